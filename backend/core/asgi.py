@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+/api/monitoring/async/... view'lari shu yerda (masalan `uvicorn core.asgi:application`)
+bitta event loop'da ishlaydi va HEMIS'ga pool'langan AsyncHemisClient orqali chiqadi.
 """
 
 import os
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -56,17 +57,65 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "monitoring.middleware.hemis_trace_middleware",
 ]
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=False, cast=bool)
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:5173,http://127.0.0.1:5173,http://localhost:5174,http://127.0.0.1:5174', cast=Csv())
+# Frontend'dan trace so‘rash va trace id / Server-Timing ni o‘qish uchun
+CORS_ALLOW_HEADERS = (*default_headers, "x-hemis-trace")
+CORS_EXPOSE_HEADERS = ["X-Hemis-Trace-Id", "Server-Timing", "Age", "ETag", "Last-Modified"]
+
+# JSON javoblar orjson bilan (o‘rnatilmagan bo‘lsa - DRF encoder); keshdagi agregatlar
+# oldindan kodlangan holda yuboriladi (monitoring/renderers.py)
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "monitoring.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
 
 HEMIS_BASE_URL = config("HEMIS_BASE_URL", default="https://student.urdu.uz/rest")
 HEMIS_TOKEN = config("HEMIS_TOKEN")
 HEMIS_UNIVERSITY_CODE = "urdu"     # UrDU kodi
 HEMIS_API_STUDENT_CONTINGENT_ENDPOINT = config("HEMIS_API_STUDENT_CONTINGENT_ENDPOINT", default="v1/data/student-list")
 
+# Fakultet x ta'lim shakli matritsasi: "count" - har katak uchun totalCount so‘rovi,
+# "scan" - student-list ni katta sahifalarda bir marta o‘qib sanash (katta OTM uchun arzonroq)
+HEMIS_FACULTY_TABLE_MODE = config("HEMIS_FACULTY_TABLE_MODE", default="count")
+HEMIS_STUDENT_SCAN_PAGE_SIZE = config("HEMIS_STUDENT_SCAN_PAGE_SIZE", default=200, cast=int)
+# Talabalar skani ustunlarda (contingent/report/ kublari manbai; scan rejimida jadval bilan birga yangilanadi)
+HEMIS_STUDENT_DATASET_TTL = config("HEMIS_STUDENT_DATASET_TTL", default=3600, cast=int)
+HEMIS_STUDENT_DATASET_STALE_TTL = config("HEMIS_STUDENT_DATASET_STALE_TTL", default=86400, cast=int)
+
+# HEMIS so‘rovlari uchun adaptiv tezlik cheklovi (jarayon bo‘yicha, rps). 0 - o‘chirilgan.
+# 429/Retry-After da tezlik kamayadi, toza javoblarda asta-sekin MAX gacha oshadi.
+HEMIS_RATE_LIMIT = config("HEMIS_RATE_LIMIT", default=8.0, cast=float)
+HEMIS_RATE_LIMIT_MIN = config("HEMIS_RATE_LIMIT_MIN", default=1.0, cast=float)
+HEMIS_RATE_LIMIT_MAX = config("HEMIS_RATE_LIMIT_MAX", default=30.0, cast=float)
+HEMIS_RATE_LIMIT_BURST = config("HEMIS_RATE_LIMIT_BURST", default=8, cast=int)
+
+# Async client (ASGI view'lar): HEMIS hostiga bir vaqtdagi so‘rovlar / pool'dagi ulanishlar soni
+HEMIS_ASYNC_MAX_CONCURRENCY = config("HEMIS_ASYNC_MAX_CONCURRENCY", default=16, cast=int)
+
+# Lokal soxta HEMIS (hemis_client/services/fake_hemis.py): HEMIS_FAKE=True bo‘lsa
+# HemisClient/AsyncHemisClient tarmoqqa chiqmaydi, sintetik universitetdan javob oladi.
+# Alohida server: `python manage.py run_fake_hemis` + HEMIS_BASE_URL=http://127.0.0.1:8765/rest
+HEMIS_FAKE = config("HEMIS_FAKE", default=False, cast=bool)
+HEMIS_FAKE_OPTIONS = {
+    "faculties": config("HEMIS_FAKE_FACULTIES", default=20, cast=int),
+    "groups": config("HEMIS_FAKE_GROUPS", default=2000, cast=int),
+    "students": config("HEMIS_FAKE_STUDENTS", default=50000, cast=int),
+    "employees": config("HEMIS_FAKE_EMPLOYEES", default=3000, cast=int),
+    "seed": config("HEMIS_FAKE_SEED", default=42, cast=int),
+    "latency_ms": config("HEMIS_FAKE_LATENCY_MS", default=0.0, cast=float),
+    "jitter_ms": config("HEMIS_FAKE_JITTER_MS", default=0.0, cast=float),
+    "error_rate": config("HEMIS_FAKE_ERROR_RATE", default=0.0, cast=float),
+    "max_rps": config("HEMIS_FAKE_MAX_RPS", default=0.0, cast=float),
+    "page_size_cap": config("HEMIS_FAKE_PAGE_SIZE_CAP", default=200, cast=int),
+}
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -96,13 +145,90 @@ DATABASES = {
     }
 }
 
+# HEMIS agregatlari uchun umumiy kesh: barcha gunicorn worker'lar bitta nusxani o‘qiydi
+# va restartdan keyin ham saqlanadi.
+# Production uchun Redis (HEMIS_REDIS_URL=redis://127.0.0.1:6379/1, `pip install redis`):
+# set() O(1), add() atomar, sig‘im maxmemory siyosati bilan boshqariladi.
+# Redis bo‘lmasa - FileBasedCache (qiymatlar pickle + zlib). Uning kamchiligi: har set()
+# papkadagi fayllarni sanaydi (O(yozuvlar)), MAX_ENTRIES ga yetganda tasodifiy 1/CULL_FREQUENCY
+# qismini o‘chiradi - shu jumladan issiq agregatlarni. Guruh davomati, natija to‘plami bo‘laklari,
+# progress/lock kalitlari minglab bo‘lgani uchun chegara yuqori qo‘yilgan; sekinlashsa - Redis.
+# SQLite varianti: HEMIS_CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache,
+# HEMIS_CACHE_LOCATION=hemis_cache va `python manage.py createcachetable`.
+HEMIS_REDIS_URL = config("HEMIS_REDIS_URL", default="")
+if HEMIS_REDIS_URL:
+    HEMIS_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': HEMIS_REDIS_URL,
+        'TIMEOUT': 3600,
+    }
+else:
+    HEMIS_CACHE = {
+        'BACKEND': config('HEMIS_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('HEMIS_CACHE_LOCATION', default=str(BASE_DIR / '.hemis_cache')),
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': config('HEMIS_CACHE_MAX_ENTRIES', default=100000, cast=int),
+            'CULL_FREQUENCY': 4,
+        },
+    }
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    'hemis': HEMIS_CACHE,
 }
 
+# HEMIS kesh TTL'lari (sekund)
+HEMIS_FACULTY_TABLE_TTL = config("HEMIS_FACULTY_TABLE_TTL", default=3600, cast=int)
+# TTL tugagandan keyin ham shuncha vaqt eski jadval beriladi (fonda yangilanadi)
+HEMIS_FACULTY_TABLE_STALE_TTL = config("HEMIS_FACULTY_TABLE_STALE_TTL", default=86400, cast=int)
+# Guruh davomati (group, status; semestr HEMIS so‘roviga kirmaydi)
+HEMIS_ATTENDANCE_GROUP_TTL = config("HEMIS_ATTENDANCE_GROUP_TTL", default=900, cast=int)
+# Fakultet o‘quv reja/guruh katalogi: shu oraliqda arzon tekshiruv (totalCount),
+# o‘zgarmagan bo‘lsa HEMIS_CATALOG_MAX_AGE gacha qayta olinmaydi
+HEMIS_ATTENDANCE_CATALOG_TTL = config("HEMIS_ATTENDANCE_CATALOG_TTL", default=3600, cast=int)
+HEMIS_CATALOG_MAX_AGE = config("HEMIS_CATALOG_MAX_AGE", default=86400, cast=int)
+# Tartiblangan davomat natija to‘plami (cursor sahifalash uchun)
+HEMIS_ATTENDANCE_RESULT_TTL = config("HEMIS_ATTENDANCE_RESULT_TTL", default=900, cast=int)
+# Imzolangan cursor shuncha sekunddan keyin eskirgan hisoblanadi (400)
+HEMIS_ATTENDANCE_CURSOR_MAX_AGE = config("HEMIS_ATTENDANCE_CURSOR_MAX_AGE", default=3600, cast=int)
+# Xavf guruhidagi talabalar (attendance/risk/): K va minimal chegaralar
+HEMIS_RISK_DEFAULT_K = config("HEMIS_RISK_DEFAULT_K", default=50, cast=int)
+HEMIS_RISK_MAX_K = config("HEMIS_RISK_MAX_K", default=1000, cast=int)
+HEMIS_RISK_MIN_ABSENT = config("HEMIS_RISK_MIN_ABSENT", default=1, cast=int)
+HEMIS_RISK_MIN_PERCENT = config("HEMIS_RISK_MIN_PERCENT", default=0.0, cast=float)
+# Universitet bo‘yicha davomat yig‘indisi (attendance/rollup/): fonda quriladi;
+# barcha fakultet guruhlari bitta navbatda, ROLLUP_WORKERS parallel so‘rov bilan
+HEMIS_ATTENDANCE_ROLLUP_TTL = config("HEMIS_ATTENDANCE_ROLLUP_TTL", default=3600, cast=int)
+HEMIS_ATTENDANCE_ROLLUP_STALE_TTL = config("HEMIS_ATTENDANCE_ROLLUP_STALE_TTL", default=86400, cast=int)
+HEMIS_ROLLUP_WORKERS = config("HEMIS_ROLLUP_WORKERS", default=20, cast=int)
+# Kafedra xodimlari ro‘yxati (barcha sahifalar birlashtirilgan)
+HEMIS_EMPLOYEE_LIST_TTL = config("HEMIS_EMPLOYEE_LIST_TTL", default=3600, cast=int)
+HEMIS_EMPLOYEE_LIST_STALE_TTL = config("HEMIS_EMPLOYEE_LIST_STALE_TTL", default=86400, cast=int)
+# Bo‘limlar daraxti (department-list)
+HEMIS_DEPARTMENT_TREE_TTL = config("HEMIS_DEPARTMENT_TREE_TTL", default=3600, cast=int)
+HEMIS_DEPARTMENT_TREE_STALE_TTL = config("HEMIS_DEPARTMENT_TREE_STALE_TTL", default=86400, cast=int)
+# Jarayon xotirasidagi qidiruv indekslari soni (LRU)
+HEMIS_SEARCH_INDEX_MAX = config("HEMIS_SEARCH_INDEX_MAX", default=64, cast=int)
+
+# So‘rov bo‘yicha HEMIS trace (monitoring/middleware.py): "X-Hemis-Trace: 1" header yoki
+# SAMPLE_RATE (0..1) ulushi. Trace'lar hemis keshida TTL davomida saqlanadi.
+# Header production'da standart o‘chiq (har kim trace yoqib keshni to‘ldirmasin);
+# /traces/ endpoint'lari faqat admin (is_staff) uchun.
+HEMIS_TRACE_HEADER_ENABLED = config("HEMIS_TRACE_HEADER_ENABLED", default=DEBUG, cast=bool)
+HEMIS_TRACE_SAMPLE_RATE = config("HEMIS_TRACE_SAMPLE_RATE", default=0.0, cast=float)
+HEMIS_TRACE_TTL = config("HEMIS_TRACE_TTL", default=3600, cast=int)
+HEMIS_TRACE_RECENT = config("HEMIS_TRACE_RECENT", default=50, cast=int)
+HEMIS_TRACE_MAX_EVENTS = config("HEMIS_TRACE_MAX_EVENTS", default=5000, cast=int)
+
+# Kontingent tarixi (monitoring.models.ContingentSnapshot): har hisoblangan fakultet jadvali
+# DB ga yoziladi; oxirgi nusxadan MIN_INTERVAL sekund o‘tmagan bo‘lsa - o‘tkazib yuboriladi
+HEMIS_SNAPSHOTS_ENABLED = config("HEMIS_SNAPSHOTS_ENABLED", default=True, cast=bool)
+HEMIS_SNAPSHOT_MIN_INTERVAL = config("HEMIS_SNAPSHOT_MIN_INTERVAL", default=3600, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,54 @@
+# backend/hemis_client/management/commands/run_fake_hemis.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hemis_client.services.fake_hemis import build_fake_hemis, make_server
+
+
+class Command(BaseCommand):
+    help = (
+        "Lokal soxta HEMIS serverini ishga tushiradi (sintetik universitet). "
+        "Backend'ni unga yo‘naltirish: HEMIS_BASE_URL=http://<host>:<port>/rest. "
+        "Standart qiymatlar settings.HEMIS_FAKE_OPTIONS dan olinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--faculties", type=int, help="Fakultetlar soni")
+        parser.add_argument("--groups", type=int, help="Guruhlar soni")
+        parser.add_argument("--students", type=int, help="Talabalar soni")
+        parser.add_argument("--employees", type=int, help="Xodimlar soni")
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--latency-ms", type=float, help="Har javob uchun kechikish, ms")
+        parser.add_argument("--jitter-ms", type=float, help="Kechikish tebranishi (±), ms")
+        parser.add_argument("--error-rate", type=float, help="Tasodifiy 429 ehtimoli (0..1)")
+        parser.add_argument("--max-rps", type=float, help="Sekundiga so‘rovlar chegarasi; oshsa 429")
+        parser.add_argument("--page-size-cap", type=int, help="limit parametrining yuqori chegarasi")
+
+    def handle(self, *args, **options):
+        fake_options = dict(settings.HEMIS_FAKE_OPTIONS)
+        for name in fake_options:
+            if options.get(name) is not None:
+                fake_options[name] = options[name]
+
+        started = time.monotonic()
+        fake = build_fake_hemis(fake_options)
+        self.stdout.write(
+            f"Synthetic university: {len(fake.faculties)} faculties, {len(fake.groups)} groups, "
+            f"{len(fake.students)} students, {len(fake.employees)} employees "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+
+        server = make_server(fake, options["host"], options["port"])
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(f"Fake HEMIS: HEMIS_BASE_URL=http://{host}:{port}/rest"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Stopped. Calls: {fake.stats()}")
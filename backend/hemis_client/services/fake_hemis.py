@@ -0,0 +1,514 @@
+# backend/hemis_client/services/fake_hemis.py
+# Lokal soxta HEMIS: sintetik universitet ustida /v1/data/* endpointlari.
+# Jarayon ichida (requests adapter / httpx transport) yoki kichik HTTP server sifatida
+# ishlaydi; kechikish, 429 va sahifa hajmi cheklovi sozlanadi - fan-out narxini
+# jonli student.urdu.uz ga tegmasdan o‘lchash uchun.
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - faqat AsyncHemisClient uchun
+    httpx = None
+
+EDUCATION_FORMS = [
+    # (code, name, ulush)
+    (11, "Kunduzgi", 0.60),
+    (13, "Sirtqi", 0.25),
+    (12, "Kechki", 0.10),
+    (16, "Masofaviy", 0.05),
+]
+EDUCATION_TYPES = [(11, "Bakalavr", 0.85), (12, "Magistr", 0.15)]
+STUDENT_STATUSES = [(11, "O‘qimoqda", 0.93), (12, "Akademik ta'tilda", 0.03), (14, "Chetlashtirilgan", 0.04)]
+EMPLOYMENT_FORMS = [("11", "Asosiy ish joy", 0.75), ("12", "O‘rindoshlik (ichki)", 0.15), ("13", "O‘rindoshlik (tashqi)", 0.10)]
+EMPLOYEE_STATUSES = [("11", "Ishlamoqda", 0.92), ("12", "Mehnat ta'tilida", 0.05), ("13", "Bo‘shagan", 0.03)]
+TEACHER_POSITIONS = ["Assistent", "Katta o‘qituvchi", "Dotsent", "Professor", "Kafedra mudiri"]
+STAFF_POSITIONS = ["Laborant", "Metodist", "Dispetcher", "Inspektor"]
+
+FIRST_NAMES = ["Alisher", "Dilshod", "Sherzod", "Jasur", "Bekzod", "Otabek", "Gulnora", "Nodira", "Shahnoza",
+               "Ozoda", "Madina", "Zarina", "Sardor", "Javohir", "Ulug‘bek", "Dilnoza", "Feruza", "Sanjar"]
+LAST_NAMES = ["Karimov", "Rahimov", "To‘xtayev", "Yo‘ldoshev", "G‘aniyev", "Qodirov", "Xolmatov", "Ergashev",
+              "Sobirov", "Matyoqubov", "Otajonov", "Bekchanov", "Sapayev", "Jumaniyozov", "Rajabov"]
+FATHER_NAMES = ["Alisher", "Baxtiyor", "Rustam", "Shavkat", "Davron", "Odil", "Komil", "Erkin"]
+
+DEFAULT_PAGE_SIZE = 20
+
+
+@dataclass
+class UniversitySpec:
+    faculties: int = 20
+    kafedras_per_faculty: int = 6
+    curricula_per_faculty: int = 20
+    groups: int = 2000
+    students: int = 50000
+    employees: int = 3000
+    seed: int = 42
+
+
+@dataclass
+class FaultSpec:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0  # tasodifiy 429 ehtimoli
+    max_rps: float = 0.0  # 0 - cheklanmagan; oshsa 429 + Retry-After
+    retry_after: float = 1.0
+    page_size_cap: int = 200
+
+
+def _weighted(rng: random.Random, choices: list[tuple]) -> tuple:
+    return rng.choices(choices, weights=[c[-1] for c in choices])[0]
+
+
+def _full_name(rng: random.Random, female: bool) -> tuple[str, str, str]:
+    last = rng.choice(LAST_NAMES) + ("a" if female else "")
+    first = rng.choice(FIRST_NAMES)
+    father = rng.choice(FATHER_NAMES) + (" qizi" if female else " o‘g‘li")
+    return last, first, father
+
+
+def _paginate(items: list, params: dict, cap: int) -> dict:
+    try:
+        limit = int(params.get("limit") or DEFAULT_PAGE_SIZE)
+        page = int(params.get("page") or 1)
+    except ValueError:
+        limit, page = DEFAULT_PAGE_SIZE, 1
+    limit = max(1, min(limit, cap))
+    page = max(1, page)
+    total = len(items)
+    return {
+        "success": True,
+        "error": None,
+        "data": {
+            "items": items[(page - 1) * limit:page * limit],
+            "pagination": {
+                "totalCount": total,
+                "pageSize": limit,
+                "pageCount": -(-total // limit),
+                "page": page,
+            },
+        },
+        "code": 200,
+    }
+
+
+def _matches(value: Any, param: str | None) -> bool:
+    return param in (None, "") or str(value) == str(param)
+
+
+class FakeHemis:
+    """
+    Sintetik universitet (deterministik, `seed` bo‘yicha) + endpoint handler'lari.
+    handle() HTTP'dan mustaqil: (status, headers, body bytes) qaytaradi;
+    adapter / transport / server faqat o‘rab beradi. Statistika: endpoint bo‘yicha sanoq.
+    """
+
+    def __init__(self, spec: UniversitySpec | None = None, faults: FaultSpec | None = None):
+        self.spec = spec or UniversitySpec()
+        self.faults = faults or FaultSpec()
+        self.calls: Counter = Counter()
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.spec.seed + 1)
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._generate()
+
+    # -----------------------
+    # DATA
+    # -----------------------
+    def _generate(self) -> None:
+        spec = self.spec
+        rng = random.Random(spec.seed)
+        form_names = {code: name for code, name, _ in EDUCATION_FORMS}
+
+        root = {"id": 1, "name": "Urganch davlat universiteti", "code": "U", "active": True,
+                "structureType": {"code": "10", "name": "Rektorat"}, "parent": None}
+        self.departments = [root]
+        self.faculties = []
+        self.kafedras = []
+        for f in range(spec.faculties):
+            fac = {"id": 100 + f, "name": f"{f + 1}-fakultet", "code": f"F{f + 1:02d}", "active": True,
+                   "structureType": {"code": "11", "name": "Fakultet"}, "parent": 1}
+            self.faculties.append(fac)
+            self.departments.append(fac)
+            for k in range(spec.kafedras_per_faculty):
+                kaf = {"id": 1000 + f * 100 + k, "name": f"{f + 1}-fakultet {k + 1}-kafedra",
+                       "code": f"K{f + 1:02d}{k + 1:02d}", "active": True,
+                       "structureType": {"code": "12", "name": "Kafedra"}, "parent": fac["id"]}
+                self.kafedras.append(kaf)
+                self.departments.append(kaf)
+
+        def dept_ref(d):
+            return {"id": d["id"], "name": d["name"], "code": d["code"],
+                    "structureType": d["structureType"], "parent": d["parent"]}
+
+        self.curricula = []
+        for fac in self.faculties:
+            for c in range(spec.curricula_per_faculty):
+                form_code, form_name, _ = _weighted(rng, EDUCATION_FORMS)
+                type_id, type_name, _ = _weighted(rng, EDUCATION_TYPES)
+                cid = len(self.curricula) + 1
+                self.curricula.append({
+                    "id": cid,
+                    "name": f"{fac['code']}-reja-{c + 1}",
+                    "department": dept_ref(fac),
+                    "educationForm": {"code": str(form_code), "name": form_name},
+                    "educationType": {"code": str(type_id), "name": type_name},
+                    "specialty": {
+                        "id": cid,
+                        "name": f"{fac['name']} {c + 1}-mutaxassislik",
+                        "educationType": {"id": type_id, "name": type_name},
+                    },
+                    "active": True,
+                })
+
+        self.groups = []
+        for g in range(spec.groups):
+            cur = self.curricula[g % len(self.curricula)] if self.curricula else None
+            if cur is None:
+                break
+            self.groups.append({
+                "id": g + 1,
+                "name": f"{cur['department']['code']}-{g + 1:04d}",
+                "department": cur["department"],
+                "educationForm": cur["educationForm"],
+                "_department": cur["department"]["id"],
+                "_curriculum": cur["id"],
+                "active": True,
+            })
+
+        self.students = []
+        self.attendance: dict[int, dict] = {}
+        for s in range(spec.students if self.groups else 0):
+            grp = self.groups[rng.randrange(len(self.groups))]
+            female = rng.random() < 0.5
+            last, first, father = _full_name(rng, female)
+            status_code, status_name, _ = _weighted(rng, STUDENT_STATUSES)
+            form_code = int(grp["educationForm"]["code"])
+            # kurs guruhdan (RNG ketma-ketligi o‘zgarmaydi)
+            course = grp["id"] % 4 + 1
+            sid = s + 1
+            self.students.append({
+                "id": sid,
+                "full_name": f"{last} {first} {father}",
+                "short_name": f"{last} {first[0]}.",
+                "first_name": first,
+                "second_name": last,
+                "third_name": father,
+                "student_id_number": f"{3000000 + sid}",
+                "gender": {"code": "12" if female else "11", "name": "Ayol" if female else "Erkak"},
+                "department": grp["department"],
+                "educationForm": {"code": str(form_code), "name": form_names[form_code]},
+                "level": {"code": str(10 + course), "name": f"{course}-kurs"},
+                "group": {"id": grp["id"], "name": grp["name"]},
+                "_group": grp["id"],
+                "studentStatus": {"code": str(status_code), "name": status_name},
+            })
+            lessons = rng.randint(80, 200)
+            absent_on = rng.choice([0, 0, 0, 2, 4, 6, 8, 12])
+            absent_off = rng.choice([0, 0, 0, 0, 2, 4, 10, 20])
+            self.attendance[sid] = {
+                "subjects": rng.randint(5, 10),
+                "lessons": lessons,
+                "absent_on": absent_on,
+                "absent_off": absent_off,
+                "total_percent": round((absent_on + absent_off) * 100 / lessons, 2),
+            }
+
+        self.employees = []
+        for e in range(spec.employees if self.kafedras else 0):
+            kaf = self.kafedras[rng.randrange(len(self.kafedras))]
+            female = rng.random() < 0.4
+            last, first, father = _full_name(rng, female)
+            is_teacher = rng.random() < 0.8
+            ef_code, ef_name, _ = _weighted(rng, EMPLOYMENT_FORMS)
+            st_code, st_name, _ = _weighted(rng, EMPLOYEE_STATUSES)
+            position = rng.choice(TEACHER_POSITIONS if is_teacher else STAFF_POSITIONS)
+            eid = e + 1
+            self.employees.append({
+                "id": eid,
+                "full_name": f"{last} {first} {father}",
+                "short_name": f"{last} {first[0]}.",
+                "image": "",
+                "employee_id_number": f"{4000000 + eid}",
+                "department": dept_ref(kaf),
+                "staffPosition": {"id": TEACHER_POSITIONS.index(position) if is_teacher else 50, "name": position},
+                "employmentForm": {"id": int(ef_code), "code": ef_code, "name": ef_name},
+                "employmentStaff": {"code": "10", "name": rng.choice(["1.00", "0.75", "0.50", "0.25"])},
+                "employeeStatus": {"id": int(st_code), "code": st_code, "name": st_name},
+                "active": st_code != "13",
+                "decree_number": f"{rng.randint(1, 999)}-K",
+                "gender": {"code": "12" if female else "11", "name": "Ayol" if female else "Erkak"},
+                "year_of_enter": rng.randint(1995, 2025),
+                "_is_teacher": is_teacher,
+            })
+
+        # Tez-tez ishlatiladigan filtrlar uchun indekslar
+        self._students_by_faculty: dict[int, list[dict]] = {}
+        self._students_by_group: dict[int, list[dict]] = {}
+        for st in self.students:
+            self._students_by_faculty.setdefault(st["department"]["id"], []).append(st)
+            self._students_by_group.setdefault(st["_group"], []).append(st)
+
+    # -----------------------
+    # FAULTS / STATS
+    # -----------------------
+    def delay(self) -> float:
+        f = self.faults
+        if not f.latency_ms and not f.jitter_ms:
+            return 0.0
+        with self._lock:
+            jitter = self._rng.uniform(-f.jitter_ms, f.jitter_ms) if f.jitter_ms else 0.0
+        return max(0.0, (f.latency_ms + jitter) / 1000)
+
+    def _should_throttle(self) -> bool:
+        f = self.faults
+        with self._lock:
+            if f.error_rate and self._rng.random() < f.error_rate:
+                return True
+            if f.max_rps:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                return self._window_count > f.max_rps
+        return False
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.throttled = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": dict(self.calls), "total": sum(self.calls.values()), "throttled": self.throttled}
+
+    # -----------------------
+    # DISPATCH
+    # -----------------------
+    def handle(self, path: str, params: dict) -> tuple[int, dict, bytes]:
+        endpoint = path.rsplit("/v1/data/", 1)[-1].strip("/") if "/v1/data/" in path else ""
+        handler = getattr(self, "_" + endpoint.replace("-", "_"), None) if endpoint else None
+
+        with self._lock:
+            self.calls[endpoint or path] += 1
+
+        if handler is None:
+            return 404, {"Content-Type": "application/json"}, b'{"success": false, "error": "Not found"}'
+
+        if self._should_throttle():
+            with self._lock:
+                self.throttled += 1
+            headers = {"Content-Type": "application/json", "Retry-After": str(self.faults.retry_after)}
+            return 429, headers, b'{"success": false, "error": "Too Many Requests"}'
+
+        body = json.dumps(handler(params), ensure_ascii=False).encode("utf-8")
+        return 200, {"Content-Type": "application/json; charset=utf-8"}, body
+
+    def _page(self, items: list, params: dict) -> dict:
+        return _paginate(items, params, self.faults.page_size_cap)
+
+    def _department_list(self, params: dict) -> dict:
+        items = [
+            d for d in self.departments
+            if _matches(d["structureType"]["code"], params.get("_structure_type"))
+            and _matches(d["parent"], params.get("_parent"))
+        ]
+        return self._page(items, params)
+
+    def _curriculum_list(self, params: dict) -> dict:
+        items = [
+            c for c in self.curricula
+            if _matches(c["department"]["id"], params.get("_department"))
+            and _matches(c["educationForm"]["code"], params.get("_education_form"))
+        ]
+        return self._page(items, params)
+
+    def _group_list(self, params: dict) -> dict:
+        items = [
+            g for g in self.groups
+            if _matches(g["_department"], params.get("_department"))
+            and _matches(g["educationForm"]["code"], params.get("_education_form"))
+            and _matches(g["_curriculum"], params.get("_curriculum"))
+        ]
+        return self._page(items, params)
+
+    def _student_list(self, params: dict) -> dict:
+        if params.get("_group"):
+            source = self._students_by_group.get(int(params["_group"]), [])
+        elif params.get("_department"):
+            source = self._students_by_faculty.get(int(params["_department"]), [])
+        else:
+            source = self.students
+        items = [
+            s for s in source
+            if _matches(s["educationForm"]["code"], params.get("_education_form"))
+            and _matches(s["studentStatus"]["code"], params.get("_student_status"))
+        ]
+        return self._page(items, params)
+
+    def _classifier_list(self, params: dict) -> dict:
+        classifiers = [
+            {"classifier": "h_education_form", "name": "Ta'lim shakli",
+             "options": [{"code": str(c), "name": n} for c, n, _ in EDUCATION_FORMS]},
+            {"classifier": "h_education_type", "name": "Ta'lim turi",
+             "options": [{"code": str(c), "name": n} for c, n, _ in EDUCATION_TYPES]},
+            {"classifier": "h_student_status", "name": "Talaba holati",
+             "options": [{"code": str(c), "name": n} for c, n, _ in STUDENT_STATUSES]},
+        ]
+        if params.get("classifier"):
+            classifiers = [c for c in classifiers if c["classifier"] == params["classifier"]]
+        return self._page(classifiers, params)
+
+    def _employee_list(self, params: dict) -> dict:
+        emp_type = params.get("type") or "teacher"
+        search = (params.get("search") or "").lower()
+        items = []
+        for e in self.employees:
+            if emp_type == "teacher" and not e["_is_teacher"]:
+                continue
+            if emp_type == "employee" and e["_is_teacher"]:
+                continue
+            if not _matches(e["department"]["id"], params.get("_department")):
+                continue
+            if search and search not in e["full_name"].lower():
+                continue
+            items.append({k: v for k, v in e.items() if not k.startswith("_")})
+        return self._page(items, params)
+
+    def _attendance_stat(self, params: dict) -> dict:
+        if params.get("_group"):
+            source = self._students_by_group.get(int(params["_group"]), [])
+        elif params.get("_department"):
+            source = self._students_by_faculty.get(int(params["_department"]), [])
+        else:
+            source = self.students
+        items = [
+            {
+                "student": {"id": s["id"], "full_name": s["full_name"]},
+                "group": s["group"],
+                **self.attendance[s["id"]],
+            }
+            for s in source
+            if _matches(s["studentStatus"]["code"], params.get("_student_status"))
+        ]
+        return self._page(items, params)
+
+
+# -----------------------
+# TRANSPORTS
+# -----------------------
+class FakeHemisAdapter(BaseAdapter):
+    """requests.Session.mount(base_url, FakeHemisAdapter(fake)) - HemisClient tarmoqsiz ishlaydi."""
+
+    def __init__(self, fake: FakeHemis):
+        super().__init__()
+        self.fake = fake
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        delay = self.fake.delay()
+        if delay:
+            time.sleep(delay)
+        parts = urlsplit(request.url)
+        status, headers, body = self.fake.handle(parts.path, dict(parse_qsl(parts.query)))
+
+        resp = requests.Response()
+        resp.status_code = status
+        resp.headers = CaseInsensitiveDict(headers)
+        resp._content = body
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "OK" if status == 200 else "Error"
+        return resp
+
+    def close(self):
+        pass
+
+
+class FakeHemisAsyncTransport(httpx.AsyncBaseTransport if httpx is not None else object):
+    """httpx.AsyncClient(transport=...) - AsyncHemisClient uchun."""
+
+    def __init__(self, fake: FakeHemis):
+        self.fake = fake
+
+    async def handle_async_request(self, request: "httpx.Request") -> "httpx.Response":
+        delay = self.fake.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        status, headers, body = self.fake.handle(request.url.path, dict(request.url.params))
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+
+def make_server(fake: FakeHemis, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Kichik HTTP server: HEMIS_BASE_URL=http://host:port/rest bilan ishlatiladi."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            delay = fake.delay()
+            if delay:
+                time.sleep(delay)
+            parts = urlsplit(self.path)
+            status, headers, body = fake.handle(parts.path, dict(parse_qsl(parts.query)))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+# -----------------------
+# SETTINGS
+# -----------------------
+_fake: FakeHemis | None = None
+_fake_lock = threading.Lock()
+
+
+def build_fake_hemis(options: dict) -> FakeHemis:
+    spec_fields = UniversitySpec.__dataclass_fields__
+    fault_fields = FaultSpec.__dataclass_fields__
+    return FakeHemis(
+        UniversitySpec(**{k: v for k, v in options.items() if k in spec_fields}),
+        FaultSpec(**{k: v for k, v in options.items() if k in fault_fields}),
+    )
+
+
+def get_fake_hemis() -> FakeHemis:
+    """settings.HEMIS_FAKE_OPTIONS bo‘yicha jarayonda bitta soxta HEMIS."""
+    global _fake
+    if _fake is None:
+        with _fake_lock:
+            if _fake is None:
+                _fake = build_fake_hemis(settings.HEMIS_FAKE_OPTIONS)
+    return _fake
+
+
+def install_fake_hemis(fake: FakeHemis | None) -> None:
+    """Benchmark/test: jarayon bo‘yicha soxta HEMIS'ni almashtirish (None - settings'dan qayta)."""
+    global _fake
+    with _fake_lock:
+        _fake = fake
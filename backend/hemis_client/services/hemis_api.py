@@ -2,52 +2,200 @@
 import logging
 import time
 import random
+import threading
 import requests
 from typing import Any
 from django.conf import settings
 
+from .metrics import record_request, record_retry
+from .rate_limiter import get_rate_limiter, parse_retry_after
+from .tracing import current_trace
+
 logger = logging.getLogger(__name__)
 
+# Ta'lim shakllari klassifikatori topilmasa ishlatiladigan REAL ro‘yxat
+FALLBACK_EDUCATION_FORMS = [
+    {"id": 11, "name": "Kunduzgi", "code": "11"},
+    {"id": 13, "name": "Sirtqi", "code": "13"},
+    {"id": 15, "name": "Ikkinchi oliy (sirtqi)", "code": "15"},
+    {"id": 14, "name": "Maxsus sirtqi", "code": "14"},
+    {"id": 12, "name": "Kechki", "code": "12"},
+    {"id": 16, "name": "Masofaviy", "code": "16"},
+    {"id": 20, "name": "Qo‘shma (kunduzgi)", "code": "20"},
+    {"id": 21, "name": "Qo‘shma (kechki)", "code": "21"},
+    {"id": 19, "name": "Ikkinchi oliy (kechki)", "code": "19"},
+    {"id": 18, "name": "Ikkinchi oliy (kunduzgi)", "code": "18"},
+    {"id": 17, "name": "Qo‘shma (sirtqi)", "code": "17"},
+    {"id": 22, "name": "Ikkinchi oliy (masofaviy)", "code": "22"},
+    {"id": 23, "name": "Qo‘shma (Masofaviy)", "code": "23"},
+]
+
+EMPLOYEE_LIST_PARAMS = ["type", "_department", "_gender", "_staff_position", "page", "limit", "search"]
+
+
+def extract_items(payload: Any) -> list[dict]:
+    """HEMIS javobidan data.items (yoki data ro‘yxat bo‘lsa - o‘zi)."""
+    if not isinstance(payload, dict):
+        return []
+    data = payload.get("data")
+    if isinstance(data, dict):
+        items = data.get("items")
+        if isinstance(items, list):
+            return items
+    if isinstance(data, list):
+        return data
+    return []
+
+
+def extract_total_count(payload: Any) -> int:
+    """HEMIS javobidan pagination.totalCount (yuqori darajada yoki data ichida)."""
+    if not isinstance(payload, dict):
+        return 0
+    pagination = payload.get("pagination")
+    if not pagination:
+        data_node = payload.get("data")
+        if isinstance(data_node, dict):
+            pagination = data_node.get("pagination")
+
+    if not pagination:
+        return 0
+
+    total = pagination.get("totalCount") or pagination.get("total_count") or 0
+    try:
+        return int(total)
+    except (TypeError, ValueError):
+        logger.warning("Unexpected totalCount value from HEMIS: %r", total)
+        return 0
+
+
+def extract_page_count(payload: Any, page_size: int) -> int:
+    """
+    HEMIS javobidan pagination.pageCount; bo‘lmasa totalCount / page_size (yuqoriga).
+    Birinchi sahifadan keyin qolgan sahifalarni parallel so‘rash uchun.
+    """
+    pagination = payload.get("pagination") if isinstance(payload, dict) else None
+    if not pagination and isinstance(payload, dict):
+        data_node = payload.get("data")
+        if isinstance(data_node, dict):
+            pagination = data_node.get("pagination")
+    pagination = pagination or {}
+    try:
+        page_count = int(pagination.get("pageCount") or 0)
+        if not page_count:
+            total = int(pagination.get("totalCount") or pagination.get("total_count") or 0)
+            page_count = -(-total // page_size)
+    except (TypeError, ValueError):
+        page_count = 1
+    return page_count
+
+
+def normalize_forms(options: list) -> list[dict]:
+    result = []
+    for opt in options:
+        try:
+            code = opt.get("code")
+            name = opt.get("name")
+            if code and name:
+                result.append({"id": int(code), "code": str(code), "name": name})
+        except (ValueError, TypeError):
+            continue
+    return result
+
 
 class HemisClient:
+    # Jarayon bo‘yicha yuborilgan HTTP so‘rovlar soni (retry'lar ham) - warmer/diagnostika uchun
+    request_count = 0
+    _count_lock = threading.Lock()
+
     def __init__(self):
         self.api_url = settings.HEMIS_BASE_URL.rstrip("/")
         self.api_token = settings.HEMIS_TOKEN
+        # Shu nusxa orqali yuborilgan so‘rovlar (bitta build/ish bo‘yicha sanash uchun;
+        # request_count esa butun jarayon - boshqa thread'larnikini ham qo‘shadi)
+        self.calls = 0
 
+        # So‘rov trace'i (middleware yoqgan bo‘lsa): pool thread'laridagi chaqiruvlar ham yoziladi
+        self._trace = current_trace()
         self.session = requests.Session()
+        if settings.HEMIS_FAKE:
+            from .fake_hemis import FakeHemisAdapter, get_fake_hemis
+            self.session.mount(self.api_url, FakeHemisAdapter(get_fake_hemis()))
         self.headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json",
         }
 
     def _get(self, endpoint: str, params: dict | None = None) -> dict:
+        trace = self._trace or current_trace()
+        if trace is None:
+            return self._get_with_retry(endpoint, params)
+
+        outcome = {"attempts": 0, "status": None, "bytes": 0}
+        started = time.perf_counter()
+        try:
+            return self._get_with_retry(endpoint, params, outcome)
+        finally:
+            trace.add_call(
+                endpoint, params, started,
+                status=outcome["status"], retries=max(0, outcome["attempts"] - 1), nbytes=outcome["bytes"],
+            )
+
+    def _get_with_retry(self, endpoint: str, params: dict | None = None, outcome: dict | None = None) -> dict:
         url = f"{self.api_url}{endpoint}"
 
         # 429 uchun yumshoq retry (backoff)
         max_retries = 4
         base_sleep = 0.6
+        # Barcha thread'lar uchun umumiy tezlik cheklovi (AIMD)
+        limiter = get_rate_limiter()
 
         for attempt in range(max_retries):
+            if limiter:
+                limiter.acquire()
+            with HemisClient._count_lock:
+                HemisClient.request_count += 1
+                self.calls += 1
+            resp = None
+            started = time.perf_counter()
             try:
                 resp = self.session.get(
                     url, headers=self.headers, params=params, timeout=15
                 )
+                record_request(endpoint, resp.status_code, time.perf_counter() - started, len(resp.content))
+                if outcome is not None:
+                    outcome.update(attempts=attempt + 1, status=resp.status_code, bytes=len(resp.content))
 
                 # Rate limit bo‘lsa - kutib qayta uramiz
                 if resp.status_code == 429:
-                    sleep_s = base_sleep * (2 ** attempt) + random.uniform(0.1, 0.4)
+                    record_retry(endpoint, "429")
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    sleep_s = retry_after if retry_after is not None else (
+                        base_sleep * (2 ** attempt) + random.uniform(0.1, 0.4)
+                    )
                     logger.warning("HEMIS 429 Too Many Requests. Sleep %.2fs then retry. url=%s", sleep_s, url)
-                    time.sleep(sleep_s)
+                    if limiter:
+                        # Cooldown'ni limiter ushlab turadi - boshqa thread/jarayonlar ham kutadi
+                        limiter.on_throttle(sleep_s)
+                    else:
+                        time.sleep(sleep_s)
                     continue
 
                 resp.raise_for_status()
+                if limiter:
+                    limiter.on_success()
                 return resp.json()
 
             except requests.RequestException as e:
+                if resp is None:
+                    # Javob yo‘q (timeout, ulanish xatosi)
+                    record_request(endpoint, "error", time.perf_counter() - started)
+                    if outcome is not None:
+                        outcome.update(attempts=attempt + 1, status="error", bytes=0)
                 # oxirgi urinishda raise
                 if attempt == max_retries - 1:
                     logger.error("HEMIS API Error (%s): %s", endpoint, e, exc_info=True)
                     raise
+                record_retry(endpoint, "error")
                 sleep_s = base_sleep * (2 ** attempt) + random.uniform(0.1, 0.4)
                 logger.warning("HEMIS request error. Sleep %.2fs then retry. endpoint=%s err=%s", sleep_s, endpoint, e)
                 time.sleep(sleep_s)
@@ -65,19 +213,21 @@ class HemisClient:
         return self._get("/v1/data/department-list", params=req_params)
 
     def get_group_list(self, *, department_id: int | None = None, education_form_id: int | None = None,
-                       curriculum_id: int | None = None, limit: int = 200) -> dict:
+                       curriculum_id: int | None = None, limit: int = 200, params=None) -> dict:
         """
         Guruhlar ro‘yxati (HEMIS: /v1/data/group-list)
         Paramlar HEMISga qarab ishlaydi: _department, _education_form, _curriculum
         """
-        params: dict[str, Any] = {"page": 1, "limit": limit}
+        req_params: dict[str, Any] = {"page": 1, "limit": limit}
         if department_id:
-            params["_department"] = department_id
+            req_params["_department"] = department_id
         if education_form_id:
-            params["_education_form"] = education_form_id
+            req_params["_education_form"] = education_form_id
         if curriculum_id:
-            params["_curriculum"] = curriculum_id
-        return self._get("/v1/data/group-list", params=params)
+            req_params["_curriculum"] = curriculum_id
+        if params:
+            req_params.update(params)
+        return self._get("/v1/data/group-list", params=req_params)
 
     def get_curriculum_list(self, *, department_id: int | None = None, education_form_id: int | None = None,
                             limit: int = 200, params=None) -> dict:
@@ -145,33 +295,10 @@ class HemisClient:
             logger.error("Failed to fetch education forms: %s", e, exc_info=True)
 
         # 3) ✅ REAL STATIC FALLBACK (siz bergan ro‘yxat)
-        return [
-            {"id": 11, "name": "Kunduzgi", "code": "11"},
-            {"id": 13, "name": "Sirtqi", "code": "13"},
-            {"id": 15, "name": "Ikkinchi oliy (sirtqi)", "code": "15"},
-            {"id": 14, "name": "Maxsus sirtqi", "code": "14"},
-            {"id": 12, "name": "Kechki", "code": "12"},
-            {"id": 16, "name": "Masofaviy", "code": "16"},
-            {"id": 20, "name": "Qo‘shma (kunduzgi)", "code": "20"},
-            {"id": 21, "name": "Qo‘shma (kechki)", "code": "21"},
-            {"id": 19, "name": "Ikkinchi oliy (kechki)", "code": "19"},
-            {"id": 18, "name": "Ikkinchi oliy (kunduzgi)", "code": "18"},
-            {"id": 17, "name": "Qo‘shma (sirtqi)", "code": "17"},
-            {"id": 22, "name": "Ikkinchi oliy (masofaviy)", "code": "22"},
-            {"id": 23, "name": "Qo‘shma (Masofaviy)", "code": "23"},
-        ]
+        return [dict(f) for f in FALLBACK_EDUCATION_FORMS]
 
     def _normalize_forms(self, options: list) -> list[dict]:
-        result = []
-        for opt in options:
-            try:
-                code = opt.get("code")
-                name = opt.get("name")
-                if code and name:
-                    result.append({"id": int(code), "code": str(code), "name": name})
-            except (ValueError, TypeError):
-                continue
-        return result
+        return normalize_forms(options)
 
     def get_education_year_list(self, limit: int = 50) -> dict:
         """
@@ -242,29 +369,33 @@ class HemisClient:
             logger.error("HEMIS student_count error: %s", exc, exc_info=True)
             return 0
 
-        pagination = payload.get("pagination")
-        if not pagination:
-            data_node = payload.get("data")
-            if isinstance(data_node, dict):
-                pagination = data_node.get("pagination")
-
-        if not pagination:
-            return 0
+        return extract_total_count(payload)
 
-        total = pagination.get("totalCount") or pagination.get("total_count") or 0
-        try:
-            return int(total)
-        except (TypeError, ValueError):
-            logger.warning("Unexpected totalCount value from HEMIS: %r", total)
-            return 0
+    def get_student_list(self, *, page: int = 1, limit: int = 200, student_status_id: int | None = None,
+                         params: dict | None = None) -> dict:
+        """
+        Talabalar ro‘yxati (HEMIS: /v1/data/student-list), bitta sahifa.
+        Katta sahifalar bilan to‘liq skan qilish uchun ishlatiladi.
+        """
+        req_params: dict[str, Any] = {"page": page, "limit": limit}
+        if student_status_id is not None:
+            req_params["_student_status"] = student_status_id
+        if params:
+            req_params.update(params)
+        return self._get("/v1/data/student-list", params=req_params)
 
     # -----------------------
     # ATTENDANCE STAT
     # -----------------------
-    # Methods already updated above implicitly via signature change? No, explicit update needed if content changed. 
-    # But wait, the previous snippet I am replacing covers get_department_list... down to ... 
-    # Ah, I replaced a huge chunk including get_semester_list etc. to update signatures or keep consistency.
-    # The KEY changes are below in get_employee_list.
+    def get_attendance_stat(self, params: dict | None = None) -> dict:
+        """
+        Davomat statistikasi (HEMIS: /v1/data/attendance-stat)
+        Params: group_by=student|group, _group, _student_status, _semester, page, limit
+        """
+        req_params: dict[str, Any] = {"page": 1, "limit": 200}
+        if params:
+            req_params.update(params)
+        return self._get("/v1/data/attendance-stat", params=req_params)
 
     # -----------------------
     # EMPLOYEE LIST
@@ -276,8 +407,7 @@ class HemisClient:
         Search: We forward 'search' to API. If API ignores it, we rely on client-side or fallback logic if explicitly requested.
         """
         # Allow search in params
-        allowed_params = ["type", "_department", "_gender", "_staff_position", "page", "limit", "search"]
-        request_params = {k: v for k, v in (params or {}).items() if k in allowed_params}
+        request_params = {k: v for k, v in (params or {}).items() if k in EMPLOYEE_LIST_PARAMS}
 
         # Default type=teacher
         if "type" not in request_params:
@@ -0,0 +1,287 @@
+# backend/hemis_client/services/hemis_async.py
+import asyncio
+import logging
+import random
+import time
+import weakref
+from typing import Any
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx faqat async view'lar uchun kerak
+    httpx = None
+
+from .hemis_api import (
+    EMPLOYEE_LIST_PARAMS,
+    FALLBACK_EDUCATION_FORMS,
+    HemisClient,
+    extract_total_count,
+    normalize_forms,
+)
+from .metrics import record_request, record_retry
+from .rate_limiter import get_rate_limiter, parse_retry_after
+from .tracing import current_trace
+
+logger = logging.getLogger(__name__)
+
+# Event loop bo‘yicha: bitta umumiy client va host bo‘yicha semaphore'lar.
+# httpx pool'i va asyncio.Semaphore loop'ga bog‘langan - loop yopilsa yozuvlar ham ketadi.
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHemisClient]" = weakref.WeakKeyDictionary()
+_host_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def host_semaphore(host: str) -> asyncio.Semaphore:
+    """
+    Shu loop'dagi barcha client'lar uchun host bo‘yicha umumiy cheklov
+    (HEMIS_ASYNC_MAX_CONCURRENCY). ASGI worker'da loop bitta - amalda jarayon bo‘yicha.
+    """
+    per_loop = _host_semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = per_loop.get(host)
+    if semaphore is None:
+        semaphore = per_loop[host] = asyncio.Semaphore(settings.HEMIS_ASYNC_MAX_CONCURRENCY)
+    return semaphore
+
+
+def get_async_client() -> "AsyncHemisClient":
+    """
+    Joriy event loop'ning umumiy client'i: so‘rovlar bir xil keep-alive pool'dan foydalanadi,
+    har build yangi ulanish/TLS ochmaydi. Yopishni aclose_async_client() qiladi.
+    """
+    loop = asyncio.get_running_loop()
+    client = _loop_clients.get(loop)
+    if client is None or client.client.is_closed:
+        client = _loop_clients[loop] = AsyncHemisClient()
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Joriy loop client'ini yopadi (masalan, loop tugashidan oldin yoki testlarda)."""
+    client = _loop_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncHemisClient:
+    """
+    HemisClient'ning asyncio varianti (ASGI view'lar uchun).
+    Odatda get_async_client() orqali - loop bo‘yicha bitta httpx.AsyncClient: keep-alive
+    ulanishlar pool'i, TLS handshake qayta-qayta bo‘lmaydi. `async with` ham ishlaydi
+    (chiqishda aclose()). Bir vaqtdagi so‘rovlar host bo‘yicha umumiy semaphore bilan cheklanadi.
+    Fan-out thread emas, coroutine bilan qilinadi. Tezlik cheklovi sync client bilan umumiy.
+    """
+
+    def __init__(self, *, max_concurrency: int | None = None):
+        if httpx is None:
+            raise ImproperlyConfigured("AsyncHemisClient uchun httpx kerak: pip install httpx")
+        self.api_url = settings.HEMIS_BASE_URL.rstrip("/")
+        self.api_token = settings.HEMIS_TOKEN
+        self.host = urlsplit(self.api_url).netloc
+        concurrency = max_concurrency or settings.HEMIS_ASYNC_MAX_CONCURRENCY
+
+        self.headers = {
+            "Authorization": f"Bearer {self.api_token}",
+            "Content-Type": "application/json",
+        }
+        transport = None
+        if settings.HEMIS_FAKE:
+            from .fake_hemis import FakeHemisAsyncTransport, get_fake_hemis
+            transport = FakeHemisAsyncTransport(get_fake_hemis())
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=15,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _get(self, endpoint: str, params: dict | None = None) -> dict:
+        # Client loop bo‘yicha umumiy - trace chaqiruv paytidagi kontekstdan olinadi
+        trace = current_trace()
+        if trace is None:
+            return await self._get_with_retry(endpoint, params)
+
+        outcome = {"attempts": 0, "status": None, "bytes": 0}
+        started = time.perf_counter()
+        task = asyncio.current_task()
+        try:
+            return await self._get_with_retry(endpoint, params, outcome)
+        finally:
+            trace.add_call(
+                endpoint, params, started,
+                status=outcome["status"], retries=max(0, outcome["attempts"] - 1), nbytes=outcome["bytes"],
+                worker=task.get_name() if task else None,
+            )
+
+    async def _get_with_retry(self, endpoint: str, params: dict | None = None, outcome: dict | None = None) -> dict:
+        url = f"{self.api_url}{endpoint}"
+
+        # 429 uchun yumshoq retry (backoff) - HemisClient._get bilan bir xil
+        max_retries = 4
+        base_sleep = 0.6
+        limiter = get_rate_limiter()
+
+        for attempt in range(max_retries):
+            if limiter:
+                await limiter.acquire_async()
+            with HemisClient._count_lock:
+                HemisClient.request_count += 1
+            resp = None
+            started = time.perf_counter()
+            try:
+                async with host_semaphore(self.host):
+                    resp = await self.client.get(url, params=params)
+                record_request(endpoint, resp.status_code, time.perf_counter() - started, len(resp.content))
+                if outcome is not None:
+                    outcome.update(attempts=attempt + 1, status=resp.status_code, bytes=len(resp.content))
+
+                if resp.status_code == 429:
+                    record_retry(endpoint, "429")
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    sleep_s = retry_after if retry_after is not None else (
+                        base_sleep * (2 ** attempt) + random.uniform(0.1, 0.4)
+                    )
+                    logger.warning("HEMIS 429 Too Many Requests. Sleep %.2fs then retry. url=%s", sleep_s, url)
+                    if limiter:
+                        await limiter.on_throttle_async(sleep_s)
+                    else:
+                        await asyncio.sleep(sleep_s)
+                    continue
+
+                resp.raise_for_status()
+                if limiter:
+                    limiter.on_success()
+                return resp.json()
+
+            except httpx.HTTPError as e:
+                if resp is None:
+                    record_request(endpoint, "error", time.perf_counter() - started)
+                    if outcome is not None:
+                        outcome.update(attempts=attempt + 1, status="error", bytes=0)
+                if attempt == max_retries - 1:
+                    logger.error("HEMIS API Error (%s): %s", endpoint, e, exc_info=True)
+                    raise
+                record_retry(endpoint, "error")
+                sleep_s = base_sleep * (2 ** attempt) + random.uniform(0.1, 0.4)
+                logger.warning("HEMIS request error. Sleep %.2fs then retry. endpoint=%s err=%s", sleep_s, endpoint, e)
+                await asyncio.sleep(sleep_s)
+
+        raise RuntimeError("HEMIS request failed after retries")
+
+    # -----------------------
+    # BASIC LISTS
+    # -----------------------
+    async def get_department_list(self, limit: int = 200, params: dict | None = None) -> dict:
+        req_params = {"limit": limit}
+        if params:
+            req_params.update(params)
+        return await self._get("/v1/data/department-list", params=req_params)
+
+    async def get_group_list(self, *, department_id: int | None = None, education_form_id: int | None = None,
+                             curriculum_id: int | None = None, limit: int = 200, params=None) -> dict:
+        req_params: dict[str, Any] = {"page": 1, "limit": limit}
+        if department_id:
+            req_params["_department"] = department_id
+        if education_form_id:
+            req_params["_education_form"] = education_form_id
+        if curriculum_id:
+            req_params["_curriculum"] = curriculum_id
+        if params:
+            req_params.update(params)
+        return await self._get("/v1/data/group-list", params=req_params)
+
+    async def get_curriculum_list(self, *, department_id: int | None = None, education_form_id: int | None = None,
+                                  limit: int = 200, params=None) -> dict:
+        req_params: dict[str, Any] = {"page": 1, "limit": limit}
+        if department_id:
+            req_params["_department"] = department_id
+        if education_form_id:
+            req_params["_education_form"] = education_form_id
+        if params:
+            req_params.update(params)
+        return await self._get("/v1/data/curriculum-list", params=req_params)
+
+    async def get_education_forms(self) -> list[dict]:
+        endpoint = "/v1/data/classifier-list"
+        try:
+            payload = await self._get(endpoint, params={"classifier": "h_education_form"})
+            items = payload.get("data", {}).get("items", [])
+            if items:
+                options = items[0].get("options", [])
+                if options:
+                    return normalize_forms(options)
+        except Exception:
+            pass
+
+        try:
+            payload = await self._get(endpoint, params={"limit": 200})
+            items = payload.get("data", {}).get("items", [])
+            for item in items:
+                if item.get("classifier") == "h_education_form":
+                    return normalize_forms(item.get("options", []))
+        except Exception as e:
+            logger.error("Failed to fetch education forms: %s", e, exc_info=True)
+
+        return [dict(f) for f in FALLBACK_EDUCATION_FORMS]
+
+    # -----------------------
+    # STUDENTS
+    # -----------------------
+    async def get_student_count(
+        self,
+        *,
+        department_id: int | None = None,
+        education_form_id: int | None = None,
+        student_status_id: int | None = None,
+    ) -> int:
+        params: dict[str, Any] = {"page": 1, "limit": 1}
+        if department_id is not None:
+            params["_department"] = department_id
+        if education_form_id is not None:
+            params["_education_form"] = education_form_id
+        if student_status_id is not None:
+            params["_student_status"] = student_status_id
+
+        try:
+            payload = await self._get("/v1/data/student-list", params=params)
+        except Exception as exc:
+            logger.error("HEMIS student_count error: %s", exc, exc_info=True)
+            return 0
+        return extract_total_count(payload)
+
+    async def get_student_list(self, *, page: int = 1, limit: int = 200, student_status_id: int | None = None,
+                               params: dict | None = None) -> dict:
+        req_params: dict[str, Any] = {"page": page, "limit": limit}
+        if student_status_id is not None:
+            req_params["_student_status"] = student_status_id
+        if params:
+            req_params.update(params)
+        return await self._get("/v1/data/student-list", params=req_params)
+
+    # -----------------------
+    # ATTENDANCE / EMPLOYEES
+    # -----------------------
+    async def get_attendance_stat(self, params: dict | None = None) -> dict:
+        req_params: dict[str, Any] = {"page": 1, "limit": 200}
+        if params:
+            req_params.update(params)
+        return await self._get("/v1/data/attendance-stat", params=req_params)
+
+    async def get_employee_list(self, params: dict | None = None) -> dict:
+        request_params = {k: v for k, v in (params or {}).items() if k in EMPLOYEE_LIST_PARAMS}
+        if "type" not in request_params:
+            request_params["type"] = "teacher"
+        return await self._get("/v1/data/employee-list", params=request_params)
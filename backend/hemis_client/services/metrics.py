@@ -0,0 +1,193 @@
+# backend/hemis_client/services/metrics.py
+# Jarayon ichidagi metrikalar: HEMIS so‘rovlari (endpoint bo‘yicha vaqt, status,
+# retry, bayt), agregatsiya bosqichlari va kesh hit/miss. /api/monitoring/metrics/
+# Prometheus matn formatida beradi. Har worker jarayon o‘z sanoqlarini ko‘rsatadi.
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable
+
+HEMIS_REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+PHASE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...], lock: threading.Lock):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._lock = lock
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...], lock: threading.Lock,
+                 buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._lock = lock
+        # labels -> [bucket sanoqlari..., count], sum
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+                self._sums[labels] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._sums[labels] += value
+
+    def snapshot(self, *labels) -> dict:
+        with self._lock:
+            counts = self._counts.get(labels) or [0] * (len(self.buckets) + 1)
+            return {"count": counts[-1], "sum": self._sums.get(labels, 0.0)}
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((labels, list(counts), self._sums[labels]) for labels, counts in self._counts.items())
+        for labels, counts, total in items:
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {round(total, 6)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {counts[-1]}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames, threading.Lock()))
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = HEMIS_REQUEST_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, threading.Lock(), buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HEMIS_REQUESTS = REGISTRY.counter(
+    "hemis_requests_total", "HEMIS HTTP so'rovlari (har urinish), endpoint va status bo'yicha",
+    ("endpoint", "status"),
+)
+HEMIS_REQUEST_SECONDS = REGISTRY.histogram(
+    "hemis_request_duration_seconds", "HEMIS javob vaqti (har urinish)", ("endpoint",),
+    buckets=HEMIS_REQUEST_BUCKETS,
+)
+HEMIS_RETRIES = REGISTRY.counter(
+    "hemis_retries_total", "Qayta urinishlar (reason: 429 yoki error)", ("endpoint", "reason"),
+)
+HEMIS_RESPONSE_BYTES = REGISTRY.counter(
+    "hemis_response_bytes_total", "HEMIS javob tanasi hajmi, bayt", ("endpoint",),
+)
+PHASE_SECONDS = REGISTRY.histogram(
+    "monitoring_phase_duration_seconds", "Agregatsiya bosqichlari davomiyligi", ("phase",),
+    buckets=PHASE_BUCKETS,
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "monitoring_cache_requests_total", "Kesh murojaatlari (result: hit, stale, miss)", ("cache", "result"),
+)
+
+
+def endpoint_label(endpoint: str) -> str:
+    """/v1/data/student-list -> student-list (label kardinalligi cheklangan)."""
+    return endpoint.rstrip("/").rsplit("/", 1)[-1] or endpoint
+
+
+def cache_label(key: str) -> str:
+    """Kesh kalitining prefiksi: attendance_group_v3:123:11 -> attendance_group_v3."""
+    return key.split(":", 1)[0]
+
+
+def record_request(endpoint: str, status, seconds: float, nbytes: int = 0) -> None:
+    label = endpoint_label(endpoint)
+    HEMIS_REQUESTS.inc(label, str(status))
+    HEMIS_REQUEST_SECONDS.observe(seconds, label)
+    if nbytes:
+        HEMIS_RESPONSE_BYTES.inc(label, amount=nbytes)
+
+
+def record_retry(endpoint: str, reason: str) -> None:
+    HEMIS_RETRIES.inc(endpoint_label(endpoint), reason)
+
+
+def record_cache(key: str, result: str, count: int = 1) -> None:
+    if count:
+        CACHE_REQUESTS.inc(cache_label(key), result, amount=count)
+
+
+def observe_phase(name: str, seconds: float) -> None:
+    PHASE_SECONDS.observe(seconds, name)
+
+
+@contextmanager
+def phase(name: str):
+    """with phase("matrix_cells"): ... - faqat muvaffaqiyatli tugagan bosqichlar yoziladi."""
+    started = time.perf_counter()
+    yield
+    observe_phase(name, time.perf_counter() - started)
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,183 @@
+# backend/hemis_client/services/rate_limiter.py
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+SHARED_COOLDOWN_KEY = "hemis_rate_limit:cooldown_until"
+SHARED_SYNC_INTERVAL = 1.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Barcha HemisClient'lar (barcha thread'lar) uchun bitta token bucket + AIMD:
+    - har so‘rov oldidan reserve() navbatdagi bo‘sh slotgacha kutish vaqtini qaytaradi
+    - 429 / Retry-After: tezlik `decrease` marta kamayadi va cooldown qo‘yiladi
+    - ~1 sekundlik toza javoblardan keyin tezlik `increase` rps ga oshadi
+    Cooldown umumiy keshga ham yoziladi - boshqa worker jarayonlar ham to‘xtab turadi.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: int,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        shared_cache_alias: str | None = None,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.shared_cache_alias = shared_cache_alias
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._clean_streak = 0
+        self._next_shared_sync = 0.0
+
+    def reserve(self) -> float:
+        """Bitta so‘rov uchun slot band qiladi; qancha kutish kerakligini qaytaradi."""
+        self._sync_shared()
+        return self._reserve_slot()
+
+    def _reserve_slot(self) -> float:
+        # Faqat xotiradagi hisob (kesh I/O yo‘q) - event loop'da ham bloklamaydi
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last
+            if elapsed > 0:
+                self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+                self._last = now
+            self._tokens -= 1
+
+            # Token'lar self._last dan boshlab to‘ladi (cooldown paytida - u tugagach),
+            # shuning uchun kutayotganlar bir vaqtda emas, 1/rate oraliq bilan chiqadi
+            ready_at = self._last + (-self._tokens / self.rate if self._tokens < 0 else 0.0)
+            return max(0.0, ready_at - now)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        # Umumiy keshdan cooldown o‘qish (fayl/Redis I/O) - alohida thread'da
+        if self._shared_sync_due():
+            await asyncio.to_thread(self._sync_shared)
+        wait = self._reserve_slot()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._clean_streak += 1
+            if self._clean_streak >= self.rate:
+                self._clean_streak = 0
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, cooldown: float) -> None:
+        self._slow_down(cooldown)
+        if self.shared_cache_alias:
+            self._push_shared_cooldown(cooldown)
+
+    async def on_throttle_async(self, cooldown: float) -> None:
+        self._slow_down(cooldown)
+        if self.shared_cache_alias:
+            await asyncio.to_thread(self._push_shared_cooldown, cooldown)
+
+    def _slow_down(self, cooldown: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._clean_streak = 0
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._block_until(now + cooldown)
+            logger.warning("HEMIS rate limit: rate=%.2f rps, cooldown=%.2fs", self.rate, cooldown)
+
+    def _shared_sync_due(self) -> bool:
+        return bool(self.shared_cache_alias) and time.monotonic() >= self._next_shared_sync
+
+    def _sync_shared(self) -> None:
+        """Boshqa worker'lar qo‘ygan cooldown'ni umumiy keshdan oladi (~1 s da bir marta)."""
+        if not self.shared_cache_alias:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_shared_sync:
+                return
+            self._next_shared_sync = now + SHARED_SYNC_INTERVAL
+
+        # kesh I/O lock'dan tashqarida - boshqa thread'lar slot olishda kutmaydi
+        try:
+            until = caches[self.shared_cache_alias].get(SHARED_COOLDOWN_KEY)
+        except Exception:
+            return
+        if until:
+            remaining = until - time.time()
+            if remaining > 0:
+                with self._lock:
+                    self._block_until(time.monotonic() + remaining)
+
+    def _block_until(self, until: float) -> None:
+        # lock ostida chaqiriladi
+        if until > self._last:
+            self._tokens = min(self._tokens, 0.0)
+            self._last = until
+
+    def _push_shared_cooldown(self, cooldown: float) -> None:
+        until = time.time() + cooldown
+        try:
+            cache = caches[self.shared_cache_alias]
+            current = cache.get(SHARED_COOLDOWN_KEY) or 0
+            if until > current:
+                cache.set(SHARED_COOLDOWN_KEY, until, timeout=int(cooldown) + 1)
+        except Exception as e:
+            logger.warning("Shared rate limit cooldown yozilmadi: %s", e)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After: sekund yoki HTTP sana."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_limiter: AdaptiveRateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter | None:
+    """Jarayon bo‘yicha yagona limiter; HEMIS_RATE_LIMIT=0 bo‘lsa o‘chirilgan."""
+    global _limiter
+    if settings.HEMIS_RATE_LIMIT <= 0:
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = AdaptiveRateLimiter(
+                    rate=settings.HEMIS_RATE_LIMIT,
+                    min_rate=settings.HEMIS_RATE_LIMIT_MIN,
+                    max_rate=settings.HEMIS_RATE_LIMIT_MAX,
+                    burst=settings.HEMIS_RATE_LIMIT_BURST,
+                    shared_cache_alias="hemis" if "hemis" in settings.CACHES else None,
+                )
+    return _limiter
@@ -0,0 +1,110 @@
+# backend/hemis_client/services/tracing.py
+# So‘rov bo‘yicha HEMIS trace: har bir HEMIS chaqiruvi (boshlanish offset, davomiylik,
+# status, retry, thread) va kesh murojaatlari. Joriy trace ContextVar'da turadi;
+# HemisClient uni yaratilganda ushlab oladi - ThreadPoolExecutor ichidagi chaqiruvlar
+# ham shu trace'ga yoziladi. Yoqish/saqlash: monitoring/middleware.py.
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+
+_current_trace: ContextVar["RequestTrace | None"] = ContextVar("hemis_trace", default=None)
+
+
+class RequestTrace:
+    def __init__(self, *, method: str = "", path: str = "", max_events: int = 5000):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.max_events = max_events
+        self.calls: list[dict] = []
+        self.cache: list[dict] = []
+        self.dropped = 0
+        self.status: int | None = None
+        self.duration_ms: float | None = None
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def offset_ms(self, perf_started: float) -> float:
+        return round((perf_started - self._t0) * 1000, 2)
+
+    def _append(self, bucket: list, event: dict) -> None:
+        with self._lock:
+            if len(self.calls) + len(self.cache) >= self.max_events:
+                self.dropped += 1
+                return
+            bucket.append(event)
+
+    def add_call(self, endpoint: str, params: dict | None, perf_started: float, *,
+                 status, retries: int, nbytes: int = 0, worker: str | None = None) -> None:
+        self._append(self.calls, {
+            "endpoint": endpoint,
+            "params": {k: v for k, v in (params or {}).items()},
+            "start_ms": self.offset_ms(perf_started),
+            "duration_ms": round((time.perf_counter() - perf_started) * 1000, 2),
+            "status": status,
+            "retries": retries,
+            "bytes": nbytes,
+            # async chaqiruvlarda - asyncio task nomi
+            "thread": worker or threading.current_thread().name,
+        })
+
+    def add_cache(self, key: str, result: str, perf_started: float, count: int = 1, hits: int | None = None) -> None:
+        self._append(self.cache, {
+            "key": key,
+            "result": result,
+            "count": count,
+            "hits": hits if hits is not None else int(result in ("hit", "stale")),
+            "start_ms": self.offset_ms(perf_started),
+            "duration_ms": round((time.perf_counter() - perf_started) * 1000, 2),
+            "thread": threading.current_thread().name,
+        })
+
+    def finish(self, status: int | None) -> None:
+        self.status = status
+        self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 2)
+
+    def summary(self) -> dict:
+        with self._lock:
+            calls = list(self.calls)
+            cache = list(self.cache)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "hemis_calls": len(calls),
+            "hemis_ms": round(sum(c["duration_ms"] for c in calls), 2),
+            "retries": sum(c["retries"] for c in calls),
+            "cache_lookups": len(cache),
+            "cache_ms": round(sum(c["duration_ms"] for c in cache), 2),
+        }
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            calls = sorted(self.calls, key=lambda c: c["start_ms"])
+            cache = sorted(self.cache, key=lambda c: c["start_ms"])
+            dropped = self.dropped
+        return {**self.summary(), "calls": calls, "cache": cache, "dropped_events": dropped}
+
+
+def current_trace() -> RequestTrace | None:
+    return _current_trace.get()
+
+
+def activate(trace: RequestTrace | None):
+    """ContextVar token qaytaradi: deactivate(token) bilan tiklanadi."""
+    return _current_trace.set(trace)
+
+
+def deactivate(token) -> None:
+    _current_trace.reset(token)
+
+
+def trace_cache(key: str, result: str, perf_started: float, count: int = 1, hits: int | None = None) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_cache(key, result, perf_started, count, hits)
@@ -1,3 +1,347 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from .services import metrics, rate_limiter
+from .services.fake_hemis import build_fake_hemis
+from .services.metrics import MetricsRegistry, phase
+from .services.hemis_api import extract_page_count
+from .services.rate_limiter import SHARED_COOLDOWN_KEY, AdaptiveRateLimiter, parse_retry_after
+
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-default"},
+    "hemis": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-hemis"},
+}
+
+
+class FakeClock:
+    """time.monotonic() / time.time() o‘rniga - testlar real kutmasin."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.wall
+
+    def advance(self, seconds: float):
+        self.now += seconds
+        self.wall += seconds
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RateLimiterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(rate_limiter, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        caches["hemis"].clear()
+        self.addCleanup(caches["hemis"].clear)
+
+    def make(self, **kwargs) -> AdaptiveRateLimiter:
+        options = dict(rate=4.0, min_rate=1.0, max_rate=6.0, burst=2, increase=0.5, decrease=0.5)
+        options.update(kwargs)
+        return AdaptiveRateLimiter(**options)
+
+
+# -----------------------
+# TOKEN BUCKET
+# -----------------------
+class TokenBucketTests(RateLimiterTestCase):
+    def test_burst_is_free_then_requests_are_spaced(self):
+        limiter = self.make()
+        waits = [limiter.reserve() for _ in range(5)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        # rate=4 - har keyingi so‘rov 0.25 s keyin
+        self.assertEqual([round(w, 6) for w in waits[2:]], [0.25, 0.5, 0.75])
+
+    def test_tokens_refill_with_time(self):
+        limiter = self.make()
+        for _ in range(3):
+            limiter.reserve()
+        self.clock.advance(1.0)
+        self.assertEqual(limiter.reserve(), 0.0)
+
+
+# -----------------------
+# AIMD
+# -----------------------
+class AimdTests(RateLimiterTestCase):
+    def test_throttle_decreases_rate_multiplicatively_down_to_min(self):
+        limiter = self.make(rate=4.0)
+        limiter.on_throttle(0)
+        self.assertEqual(limiter.rate, 2.0)
+        limiter.on_throttle(0)
+        self.assertEqual(limiter.rate, 1.0)
+        limiter.on_throttle(0)
+        self.assertEqual(limiter.rate, 1.0)
+
+    def test_clean_streak_increases_rate_additively_up_to_max(self):
+        limiter = self.make(rate=4.0, max_rate=5.0)
+        for _ in range(3):
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 4.0)
+        limiter.on_success()
+        self.assertEqual(limiter.rate, 4.5)
+        for _ in range(20):
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 5.0)
+
+    def test_throttle_resets_clean_streak(self):
+        limiter = self.make(rate=2.0)
+        limiter.on_success()
+        limiter.on_throttle(0)
+        self.assertEqual(limiter.rate, 1.0)
+        limiter.on_success()
+        self.assertEqual(limiter.rate, 1.5)
+
+    def test_cooldown_blocks_next_reservations(self):
+        limiter = self.make(rate=4.0, burst=4)
+        limiter.on_throttle(3.0)
+        # rate 2 ga tushdi: token'lar cooldown tugagach to‘la boshlaydi, so‘rovlar 0.5 s oraliqda
+        self.assertEqual(round(limiter.reserve(), 6), 3.5)
+        self.assertEqual(round(limiter.reserve(), 6), 4.0)
+        self.clock.advance(10)
+        self.assertEqual(limiter.reserve(), 0.0)
+
+    def test_cooldown_is_shared_through_cache(self):
+        first = self.make(shared_cache_alias="hemis")
+        second = self.make(shared_cache_alias="hemis")
+        first.on_throttle(5.0)
+        self.assertEqual(caches["hemis"].get(SHARED_COOLDOWN_KEY), self.clock.wall + 5.0)
+        self.assertEqual(round(second.reserve(), 6), 5.25)
+
+    def test_shorter_cooldown_does_not_overwrite_longer_one(self):
+        limiter = self.make(shared_cache_alias="hemis")
+        limiter.on_throttle(5.0)
+        limiter.on_throttle(1.0)
+        self.assertEqual(caches["hemis"].get(SHARED_COOLDOWN_KEY), self.clock.wall + 5.0)
+
+    def test_shared_cooldown_is_read_at_most_once_per_interval(self):
+        limiter = self.make(shared_cache_alias="hemis")
+        shared = caches["hemis"]
+        with mock.patch.object(shared, "get", wraps=shared.get) as spy:
+            for _ in range(5):
+                limiter.reserve()
+            self.assertEqual(spy.call_count, 1)
+            self.clock.advance(rate_limiter.SHARED_SYNC_INTERVAL)
+            limiter.reserve()
+            self.assertEqual(spy.call_count, 2)
+
+
+# -----------------------
+# ASYNC
+# -----------------------
+class AsyncLimiterTests(RateLimiterTestCase):
+    def test_acquire_async_reads_shared_cache_off_the_event_loop(self):
+        limiter = self.make(shared_cache_alias="hemis")
+        caches["hemis"].set(SHARED_COOLDOWN_KEY, self.clock.wall + 2.0)
+        threads = []
+        original = limiter._sync_shared
+
+        def spy():
+            threads.append(threading.current_thread())
+            original()
+
+        async def run():
+            loop_thread = threading.current_thread()
+            with mock.patch.object(limiter, "_sync_shared", spy), \
+                    mock.patch.object(rate_limiter.asyncio, "sleep", mock.AsyncMock()) as sleep:
+                await limiter.acquire_async()
+                await limiter.acquire_async()
+            return loop_thread, sleep
+
+        loop_thread, sleep = asyncio.run(run())
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], loop_thread)
+        self.assertAlmostEqual(sleep.await_args_list[0].args[0], 2.25)
+
+    def test_on_throttle_async_matches_sync_behaviour(self):
+        limiter = self.make(rate=4.0, shared_cache_alias="hemis")
+        asyncio.run(limiter.on_throttle_async(3.0))
+        self.assertEqual(limiter.rate, 2.0)
+        self.assertEqual(caches["hemis"].get(SHARED_COOLDOWN_KEY), self.clock.wall + 3.0)
+
+
+# -----------------------
+# RETRY-AFTER
+# -----------------------
+class RetryAfterTests(SimpleTestCase):
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("1.5"), 1.5)
+        self.assertEqual(parse_retry_after("-2"), 0.0)
+
+    def test_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        seconds = parse_retry_after(format_datetime(when, usegmt=True))
+        self.assertTrue(25 <= seconds <= 30, seconds)
+
+    def test_past_date_is_zero(self):
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after(""))
+        self.assertIsNone(parse_retry_after("soon"))
+
+
+# -----------------------
+# PAGINATION
+# -----------------------
+class ExtractPageCountTests(SimpleTestCase):
+    def test_page_count_is_used_as_is(self):
+        self.assertEqual(extract_page_count({"pagination": {"pageCount": 7, "totalCount": 1}}, 200), 7)
+
+    def test_total_count_is_divided_and_rounded_up(self):
+        self.assertEqual(extract_page_count({"data": {"pagination": {"totalCount": 401}}}, 200), 3)
+        self.assertEqual(extract_page_count({"data": {"pagination": {"total_count": 400}}}, 200), 2)
+
+    def test_missing_or_bad_pagination(self):
+        self.assertEqual(extract_page_count({"data": {"items": []}}, 200), 0)
+        self.assertEqual(extract_page_count(None, 200), 0)
+        self.assertEqual(extract_page_count({"pagination": {"pageCount": "many"}}, 200), 1)
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    HEMIS_RATE_LIMIT=4.0,
+    HEMIS_RATE_LIMIT_MIN=1.0,
+    HEMIS_RATE_LIMIT_MAX=6.0,
+    HEMIS_RATE_LIMIT_BURST=2,
+)
+class GetRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        rate_limiter._limiter = None
+        self.addCleanup(setattr, rate_limiter, "_limiter", None)
+
+    def test_singleton_uses_settings(self):
+        limiter = rate_limiter.get_rate_limiter()
+        self.assertIs(limiter, rate_limiter.get_rate_limiter())
+        self.assertEqual((limiter.rate, limiter.min_rate, limiter.max_rate, limiter.burst), (4.0, 1.0, 6.0, 2))
+        self.assertEqual(limiter.shared_cache_alias, "hemis")
+
+    @override_settings(HEMIS_RATE_LIMIT=0)
+    def test_disabled(self):
+        self.assertIsNone(rate_limiter.get_rate_limiter())
+
+
+# -----------------------
+# FAKE HEMIS
+# -----------------------
+class FakeHemisPaginationTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.fake = build_fake_hemis({"faculties": 3, "groups": 40, "students": 500, "employees": 30,
+                                     "page_size_cap": 50})
+
+    def get(self, endpoint: str, **params) -> dict:
+        status, _, body = self.fake.handle(f"/rest/v1/data/{endpoint}", {k: str(v) for k, v in params.items()})
+        self.assertEqual(status, 200)
+        return json.loads(body)["data"]
+
+    def walk(self, endpoint: str, limit: int, **params) -> tuple[list, dict]:
+        first = self.get(endpoint, page=1, limit=limit, **params)
+        items = list(first["items"])
+        for page in range(2, first["pagination"]["pageCount"] + 1):
+            items.extend(self.get(endpoint, page=page, limit=limit, **params)["items"])
+        return items, first["pagination"]
+
+    def test_pages_cover_total_without_overlap(self):
+        items, pagination = self.walk("student-list", 7)
+        ids = [s["id"] for s in items]
+        self.assertEqual(len(ids), pagination["totalCount"])
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(pagination["pageCount"], -(-len(ids) // 7))
+        self.assertEqual(self.get("student-list", page=pagination["pageCount"] + 1, limit=7)["items"], [])
+
+    def test_limit_is_capped_and_reported(self):
+        pagination = self.get("student-list", limit=500)["pagination"]
+        self.assertEqual(pagination["pageSize"], 50)
+        self.assertEqual(pagination["pageCount"], -(-pagination["totalCount"] // 50))
+
+    def test_filtered_totals_add_up(self):
+        total = self.get("student-list", limit=1)["pagination"]["totalCount"]
+        by_faculty = [self.get("student-list", limit=1, _department=f["id"])["pagination"]["totalCount"]
+                      for f in self.fake.faculties]
+        by_form = [self.get("student-list", limit=1, _education_form=code)["pagination"]["totalCount"]
+                   for code in (11, 12, 13, 16)]
+        self.assertEqual(total, len(self.fake.students))
+        self.assertEqual(sum(by_faculty), total)
+        self.assertEqual(sum(by_form), total)
+
+    def test_attendance_totals_match_student_list(self):
+        for group in self.fake.groups[:5]:
+            with self.subTest(group=group["id"]):
+                students, _ = self.walk("student-list", 10, _group=group["id"])
+                rows, pagination = self.walk("attendance-stat", 10, _group=group["id"])
+                self.assertEqual(pagination["totalCount"], len(students))
+                self.assertEqual([r["student"]["id"] for r in rows], [s["id"] for s in students])
+
+    def test_throttle_returns_429_with_retry_after(self):
+        fake = build_fake_hemis({"faculties": 1, "groups": 2, "students": 5, "employees": 0,
+                                 "error_rate": 1.0, "retry_after": 2.5})
+        status, headers, _ = fake.handle("/rest/v1/data/student-list", {})
+        self.assertEqual(status, 429)
+        self.assertEqual(headers["Retry-After"], "2.5")
+        self.assertEqual(fake.stats(), {"calls": {"student-list": 1}, "total": 1, "throttled": 1})
+
+
+# -----------------------
+# METRICS
+# -----------------------
+class MetricsRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_exposition(self):
+        requests = self.registry.counter("hemis_requests_total", "So'rovlar", ("endpoint", "status"))
+        requests.inc("student-list", "200")
+        requests.inc("student-list", "200", amount=2)
+        requests.inc('a"b\\c', "429")
+        self.assertEqual(requests.value("student-list", "200"), 3)
+        self.assertEqual(self.registry.render(), (
+            "# HELP hemis_requests_total So'rovlar\n"
+            "# TYPE hemis_requests_total counter\n"
+            'hemis_requests_total{endpoint="a\\"b\\\\c",status="429"} 1\n'
+            'hemis_requests_total{endpoint="student-list",status="200"} 3\n'
+        ))
+
+    def test_histogram_buckets_are_cumulative(self):
+        seconds = self.registry.histogram("phase_seconds", "Bosqichlar", ("phase",), buckets=(1.0, 0.1))
+        for value in (0.05, 0.5, 3.0):
+            seconds.observe(value, "scan")
+        self.assertEqual(self.registry.render().splitlines(), [
+            "# HELP phase_seconds Bosqichlar",
+            "# TYPE phase_seconds histogram",
+            'phase_seconds_bucket{phase="scan",le="0.1"} 1',
+            'phase_seconds_bucket{phase="scan",le="1"} 2',
+            'phase_seconds_bucket{phase="scan",le="+Inf"} 3',
+            'phase_seconds_sum{phase="scan"} 3.55',
+            'phase_seconds_count{phase="scan"} 3',
+        ])
+        self.assertEqual(seconds.snapshot("scan")["count"], 3)
+
+    def test_duplicate_name_is_rejected(self):
+        self.registry.counter("x_total", "x")
+        with self.assertRaises(ValueError):
+            self.registry.counter("x_total", "x")
+
+    def test_failed_phase_is_not_observed(self):
+        before = metrics.PHASE_SECONDS.snapshot("test_phase")["count"]
+        with phase("test_phase"):
+            pass
+        with self.assertRaises(RuntimeError), phase("test_phase"):
+            raise RuntimeError
+        self.assertEqual(metrics.PHASE_SECONDS.snapshot("test_phase")["count"], before + 1)
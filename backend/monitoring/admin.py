@@ -1,3 +1,34 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AttendanceFact, ContingentCell, ContingentSnapshot
+
+
+class ContingentCellInline(admin.TabularInline):
+    model = ContingentCell
+    extra = 0
+    can_delete = False
+    readonly_fields = ("faculty_id", "form_id", "count")
+
+
+@admin.register(ContingentSnapshot)
+class ContingentSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("taken_at", "grand_total", "mode", "built_at")
+    list_filter = ("mode",)
+    date_hierarchy = "taken_at"
+    readonly_fields = ("taken_at", "built_at", "mode", "grand_total", "faculties", "forms")
+    inlines = [ContingentCellInline]
+
+
+@admin.register(ContingentCell)
+class ContingentCellAdmin(admin.ModelAdmin):
+    list_display = ("snapshot", "faculty_id", "form_id", "count")
+    list_filter = ("form_id",)
+    search_fields = ("faculty_id",)
+
+
+@admin.register(AttendanceFact)
+class AttendanceFactAdmin(admin.ModelAdmin):
+    list_display = ("student_name", "group_name", "faculty_name", "total_absent", "percent",
+                    "period_start", "period_end", "is_current")
+    list_filter = ("is_current", "education_form", "semester")
+    search_fields = ("student_name", "group_name")
@@ -0,0 +1,170 @@
+# backend/monitoring/aggregation.py
+# Vektorli agregatlar: o‘lchamlar zich butun kodlarga (0..n-1, columnar.StringTable)
+# o‘giriladi, guruhlash yig‘indilari bitta bincount, ko‘p o‘lchamli kub - bitta tekis
+# indeks (ravel) bilan. numpy o‘rnatilgan bo‘lsa u bilan (ixtiyoriy bog‘liqlik), aks
+# holda xuddi shu natijani beruvchi oddiy sikllar. Natijalar JSON uchun - list.
+import bisect
+import math
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ixtiyoriy
+    np = None
+
+
+def vector(values, dtype: str | None = None):
+    """array.array ustun - nusxasiz ko‘rinish (frombuffer), qolgani - massivga."""
+    if np is None:
+        return values
+    if isinstance(values, array):
+        return np.frombuffer(values, dtype=values.typecode) if len(values) else np.zeros(0, dtype=values.typecode)
+    return np.asarray(values, dtype=dtype)
+
+
+def tolist(values) -> list:
+    return values.tolist() if np is not None and isinstance(values, np.ndarray) else list(values)
+
+
+def column_sum(values):
+    if np is None or not len(values):
+        return sum(values)
+    return vector(values).sum().item()
+
+
+def _strides(shape: tuple[int, ...]) -> list[int]:
+    # C tartibi: oxirgi o‘lcham eng tez o‘zgaradi (numpy reshape bilan bir xil)
+    strides = list(accumulate(reversed(shape[1:]), lambda a, b: a * b, initial=1))
+    return strides[::-1]
+
+
+def cube(codes: list, shape: tuple[int, ...], weights=None) -> list:
+    """
+    Ko‘p o‘lchamli guruhlash: codes[d][i] - i-qatorning d-o‘lchamdagi kodi (0..shape[d]-1).
+    Natija - tekis (C tartibli) yig‘indilar ro‘yxati, uzunligi prod(shape).
+    weights berilmasa - qatorlar soni.
+    """
+    size = math.prod(shape)
+    if np is not None:
+        flat = np.zeros(len(codes[0]) if codes else 0, dtype=np.int64)
+        for stride, c in zip(_strides(shape), codes):
+            flat += vector(c, "int64").astype(np.int64, copy=False) * stride
+        if weights is None:
+            return np.bincount(flat, minlength=size).tolist()
+        w = vector(weights)
+        sums = np.bincount(flat, weights=w.astype(np.float64, copy=False), minlength=size)
+        # butun ustunlar yig‘indisi butun bo‘lib qaytadi
+        return sums.astype(np.int64).tolist() if w.dtype.kind in "iu" else sums.tolist()
+
+    sums = [0] * size
+    strides = _strides(shape)
+    rows = zip(*codes) if codes else ()
+    if weights is None:
+        for row in rows:
+            sums[sum(c * s for c, s in zip(row, strides))] += 1
+    else:
+        for row, w in zip(rows, weights):
+            sums[sum(c * s for c, s in zip(row, strides))] += w
+    return sums
+
+
+def group_sum(codes, size: int, weights=None) -> list:
+    """Bir o‘lchamli guruhlash (kod -> soni / yig‘indi)."""
+    return cube([codes], (size,), weights)
+
+
+def marginal(flat: list, shape: tuple[int, ...], keep: tuple[int, ...]) -> list:
+    """Kubning keep o‘lchamlari bo‘yicha yig‘indisi (qolganlari bo‘yicha qo‘shiladi), tekis."""
+    if np is not None:
+        drop = tuple(d for d in range(len(shape)) if d not in keep)
+        out = np.asarray(flat, dtype=np.int64).reshape(shape).sum(axis=drop) if drop else np.asarray(flat)
+        return out.reshape(-1).tolist()
+
+    out_shape = tuple(shape[d] for d in keep)
+    out_strides = _strides(out_shape)
+    out = [0] * math.prod(out_shape)
+    strides = _strides(shape)
+    for i, value in enumerate(flat):
+        if not value:
+            continue
+        j = 0
+        for d, s in zip(keep, out_strides):
+            j += (i // strides[d]) % shape[d] * s
+        out[j] += value
+    return out
+
+
+def unravel(indices: list[int], shape: tuple[int, ...]) -> list[list[int]]:
+    """Tekis indekslar -> har o‘lcham bo‘yicha kodlar (cube natijasidagi katak o‘rni)."""
+    if np is not None:
+        if not indices:
+            return [[] for _ in shape]
+        return [c.tolist() for c in np.unravel_index(np.asarray(indices, dtype=np.int64), shape)]
+    return [[i // s % n for i in indices] for s, n in zip(_strides(shape), shape)]
+
+
+def remainder(whole: list, part: list) -> list:
+    """max(whole - part, 0) har element uchun (masalan, jami - taqsimlangan = "boshqa")."""
+    if np is not None:
+        return np.maximum(np.asarray(whole, dtype=np.int64) - np.asarray(part, dtype=np.int64), 0).tolist()
+    return [max(w - p, 0) for w, p in zip(whole, part)]
+
+
+def percent(part: list, whole, digits: int = 2) -> list:
+    """part[i] * 100 / whole (son yoki ro‘yxat); whole 0 bo‘lsa - 0.0."""
+    if np is not None:
+        p = np.asarray(part, dtype=np.float64)
+        w = np.broadcast_to(np.asarray(whole, dtype=np.float64), p.shape)
+        out = np.divide(p * 100, w, out=np.zeros_like(p), where=w != 0)
+        return np.round(out, digits).tolist()
+    wholes = whole if isinstance(whole, (list, tuple)) else [whole] * len(part)
+    return [round(p * 100 / w, digits) if w else 0.0 for p, w in zip(part, wholes)]
+
+
+def percentiles(values, qs: tuple = (50, 75, 90, 95), digits: int = 2) -> dict[str, float]:
+    """Chiziqli interpolyatsiya (numpy.percentile odatiy usuli); bo‘sh bo‘lsa - 0."""
+    if not len(values):
+        return {f"p{q}": 0.0 for q in qs}
+    if np is not None:
+        result = np.percentile(vector(values, "float64"), qs)
+        return {f"p{q}": round(float(v), digits) for q, v in zip(qs, result)}
+
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    out = {}
+    for q in qs:
+        pos = last * q / 100
+        lo = math.floor(pos)
+        hi = min(lo + 1, last)
+        out[f"p{q}"] = round(ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo), digits)
+    return out
+
+
+def rank_desc(values) -> list[int]:
+    """O‘rin (1 - eng kattasi); tenglar bir xil o‘rin oladi, keyingisi sakraydi (1, 2, 2, 4)."""
+    if np is not None:
+        v = vector(values, "float64")
+        ordered = np.sort(v)
+        return (len(v) - np.searchsorted(ordered, v, side="right") + 1).tolist()
+    ordered = sorted(values)
+    return [len(ordered) - bisect.bisect_right(ordered, v) + 1 for v in values]
+
+
+def nonzero(values) -> list[int]:
+    if np is not None:
+        return np.flatnonzero(np.asarray(values)).tolist()
+    return [i for i, v in enumerate(values) if v]
+
+
+def threshold_indices(columns: list, minimums: list) -> list[int]:
+    """Har ustunda qiymat >= minimum bo‘lgan qatorlar indekslari (filtr - bitta niqob)."""
+    if np is not None:
+        mask = np.ones(len(columns[0]) if columns else 0, dtype=bool)
+        for c, m in zip(columns, minimums):
+            mask &= vector(c, "float64") >= m
+        return np.flatnonzero(mask).tolist()
+    return [
+        i for i, row in enumerate(zip(*columns))
+        if all(v >= m for v, m in zip(row, minimums))
+    ]
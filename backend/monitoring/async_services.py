@@ -0,0 +1,235 @@
+# backend/monitoring/async_services.py
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from hemis_client.services.hemis_api import extract_items, extract_page_count
+from hemis_client.services.hemis_async import get_async_client
+from hemis_client.services.metrics import observe_phase, phase, record_cache
+from hemis_client.services.tracing import activate, current_trace, deactivate, trace_cache
+
+from .attendance_services import (
+    DEFAULT_ATTENDANCE_ORDER,
+    _attendance_page,
+    _group_cache_key,
+    _group_stat_params,
+    _resolve_attendance_query,
+    _resolve_target_groups,
+    _parse_group_rows,
+    _with_semester,
+    merge_group_columns,
+)
+from .cache import aget_or_build, hemis_cache
+from .columnar import AttendanceColumns
+from .department_tree import get_department_tree
+from .services import (
+    FACULTY_TABLE_CACHE_KEY,
+    _StudentScanner,
+    _assemble_faculty_table,
+    _parse_forms,
+    _student_matrix,
+    snapshot_faculty_table,
+    store_student_dataset,
+    summary_entry_for,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------
+# FACULTY TABLE
+# -----------------------
+async def aget_faculty_table_entry() -> dict:
+    """
+    get_faculty_table_entry bilan bir xil kesh kaliti va lock; SWR/single-flight va
+    qayta hisoblash shu event loop'da, umumiy async client bilan (thread'siz fan-out).
+    """
+    return await aget_or_build(
+        FACULTY_TABLE_CACHE_KEY,
+        _abuild_faculty_table,
+        ttl=settings.HEMIS_FACULTY_TABLE_TTL,
+        stale_ttl=settings.HEMIS_FACULTY_TABLE_STALE_TTL,
+        on_built=snapshot_faculty_table,
+        encode=True,
+    )
+
+
+async def aget_dashboard_summary_entry() -> dict:
+    entry = await aget_faculty_table_entry()
+    return await sync_to_async(summary_entry_for, thread_sensitive=False)(entry)
+
+
+async def _abuild_faculty_table() -> dict:
+    client = get_async_client()
+    tree, ed_forms_raw = await asyncio.gather(
+        sync_to_async(get_department_tree, thread_sensitive=False)(),
+        client.get_education_forms(),
+    )
+    all_faculties = tree.faculties()
+    all_forms = _parse_forms(ed_forms_raw)
+
+    if settings.HEMIS_FACULTY_TABLE_MODE == "scan":
+        active_faculties, active_form_ids, matrix_data = await _ascan_matrix(
+            client, all_faculties, all_forms, tree.faculty
+        )
+    else:
+        active_faculties, active_form_ids, matrix_data = await _aprobe_matrix(client, all_faculties, all_forms)
+
+    return _assemble_faculty_table(all_forms, active_faculties, active_form_ids, matrix_data)
+
+
+async def _aprobe_matrix(client, all_faculties: list[dict], all_forms: dict) -> tuple[list[dict], list[int], dict]:
+    form_ids = list(all_forms.keys())
+    started = time.perf_counter()
+
+    async def timed(name: str, coros):
+        result = await asyncio.gather(*coros)
+        observe_phase(name, time.perf_counter() - started)
+        return result
+
+    fac_totals, form_totals = await asyncio.gather(
+        timed("faculty_probe", (
+            client.get_student_count(department_id=f["id"], student_status_id=11) for f in all_faculties
+        )),
+        timed("form_probe", (
+            client.get_student_count(education_form_id=fid, student_status_id=11) for fid in form_ids
+        )),
+    )
+
+    active_faculties = [
+        {"id": fac["id"], "name": fac.get("name", ""), "total": c}
+        for fac, c in zip(all_faculties, fac_totals)
+        if c > 0
+    ]
+    active_form_ids = [fid for fid, c in zip(form_ids, form_totals) if c > 0]
+
+    cells = [(fac["id"], fid) for fac in active_faculties for fid in active_form_ids]
+    with phase("matrix_cells"):
+        values = await asyncio.gather(*(
+            client.get_student_count(department_id=fac_id, education_form_id=fid, student_status_id=11)
+            for fac_id, fid in cells
+        ))
+    matrix_data = {cell: val for cell, val in zip(cells, values) if val > 0}
+    return active_faculties, active_form_ids, matrix_data
+
+
+async def _ascan_matrix(
+    client, all_faculties: list[dict], all_forms: dict, faculty_of: dict | None = None
+) -> tuple[list[dict], list[int], dict]:
+    page_size = settings.HEMIS_STUDENT_SCAN_PAGE_SIZE
+    scanner = _StudentScanner(all_faculties, faculty_of)
+
+    with phase("student_scan"):
+        first = await client.get_student_list(page=1, limit=page_size, student_status_id=11)
+        scanner.consume(first)
+        page_count = extract_page_count(first, page_size)
+
+        pages = [
+            client.get_student_list(page=p, limit=page_size, student_status_id=11)
+            for p in range(2, page_count + 1)
+        ]
+        for coro in asyncio.as_completed(pages):
+            scanner.consume(await coro)
+
+    await sync_to_async(store_student_dataset, thread_sensitive=False)(scanner.columns)
+    return _student_matrix(scanner.columns, all_faculties, all_forms)
+
+
+# -----------------------
+# ATTENDANCE
+# -----------------------
+async def aget_attendance_stat(
+    *,
+    faculty_id: int,
+    education_type_id: int | None = None,
+    education_form_id: int | None = None,
+    semester_id: int | None = None,
+    order: str = DEFAULT_ATTENDANCE_ORDER,
+    search: str | None = None,
+    page: int = 1,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> dict:
+    """get_attendance_stat ning async varianti (guruh keshi va natija to‘plami umumiy)."""
+    query, offset, limit = _resolve_attendance_query(
+        faculty_id=faculty_id,
+        education_type_id=education_type_id,
+        education_form_id=education_form_id,
+        semester_id=semester_id,
+        order=order,
+        search=search,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+    )
+    loop = asyncio.get_running_loop()
+
+    def collect(**kwargs) -> AttendanceColumns:
+        # Natija to‘plami mantig‘i (sync) thread'da; guruhlar esa shu so‘rovning loop'ida,
+        # umumiy client bilan yig‘iladi - yangi event loop ochilmaydi
+        trace = current_trace()
+
+        async def traced() -> AttendanceColumns:
+            token = activate(trace)
+            try:
+                return await _acollect_attendance_columns(**kwargs)
+            finally:
+                deactivate(token)
+
+        return asyncio.run_coroutine_threadsafe(traced(), loop).result()
+
+    return await sync_to_async(_attendance_page, thread_sensitive=False)(query, offset, limit, collect)
+
+
+async def _acollect_attendance_columns(
+    *,
+    faculty_id: int,
+    education_type_id: int | None = None,
+    education_form_id: int | None = None,
+    semester_id: int | None = None,
+    force_refresh: bool = False,
+) -> AttendanceColumns:
+    # Katalog (o‘quv reja/guruh indekslari) sync kesh servisidan
+    target_groups, c_map = await sync_to_async(_resolve_target_groups, thread_sensitive=False)(
+        faculty_id, education_type_id, education_form_id, force_refresh
+    )
+    if not target_groups:
+        return AttendanceColumns()
+
+    keys = {_group_cache_key(g["id"]): g for g in target_groups}
+    started = time.perf_counter()
+    cached = {} if force_refresh else await hemis_cache.aget_many(list(keys))
+    trace_cache(next(iter(keys)), "get_many", started, len(keys), len(cached))
+    rows_by_group = {keys[k]["id"]: rows for k, rows in cached.items()}
+    missing = [(k, g) for k, g in keys.items() if k not in cached]
+    record_cache(next(iter(keys)), "hit", len(cached))
+    record_cache(next(iter(keys)), "miss", len(missing))
+
+    client = get_async_client()
+
+    async def fetch_group_stat(grp):
+        try:
+            res = await client.get_attendance_stat(params=_group_stat_params(grp["id"]))
+            return _parse_group_rows(extract_items(res), grp, c_map)
+        except Exception as e:
+            logger.warning("Group attendance fetch failed (group=%s): %s", grp.get("id"), e)
+            return None
+
+    results = []
+    if missing:
+        with phase("group_attendance"):
+            results = await asyncio.gather(*(fetch_group_stat(g) for _, g in missing))
+    fetched = {}
+    for (key, grp), rows in zip(missing, results):
+        if rows is not None:
+            rows_by_group[grp["id"]] = rows
+            fetched[key] = rows
+    if fetched:
+        await hemis_cache.aset_many(fetched, timeout=settings.HEMIS_ATTENDANCE_GROUP_TTL)
+
+    return merge_group_columns(
+        target_groups, {gid: _with_semester(rows, semester_id) for gid, rows in rows_by_group.items()}
+    )
+
@@ -1,22 +1,58 @@
+import hashlib
+import heapq
+import itertools
+import json
 import logging
-from typing import Any
+import time
+from typing import Any, Callable
 
-from hemis_client.services.hemis_api import HemisClient
+from django.conf import settings
+from django.core import signing
+from hemis_client.services.hemis_api import HemisClient, extract_items
+from hemis_client.services.metrics import observe_phase, record_cache
+from hemis_client.services.tracing import trace_cache
+
+from .aggregation import threshold_indices
+from .cache import build_in_background, entry_age, get_or_build, hemis_cache, refresh
+from .catalog import get_faculty_catalog
+from .columnar import AttendanceColumns
+from .department_tree import get_department_tree
+from .search_index import get_index
 
 logger = logging.getLogger(__name__)
 
+ACTIVE_STUDENT_STATUS = 11
 
-def _safe_items(payload: Any) -> list[dict]:
-    if not isinstance(payload, dict):
-        return []
-    data = payload.get("data")
-    if isinstance(data, dict):
-        items = data.get("items")
-        if isinstance(items, list):
-            return items
-    if isinstance(data, list):
-        return data
-    return []
+ATTENDANCE_EXPORT_FIELDS = [
+    "entity",
+    "specialty",
+    "education_form",
+    "group",
+    "semester",
+    "subjects",
+    "lessons",
+    "absent_on",
+    "absent_off",
+    "total_absent",
+    "total_percent",
+]
+
+# Natija to‘plami tartiblari: har biri to‘liq (deterministik) kalit beradi
+ATTENDANCE_ORDERINGS: dict[str, Callable[[dict], tuple]] = {
+    "total_absent": lambda r: (-r["total_absent"], -r["total_percent"], r["group"], r["entity"]),
+    "percent": lambda r: (-r["total_percent"], -r["total_absent"], r["group"], r["entity"]),
+    "group": lambda r: (r["group"], r["entity"]),
+    "name": lambda r: (r["entity"], r["group"]),
+}
+DEFAULT_ATTENDANCE_ORDER = "total_absent"
+
+# Xavf ro‘yxati faqat shu ikki tartibda (eng ko‘p qoldirganlar)
+RISK_ORDERS = ("total_absent", "percent")
+
+RESULT_SET_CHUNK_SIZE = 500
+# Bitta sahifadagi qatorlar chegarasi (EMPLOYEE_MAX_LIMIT kabi)
+ATTENDANCE_MAX_LIMIT = 1000
+CURSOR_SALT = "monitoring.attendance.cursor"
 
 
 def _opt(item_id: Any, name: str) -> dict:
@@ -41,68 +77,29 @@ def get_attendance_filter_options(
     faculty_id: int | None = None,
     education_form_id: int | None = None,
     curriculum_id: int | None = None,
+    force_refresh: bool = False,
 ) -> dict:
     """
     Frontend filter option’lari:
     faculties, education_types, education_forms, education_years, semester_types
     """
-    client = HemisClient()
-
-    # 1) Faculties (Active Only)
-    dept_payload = client.get_department_list(limit=500)
-    dept_items = _safe_items(dept_payload)
-    faculties: list[dict] = []
-    
-    for it in dept_items:
-        st = (it.get("structureType") or {}).get("code")
-        # Active check: Hemis usually returns active but explicit check is good
-        is_active = it.get("active", True)
-        if str(st) == "11" and is_active is not False:
-            faculties.append(_opt(it.get("id"), it.get("name", "Noma'lum")))
+    # Alohida kesh yo‘q: daraxt va katalog keshda, bu yerda faqat lug‘at o‘qiladi
+    # 1) Faculties (Active Only) - keshlangan bo‘limlar daraxtidan
+    faculties: list[dict] = [
+        _opt(it.get("id"), it.get("name", "Noma'lum"))
+        for it in get_department_tree().faculties()
+        if it.get("active", True) is not False
+    ]
     faculties.sort(key=lambda x: x["name"])
 
-    # 2) Education Types & Forms
+    # 2) Education Types & Forms - fakultet katalogi indekslaridan
     education_types: list[dict] = []
     education_forms: list[dict] = []
-    
+
     if faculty_id:
-        # Fetch active curricula for this faculty to extract types/forms
-        c_params = {
-            "limit": 500, 
-            "_department": faculty_id
-        }
-        curr_payload = client.get_curriculum_list(params=c_params)
-        curr_items = _safe_items(curr_payload)
-
-        seen_types = set()
-        seen_forms = set()
-
-        for c in curr_items:
-            # Education Type
-            spec = c.get("specialty") or {}
-            etype = spec.get("educationType") or {}
-            et_id = etype.get("id")
-            et_name = etype.get("name")
-            if et_id and et_name and et_id not in seen_types:
-                seen_types.add(et_id)
-                education_types.append(_opt(et_id, et_name))
-
-            # Education Form
-            eform = c.get("educationForm") or {}
-            ef_id = eform.get("id") or eform.get("code")
-            ef_name = eform.get("name")
-            if ef_id and ef_name:
-                try: 
-                    ef_id_int = int(ef_id)
-                    if ef_id_int not in seen_forms:
-                        seen_forms.add(ef_id_int)
-                        education_forms.append(_opt(ef_id_int, ef_name))
-                except: pass
-        
-        education_types.sort(key=lambda x: x["name"])
-        # Custom sort for forms
-        order = [11, 13, 15, 14, 12, 16]
-        education_forms.sort(key=lambda x: order.index(x["id"]) if x["id"] in order else 99)
+        catalog = get_faculty_catalog(faculty_id, force_refresh=force_refresh)
+        education_types = list(catalog.education_types)
+        education_forms = list(catalog.education_forms)
 
     # 3) Semesters (Fixed 1-8)
     semesters = [{"id": i, "name": f"{i}-semestr"} for i in range(1, 9)]
@@ -117,157 +114,631 @@ def get_attendance_filter_options(
 
 def get_attendance_stat(
     *,
-    faculty_id: int,
+    faculty_id: int | None = None,
     education_type_id: int | None = None,
     education_form_id: int | None = None,
     semester_id: int | None = None,
+    order: str = DEFAULT_ATTENDANCE_ORDER,
+    search: str | None = None,
     page: int = 1,
     limit: int = 50,
+    cursor: str | None = None,
+    force_refresh: bool = False,
 ) -> dict:
     """
     Faculty-Level Report:
     1. Find groups matching Faculty + EduType + EduForm.
     2. Parallel fetch attendance for these groups (and optional semester).
     3. Aggregate & Filter.
+    Har guruh davomati (group, status, semester) kaliti bilan alohida keshlanadi:
+    hisobot keshdagi guruhlardan yig‘iladi, faqat yo‘q/eskirganlari HEMIS dan olinadi.
+    Tartiblangan natija to‘plami query hash ostida bo‘laklab saqlanadi; `cursor`
+    berilsa filtrlar va offset undan olinadi va faqat kerakli bo‘laklar o‘qiladi.
+    `search` (talaba F.I.O. / guruh) shu to‘plam ustidagi xotiradagi indeks bilan filtrlaydi.
+    """
+    query, offset, limit = _resolve_attendance_query(
+        faculty_id=faculty_id,
+        education_type_id=education_type_id,
+        education_form_id=education_form_id,
+        semester_id=semester_id,
+        order=order,
+        search=search,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+    )
+    return _attendance_page(query, offset, limit, _collect_attendance_columns, force_refresh)
+
+
+def get_attendance_risk_entry(
+    *,
+    faculty_id: int | None = None,
+    education_type_id: int | None = None,
+    education_form_id: int | None = None,
+    semester_id: int | None = None,
+    order: str = "total_absent",
+    k: int | None = None,
+    min_absent: int | None = None,
+    min_percent: float | None = None,
+    force_refresh: bool = False,
+) -> tuple[dict | None, dict | None]:
+    """
+    Eng ko‘p dars qoldirgan K talaba: (kesh yozuvi yoki None, progress).
+    Guruh qatorlari keshdan / HEMIS dan oqim bo‘lib keladi va K o‘lchamli heap'dan o‘tadi:
+    xotira skanerlangan guruhlar soniga emas, K ga bog‘liq. Natija query bo‘yicha keshlanadi.
+    Fakultet - so‘rov ichida quriladi (progress None). faculty_id=None - butun universitet:
+    rollup kabi fonda quriladi, tayyor bo‘lguncha yozuv None va progress qaytadi.
+    """
+    query = _risk_query(
+        faculty_id=faculty_id,
+        education_type_id=education_type_id,
+        education_form_id=education_form_id,
+        semester_id=semester_id,
+        order=order,
+        k=k,
+        min_absent=min_absent,
+        min_percent=min_percent,
+    )
+    qhash = hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()
+    key = f"attendance_risk_v2:{qhash}"
+    if faculty_id is None:
+        return _university_risk_entry(key, query, force_refresh)
+
+    func = refresh if force_refresh else get_or_build
+    entry = func(
+        key,
+        lambda: _build_risk(query, force_refresh),
+        ttl=settings.HEMIS_ATTENDANCE_RESULT_TTL,
+        encode=True,
+    )
+    return entry, None
+
+
+def _risk_query(
+    *,
+    faculty_id: int | None = None,
+    education_type_id: int | None = None,
+    education_form_id: int | None = None,
+    semester_id: int | None = None,
+    order: str = "total_absent",
+    k: int | None = None,
+    min_absent: int | None = None,
+    min_percent: float | None = None,
+) -> dict:
+    if order not in RISK_ORDERS:
+        raise ValueError(f"Unknown order: {order}")
+    k = settings.HEMIS_RISK_DEFAULT_K if k is None else k
+    if not 1 <= k <= settings.HEMIS_RISK_MAX_K:
+        raise ValueError(f"k must be between 1 and {settings.HEMIS_RISK_MAX_K}")
+    return {
+        "faculty_id": faculty_id,
+        "education_type_id": education_type_id,
+        "education_form_id": education_form_id,
+        "semester_id": semester_id,
+        "order": order,
+        "k": k,
+        "min_absent": settings.HEMIS_RISK_MIN_ABSENT if min_absent is None else min_absent,
+        "min_percent": settings.HEMIS_RISK_MIN_PERCENT if min_percent is None else min_percent,
+    }
+
+
+def _set_risk_progress(key: str, progress: dict) -> None:
+    progress["updated_at"] = time.time()
+    hemis_cache.set(f"{key}:progress", progress, timeout=settings.HEMIS_ATTENDANCE_RESULT_TTL)
+
+
+def _university_risk_entry(key: str, query: dict, force_refresh: bool) -> tuple[dict | None, dict | None]:
+    entry = None if force_refresh else hemis_cache.get(key)
+    if entry is not None and entry_age(entry) < settings.HEMIS_ATTENDANCE_RESULT_TTL:
+        return entry, None
+
+    def build() -> dict:
+        progress = {"status": "catalog", "started_at": time.time(), "groups_total": 0, "groups": 0, "rows": 0}
+        try:
+            return _build_risk(query, force_refresh, progress, lambda: _set_risk_progress(key, progress))
+        except Exception as e:
+            _set_risk_progress(key, {**progress, "status": "failed", "error": str(e)})
+            raise
+
+    started = build_in_background(key, build, ttl=settings.HEMIS_ATTENDANCE_RESULT_TTL, encode=True)
+    if started:
+        _set_risk_progress(key, {"status": "queued", "started_at": time.time()})
+    return entry, hemis_cache.get(f"{key}:progress")
+
+
+def _risk_faculties(faculty_id: int | None) -> list[dict]:
+    if faculty_id:
+        item = get_department_tree().items.get(faculty_id) or {}
+        return [_opt(faculty_id, item.get("name", ""))]
+    return get_attendance_filter_options()["faculties"]
+
+
+def _iter_risk_rows(query: dict, stats: dict, force_refresh: bool, report: Callable[[], None] | None = None):
+    """
+    Barcha fakultetlarning guruhlari bitta navbatda (rollup kabi, HEMIS_ROLLUP_WORKERS parallel) -
+    fakultetlar ketma-ket fan-out qilinmaydi. Qatorga fakultet qo‘shiladi.
     """
     client = HemisClient()
-    
-    # 1. Find Curricula first (to get relevant groups)
-    c_params = {
-        "limit": 500, 
-        "_department": faculty_id
+    groups: list[dict] = []
+    c_map: dict = {}
+    group_faculty: dict[int, dict] = {}
+    for fac in _risk_faculties(query["faculty_id"]):
+        fac_groups, fac_map = _resolve_target_groups(
+            fac["id"], query["education_type_id"], query["education_form_id"], force_refresh
+        )
+        groups.extend(fac_groups)
+        c_map.update(fac_map)
+        for g in fac_groups:
+            group_faculty[g["id"]] = fac
+    stats.update(status="groups", groups_total=len(groups))
+    if report:
+        report()
+
+    last_report = time.monotonic()
+    for grp, columns in _iter_group_rows(client, groups, c_map, query["semester_id"], force_refresh,
+                                         max_workers=settings.HEMIS_ROLLUP_WORKERS):
+        fac = group_faculty[grp["id"]]
+        stats["groups"] += 1
+        stats["rows"] += len(columns)
+        if report and time.monotonic() - last_report >= 1.0:
+            last_report = time.monotonic()
+            report()
+        # chegara - ustunlar bo‘yicha bitta niqob; dict faqat o‘tgan qatorlar uchun
+        passed = threshold_indices(
+            [columns.column("total_absent"), columns.column("total_percent")],
+            [query["min_absent"], query["min_percent"]],
+        )
+        for i in passed:
+            yield {**columns.row(i), "faculty_id": fac["id"], "faculty": fac["name"]}
+
+
+def _build_risk(
+    query: dict, force_refresh: bool, progress: dict | None = None, report: Callable[[], None] | None = None,
+) -> dict:
+    stats = progress if progress is not None else {"groups": 0, "rows": 0}
+    # nsmallest - K o‘lchamli heap (tartib kaliti ATTENDANCE_ORDERINGS bilan bir xil)
+    top = heapq.nsmallest(query["k"], _iter_risk_rows(query, stats, force_refresh, report),
+                          key=ATTENDANCE_ORDERINGS[query["order"]])
+    stats["status"] = "done"
+    if report:
+        report()
+    return {
+        "rows": top,
+        "order": query["order"],
+        "k": query["k"],
+        "thresholds": {"min_absent": query["min_absent"], "min_percent": query["min_percent"]},
+        "scanned_groups": stats["groups"],
+        "scanned_rows": stats["rows"],
     }
-    
-    curricula_payload = client.get_curriculum_list(params=c_params)
-    all_curricula = _safe_items(curricula_payload)
-    
-    # Filter Curricula by Type & Form
-    valid_c_ids = set()
-    c_map = {} # id -> {code, specialtyName, formName}
-    
-    for c in all_curricula:
-        # Check Form
-        sform = c.get("educationForm") or {}
-        sform_id = sform.get("id") or sform.get("code")
-        if education_form_id:
-            try:
-                if int(sform_id or 0) != education_form_id:
-                    continue
-            except: continue
-        
-        cid = c.get("id")
-        valid_c_ids.add(cid)
-        c_map[cid] = {
-            "specialty": (c.get("specialty") or {}).get("name", ""),
-            "form": sform.get("name", "")
-        }
-
-    if not valid_c_ids:
-        return {"rows": [], "count": 0}
-
-    # 3. Fetch Groups
-    g_params = {
-        "limit": 1000,
-        "_department": faculty_id,
-        "active": True
+
+
+def _resolve_attendance_query(
+    *,
+    faculty_id: int | None,
+    education_type_id: int | None,
+    education_form_id: int | None,
+    semester_id: int | None,
+    order: str,
+    page: int,
+    limit: int,
+    cursor: str | None,
+    search: str | None = None,
+) -> tuple[dict, int, int]:
+    if cursor:
+        return decode_attendance_cursor(cursor)
+
+    if order not in ATTENDANCE_ORDERINGS:
+        raise ValueError(f"Unknown order: {order}")
+    # page<1 manfiy offset beradi (bo‘lak topilmay to‘plam qayta quriladi) - rad etiladi
+    if page < 1:
+        raise ValueError("page must be >= 1")
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    limit = min(limit, ATTENDANCE_MAX_LIMIT)
+    query = {
+        "faculty_id": faculty_id,
+        "education_type_id": education_type_id,
+        "education_form_id": education_form_id,
+        "semester_id": semester_id,
+        "order": order,
     }
-    g_payload = client.get_group_list(params=g_params)
-    all_groups = _safe_items(g_payload)
-    
-    target_groups = []
-    for g in all_groups:
-        gcid = g.get("_curriculum")
-        if gcid in valid_c_ids:
-            target_groups.append(g)
+    if search and search.strip():
+        # kalit faqat qidiruvda qo‘shiladi - qidiruvsiz to‘plam hash'i o‘zgarmaydi
+        query["search"] = search.strip()
+    return query, (page - 1) * limit, limit
+
+
+def decode_attendance_cursor(cursor: str) -> tuple[dict, int, int]:
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT, max_age=settings.HEMIS_ATTENDANCE_CURSOR_MAX_AGE)
+    except signing.SignatureExpired:
+        raise ValueError("Cursor expired")
+    except signing.BadSignature:
+        raise ValueError("Invalid cursor")
+    return payload["q"], payload["o"], payload["l"]
+
+
+def _make_cursor(query: dict, offset: int, limit: int) -> str:
+    return signing.dumps({"q": query, "o": offset, "l": limit}, salt=CURSOR_SALT, compress=True)
+
+
+def _attendance_page(
+    query: dict,
+    offset: int,
+    limit: int,
+    collect: Callable[..., list[dict]],
+    force_refresh: bool = False,
+) -> dict:
+    if query.get("search"):
+        rows, count = _search_result_set(query, offset, limit, collect, force_refresh)
+    else:
+        meta_key, meta = _result_set_meta(query)
+        rows = None
+        if meta and not force_refresh:
+            rows = _read_result_chunks(meta_key, meta, offset, limit)
+        if rows is None:
+            # To‘plam yo‘q yoki bo‘laklari o‘chib ketgan - guruh keshidan qayta yig‘amiz
+            meta = _store_result_set(meta_key, query, collect, force_refresh)
+            rows = _read_result_chunks(meta_key, meta, offset, limit) or []
+        count = meta["count"]
+
+    return {
+        "rows": rows,
+        "count": count,
+        "order": query["order"],
+        "next_cursor": _make_cursor(query, offset + limit, limit) if offset + limit < count else None,
+        "prev_cursor": _make_cursor(query, max(0, offset - limit), limit) if offset > 0 else None,
+    }
+
+
+def _result_set_meta(query: dict) -> tuple[str, dict | None]:
+    qhash = hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()
+    meta_key = f"attendance_rs_v3:{qhash}"
+    return meta_key, hemis_cache.get(meta_key)
+
 
+def _keyed_attendance_rows(rows: list[dict]) -> list[tuple[tuple, dict]]:
+    """
+    Indeks kaliti bilan qatorlar: guruh + talaba id'si. HEMIS id bermagan (0) adash
+    talabalar (bir xil F.I.O.) n-chi uchrashi bo‘yicha ajratiladi, aks holda birlashib ketadi.
+    """
+    seen: dict[tuple, int] = {}
+    out = []
+    for row in rows:
+        base = (row["group"], row["student_id"], row["entity"], row["semester"], row["specialty"],
+                row["education_form"])
+        n = seen[base] = seen.get(base, -1) + 1
+        out.append(((*base, n), row))
+    return out
+
+
+def _search_result_set(
+    query: dict,
+    offset: int,
+    limit: int,
+    collect: Callable[..., list[dict]],
+    force_refresh: bool,
+) -> tuple[list[dict], int]:
+    """
+    Qidiruvsiz (asosiy) natija to‘plami ustida indeks; to‘plam qayta qurilsa
+    (built_at o‘zgaradi) indeks inkremental yangilanadi. Tartib asosiy to‘plamniki.
+    """
+    base_query = {k: v for k, v in query.items() if k != "search"}
+    meta_key, meta = _result_set_meta(base_query)
+    if not meta or force_refresh:
+        meta = _store_result_set(meta_key, base_query, collect, force_refresh)
+
+    def load_rows() -> list[dict]:
+        # faqat indeks eskirganda o‘qiladi; bo‘laklar o‘chib ketgan bo‘lsa qayta yig‘iladi
+        rows = _read_result_chunks(meta_key, meta, 0, meta["count"])
+        if rows is None:
+            fresh = _store_result_set(meta_key, base_query, collect, False)
+            rows = _read_result_chunks(meta_key, fresh, 0, fresh["count"]) or []
+        return _keyed_attendance_rows(rows)
+
+    index = get_index(
+        meta_key,
+        meta["built_at"],
+        load_rows,
+        key=lambda item: item[0],
+        text=lambda item: f"{item[1]['entity']} {item[1]['group']}",
+    )
+    matched = index.filter(query["search"])
+    return [row for _, row in matched[offset:offset + limit]], len(matched)
+
+
+def _store_result_set(
+    meta_key: str, query: dict, collect: Callable[..., AttendanceColumns], force_refresh: bool
+) -> dict:
+    columns = collect(
+        faculty_id=query["faculty_id"],
+        education_type_id=query["education_type_id"],
+        education_form_id=query["education_form_id"],
+        semester_id=query["semester_id"],
+        force_refresh=force_refresh,
+    )
+    # Tartib - indekslar permutatsiyasi; bo‘laklar ustunli (satrlar bo‘lak ichida intern)
+    order = columns.sort_indices(query["order"])
+
+    size = RESULT_SET_CHUNK_SIZE
+    chunks = {
+        f"{meta_key}:{i}": columns.take(order[i * size:(i + 1) * size])
+        for i in range(-(-len(order) // size))
+    }
+    meta = {"count": len(columns), "chunk_size": size, "built_at": time.time()}
+    # meta oxirida yoziladi: meta ko‘ringan bo‘lsa bo‘laklar ham bor
+    hemis_cache.set_many({**chunks, meta_key: meta}, timeout=settings.HEMIS_ATTENDANCE_RESULT_TTL)
+    return meta
+
+
+def _read_result_chunks(meta_key: str, meta: dict, offset: int, limit: int) -> list[dict] | None:
+    """Faqat [offset, offset + limit) ni qoplaydigan bo‘laklar o‘qiladi."""
+    count = meta["count"]
+    if offset >= count or limit <= 0:
+        return []
+    size = meta["chunk_size"]
+    first = offset // size
+    last = (min(offset + limit, count) - 1) // size
+    keys = [f"{meta_key}:{i}" for i in range(first, last + 1)]
+
+    chunks = hemis_cache.get_many(keys)
+    if len(chunks) != len(keys):
+        return None
+    # dict faqat sahifaga tushgan qatorlar uchun yasaladi
+    rows: list[dict] = []
+    start = offset - first * size
+    for key in keys:
+        rows.extend(chunks[key].iter_rows(start, start + limit - len(rows)))
+        start = 0
+    return rows
+
+
+def _collect_attendance_columns(
+    *,
+    faculty_id: int,
+    education_type_id: int | None = None,
+    education_form_id: int | None = None,
+    semester_id: int | None = None,
+    force_refresh: bool = False,
+) -> AttendanceColumns:
+    client = HemisClient()
+    target_groups, c_map = _resolve_target_groups(faculty_id, education_type_id, education_form_id, force_refresh)
     if not target_groups:
-        return {"rows": [], "count": 0}
+        return AttendanceColumns()
+
+    # 3. Cached / Parallel Fetch Attendance
+    columns_by_group = _load_group_rows(client, target_groups, c_map, semester_id, force_refresh)
+    return merge_group_columns(target_groups, columns_by_group)
+
+
+def merge_group_columns(groups: list[dict], columns_by_group: dict[int, AttendanceColumns]) -> AttendanceColumns:
+    """Guruhlar tartibida bitta konteynerga (o‘lcham satrlari umumiy jadvallarda)."""
+    merged = AttendanceColumns()
+    for g in groups:
+        columns = columns_by_group.get(g["id"])
+        if columns:
+            merged.extend(columns)
+    return merged
+
+
+def iter_attendance_rows(
+    *,
+    faculty_id: int,
+    education_type_id: int | None = None,
+    education_form_id: int | None = None,
+    semester_id: int | None = None,
+) -> tuple[Any, list[int]]:
+    """
+    Export uchun: (qatorlar generatori, olinmagan guruh id lari). Katalog va birinchi
+    guruh shu chaqiruvning o‘zida olinadi - ularning xatosi javob boshlanmasidan oldin
+    chiqadi; qolgan guruhlar generator iste'mol qilinganda (to‘liq ro‘yxat xotirada yig‘ilmaydi).
+    """
+    client = HemisClient()
+    target_groups, c_map = _resolve_target_groups(faculty_id, education_type_id, education_form_id)
+    failed: list[int] = []
+    groups = _iter_group_rows(client, target_groups, c_map, semester_id, failed=failed)
+    first = next(groups, None)
+    if first is None and failed:
+        raise RuntimeError(f"Attendance fetch failed for all {len(failed)} groups")
+
+    def rows():
+        if first is not None:
+            yield from first[1].iter_rows()
+        for _grp, columns in groups:
+            yield from columns.iter_rows()
+
+    return rows(), failed
+
+
+def _resolve_target_groups(
+    faculty_id: int,
+    education_type_id: int | None,
+    education_form_id: int | None,
+    force_refresh: bool = False,
+) -> tuple[list[dict], dict]:
+    """Katalog indekslaridan: (guruhlar, o‘quv reja id -> {specialty, form})."""
+    catalog = get_faculty_catalog(faculty_id, force_refresh=force_refresh)
+    filters = {"education_type_id": education_type_id, "education_form_id": education_form_id}
+    return catalog.select_groups(**filters), catalog.curriculum_map(**filters)
+
+
+def _group_cache_key(group_id: int) -> str:
+    # Semestr HEMIS'ga yuborilmaydi (_group_stat_params) - javob semestrga bog‘liq emas,
+    # shuning uchun kalitda ham yo‘q; semestr belgisi o‘qishda qo‘yiladi
+    return f"attendance_group_v4:{group_id}:{ACTIVE_STUDENT_STATUS}"
+
+
+def _with_semester(columns: AttendanceColumns, semester_id: int | None) -> AttendanceColumns:
+    return columns.with_label("semester", str(semester_id)) if semester_id else columns
+
+
+def _load_group_rows(
+    client: HemisClient,
+    groups: list[dict],
+    c_map: dict,
+    semester_id: int | None,
+    force_refresh: bool = False,
+) -> dict[int, AttendanceColumns]:
+    """group_id -> qatorlar. Keshda borlari get_many bilan, qolganlari parallel olinadi."""
+    return {
+        grp["id"]: rows
+        for grp, rows in _iter_group_rows(client, groups, c_map, semester_id, force_refresh)
+    }
+
+
+def _iter_group_rows(
+    client: HemisClient,
+    groups: list[dict],
+    c_map: dict,
+    semester_id: int | None,
+    force_refresh: bool = False,
+    batch_size: int = 50,
+    max_workers: int = 20,
+    failed: list | None = None,
+):
+    """
+    (guruh, AttendanceColumns) juftliklarini tayyor bo‘lishi bilan beradi: avval keshdagilar
+    (batch bo‘yicha get_many), keyin HEMIS dan olinganlari tugash tartibida.
+    Olinmagan guruhlar o‘tkazib yuboriladi; failed berilsa - id lari unga qo‘shiladi.
+    Xotirada bir vaqtda faqat bitta batch / oynadagi (max_workers*2) guruhlar turadi.
+    """
+    keys = [(_group_cache_key(g["id"]), g) for g in groups]
+    missing = []
+    for i in range(0, len(keys), batch_size):
+        batch = keys[i:i + batch_size]
+        started = time.perf_counter()
+        cached = {} if force_refresh else hemis_cache.get_many([k for k, _ in batch])
+        trace_cache(batch[0][0], "get_many", started, len(batch), len(cached))
+        for key, grp in batch:
+            if key in cached:
+                yield grp, _with_semester(cached[key], semester_id)
+            else:
+                missing.append((key, grp))
+
+    if keys:
+        record_cache(keys[0][0], "hit", len(keys) - len(missing))
+        record_cache(keys[0][0], "miss", len(missing))
+    if not missing:
+        return
 
-    # 3. Parallel Fetch Attendance
     import concurrent.futures
-    flattened_rows = []
-    
-    def fetch_group_stat(grp):
-        gid = grp['id']
-        gname = grp['name']
-        cid = grp.get("_curriculum")
-        meta = c_map.get(cid, {})
-        
-        p = {
-            "limit": 200, 
-            "group_by": "student",
-            "_group": gid,
-            "_student_status": 11
-        }
-        # NOTE: We do not pass _semester=semester_id because Hemis expects a specific ID, not '1', '2'.
-        # Passing '1' causes empty results. We rely on Hemis returning current/active semester data.
 
+    def fetch_group_stat(grp):
         try:
-            res = client.get_attendance_stat(params=p)
-            items = _safe_items(res)
-            g_rows = []
-            for it in items:
-                abs_on = int(it.get("absent_on") or it.get("ABSENT_ON") or 0)
-                abs_off = int(it.get("absent_off") or it.get("ABSENT_OFF") or 0)
-                if abs_on == 0 and abs_off == 0:
+            res = client.get_attendance_stat(params=_group_stat_params(grp["id"]))
+            return _parse_group_rows(extract_items(res), grp, c_map)
+        except Exception as e:
+            logger.warning("Group attendance fetch failed (group=%s): %s", grp.get("id"), e)
+            return None
+
+    started = time.perf_counter()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    # Cheklangan oyna: bir vaqtda ko‘pi bilan max_workers*2 Future; tugagani darhol
+    # lug‘atdan olinadi - natijasi iste'molchiga berilgach xotirada qolmaydi
+    queue = iter(missing)
+    window = max_workers * 2
+    pending: dict = {}
+
+    def submit_more():
+        for key, grp in itertools.islice(queue, window - len(pending)):
+            pending[executor.submit(fetch_group_stat, grp)] = (key, grp)
+
+    try:
+        submit_more()
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            while done:
+                f = done.pop()
+                key, grp = pending.pop(f)
+                rows = f.result()
+                del f
+                submit_more()
+                if rows is None:
+                    # Xato keshlanmaydi - keyingi so‘rovda qayta uriniladi
+                    if failed is not None:
+                        failed.append(grp["id"])
                     continue
-                
-                # Extract student name safely - ROBUST F.I.O
-                student_obj = it.get("student") or it.get("_student") or {}
-                student_name = None
-                
-                if isinstance(student_obj, dict):
-                    student_name = student_obj.get("full_name") or student_obj.get("fullname") or student_obj.get("name") or student_obj.get("short_name")
-                    if not student_name:
-                         # Construct from parts
-                         lname = student_obj.get("second_name") or student_obj.get("last_name") or student_obj.get("lastname") or ""
-                         fname = student_obj.get("first_name") or student_obj.get("firstname") or ""
-                         mname = student_obj.get("third_name") or student_obj.get("father_name") or ""
-                         parts = [x for x in [lname, fname, mname] if x]
-                         if parts:
-                              student_name = " ".join(parts)
-
-                # Fallback to current level keys
-                if not student_name:
-                    student_name = it.get("fullname") or it.get("short_name") or it.get("name")
-                
-                # Fallback to entity if everything fails
-                if not student_name:
-                     ent = it.get("_entityname") or it.get("entity") or it.get("_entityName")
-                     student_name = _stringify(ent)
-
-                g_rows.append({
-                    "entity": student_name,
-                    "specialty": meta.get("specialty"),
-                    "education_form": meta.get("form"),
-                    "group": gname,
-                    "semester": str(semester_id) if semester_id else "-",
-                    "subjects": int(it.get("subjects") or 0),
-                    "lessons": int(it.get("lessons") or 0),
-                    "absent_on": abs_on,
-                    "absent_off": abs_off,
-                    "total_absent": abs_on + abs_off,
-                    "total_percent": float(it.get("total_percent") or 0)
-                })
-            return g_rows
-        except:
-            return []
-
-    futures = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        for g in target_groups:
-            futures.append(executor.submit(fetch_group_stat, g))
-                 
-        for f in concurrent.futures.as_completed(futures):
-            flattened_rows.extend(f.result())
-
-    # 4. Pagination
-    total_count = len(flattened_rows)
-    start = (page - 1) * limit
-    end = start + limit
-    paged_rows = flattened_rows[start:end]
+                hemis_cache.set(key, rows, timeout=settings.HEMIS_ATTENDANCE_GROUP_TTL)
+                yield grp, _with_semester(rows, semester_id)
+                del rows
+        observe_phase("group_attendance", time.perf_counter() - started)
+    finally:
+        # Iste'molchi to‘xtasa (masalan, export ulanishi uzilsa) navbatdagilar bekor qilinadi
+        executor.shutdown(wait=False, cancel_futures=True)
+
 
+def _group_stat_params(group_id: int) -> dict:
+    # NOTE: We do not pass _semester=semester_id because Hemis expects a specific ID, not '1', '2'.
+    # Passing '1' causes empty results. We rely on Hemis returning current/active semester data.
     return {
-        "rows": paged_rows,
-        "count": total_count,
+        "limit": 200, 
+        "group_by": "student",
+        "_group": group_id,
+        "_student_status": ACTIVE_STUDENT_STATUS
     }
+
+
+def _student_id(it: dict) -> int:
+    # HEMIS student.id; yo‘q bo‘lsa 0 (qator kaliti unda F.I.O. bo‘yicha)
+    student = it.get("student") or it.get("_student") or {}
+    sid = student.get("id") if isinstance(student, dict) else None
+    try:
+        return int(sid or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _student_name(it: dict) -> str:
+    # Extract student name safely - ROBUST F.I.O
+    student_obj = it.get("student") or it.get("_student") or {}
+    student_name = None
+    
+    if isinstance(student_obj, dict):
+        student_name = student_obj.get("full_name") or student_obj.get("fullname") or student_obj.get("name") or student_obj.get("short_name")
+        if not student_name:
+             # Construct from parts
+             lname = student_obj.get("second_name") or student_obj.get("last_name") or student_obj.get("lastname") or ""
+             fname = student_obj.get("first_name") or student_obj.get("firstname") or ""
+             mname = student_obj.get("third_name") or student_obj.get("father_name") or ""
+             parts = [x for x in [lname, fname, mname] if x]
+             if parts:
+                  student_name = " ".join(parts)
+
+    # Fallback to current level keys
+    if not student_name:
+        student_name = it.get("fullname") or it.get("short_name") or it.get("name")
+    
+    # Fallback to entity if everything fails
+    if not student_name:
+         ent = it.get("_entityname") or it.get("entity") or it.get("_entityName")
+         student_name = _stringify(ent)
+    return student_name
+
+
+def _parse_group_rows(items: list[dict], grp: dict, c_map: dict) -> AttendanceColumns:
+    """Bitta guruhning group_by=student javobidan qoldirilgan darsi bor talabalar qatorlari."""
+    gname = grp['name']
+    meta = c_map.get(grp.get("_curriculum"), {})
+
+    g_rows = AttendanceColumns()
+    for it in items:
+        abs_on = int(it.get("absent_on") or it.get("ABSENT_ON") or 0)
+        abs_off = int(it.get("absent_off") or it.get("ABSENT_OFF") or 0)
+        if abs_on == 0 and abs_off == 0:
+            continue
+
+        g_rows.append({
+            "student_id": _student_id(it),
+            "entity": _student_name(it),
+            "specialty": meta.get("specialty"),
+            "education_form": meta.get("form"),
+            "group": gname,
+            "semester": "-",
+            "subjects": int(it.get("subjects") or 0),
+            "lessons": int(it.get("lessons") or 0),
+            "absent_on": abs_on,
+            "absent_off": abs_off,
+            "total_absent": abs_on + abs_off,
+            "total_percent": float(it.get("total_percent") or 0)
+        })
+    return g_rows
@@ -0,0 +1,391 @@
+# backend/monitoring/cache.py
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connections
+from django.utils.connection import ConnectionProxy
+from hemis_client.services.metrics import record_cache
+from hemis_client.services.tracing import trace_cache
+
+from .renderers import encode_entry
+
+logger = logging.getLogger(__name__)
+
+# HEMIS dan olingan agregatlar uchun umumiy kesh (settings.CACHES["hemis"]).
+# `django.core.cache.cache` kabi proxy: har bir thread o‘z ulanishini oladi.
+hemis_cache = ConnectionProxy(caches, "hemis")
+
+# Shu jarayonda hozir hisoblanayotgan kalitlar (single-flight)
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+# Async variant: event loop bo‘yicha hisoblanayotgan kalitlar (aget_or_build)
+_ainflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+LOCK_POLL_INTERVAL = 0.5
+
+
+def entry_age(entry: dict) -> int:
+    return max(0, int(time.time() - entry["built_at"]))
+
+
+def entry_meta(entry: dict) -> dict:
+    """Javobga qo‘shiladigan ma'lumot yoshi (dashboard ko‘rsatishi uchun)."""
+    generated_at = datetime.fromtimestamp(entry["built_at"], tz=timezone.utc)
+    return {"generated_at": generated_at.isoformat()}
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+# -----------------------
+# WORKER'LAR ORASIDAGI LOCK
+# -----------------------
+# FileBasedCache.add() atomar emas (has_key, keyin set) - ikki worker bir vaqtda lock'ni
+# olishi mumkin. Shu backend uchun lock - kesh papkasi yonidagi O_CREAT|O_EXCL fayl;
+# boshqa backend'larda (DB, Redis, locmem) add() atomar - o‘shaning o‘zi.
+def _lock_dir() -> str | None:
+    backend = caches["hemis"]
+    if not isinstance(backend, FileBasedCache):
+        return None
+    path = f"{backend._dir.rstrip(os.sep)}-locks"
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _lock_path(lock_dir: str, key: str) -> str:
+    return os.path.join(lock_dir, hashlib.sha1(_lock_key(key).encode()).hexdigest() + ".lock")
+
+
+def _acquire_lock(key: str, lock_timeout: int) -> bool:
+    lock_dir = _lock_dir()
+    if lock_dir is None:
+        return hemis_cache.add(_lock_key(key), os.getpid(), timeout=lock_timeout)
+
+    path = _lock_path(lock_dir, key)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            try:
+                age = time.time() - os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+            if age < lock_timeout:
+                return False
+            # Lock egasi lock_timeout dan oshib ketgan (worker o‘lgan) - bitta urinishda olib tashlanadi
+            _break_stale_lock(path, lock_timeout)
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def _break_stale_lock(path: str, lock_timeout: int) -> None:
+    # rename atomar: bir vaqtda buzayotgan worker'lardan faqat bittasi faylni ko‘chiradi
+    moved = f"{path}.{os.getpid()}.{threading.get_ident()}.stale"
+    try:
+        os.rename(path, moved)
+    except FileNotFoundError:
+        return
+    try:
+        if time.time() - os.stat(moved).st_mtime < lock_timeout:
+            # stat va rename orasida boshqa worker yangi lock olgan - qaytarib qo‘yamiz
+            try:
+                os.link(moved, path)
+            except FileExistsError:
+                pass
+    finally:
+        os.unlink(moved)
+
+
+def _release_lock(key: str) -> None:
+    lock_dir = _lock_dir()
+    if lock_dir is None:
+        hemis_cache.delete(_lock_key(key))
+        return
+    try:
+        os.unlink(_lock_path(lock_dir, key))
+    except FileNotFoundError:
+        pass
+
+
+def _build_and_store(
+    key: str, builder: Callable[[], Any], timeout: int, on_built: Callable[[dict], None] | None = None,
+    encode: bool = False,
+) -> dict:
+    entry = {"value": builder(), "built_at": time.time()}
+    if encode:
+        # Javob tanasi (ETag, gzip/br bilan) bir marta tayyorlanadi - iliq so‘rovlar uni o‘zgartirmasdan yuboradi
+        encode_entry(entry, entry_meta(entry))
+    hemis_cache.set(key, entry, timeout=timeout)
+    if on_built:
+        # Masalan, kontingent nusxasini DB ga yozish - xatosi yozuvni buzmaydi
+        try:
+            on_built(entry)
+        except Exception as e:
+            logger.warning("on_built hook failed (%s): %s", key, e)
+    return entry
+
+
+def _run_single_flight(
+    key: str, builder: Callable[[], Any], timeout: int, lock_timeout: int, on_built=None, encode: bool = False
+) -> dict:
+    """
+    Jarayon ichida: bitta thread hisoblaydi, qolganlari uning Future'ini kutadi.
+    Jarayonlar orasida: atomar lock (_acquire_lock) - lock'ni ololmagan worker natija
+    keshga tushishini kutadi.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not leader:
+        return future.result()
+
+    try:
+        entry = None
+        while entry is None:
+            if _acquire_lock(key, lock_timeout):
+                try:
+                    entry = _build_and_store(key, builder, timeout, on_built, encode)
+                finally:
+                    _release_lock(key)
+                break
+
+            # Boshqa worker hisoblayapti - natijani kutamiz
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = hemis_cache.get(key)
+        future.set_result(entry)
+        return entry
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _refresh_in_background(
+    key: str, builder: Callable[[], Any], timeout: int, lock_timeout: int, on_built=None, encode: bool = False
+) -> bool:
+    """False - kalit allaqachon hisoblanmoqda (shu yoki boshqa worker'da)."""
+    with _inflight_lock:
+        if key in _inflight:
+            return False
+    if not _acquire_lock(key, lock_timeout):
+        return False
+
+    def run():
+        try:
+            _build_and_store(key, builder, timeout, on_built, encode)
+        except Exception as e:
+            logger.error("Background refresh failed (%s): %s", key, e, exc_info=True)
+        finally:
+            _release_lock(key)
+            connections.close_all()
+
+    threading.Thread(target=run, name=f"refresh:{key}", daemon=True).start()
+    return True
+
+
+def build_in_background(
+    key: str, builder: Callable[[], Any], *, ttl: int, stale_ttl: int = 0, lock_timeout: int = 600,
+    on_built: Callable[[dict], None] | None = None, encode: bool = False,
+) -> bool:
+    """
+    Uzoq hisoblash (so‘rov kutmaydi): fonda bitta thread, kesh lock'i bilan.
+    True - yangi hisoblash boshlandi, False - allaqachon ketmoqda.
+    """
+    return _refresh_in_background(key, builder, ttl + stale_ttl, lock_timeout, on_built, encode)
+
+
+def get_or_build(
+    key: str,
+    builder: Callable[[], Any],
+    *,
+    ttl: int,
+    stale_ttl: int = 0,
+    lock_timeout: int = 600,
+    on_built: Callable[[dict], None] | None = None,
+    encode: bool = False,
+) -> dict:
+    """
+    Stale-while-revalidate + single-flight.
+    Keshdagi yozuv: {"value": ..., "built_at": epoch}.
+    - age < ttl: darhol qaytariladi
+    - ttl <= age < ttl + stale_ttl: eski qiymat qaytariladi, fonda bitta yangilash boshlanadi
+    - yozuv yo‘q: bitta hisoblash, bir vaqtdagi boshqa so‘rovlar uni kutadi
+    `on_built(entry)` - yangi yozuv keshga tushgach chaqiriladi (fon yangilashda ham).
+    `encode=True` - yozuvga tayyor JSON, ETag va siqilgan variantlar qo‘shiladi (renderers.encode_entry).
+    """
+    timeout = ttl + stale_ttl
+    started = time.perf_counter()
+    entry = hemis_cache.get(key)
+    if entry is not None:
+        result = "stale" if entry_age(entry) >= ttl else "hit"
+        record_cache(key, result)
+        trace_cache(key, result, started)
+        if result == "stale":
+            _refresh_in_background(key, builder, timeout, lock_timeout, on_built, encode)
+        return entry
+    record_cache(key, "miss")
+    trace_cache(key, "miss", started)
+    return _run_single_flight(key, builder, timeout, lock_timeout, on_built, encode)
+
+
+def derived_entry(
+    key: str, source: dict, derive: Callable[[Any], Any], *, timeout: int, encode: bool = False,
+) -> dict:
+    """
+    Boshqa yozuvdan hosil qilingan qiymat (masalan, jadvaldan summary): manbaning har
+    built_at i uchun bir marta hisoblanib keshlanadi, built_at manbaniki bilan bir xil.
+    """
+    dkey = f"{key}:{source['built_at']!r}"
+    started = time.perf_counter()
+    entry = hemis_cache.get(dkey)
+    result = "hit" if entry is not None else "miss"
+    record_cache(dkey, result)
+    trace_cache(dkey, result, started)
+    if entry is None:
+        entry = {"value": derive(source["value"]), "built_at": source["built_at"]}
+        if encode:
+            encode_entry(entry, entry_meta(entry))
+        hemis_cache.set(dkey, entry, timeout=timeout)
+    return entry
+
+
+# -----------------------
+# ASYNC (ASGI view'lar uchun)
+# -----------------------
+async def _abuild_and_store(
+    key: str, abuilder: Callable[[], Awaitable[Any]], timeout: int, on_built=None, encode: bool = False,
+) -> dict:
+    entry = {"value": await abuilder(), "built_at": time.time()}
+    if encode:
+        await sync_to_async(encode_entry, thread_sensitive=False)(entry, entry_meta(entry))
+    await hemis_cache.aset(key, entry, timeout=timeout)
+    if on_built:
+        try:
+            await sync_to_async(on_built)(entry)
+        except Exception as e:
+            logger.warning("on_built hook failed (%s): %s", key, e)
+    return entry
+
+
+async def _alead(
+    key: str, abuilder: Callable[[], Awaitable[Any]], timeout: int, lock_timeout: int, on_built=None,
+    encode: bool = False,
+) -> dict:
+    acquire = sync_to_async(_acquire_lock, thread_sensitive=False)
+    release = sync_to_async(_release_lock, thread_sensitive=False)
+    while True:
+        if await acquire(key, lock_timeout):
+            try:
+                return await _abuild_and_store(key, abuilder, timeout, on_built, encode)
+            finally:
+                await release(key)
+
+        # Boshqa worker (yoki shu jarayondagi sync yo‘l) hisoblayapti - natijani kutamiz
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        entry = await hemis_cache.aget(key)
+        if entry is not None:
+            return entry
+
+
+async def _arun_single_flight(
+    key: str, abuilder: Callable[[], Awaitable[Any]], timeout: int, lock_timeout: int, on_built=None,
+    encode: bool = False,
+) -> dict:
+    """
+    _run_single_flight ning async varianti: loop ichida bitta Task hisoblaydi, qolgan
+    so‘rovlar uni kutadi (thread ham, yangi event loop ham ochilmaydi). Task so‘rovdan
+    ajratilgan (shield) - birinchi mijoz uzilsa ham qolganlar natijani oladi.
+    """
+    inflight = _ainflight.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_alead(key, abuilder, timeout, lock_timeout, on_built, encode))
+        inflight[key] = task
+        task.add_done_callback(lambda t: inflight.pop(key, None) if inflight.get(key) is t else None)
+    return await asyncio.shield(task)
+
+
+def _arefresh_in_background(
+    key: str, abuilder: Callable[[], Awaitable[Any]], timeout: int, lock_timeout: int, on_built=None,
+    encode: bool = False,
+) -> bool:
+    inflight = _ainflight.setdefault(asyncio.get_running_loop(), {})
+    if key in inflight:
+        return False
+
+    async def run():
+        acquire = sync_to_async(_acquire_lock, thread_sensitive=False)
+        if not await acquire(key, lock_timeout):
+            return None
+        try:
+            return await _abuild_and_store(key, abuilder, timeout, on_built, encode)
+        except Exception as e:
+            logger.error("Background refresh failed (%s): %s", key, e, exc_info=True)
+            return None
+        finally:
+            await sync_to_async(_release_lock, thread_sensitive=False)(key)
+
+    task = inflight[key] = asyncio.ensure_future(run())
+    task.add_done_callback(lambda t: inflight.pop(key, None) if inflight.get(key) is t else None)
+    return True
+
+
+async def aget_or_build(
+    key: str,
+    abuilder: Callable[[], Awaitable[Any]],
+    *,
+    ttl: int,
+    stale_ttl: int = 0,
+    lock_timeout: int = 600,
+    on_built: Callable[[dict], None] | None = None,
+    encode: bool = False,
+) -> dict:
+    """
+    get_or_build ning async varianti (kalit, yozuv formati, lock umumiy): `abuilder` -
+    coroutine funksiya, joriy event loop'da ishlaydi. Stale yozuvda fon yangilash - Task.
+    """
+    timeout = ttl + stale_ttl
+    started = time.perf_counter()
+    entry = await hemis_cache.aget(key)
+    if entry is not None:
+        result = "stale" if entry_age(entry) >= ttl else "hit"
+        record_cache(key, result)
+        trace_cache(key, result, started)
+        if result == "stale":
+            _arefresh_in_background(key, abuilder, timeout, lock_timeout, on_built, encode)
+        return entry
+    record_cache(key, "miss")
+    trace_cache(key, "miss", started)
+    return await _arun_single_flight(key, abuilder, timeout, lock_timeout, on_built, encode)
+
+
+def refresh(
+    key: str, builder: Callable[[], Any], *, ttl: int, stale_ttl: int = 0,
+    on_built: Callable[[dict], None] | None = None, encode: bool = False,
+) -> dict:
+    """Majburiy qayta hisoblash (masalan, fon warmer uchun)."""
+    return _build_and_store(key, builder, ttl + stale_ttl, on_built, encode)
@@ -0,0 +1,175 @@
+# backend/monitoring/catalog.py
+# Fakultet o‘quv rejalari va guruhlari katalogi: bir marta olinadi, indekslanadi
+# (o‘quv reja -> guruhlar, shakl -> rejalar, ta'lim turi -> rejalar) va keshda turadi.
+# Davomat filtrlari ham, statistikasi ham filtrlarni shu lug‘atlardan hal qiladi.
+import logging
+from typing import Any
+
+from django.conf import settings
+from hemis_client.services.hemis_api import HemisClient, extract_items, extract_total_count
+
+from .cache import get_or_build, hemis_cache, refresh
+
+logger = logging.getLogger(__name__)
+
+# Ta'lim shakllari ko‘rsatish tartibi (filtrlarda)
+EDUCATION_FORM_ORDER = [11, 13, 15, 14, 12, 16]
+
+
+def _catalog_key(faculty_id: int) -> str:
+    return f"faculty_catalog_v1:{faculty_id}"
+
+
+def _curriculum_params(faculty_id: int) -> dict:
+    return {
+        "limit": 500,
+        "_department": faculty_id
+    }
+
+
+def _group_params(faculty_id: int) -> dict:
+    return {
+        "limit": 1000,
+        "_department": faculty_id,
+        "active": True
+    }
+
+
+def _to_int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FacultyCatalog:
+    """
+    Bitta fakultetning o‘quv rejalari va guruhlari + indekslar.
+    Filtrlar (ta'lim turi, shakl) indekslar kesishmasi bilan hal qilinadi.
+    `source_counts` - HEMIS totalCount qiymatlari (arzon eskirish tekshiruvi uchun).
+    """
+
+    def __init__(self, faculty_id: int, curricula: list[dict], groups: list[dict], source_counts: dict):
+        self.faculty_id = faculty_id
+        self.source_counts = source_counts
+
+        self.curricula: dict[Any, dict] = {}
+        self.curricula_by_form: dict[int, list] = {}
+        self.curricula_by_type: dict[int, list] = {}
+        types: dict[int, str] = {}
+        forms: dict[int, str] = {}
+
+        for c in curricula:
+            cid = c.get("id")
+            if cid is None:
+                continue
+            spec = c.get("specialty") or {}
+            etype = spec.get("educationType") or {}
+            eform = c.get("educationForm") or {}
+            type_id = _to_int(etype.get("id"))
+            form_id = _to_int(eform.get("id") or eform.get("code"))
+
+            self.curricula[cid] = {
+                "specialty": spec.get("name", ""),
+                "form": eform.get("name", ""),
+                "form_id": form_id,
+                "type_id": type_id,
+            }
+            if form_id is not None:
+                self.curricula_by_form.setdefault(form_id, []).append(cid)
+                if eform.get("name"):
+                    forms.setdefault(form_id, eform["name"])
+            if type_id is not None:
+                self.curricula_by_type.setdefault(type_id, []).append(cid)
+                if etype.get("name"):
+                    types.setdefault(type_id, etype["name"])
+
+        self.groups_by_curriculum: dict[Any, list[dict]] = {}
+        for g in groups:
+            if g.get("_curriculum") in self.curricula:
+                self.groups_by_curriculum.setdefault(g["_curriculum"], []).append(g)
+
+        self.education_types = sorted(
+            ({"id": i, "name": n} for i, n in types.items()), key=lambda x: x["name"]
+        )
+        self.education_forms = sorted(
+            ({"id": i, "name": n} for i, n in forms.items()),
+            key=lambda x: EDUCATION_FORM_ORDER.index(x["id"]) if x["id"] in EDUCATION_FORM_ORDER else 99,
+        )
+
+    def select_curricula(self, *, education_type_id: int | None = None,
+                         education_form_id: int | None = None) -> list:
+        selected = list(self.curricula)
+        if education_form_id:
+            selected = self.curricula_by_form.get(education_form_id, [])
+        if education_type_id:
+            by_type = set(self.curricula_by_type.get(education_type_id, []))
+            selected = [cid for cid in selected if cid in by_type]
+        return selected
+
+    def curriculum_map(self, *, education_type_id: int | None = None,
+                       education_form_id: int | None = None) -> dict:
+        """o‘quv reja id -> {specialty, form} (qatorlarni to‘ldirish uchun)."""
+        return {
+            cid: {"specialty": self.curricula[cid]["specialty"], "form": self.curricula[cid]["form"]}
+            for cid in self.select_curricula(education_type_id=education_type_id, education_form_id=education_form_id)
+        }
+
+    def select_groups(self, *, education_type_id: int | None = None,
+                      education_form_id: int | None = None) -> list[dict]:
+        return [
+            g
+            for cid in self.select_curricula(education_type_id=education_type_id, education_form_id=education_form_id)
+            for g in self.groups_by_curriculum.get(cid, [])
+        ]
+
+
+def get_faculty_catalog(
+    faculty_id: int, *, force_refresh: bool = False, client: HemisClient | None = None
+) -> FacultyCatalog:
+    """
+    Keshdagi katalog. Har HEMIS_ATTENDANCE_CATALOG_TTL da bitta worker arzon tekshiruv
+    qiladi (curriculum-list va group-list, limit=1 -> totalCount); sonlar o‘zgargan
+    bo‘lsa katalog qayta quriladi, aks holda eskisi ishlatilaveradi.
+    client berilsa - so‘rovlar o‘sha nusxa orqali (chaqiruvchi ularni sanashi uchun).
+    """
+    key = _catalog_key(faculty_id)
+    builder = lambda: _build_catalog(faculty_id, client)  # noqa: E731
+    if force_refresh:
+        return refresh(key, builder, ttl=settings.HEMIS_CATALOG_MAX_AGE)["value"]
+
+    catalog = get_or_build(key, builder, ttl=settings.HEMIS_CATALOG_MAX_AGE)["value"]
+    # add() - faqat bitta worker tekshiradi; qolganlar keshdagini ishlatadi
+    if hemis_cache.add(f"{key}:checked", 1, timeout=settings.HEMIS_ATTENDANCE_CATALOG_TTL):
+        try:
+            current = _source_counts(client or HemisClient(), faculty_id)
+        except Exception as e:
+            logger.warning("Catalog staleness check failed (faculty=%s): %s", faculty_id, e)
+            return catalog
+        if current != catalog.source_counts:
+            logger.info("Catalog changed (faculty=%s): %s -> %s", faculty_id, catalog.source_counts, current)
+            catalog = refresh(key, builder, ttl=settings.HEMIS_CATALOG_MAX_AGE)["value"]
+    return catalog
+
+
+def _source_counts(client: HemisClient, faculty_id: int) -> dict:
+    curricula = client.get_curriculum_list(params={**_curriculum_params(faculty_id), "limit": 1})
+    groups = client.get_group_list(params={**_group_params(faculty_id), "limit": 1})
+    return {"curricula": extract_total_count(curricula), "groups": extract_total_count(groups)}
+
+
+def _build_catalog(faculty_id: int, client: HemisClient | None = None) -> FacultyCatalog:
+    client = client or HemisClient()
+    curricula_payload = client.get_curriculum_list(params=_curriculum_params(faculty_id))
+    groups_payload = client.get_group_list(params=_group_params(faculty_id))
+    # Yangi qurilgan katalogni darhol tekshirish shart emas
+    hemis_cache.set(f"{_catalog_key(faculty_id)}:checked", 1, timeout=settings.HEMIS_ATTENDANCE_CATALOG_TTL)
+    return FacultyCatalog(
+        faculty_id,
+        extract_items(curricula_payload),
+        extract_items(groups_payload),
+        {
+            "curricula": extract_total_count(curricula_payload),
+            "groups": extract_total_count(groups_payload),
+        },
+    )
@@ -0,0 +1,211 @@
+# backend/monitoring/columnar.py
+# Davomat qatorlari uchun ustunli konteyner: o‘lcham satrlari (mutaxassislik, shakl,
+# guruh, semestr) intern qilinib kod sifatida, sonlar `array` ustunlarida turadi.
+# Guruh keshi, natija to‘plami bo‘laklari, tartiblash va sahifalash shu ko‘rinishda;
+# dict faqat javobga chiqishda (row / iter_rows) yasaladi.
+from array import array
+
+from .aggregation import column_sum
+
+DIMENSIONS = ("specialty", "education_form", "group", "semester")
+INT_COLUMNS = ("student_id", "subjects", "lessons", "absent_on", "absent_off", "total_absent")
+
+# ATTENDANCE_ORDERINGS bilan bir xil tartib: barqaror (stable) saralashlar ketma-ketligi,
+# eng kichik ahamiyatli kalitdan boshlab. (ustun, kamayish bo‘yicha)
+SORT_PASSES: dict[str, tuple[tuple[str, bool], ...]] = {
+    "total_absent": (("entity", False), ("group", False), ("total_percent", True), ("total_absent", True)),
+    "percent": (("entity", False), ("group", False), ("total_absent", True), ("total_percent", True)),
+    "group": (("entity", False), ("group", False)),
+    "name": (("group", False), ("entity", False)),
+}
+
+
+class StringTable:
+    """Intern qilingan satrlar: qiymat -> kod (kiritish tartibida)."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values=()):
+        self.values: list = []
+        self._codes: dict = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def ranks(self) -> array:
+        """kod -> saralangan tartibdagi o‘rni (satrlarni har qatorda solishtirmaslik uchun)."""
+        ranks = array("I", bytes(4 * len(self.values)))
+        order = sorted(range(len(self.values)), key=lambda c: self.values[c] or "")
+        for pos, code in enumerate(order):
+            ranks[code] = pos
+        return ranks
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    # Keshda faqat qiymatlar saqlanadi, indeks o‘qishda qayta quriladi
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values):
+        self.values = []
+        self._codes = {}
+        for value in values:
+            self.code(value)
+
+
+class AttendanceColumns:
+    __slots__ = ("entity", "tables", "codes", "ints", "total_percent")
+
+    def __init__(self):
+        self.entity: list[str] = []
+        self.tables = {d: StringTable() for d in DIMENSIONS}
+        self.codes = {d: array("I") for d in DIMENSIONS}
+        self.ints = {c: array("I") for c in INT_COLUMNS}
+        self.total_percent = array("d")
+
+    def __len__(self) -> int:
+        return len(self.entity)
+
+    def append(self, row: dict) -> None:
+        self.entity.append(row["entity"])
+        for d in DIMENSIONS:
+            self.codes[d].append(self.tables[d].code(row[d]))
+        for c in INT_COLUMNS:
+            self.ints[c].append(row[c])
+        self.total_percent.append(row["total_percent"])
+
+    def extend(self, other: "AttendanceColumns") -> None:
+        """Boshqa konteyner qatorlarini qo‘shadi (kodlar shu jadvallarga o‘giriladi)."""
+        self.entity.extend(other.entity)
+        for d in DIMENSIONS:
+            mapping = [self.tables[d].code(v) for v in other.tables[d].values]
+            self.codes[d].extend(map(mapping.__getitem__, other.codes[d]))
+        for c in INT_COLUMNS:
+            self.ints[c].extend(other.ints[c])
+        self.total_percent.extend(other.total_percent)
+
+    def take(self, indices) -> "AttendanceColumns":
+        """Berilgan tartibdagi qatorlar; jadvallarda faqat ishlatilgan satrlar qoladi."""
+        out = AttendanceColumns()
+        out.entity = list(map(self.entity.__getitem__, indices))
+        for d in DIMENSIONS:
+            values = self.tables[d].values
+            remap: dict[int, int] = {}
+            table = out.tables[d]
+            codes = out.codes[d]
+            for code in map(self.codes[d].__getitem__, indices):
+                new = remap.get(code)
+                if new is None:
+                    new = remap[code] = table.code(values[code])
+                codes.append(new)
+        for c in INT_COLUMNS:
+            out.ints[c] = array("I", map(self.ints[c].__getitem__, indices))
+        out.total_percent = array("d", map(self.total_percent.__getitem__, indices))
+        return out
+
+    def with_label(self, name: str, value) -> "AttendanceColumns":
+        """Barcha qatorlarda o‘lcham bitta qiymat (masalan, so‘ralgan semestr); ustunlar nusxalanmaydi."""
+        out = AttendanceColumns.__new__(AttendanceColumns)
+        out.entity = self.entity
+        out.tables = {**self.tables, name: StringTable([value])}
+        out.codes = {**self.codes, name: array("I", bytes(4 * len(self)))}
+        out.ints = self.ints
+        out.total_percent = self.total_percent
+        return out
+
+    def column(self, name: str):
+        if name == "entity":
+            return self.entity
+        if name == "total_percent":
+            return self.total_percent
+        if name in self.ints:
+            return self.ints[name]
+        raise KeyError(name)
+
+    def sum(self, name: str):
+        return column_sum(self.column(name))
+
+    def sort_indices(self, order: str) -> list[int]:
+        """Qator indekslari ATTENDANCE_ORDERINGS[order] tartibida (har o‘tish C darajada)."""
+        indices = list(range(len(self)))
+        for name, descending in SORT_PASSES[order]:
+            if name in DIMENSIONS:
+                ranks = self.tables[name].ranks()
+                key = array("I", map(ranks.__getitem__, self.codes[name]))
+            else:
+                key = self.column(name)
+            indices.sort(key=key.__getitem__, reverse=descending)
+        return indices
+
+    def row(self, i: int) -> dict:
+        tables, codes, ints = self.tables, self.codes, self.ints
+        return {
+            "student_id": ints["student_id"][i],
+            "entity": self.entity[i],
+            "specialty": tables["specialty"].values[codes["specialty"][i]],
+            "education_form": tables["education_form"].values[codes["education_form"][i]],
+            "group": tables["group"].values[codes["group"][i]],
+            "semester": tables["semester"].values[codes["semester"][i]],
+            "subjects": ints["subjects"][i],
+            "lessons": ints["lessons"][i],
+            "absent_on": ints["absent_on"][i],
+            "absent_off": ints["absent_off"][i],
+            "total_absent": ints["total_absent"][i],
+            "total_percent": self.total_percent[i],
+        }
+
+    def iter_rows(self, start: int = 0, stop: int | None = None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop):
+            yield self.row(i)
+
+    @classmethod
+    def from_rows(cls, rows) -> "AttendanceColumns":
+        columns = cls()
+        for row in rows:
+            columns.append(row)
+        return columns
+
+
+# Talabalar ro‘yxati (student-list skani) o‘lchamlari: kalit - id / HEMIS kodi
+STUDENT_DIMENSIONS = ("faculty", "education_form", "course", "gender")
+
+
+class StudentColumns:
+    """
+    Har talaba - bitta qator, har o‘lcham - zich kod (array 'I') va kalitlar jadvali;
+    nomlar alohida (kalit -> nom). Kontingent kublari (aggregation.cube) shu ustunlardan.
+    """
+
+    __slots__ = ("tables", "codes", "labels")
+
+    def __init__(self):
+        self.tables = {d: StringTable() for d in STUDENT_DIMENSIONS}
+        self.codes = {d: array("I") for d in STUDENT_DIMENSIONS}
+        self.labels: dict[str, dict] = {d: {} for d in STUDENT_DIMENSIONS}
+
+    def __len__(self) -> int:
+        return len(self.codes[STUDENT_DIMENSIONS[0]])
+
+    def append(self, keys: dict, names: dict) -> None:
+        for d in STUDENT_DIMENSIONS:
+            key = keys.get(d)
+            self.codes[d].append(self.tables[d].code(key))
+            if key is not None and key not in self.labels[d]:
+                self.labels[d][key] = names.get(d) or ""
+
+    def size(self, dim: str) -> int:
+        return len(self.tables[dim])
+
+    def keys(self, dim: str) -> list:
+        return self.tables[dim].values
+
+    def label(self, dim: str, key) -> str:
+        return self.labels[dim].get(key, "")
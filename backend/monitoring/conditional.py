@@ -0,0 +1,74 @@
+# backend/monitoring/conditional.py
+# Keshlangan agregatlar uchun shartli GET: ETag / Last-Modified yozuv to‘ldirilganda
+# hisoblangan (renderers.encode_entry), If-None-Match / If-Modified-Since mos kelsa -
+# 304 bo‘sh javob. Aks holda oldindan siqilgan variant (br, gzip) Accept-Encoding bo‘yicha.
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+
+from .cache import entry_age
+
+# Afzallik tartibida
+ENCODINGS = ("br", "gzip")
+
+
+def _accepted_encodings(request) -> set[str]:
+    accepted = set()
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(ENCODINGS)
+    return accepted
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match: kuchsiz taqqoslash; "-gzip"/"-br" suffiksi - bir xil tana."""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"').split("-", 1)[0] == etag:
+            return True
+    return False
+
+
+def _not_modified(request, entry: dict) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, entry["etag"])
+    since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return since is not None and int(entry["built_at"]) <= since
+
+
+def cached_entry_response(request, entry: dict) -> HttpResponse:
+    """
+    encode=True bilan keshlangan yozuv javobi (body/etag/gzip/br tayyor):
+    CPU faqat sarlavhalar uchun, 304 da tana umuman yuborilmaydi.
+    """
+    accepted = _accepted_encodings(request)
+    coding = next((c for c in ENCODINGS if c in entry and c in accepted), None)
+    if _not_modified(request, entry):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry[coding] if coding else entry["body"], content_type="application/json")
+        if coding:
+            response["Content-Encoding"] = coding
+
+    response["ETag"] = f'"{entry["etag"]}-{coding}"' if coding else f'"{entry["etag"]}"'
+    response["Last-Modified"] = http_date(entry["built_at"])
+    # Brauzer har safar tekshiradi (If-None-Match), o‘zgarmagan bo‘lsa - 304
+    response["Cache-Control"] = "no-cache"
+    response["Vary"] = "Accept-Encoding"
+    response["Age"] = str(entry_age(entry))
+    return response
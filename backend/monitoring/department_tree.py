@@ -0,0 +1,224 @@
+# backend/monitoring/department_tree.py
+# HEMIS department-list -> keshlangan daraxt: id -> tugun, bolalar, ajdodlar yo‘li,
+# har bo‘lim uchun fakulteti (O(1)) va pastki daraxt bo‘yicha yig‘indilar.
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Mapping
+
+from django.conf import settings
+from hemis_client.services.hemis_api import HemisClient, extract_items, extract_total_count
+
+from .cache import get_or_build, refresh
+
+logger = logging.getLogger(__name__)
+
+DEPARTMENT_TREE_CACHE_KEY = "department_tree_v1"
+DEPARTMENT_PAGE_SIZE = 200
+
+FACULTY_STRUCTURE_TYPE = "11"
+KAFEDRA_STRUCTURE_TYPE = "12"
+
+
+def _parent_id(item: dict) -> Any:
+    parent = item.get("parent")
+    if isinstance(parent, dict):
+        parent = parent.get("id")
+    return parent or item.get("_parent") or None
+
+
+def _structure_type(item: dict) -> str:
+    st = item.get("structureType")
+    code = st.get("code") if isinstance(st, dict) else item.get("_structure_type")
+    return str(code) if code not in (None, "") else ""
+
+
+class DepartmentTree:
+    """
+    Bir marta quriladi (keshga pickle qilinadi), keyin barcha so‘rovlar lug‘at qidiruvi:
+    - node(id), children[id], paths[id] (ildizdan o‘zigacha), faculty[id]
+    - by_type[structure_type] -> id'lar
+    - rollup(values) - pastki daraxt yig‘indilari (postorder, bitta o‘tish)
+    """
+
+    def __init__(self, items: list[dict]):
+        self.items: dict[Any, dict] = {}
+        for item in items:
+            if item.get("id") is not None:
+                self.items[item["id"]] = item
+
+        self.parent: dict[Any, Any] = {}
+        self.children: dict[Any, list] = {dept_id: [] for dept_id in self.items}
+        self.roots: list = []
+        for dept_id, item in self.items.items():
+            parent = _parent_id(item)
+            if parent in self.items and parent != dept_id:
+                self.parent[dept_id] = parent
+                self.children[parent].append(dept_id)
+            else:
+                self.parent[dept_id] = None
+                self.roots.append(dept_id)
+
+        self.by_type: dict[str, list] = {}
+        for dept_id, item in self.items.items():
+            self.by_type.setdefault(_structure_type(item), []).append(dept_id)
+
+        # Ildizlardan DFS: yo‘llar, fakultet va postorder (sikl bo‘lsa - tugun ildiz bo‘ladi)
+        self.paths: dict[Any, tuple] = {}
+        self.faculty: dict[Any, Any] = {}
+        self.postorder: list = []
+        for root in list(self.roots):
+            self._walk(root)
+        for dept_id in self.items:
+            if dept_id not in self.paths:
+                logger.warning("Department parent cycle: %s", dept_id)
+                self.children[self.parent[dept_id]].remove(dept_id)
+                self.parent[dept_id] = None
+                self.roots.append(dept_id)
+                self._walk(dept_id)
+
+    def _walk(self, root) -> None:
+        stack = [(root, False)]
+        while stack:
+            dept_id, done = stack.pop()
+            if done:
+                self.postorder.append(dept_id)
+                continue
+            if dept_id in self.paths:
+                continue
+            parent = self.parent.get(dept_id)
+            parent_path = self.paths.get(parent, ()) if parent is not None else ()
+            self.paths[dept_id] = parent_path + (dept_id,)
+            if _structure_type(self.items[dept_id]) == FACULTY_STRUCTURE_TYPE:
+                self.faculty[dept_id] = dept_id
+            else:
+                self.faculty[dept_id] = self.faculty.get(parent) if parent is not None else None
+
+            stack.append((dept_id, True))
+            for child in reversed(self.children[dept_id]):
+                if child not in self.paths:
+                    stack.append((child, False))
+
+    def __contains__(self, dept_id) -> bool:
+        return dept_id in self.items
+
+    def node(self, dept_id) -> dict | None:
+        return self.items.get(dept_id)
+
+    def faculty_of(self, dept_id) -> Any:
+        return self.faculty.get(dept_id)
+
+    def ancestors(self, dept_id) -> list:
+        return list(self.paths.get(dept_id, ())[:-1])
+
+    def of_type(self, structure_type: str) -> list[dict]:
+        return [self.items[i] for i in self.by_type.get(str(structure_type), [])]
+
+    def faculties(self) -> list[dict]:
+        return self.of_type(FACULTY_STRUCTURE_TYPE)
+
+    def subtree(self, dept_id) -> list:
+        """Pastki daraxt id'lari (preorder, o‘zi bilan)."""
+        result, stack = [], [dept_id]
+        while stack:
+            current = stack.pop()
+            result.append(current)
+            stack.extend(reversed(self.children.get(current, [])))
+        return result
+
+    def rollup(self, values: Mapping[Any, int]) -> dict[Any, int]:
+        """Har tugun uchun o‘zi + barcha avlodlari qiymatlari yig‘indisi."""
+        totals: dict[Any, int] = {}
+        for dept_id in self.postorder:
+            total = values.get(dept_id, 0)
+            for child in self.children[dept_id]:
+                total += totals[child]
+            totals[dept_id] = total
+        return totals
+
+
+def get_department_tree_entry(*, force_refresh: bool = False) -> dict:
+    """{"value": DepartmentTree, "built_at"} - SWR bilan keshlanadi."""
+    func = refresh if force_refresh else get_or_build
+    return func(
+        DEPARTMENT_TREE_CACHE_KEY,
+        _build_department_tree,
+        ttl=settings.HEMIS_DEPARTMENT_TREE_TTL,
+        stale_ttl=settings.HEMIS_DEPARTMENT_TREE_STALE_TTL,
+    )
+
+
+def get_department_tree() -> DepartmentTree:
+    return get_department_tree_entry()["value"]
+
+
+def _build_department_tree() -> DepartmentTree:
+    client = HemisClient()
+    first = client.get_department_list(limit=DEPARTMENT_PAGE_SIZE, params={"page": 1})
+    items = list(extract_items(first))
+
+    page_count = -(-extract_total_count(first) // DEPARTMENT_PAGE_SIZE)
+    if page_count > 1:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pages = executor.map(
+                lambda p: client.get_department_list(limit=DEPARTMENT_PAGE_SIZE, params={"page": p}),
+                range(2, page_count + 1),
+            )
+            for payload in pages:
+                items.extend(extract_items(payload))
+
+    tree = DepartmentTree(items)
+    logger.info("Department tree built: %s nodes, %s roots", len(tree.items), len(tree.roots))
+    return tree
+
+
+# -----------------------
+# ROLLUPS
+# -----------------------
+def department_counts(tree: DepartmentTree, employees: Iterable[dict], faculty_rows: Iterable[dict]) -> dict:
+    """
+    Bo‘lim bo‘yicha o‘z va pastki daraxt sanoqlari, keshdagi ro‘yxatlardan:
+    - xodimlar: department.id bo‘yicha (kafedra darajasi)
+    - talabalar: fakultet jadvali qatorlari (faculty_id -> total)
+    """
+    own_employees: Counter = Counter()
+    for item in employees:
+        dept_id = (item.get("department") or {}).get("id")
+        if dept_id in tree:
+            own_employees[dept_id] += 1
+
+    students: Counter = Counter()
+    for row in faculty_rows:
+        if row.get("faculty_id") in tree:
+            students[row["faculty_id"]] += row.get("total", 0)
+
+    return {
+        "employees": dict(own_employees),
+        "employees_total": tree.rollup(own_employees),
+        "students_total": tree.rollup(students),
+    }
+
+
+def serialize_subtree(tree: DepartmentTree, dept_id, counts: dict | None = None, depth: int | None = None) -> dict:
+    item = tree.items[dept_id]
+    st = item.get("structureType") if isinstance(item.get("structureType"), dict) else {}
+    node = {
+        "id": dept_id,
+        "name": item.get("name", ""),
+        "code": item.get("code"),
+        "structure_type": {"code": _structure_type(item), "name": st.get("name")},
+        "active": item.get("active", True),
+        "parent_id": tree.parent.get(dept_id),
+        "faculty_id": tree.faculty_of(dept_id),
+        "path": list(tree.paths[dept_id]),
+    }
+    if counts is not None:
+        node["employees"] = counts["employees"].get(dept_id, 0)
+        node["employees_total"] = counts["employees_total"].get(dept_id, 0)
+        node["students_total"] = counts["students_total"].get(dept_id, 0)
+    if depth is None or depth > 0:
+        next_depth = None if depth is None else depth - 1
+        node["children"] = [serialize_subtree(tree, c, counts, next_depth) for c in tree.children[dept_id]]
+    else:
+        node["children_count"] = len(tree.children[dept_id])
+    return node
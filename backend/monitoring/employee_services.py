@@ -0,0 +1,238 @@
+# backend/monitoring/employee_services.py
+# Kafedra xodimlari: HEMIS employee-list barcha sahifalari bir marta o‘qiladi,
+# birlashtirilgan ro‘yxat (tur, kafedra) bo‘yicha keshlanadi; filtr, facet
+# sanoqlari va sahifalash serverda bajariladi.
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.conf import settings
+from hemis_client.services.hemis_api import HemisClient, extract_items, extract_page_count
+
+from .cache import build_in_background, get_or_build, hemis_cache, refresh
+from .search_index import get_index
+
+logger = logging.getLogger(__name__)
+
+EMPLOYEE_TYPES = ("teacher", "employee", "all")
+EMPLOYEE_PAGE_SIZE = 200
+EMPLOYEE_MAX_LIMIT = 500
+
+# active (bool) bo‘yicha status - employeeStatus bo‘lmagan yozuvlar uchun
+ACTIVE_STATUS_NAMES = {"true": "Ishlamoqda", "false": "Bo‘shagan"}
+
+
+def _dataset_key(employee_type: str, department_id: int | None) -> str:
+    return f"employee_dataset_v1:{employee_type}:{department_id or 0}"
+
+
+def _employee_key(item: dict):
+    return item.get("id") or item.get("employee_id_number")
+
+
+def _employee_text(item: dict) -> str:
+    return " ".join(str(item.get(f) or "") for f in ("full_name", "short_name", "employee_id_number"))
+
+
+def search_employees(entry: dict, search: str, *, employee_type: str, department_id: int | None) -> list[dict]:
+    """Keshdagi ro‘yxat indeksidan qidiruv (relevance bo‘yicha tartiblangan)."""
+    index = get_index(
+        _dataset_key(employee_type, department_id),
+        entry["built_at"],
+        lambda: entry["value"],
+        key=_employee_key,
+        text=_employee_text,
+    )
+    return index.ranked(search)
+
+
+def _code(node: Any) -> str:
+    if isinstance(node, dict) and node.get("code") not in (None, ""):
+        return str(node["code"])
+    return ""
+
+
+def _status_of(item: dict) -> tuple[str, str] | None:
+    """(code, name): avval employeeStatus, bo‘lmasa active -> "true"/"false"."""
+    status = item.get("employeeStatus")
+    code = _code(status)
+    if code:
+        return code, status.get("name") or code
+    active = item.get("active")
+    if isinstance(active, bool):
+        code = "true" if active else "false"
+        return code, ACTIVE_STATUS_NAMES[code]
+    return None
+
+
+def _employment_form_of(item: dict) -> tuple[str, str] | None:
+    form = item.get("employmentForm")
+    code = _code(form)
+    if code:
+        return code, form.get("name") or code
+    return None
+
+
+def get_employee_dataset_entry(
+    *,
+    department_id: int | None = None,
+    employee_type: str = "teacher",
+    force_refresh: bool = False,
+) -> dict:
+    """Kafedra (yoki butun OTM) xodimlarining to‘liq ro‘yxati: {"value": [...], "built_at"}."""
+    if employee_type not in EMPLOYEE_TYPES:
+        raise ValueError(f"Unknown employee type: {employee_type}")
+
+    key = _dataset_key(employee_type, department_id)
+    builder = lambda: _crawl_employees(department_id, employee_type)  # noqa: E731
+    if force_refresh:
+        return refresh(
+            key, builder, ttl=settings.HEMIS_EMPLOYEE_LIST_TTL, stale_ttl=settings.HEMIS_EMPLOYEE_LIST_STALE_TTL
+        )
+    return get_or_build(
+        key, builder, ttl=settings.HEMIS_EMPLOYEE_LIST_TTL, stale_ttl=settings.HEMIS_EMPLOYEE_LIST_STALE_TTL
+    )
+
+
+def peek_employee_dataset_entry(*, employee_type: str = "teacher") -> dict | None:
+    """Faqat keshdagi OTM xodimlari ro‘yxati; yo‘q bo‘lsa crawl fonda boshlanadi va None qaytadi."""
+    key = _dataset_key(employee_type, None)
+    entry = hemis_cache.get(key)
+    if entry is None:
+        build_in_background(
+            key,
+            lambda: _crawl_employees(None, employee_type),
+            ttl=settings.HEMIS_EMPLOYEE_LIST_TTL,
+            stale_ttl=settings.HEMIS_EMPLOYEE_LIST_STALE_TTL,
+        )
+    return entry
+
+
+def _crawl_employees(department_id: int | None, employee_type: str) -> list[dict]:
+    client = HemisClient()
+    params: dict[str, Any] = {"type": employee_type, "limit": EMPLOYEE_PAGE_SIZE}
+    if department_id:
+        params["_department"] = department_id
+
+    first = client.get_employee_list({**params, "page": 1})
+    items = list(extract_items(first))
+    page_count = extract_page_count(first, EMPLOYEE_PAGE_SIZE)
+
+    if page_count > 1:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pages = executor.map(
+                lambda p: client.get_employee_list({**params, "page": p}),
+                range(2, page_count + 1),
+            )
+            for payload in pages:
+                items.extend(extract_items(payload))
+
+    # Sahifalar chegarasida takrorlangan yozuvlar bo‘lishi mumkin
+    seen: set = set()
+    unique = []
+    for item in items:
+        item_id = item.get("id")
+        if item_id is not None:
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+        unique.append(item)
+
+    logger.info(
+        "Employee list crawled: type=%s department=%s pages=%s items=%s",
+        employee_type, department_id, page_count, len(unique),
+    )
+    return unique
+
+
+def _matches(item: dict, *, employment_form, status) -> bool:
+    # Kafedra bo‘yicha filtr yo‘q: ro‘yxat o‘zi kafedra kaliti bilan (_department) olingan,
+    # item.department esa ichki bo‘linma bo‘lishi mumkin - ular ham kafedra xodimlari
+    if employment_form:
+        form = _employment_form_of(item)
+        if not form or form[0] != employment_form:
+            return False
+    if status:
+        # facet bilan bir xil qoida - tanlangan status soni natija soniga teng
+        pair = _status_of(item)
+        if not pair or pair[0] != status:
+            return False
+    return True
+
+
+def _facet(items: list[dict], extract) -> list[dict]:
+    counts: dict[str, dict] = {}
+    for item in items:
+        pair = extract(item)
+        if not pair:
+            continue
+        code, name = pair
+        bucket = counts.get(code)
+        if bucket is None:
+            counts[code] = {"code": code, "name": name, "count": 1}
+        else:
+            bucket["count"] += 1
+    return sorted(counts.values(), key=lambda b: (-b["count"], b["name"]))
+
+
+def query_employees(
+    *,
+    department_id: int | None = None,
+    employee_type: str = "teacher",
+    employment_form: str | None = None,
+    status: str | None = None,
+    search: str | None = None,
+    page: int = 1,
+    limit: int = 50,
+    force_refresh: bool = False,
+) -> dict:
+    """
+    Keshdagi to‘liq ro‘yxatdan filtrlangan sahifa + facet sanoqlari.
+    Har bir facet qolgan filtrlar bo‘yicha sanaladi (o‘zi hisobga olinmaydi).
+    `search` indeks orqali (lotin/kirill, prefiks, trigram); natija relevance bo‘yicha.
+    limit=0 - barcha mos yozuvlar (eksport uchun).
+    Qaytadi: {"value": natija, "built_at"} (ro‘yxat keshga yozilgan vaqt).
+    """
+    page = max(1, int(page))
+    limit = max(0, min(int(limit), EMPLOYEE_MAX_LIMIT)) if limit else 0
+
+    entry = get_employee_dataset_entry(
+        department_id=department_id, employee_type=employee_type, force_refresh=force_refresh
+    )
+    dataset = entry["value"]
+    candidates = dataset
+    if search and search.strip():
+        candidates = search_employees(entry, search, employee_type=employee_type, department_id=department_id)
+    filters = {
+        "employment_form": employment_form or None,
+        "status": status or None,
+    }
+
+    rows = [item for item in candidates if _matches(item, **filters)]
+    form_base = [item for item in candidates if _matches(item, **{**filters, "employment_form": None})]
+    status_base = [item for item in candidates if _matches(item, **{**filters, "status": None})]
+
+    total = len(rows)
+    if limit:
+        offset = (page - 1) * limit
+        items = rows[offset:offset + limit]
+        page_count = -(-total // limit)
+    else:
+        items = rows
+        page_count = 1
+
+    result = {
+        "items": items,
+        "pagination": {
+            "totalCount": total,
+            "currentPage": page,
+            "pageCount": page_count,
+            "perPage": limit or total,
+        },
+        "total_loaded": len(dataset),
+        "facets": {
+            "employment_forms": _facet(form_base, _employment_form_of),
+            "statuses": _facet(status_base, _status_of),
+        },
+    }
+    return {"value": result, "built_at": entry["built_at"]}
@@ -0,0 +1,260 @@
+# backend/monitoring/management/commands/benchmark_hemis.py
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from hemis_client.services import rate_limiter
+from hemis_client.services.fake_hemis import build_fake_hemis, install_fake_hemis
+from hemis_client.services.hemis_api import HemisClient
+from monitoring import search_index
+from monitoring.attendance_services import get_attendance_filter_options, get_attendance_stat
+from monitoring.cache import hemis_cache
+from monitoring.employee_services import get_employee_dataset_entry
+from monitoring.services import get_dashboard_summary, get_faculty_table_data
+
+# Sintetik universitet o‘lchamlari (fake HEMIS UniversitySpec maydonlari)
+SIZES = {
+    "small": {"faculties": 5, "groups": 200, "students": 5000, "employees": 300},
+    "medium": {"faculties": 20, "groups": 2000, "students": 50000, "employees": 3000},
+    "large": {"faculties": 40, "groups": 4000, "students": 100000, "employees": 6000},
+}
+
+
+def _first_faculty(fake) -> int:
+    return fake.faculties[0]["id"]
+
+
+SCENARIOS = {
+    "faculty_table": lambda fake: get_faculty_table_data(),
+    "dashboard_summary": lambda fake: get_dashboard_summary(),
+    "attendance_options": lambda fake: get_attendance_filter_options(faculty_id=_first_faculty(fake)),
+    "attendance_stat": lambda fake: get_attendance_stat(faculty_id=_first_faculty(fake)),
+    "employee_crawl": lambda fake: get_employee_dataset_entry(employee_type="all"),
+}
+
+# Benchmark keshi: ishchi (fayl) keshga tegmaydi, har o‘lcham uchun toza
+BENCHMARK_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark-default"},
+    "hemis": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark-hemis",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
+
+def _reset_state() -> None:
+    """Sovuq start: kesh, jarayondagi qidiruv indekslari, limiter."""
+    hemis_cache.clear()
+    with search_index._registry_lock:
+        search_index._registry.clear()
+    rate_limiter._limiter = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Monitoring agregatlarini bundled soxta HEMIS ustida o‘lchaydi: sovuq/iliq kechikish, "
+        "HEMIS so‘rovlari soni, tracemalloc peak xotira - bir nechta o‘lcham va parallellikda. "
+        "--output JSON ga yozadi, --baseline bilan oldingi natija bilan solishtiradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="small", help=f"Vergul bilan: {', '.join(SIZES)}")
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Vergul bilan: {', '.join(SCENARIOS)}")
+        parser.add_argument("--concurrency", default="1,8", help="Bir vaqtdagi chaqiruvchilar soni, vergul bilan")
+        parser.add_argument("--warm-runs", type=int, default=3, help="Iliq o‘lchovlar soni (median olinadi)")
+        parser.add_argument("--latency-ms", type=float, default=20.0, help="Soxta HEMIS javob kechikishi, ms")
+        parser.add_argument("--jitter-ms", type=float, default=5.0)
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Tasodifiy 429 ehtimoli")
+        parser.add_argument("--page-size-cap", type=int, default=200)
+        parser.add_argument("--rate-limit", type=float, default=0.0, help="HEMIS_RATE_LIMIT (0 - o‘chirilgan)")
+        parser.add_argument("--mode", choices=["count", "scan"], help="HEMIS_FACULTY_TABLE_MODE")
+        parser.add_argument("--no-memory", action="store_true", help="tracemalloc o‘lchovini o‘tkazib yuborish")
+        parser.add_argument("--output", help="Natijalar JSON fayli")
+        parser.add_argument("--baseline", help="Solishtirish uchun oldingi JSON natija")
+        parser.add_argument("--threshold", type=float, default=0.25, help="Kechikish regressiyasi chegarasi (0.25 = +25%%)")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        sizes = self._split(options["sizes"], SIZES, "o‘lcham")
+        scenarios = self._split(options["scenarios"], SCENARIOS, "ssenariy")
+        try:
+            levels = sorted({max(1, int(c)) for c in options["concurrency"].split(",") if c.strip()})
+        except ValueError:
+            raise CommandError("--concurrency butun sonlar bo‘lishi kerak")
+
+        overrides = {
+            "HEMIS_FAKE": True,
+            "HEMIS_RATE_LIMIT": options["rate_limit"],
+            "CACHES": BENCHMARK_CACHES,
+            # Sintetik jadvallar kontingent tarixiga yozilmasin
+            "HEMIS_SNAPSHOTS_ENABLED": False,
+        }
+        if options["mode"]:
+            overrides["HEMIS_FACULTY_TABLE_MODE"] = options["mode"]
+
+        results = []
+        with override_settings(**overrides):
+            try:
+                for size in sizes:
+                    fake = build_fake_hemis({
+                        **SIZES[size],
+                        "latency_ms": options["latency_ms"],
+                        "jitter_ms": options["jitter_ms"],
+                        "error_rate": options["error_rate"],
+                        "page_size_cap": options["page_size_cap"],
+                    })
+                    install_fake_hemis(fake)
+                    for scenario in scenarios:
+                        for level in levels:
+                            result = self._run(fake, size, scenario, level, options)
+                            results.append(result)
+                            self._print(result)
+            finally:
+                install_fake_hemis(None)
+                rate_limiter._limiter = None
+
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "options": {k: options[k] for k in (
+                "latency_ms", "jitter_ms", "error_rate", "page_size_cap", "rate_limit", "mode", "warm_runs"
+            )},
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Saved: {options['output']}")
+
+        if options["baseline"]:
+            regressions = self._compare(report, options["baseline"], options["threshold"])
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} ta regressiya")
+
+    def _split(self, value: str, known: dict, label: str) -> list[str]:
+        names = [v.strip() for v in value.split(",") if v.strip()]
+        unknown = [n for n in names if n not in known]
+        if unknown:
+            raise CommandError(f"Noma'lum {label}: {', '.join(unknown)}")
+        return names
+
+    # -----------------------
+    # MEASURE
+    # -----------------------
+    def _measure(self, fake, scenario: str, concurrency: int) -> dict:
+        func = SCENARIOS[scenario]
+        fake.reset_stats()
+        calls_before = HemisClient.request_count
+        barrier = threading.Barrier(concurrency)
+
+        def call():
+            barrier.wait()
+            started = time.perf_counter()
+            func(fake)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(lambda _: call(), range(concurrency)))
+        wall = time.perf_counter() - started
+
+        stats = fake.stats()
+        return {
+            "wall_s": round(wall, 4),
+            "p50_s": round(statistics.median(latencies), 4),
+            "max_s": round(max(latencies), 4),
+            # async client HemisClient.request_count ga kirmaydi - soxta server sanog‘i asosiy
+            "hemis_calls": stats["total"],
+            "client_calls": HemisClient.request_count - calls_before,
+            "by_endpoint": stats["calls"],
+            "throttled": stats["throttled"],
+        }
+
+    def _run(self, fake, size: str, scenario: str, concurrency: int, options) -> dict:
+        _reset_state()
+        cold = self._measure(fake, scenario, concurrency)
+
+        warm_runs = [self._measure(fake, scenario, concurrency) for _ in range(max(1, options["warm_runs"]))]
+        warm = warm_runs[0] if len(warm_runs) == 1 else {
+            **warm_runs[-1],
+            "wall_s": round(statistics.median(r["wall_s"] for r in warm_runs), 4),
+            "p50_s": round(statistics.median(r["p50_s"] for r in warm_runs), 4),
+            "max_s": round(max(r["max_s"] for r in warm_runs), 4),
+            "hemis_calls": max(r["hemis_calls"] for r in warm_runs),
+        }
+
+        peak_kb = None
+        if not options["no_memory"]:
+            # Alohida sovuq o‘tish: tracemalloc kechikishni buzmasligi uchun
+            _reset_state()
+            tracemalloc.start()
+            try:
+                SCENARIOS[scenario](fake)
+                peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+            finally:
+                tracemalloc.stop()
+
+        return {
+            "size": size,
+            "scenario": scenario,
+            "concurrency": concurrency,
+            "cold": cold,
+            "warm": warm,
+            "peak_memory_kb": peak_kb,
+        }
+
+    def _print(self, r: dict):
+        mem = f"{r['peak_memory_kb']} KB" if r["peak_memory_kb"] is not None else "-"
+        self.stdout.write(
+            f"{r['size']:>6} {r['scenario']:<20} x{r['concurrency']:<3} "
+            f"cold {r['cold']['wall_s']:.3f}s ({r['cold']['hemis_calls']} calls, {r['cold']['throttled']} 429) | "
+            f"warm {r['warm']['wall_s']:.3f}s ({r['warm']['hemis_calls']} calls) | peak {mem}"
+        )
+
+    # -----------------------
+    # COMPARE
+    # -----------------------
+    def _compare(self, report: dict, baseline_path: str, threshold: float) -> list[str]:
+        try:
+            with open(baseline_path, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Baseline o‘qilmadi: {e}")
+
+        def key(r):
+            return r["size"], r["scenario"], r["concurrency"]
+
+        base = {key(r): r for r in baseline.get("results", [])}
+        regressions = []
+        for r in report["results"]:
+            old = base.get(key(r))
+            if old is None:
+                continue
+            label = "/".join(str(k) for k in key(r))
+            for phase in ("cold", "warm"):
+                # So‘rovlar soni deterministik - har qanday o‘sish regressiya
+                if r[phase]["hemis_calls"] > old[phase]["hemis_calls"]:
+                    regressions.append(
+                        f"{label} {phase} calls {old[phase]['hemis_calls']} -> {r[phase]['hemis_calls']}"
+                    )
+                old_wall, new_wall = old[phase]["wall_s"], r[phase]["wall_s"]
+                # Juda kichik qiymatlarda shovqin ko‘p - 10ms dan kichik farq e'tiborsiz
+                if new_wall > old_wall * (1 + threshold) and new_wall - old_wall > 0.01:
+                    regressions.append(f"{label} {phase} wall {old_wall:.3f}s -> {new_wall:.3f}s")
+            old_mem, new_mem = old.get("peak_memory_kb"), r.get("peak_memory_kb")
+            if old_mem and new_mem and new_mem > old_mem * (1 + threshold):
+                regressions.append(f"{label} peak memory {old_mem} KB -> {new_mem} KB")
+
+        if regressions:
+            self.stdout.write(self.style.ERROR(f"Regressions vs {baseline_path}:"))
+            for line in regressions:
+                self.stdout.write(f"  {line}")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"No regressions vs {baseline_path}"))
+        return regressions
@@ -0,0 +1,69 @@
+# backend/monitoring/management/commands/sync_attendance_facts.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from hemis_client.services.hemis_api import HemisClient
+from monitoring.attendance_services import get_attendance_filter_options
+from monitoring.warehouse import sync_faculty_attendance
+
+
+class Command(BaseCommand):
+    help = (
+        "Fakultet guruhlari davomatini HEMIS dan olib AttendanceFact omboriga yozadi "
+        "(faqat yangi/o‘zgargan qatorlar). Cron yoki --loop bilan kuniga bir necha marta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--faculty",
+            type=int,
+            action="append",
+            dest="faculties",
+            help="Faqat shu fakultet(lar)",
+        )
+        parser.add_argument("--semester", type=int, help="HEMIS semestr bermasa yoziladigan semestr kodi")
+        parser.add_argument("--force-refresh", action="store_true", help="Fakultet katalogini qayta olish")
+        parser.add_argument("--loop", action="store_true", help="To‘xtovsiz rejim (scheduler)")
+        parser.add_argument("--interval", type=int, default=6 * 3600, help="Sikllar orasidagi vaqt, sekund")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            self._run_cycle(options)
+            if not options["loop"]:
+                break
+            time.sleep(max(0, options["interval"] - (time.monotonic() - started)))
+
+    def _run_cycle(self, options):
+        cycle_started = time.monotonic()
+        cycle_calls = HemisClient.request_count
+
+        faculties = get_attendance_filter_options().get("faculties", [])
+        if options["faculties"]:
+            names = {f["id"]: f["name"] for f in faculties}
+            faculties = [{"id": fid, "name": names.get(fid, "")} for fid in options["faculties"]]
+
+        for fac in faculties:
+            calls_before = HemisClient.request_count
+            try:
+                stats = sync_faculty_attendance(
+                    fac["id"],
+                    faculty_name=fac["name"],
+                    semester=options["semester"],
+                    force_refresh=options["force_refresh"],
+                )
+            except Exception as e:
+                self.stderr.write(f"attendance_sync[{fac['id']}]: FAILED - {e}")
+                continue
+            self.stdout.write(
+                f"attendance_sync[{fac['id']}]: {stats['duration']:.2f}s, "
+                f"HEMIS calls: {HemisClient.request_count - calls_before}, "
+                f"groups: {stats['groups']} (failed {stats['failed']}), "
+                f"+{stats['inserted']} ~{stats['updated']} ={stats['unchanged']} -{stats['closed']}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"cycle: {time.monotonic() - cycle_started:.2f}s, "
+            f"HEMIS calls: {HemisClient.request_count - cycle_calls}"
+        ))
@@ -0,0 +1,117 @@
+# backend/monitoring/management/commands/warm_hemis_cache.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hemis_client.services.hemis_api import HemisClient
+from monitoring.attendance_services import get_attendance_filter_options, get_attendance_stat
+from monitoring.employee_services import get_employee_dataset_entry
+from monitoring.rollup import refresh_university_rollup
+from monitoring.services import get_dashboard_summary_entry, refresh_faculty_table, refresh_student_dataset
+
+JOBS = [
+    "faculty_table", "summary", "student_dataset", "employee_dataset",
+    "attendance_options", "attendance_stat", "attendance_rollup",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "HEMIS agregatlarini oldindan hisoblab umumiy keshga yozadi "
+        "(fakultet jadvali, dashboard summary, talabalar skani, xodimlar ro‘yxati, davomat filtrlari, "
+        "fakultet davomati, universitet davomati). "
+        "--loop bilan har --interval sekundda qayta ishlaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="To‘xtovsiz rejim (scheduler)")
+        parser.add_argument("--interval", type=int, default=900, help="Sikllar orasidagi vaqt, sekund")
+        parser.add_argument(
+            "--jobs",
+            default=",".join(JOBS),
+            help=f"Vergul bilan: {', '.join(JOBS)}",
+        )
+        parser.add_argument(
+            "--faculty",
+            type=int,
+            action="append",
+            dest="faculties",
+            help="Davomat ishlarini shu fakultet(lar) bilan cheklash",
+        )
+
+    def handle(self, *args, **options):
+        jobs = [j.strip() for j in options["jobs"].split(",") if j.strip()]
+        unknown = [j for j in jobs if j not in JOBS]
+        if unknown:
+            raise CommandError(f"Noma'lum job: {', '.join(unknown)}")
+
+        while True:
+            started = time.monotonic()
+            self._run_cycle(jobs, options["faculties"])
+            if not options["loop"]:
+                break
+            elapsed = time.monotonic() - started
+            time.sleep(max(0, options["interval"] - elapsed))
+
+    def _run_cycle(self, jobs: list[str], faculty_ids: list[int] | None):
+        cycle_started = time.monotonic()
+        cycle_calls = HemisClient.request_count
+
+        if "faculty_table" in jobs:
+            self._run_job("faculty_table", refresh_faculty_table)
+        if "summary" in jobs:
+            self._run_job("summary", get_dashboard_summary_entry)
+        # scan rejimida jadval qurilishi skanni ham keshga yozadi - ikkinchi skan shart emas
+        scanned = "faculty_table" in jobs and settings.HEMIS_FACULTY_TABLE_MODE == "scan"
+        if "student_dataset" in jobs and not scanned:
+            self._run_job("student_dataset", refresh_student_dataset)
+        if "employee_dataset" in jobs:
+            # bo‘limlar daraxti yig‘indilari (department-tree/?counts=1) shu ro‘yxatdan
+            self._run_job(
+                "employee_dataset", lambda: get_employee_dataset_entry(employee_type="all", force_refresh=True)
+            )
+
+        options = None
+        if "attendance_options" in jobs:
+            options = self._run_job(
+                "attendance_options", lambda: get_attendance_filter_options(force_refresh=True)
+            )
+        elif "attendance_stat" in jobs and not faculty_ids:
+            options = get_attendance_filter_options()
+
+        ids = faculty_ids or [f["id"] for f in (options or {}).get("faculties", [])]
+        for fid in ids:
+            if "attendance_options" in jobs:
+                self._run_job(
+                    f"attendance_options[{fid}]",
+                    lambda: get_attendance_filter_options(faculty_id=fid, force_refresh=True),
+                )
+            if "attendance_stat" in jobs:
+                self._run_job(
+                    f"attendance_stat[{fid}]",
+                    lambda: get_attendance_stat(faculty_id=fid, force_refresh=True),
+                )
+
+        if "attendance_rollup" in jobs:
+            # guruhlar yuqoridagi attendance_stat dan keshda - asosan get_many
+            self._run_job("attendance_rollup", refresh_university_rollup)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"cycle: {time.monotonic() - cycle_started:.2f}s, "
+            f"HEMIS calls: {HemisClient.request_count - cycle_calls}"
+        ))
+
+    def _run_job(self, name: str, func):
+        started = time.monotonic()
+        calls_before = HemisClient.request_count
+        try:
+            result = func()
+        except Exception as e:
+            self.stderr.write(f"{name}: FAILED after {time.monotonic() - started:.2f}s - {e}")
+            return None
+        self.stdout.write(
+            f"{name}: {time.monotonic() - started:.2f}s, "
+            f"HEMIS calls: {HemisClient.request_count - calls_before}"
+        )
+        return result
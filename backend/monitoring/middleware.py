@@ -0,0 +1,94 @@
+# backend/monitoring/middleware.py
+# Opt-in HEMIS trace: "X-Hemis-Trace: 1" header (HEMIS_TRACE_HEADER_ENABLED) yoki
+# HEMIS_TRACE_SAMPLE_RATE ulushidagi so‘rovlar uchun. Javobga X-Hemis-Trace-Id va
+# Server-Timing qo‘shiladi; to‘liq trace keshda saqlanadi (/api/monitoring/traces/<id>/).
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+from hemis_client.services.tracing import RequestTrace, activate, deactivate
+
+from .cache import hemis_cache
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = "HTTP_X_HEMIS_TRACE"
+TRACE_RECENT_KEY = "hemis_trace_recent_v1"
+
+
+def _trace_key(trace_id: str) -> str:
+    return f"hemis_trace_v1:{trace_id}"
+
+
+def _should_trace(request) -> bool:
+    if settings.HEMIS_TRACE_HEADER_ENABLED and request.META.get(TRACE_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    rate = settings.HEMIS_TRACE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def get_trace(trace_id: str) -> dict | None:
+    return hemis_cache.get(_trace_key(trace_id))
+
+
+def recent_traces() -> list[dict]:
+    return hemis_cache.get(TRACE_RECENT_KEY) or []
+
+
+def store_trace(trace: RequestTrace) -> None:
+    data = trace.to_dict()
+    ttl = settings.HEMIS_TRACE_TTL
+    hemis_cache.set(_trace_key(trace.id), data, timeout=ttl)
+    # So‘nggi trace'lar ro‘yxati (best-effort: parallel yozuvlarda bittasi tushib qolishi mumkin)
+    recent = [trace.summary()] + [t for t in recent_traces() if t["id"] != trace.id]
+    hemis_cache.set(TRACE_RECENT_KEY, recent[:settings.HEMIS_TRACE_RECENT], timeout=ttl)
+
+
+def _server_timing(summary: dict) -> str:
+    return ", ".join([
+        f'hemis;dur={summary["hemis_ms"]};desc="{summary["hemis_calls"]} HEMIS calls (sum), {summary["retries"]} retries"',
+        f'cache;dur={summary["cache_ms"]};desc="{summary["cache_lookups"]} cache lookups"',
+        f'total;dur={summary["duration_ms"]}',
+    ])
+
+
+def _finish(trace: RequestTrace, response):
+    trace.finish(getattr(response, "status_code", None))
+    try:
+        store_trace(trace)
+    except Exception as e:
+        logger.warning("Trace store failed (%s): %s", trace.id, e)
+    response["X-Hemis-Trace-Id"] = trace.id
+    response["Server-Timing"] = _server_timing(trace.summary())
+    return response
+
+
+@sync_and_async_middleware
+def hemis_trace_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not _should_trace(request):
+                return await get_response(request)
+            trace = RequestTrace(method=request.method, path=request.get_full_path(),
+                                 max_events=settings.HEMIS_TRACE_MAX_EVENTS)
+            token = activate(trace)
+            try:
+                response = await get_response(request)
+            finally:
+                deactivate(token)
+            return await sync_to_async(_finish, thread_sensitive=False)(trace, response)
+    else:
+        def middleware(request):
+            if not _should_trace(request):
+                return get_response(request)
+            trace = RequestTrace(method=request.method, path=request.get_full_path(),
+                                 max_events=settings.HEMIS_TRACE_MAX_EVENTS)
+            token = activate(trace)
+            try:
+                response = get_response(request)
+            finally:
+                deactivate(token)
+            return _finish(trace, response)
+    return middleware
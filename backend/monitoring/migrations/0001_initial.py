@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContingentSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(db_index=True)),
+                ('built_at', models.DateTimeField(unique=True)),
+                ('mode', models.CharField(default='count', max_length=16)),
+                ('grand_total', models.PositiveIntegerField(default=0)),
+                ('faculties', models.JSONField(default=dict)),
+                ('forms', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-taken_at'],
+                'get_latest_by': 'taken_at',
+            },
+        ),
+        migrations.CreateModel(
+            name='ContingentCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('faculty_id', models.IntegerField()),
+                ('form_id', models.CharField(max_length=16)),
+                ('count', models.PositiveIntegerField()),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cells', to='monitoring.contingentsnapshot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['faculty_id', 'snapshot'], name='contingent_cell_faculty_idx'), models.Index(fields=['form_id', 'snapshot'], name='contingent_cell_form_idx')],
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'faculty_id', 'form_id'), name='uniq_contingent_cell')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('faculty_id', models.IntegerField()),
+                ('faculty_name', models.CharField(blank=True, max_length=255)),
+                ('group_id', models.IntegerField()),
+                ('group_name', models.CharField(max_length=128)),
+                ('curriculum_id', models.IntegerField(null=True)),
+                ('specialty', models.CharField(blank=True, max_length=255)),
+                ('education_form', models.CharField(blank=True, max_length=64)),
+                ('semester', models.IntegerField(null=True)),
+                ('student_key', models.CharField(max_length=64)),
+                ('student_name', models.CharField(max_length=255)),
+                ('subjects', models.PositiveIntegerField(default=0)),
+                ('lessons', models.PositiveIntegerField(default=0)),
+                ('absent_on', models.PositiveIntegerField(default=0)),
+                ('absent_off', models.PositiveIntegerField(default=0)),
+                ('total_absent', models.PositiveIntegerField(default=0)),
+                ('percent', models.FloatField(default=0)),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('is_current', models.BooleanField(default=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_current', True)), fields=['faculty_id', 'group_id'], name='att_fact_cur_faculty_idx'), models.Index(condition=models.Q(('is_current', True)), fields=['group_id', 'student_key'], name='att_fact_cur_group_idx'), models.Index(fields=['faculty_id', 'period_start', 'period_end'], name='att_fact_period_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0002_attendance_fact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceGroupSync',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group_id', models.IntegerField(unique=True)),
+                ('faculty_id', models.IntegerField()),
+                ('last_seen', models.DateField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['faculty_id', 'last_seen'], name='att_group_sync_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,107 @@
 from django.db import models
 
-# Create your models here.
+
+class ContingentSnapshot(models.Model):
+    """
+    Fakultet x ta'lim shakli jadvalining sanali nusxasi. Nomlar bir marta (JSON),
+    sonlar ContingentCell qatorlarida - faqat noldan katta kataklar saqlanadi.
+    """
+
+    taken_at = models.DateTimeField(db_index=True)
+    # Jadval HEMIS dan hisoblangan vaqt (kesh yozuvining built_at) - bir yozuv ikki marta saqlanmaydi
+    built_at = models.DateTimeField(unique=True)
+    mode = models.CharField(max_length=16, default="count")
+    grand_total = models.PositiveIntegerField(default=0)
+    # {"<faculty_id>": "Fakultet nomi"}, {"<form_id>": "Kunduzgi", "other": "Boshqa"}
+    faculties = models.JSONField(default=dict)
+    forms = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["-taken_at"]
+        get_latest_by = "taken_at"
+
+    def __str__(self):
+        return f"{self.taken_at:%Y-%m-%d %H:%M} ({self.grand_total})"
+
+
+class ContingentCell(models.Model):
+    snapshot = models.ForeignKey(ContingentSnapshot, on_delete=models.CASCADE, related_name="cells")
+    faculty_id = models.IntegerField()
+    # Ta'lim shakli id si yoki "other"
+    form_id = models.CharField(max_length=16)
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["snapshot", "faculty_id", "form_id"], name="uniq_contingent_cell"),
+        ]
+        indexes = [
+            models.Index(fields=["faculty_id", "snapshot"], name="contingent_cell_faculty_idx"),
+            models.Index(fields=["form_id", "snapshot"], name="contingent_cell_form_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.faculty_id}/{self.form_id}: {self.count}"
+
+
+class AttendanceFact(models.Model):
+    """
+    Talaba x guruh davomati, amal qilish oralig‘i bilan (period_start..period_end).
+    Sinxronlashda qiymatlar o‘zgarmasa qator yozilmaydi; o‘zgarsa eski qator yopiladi
+    (is_current=False, period_end yoziladi) va yangisi qo‘shiladi. Joriy qatorning amal
+    qilish oxiri - guruhning AttendanceGroupSync.last_seen sanasi.
+    """
+
+    faculty_id = models.IntegerField()
+    faculty_name = models.CharField(max_length=255, blank=True)
+    group_id = models.IntegerField()
+    group_name = models.CharField(max_length=128)
+    curriculum_id = models.IntegerField(null=True)
+    specialty = models.CharField(max_length=255, blank=True)
+    education_form = models.CharField(max_length=64, blank=True)
+    semester = models.IntegerField(null=True)
+    # HEMIS student.id; bo‘lmasa F.I.O. xeshi
+    student_key = models.CharField(max_length=64)
+    student_name = models.CharField(max_length=255)
+
+    subjects = models.PositiveIntegerField(default=0)
+    lessons = models.PositiveIntegerField(default=0)
+    absent_on = models.PositiveIntegerField(default=0)
+    absent_off = models.PositiveIntegerField(default=0)
+    total_absent = models.PositiveIntegerField(default=0)
+    percent = models.FloatField(default=0)
+
+    period_start = models.DateField()
+    period_end = models.DateField()
+    is_current = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # Hisobotlar faqat joriy qatorlar ustida - qisman indekslar kichik
+            models.Index(
+                fields=["faculty_id", "group_id"], name="att_fact_cur_faculty_idx",
+                condition=models.Q(is_current=True),
+            ),
+            models.Index(
+                fields=["group_id", "student_key"], name="att_fact_cur_group_idx",
+                condition=models.Q(is_current=True),
+            ),
+            models.Index(fields=["faculty_id", "period_start", "period_end"], name="att_fact_period_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.group_name} / {self.student_name}: {self.total_absent}"
+
+
+class AttendanceGroupSync(models.Model):
+    """Guruh oxirgi marta muvaffaqiyatli sinxronlangan kun (joriy faktlar shu kungacha amal qiladi)."""
+
+    group_id = models.IntegerField(unique=True)
+    faculty_id = models.IntegerField()
+    last_seen = models.DateField()
+
+    class Meta:
+        indexes = [models.Index(fields=["faculty_id", "last_seen"], name="att_group_sync_idx")]
+
+    def __str__(self):
+        return f"{self.group_id}: {self.last_seen}"
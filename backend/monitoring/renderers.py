@@ -0,0 +1,89 @@
+# backend/monitoring/renderers.py
+# Tez JSON: orjson o‘rnatilgan bo‘lsa u bilan (ixtiyoriy bog‘liqlik), aks holda DRF
+# encoder'i bilan ixcham json.dumps. Keshdagi agregatlar yozuvda oldindan kodlangan
+# holda ("json" bayt) saqlanadi - iliq so‘rov dict yig‘masdan va qayta kodlamasdan javob beradi.
+# To‘liq javob tanasi, uning ETag i va gzip/brotli variantlari ham shu yerda bir marta tayyorlanadi.
+import gzip
+import hashlib
+import json
+
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ixtiyoriy
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli ixtiyoriy, bo‘lmasa faqat gzip
+    brotli = None
+
+_DRF_ENCODER = encoders.JSONEncoder()
+
+if orjson is not None:
+    # datetime DRF bilan bir xil ("Z" suffiks), int kalitlar (by_form) satrga aylanadi
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class RawJSON(bytes):
+    """Tayyor JSON tanasi: FastJSONRenderer uni o‘zgartirmasdan yuboradi."""
+
+
+# DRF JSONRenderer kabi: U+2028 / U+2029 JavaScript satrida qator tugashi - escape qilinadi
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def encode_json(data) -> bytes:
+    if orjson is not None:
+        encoded = orjson.dumps(data, default=_DRF_ENCODER.default, option=ORJSON_OPTIONS)
+    else:
+        encoded = json.dumps(data, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode()
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in encoded:
+            encoded = encoded.replace(raw, escaped)
+    return encoded
+
+
+def entry_json(entry: dict) -> bytes:
+    """Kesh yozuvi qiymatining JSON i: oldindan kodlangan bo‘lsa - o‘sha."""
+    encoded = entry.get("json")
+    return encoded if encoded is not None else encode_json(entry["value"])
+
+
+def entry_body(entry: dict, meta: dict) -> RawJSON:
+    """{**value, "meta": meta} - qiymat qayta kodlanmaydi, meta obyekt oxiriga qo‘shiladi."""
+    value = entry_json(entry)
+    sep = b"," if value != b"{}" else b""
+    return RawJSON(value[:-1] + sep + b'"meta":' + encode_json(meta) + b"}")
+
+
+def encode_entry(entry: dict, meta: dict) -> None:
+    """
+    Yozuvga: "json" (qiymat), "body" (qiymat + meta - tayyor javob), "etag" (body xeshi),
+    "gzip" va brotli o‘rnatilgan bo‘lsa "br". Keshga yozishdan oldin bir marta chaqiriladi.
+    """
+    entry["json"] = encode_json(entry["value"])
+    body = bytes(entry_body(entry, meta))
+    entry["body"] = body
+    entry["etag"] = hashlib.blake2b(body, digest_size=12).hexdigest()
+    entry["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+    if brotli is not None:
+        entry["br"] = brotli.compress(body, quality=11)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    DRF JSONRenderer o‘rniga: RawJSON - to‘g‘ridan-to‘g‘ri, qolgani orjson bilan.
+    indent so‘ralsa (browsable API) - odatdagi DRF renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, RawJSON):
+            return bytes(data)
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return encode_json(data)
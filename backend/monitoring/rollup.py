@@ -0,0 +1,206 @@
+# backend/monitoring/rollup.py
+# Universitet bo‘yicha davomat yig‘indisi: barcha fakultetlarning guruhlari bitta
+# navbatga qo‘yiladi (HEMIS_ROLLUP_WORKERS parallel, umumiy rate limiter orqali) -
+# har fakultet uchun alohida 20 thread'li fan-out ketma-ket ishlamaydi. Natija fonda
+# quriladi; jarayon holati (progress) keshda, so‘rov 202 + progress oladi.
+import logging
+import time
+from array import array
+
+from django.conf import settings
+from hemis_client.services.hemis_api import HemisClient
+from hemis_client.services.metrics import phase
+
+from .aggregation import percentiles, rank_desc
+from .attendance_services import _iter_group_rows, get_attendance_filter_options
+from .cache import build_in_background, entry_meta, hemis_cache
+from .catalog import get_faculty_catalog
+from .columnar import AttendanceColumns
+from .renderers import encode_entry
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 1.0
+
+
+def _rollup_key(semester_id: int | None) -> str:
+    return f"attendance_rollup_v2:{semester_id or 0}"
+
+
+def _progress_key(semester_id: int | None) -> str:
+    return f"{_rollup_key(semester_id)}:progress"
+
+
+def get_rollup_progress(semester_id: int | None = None) -> dict | None:
+    return hemis_cache.get(_progress_key(semester_id))
+
+
+def _set_progress(semester_id: int | None, progress: dict) -> None:
+    progress["updated_at"] = time.time()
+    hemis_cache.set(_progress_key(semester_id), progress, timeout=settings.HEMIS_ATTENDANCE_ROLLUP_TTL)
+
+
+def get_university_rollup(*, semester_id: int | None = None, force_refresh: bool = False) -> tuple[dict | None, dict | None]:
+    """
+    (kesh yozuvi yoki None, progress). Yozuv yo‘q yoki force_refresh - fonda qurish
+    boshlanadi (ikkinchi marta boshlanmaydi). Eskirgan yozuv berilib, fonda yangilanadi.
+    """
+    key = _rollup_key(semester_id)
+    entry = None if force_refresh else hemis_cache.get(key)
+    if entry is not None and time.time() - entry["built_at"] < settings.HEMIS_ATTENDANCE_ROLLUP_TTL:
+        return entry, None
+
+    started = build_in_background(
+        key,
+        lambda: build_university_rollup(semester_id=semester_id),
+        ttl=settings.HEMIS_ATTENDANCE_ROLLUP_TTL,
+        stale_ttl=settings.HEMIS_ATTENDANCE_ROLLUP_STALE_TTL,
+        encode=True,
+    )
+    if started:
+        _set_progress(semester_id, {"status": "queued", "started_at": time.time()})
+    return entry, get_rollup_progress(semester_id)
+
+
+def refresh_university_rollup(*, semester_id: int | None = None) -> dict:
+    """Sinxron qayta qurish (warm_hemis_cache uchun): {"value", "built_at"}."""
+    entry = {"value": build_university_rollup(semester_id=semester_id), "built_at": time.time()}
+    encode_entry(entry, entry_meta(entry))
+    hemis_cache.set(
+        _rollup_key(semester_id), entry,
+        timeout=settings.HEMIS_ATTENDANCE_ROLLUP_TTL + settings.HEMIS_ATTENDANCE_ROLLUP_STALE_TTL,
+    )
+    return entry
+
+
+# -----------------------
+# BUILD
+# -----------------------
+class _Totals:
+    __slots__ = ("groups", "absent_students", "absent_on", "absent_off", "total_absent", "lessons", "percent_sum",
+                 "percents")
+
+    def __init__(self):
+        self.groups = 0
+        self.absent_students = 0
+        self.absent_on = 0
+        self.absent_off = 0
+        self.total_absent = 0
+        self.lessons = 0
+        self.percent_sum = 0.0
+        # qatorlar foizlari - persentillar uchun (ixcham 'd' massiv)
+        self.percents = array("d")
+
+    def add_group(self, columns: AttendanceColumns) -> None:
+        # ustun yig‘indilari - har qator uchun dict yasalmaydi
+        self.groups += 1
+        self.absent_students += len(columns)
+        self.absent_on += columns.sum("absent_on")
+        self.absent_off += columns.sum("absent_off")
+        self.total_absent += columns.sum("total_absent")
+        self.lessons += columns.sum("lessons")
+        self.percent_sum += columns.sum("total_percent")
+        self.percents.extend(columns.total_percent)
+
+    def to_dict(self, **extra) -> dict:
+        return {
+            **extra,
+            "groups": self.groups,
+            "absent_students": self.absent_students,
+            "absent_on": self.absent_on,
+            "absent_off": self.absent_off,
+            "total_absent": self.total_absent,
+            "lessons": self.lessons,
+            # qoldirgan talabalar darslarining necha foizi qoldirilgan
+            "absent_percent": round(self.total_absent * 100 / self.lessons, 2) if self.lessons else 0.0,
+            "avg_percent": round(self.percent_sum / self.absent_students, 2) if self.absent_students else 0.0,
+            "percent_percentiles": percentiles(self.percents),
+        }
+
+
+def _ranked_by_absent(items) -> list[dict]:
+    """total_absent bo‘yicha kamayish tartibida, "rank" bilan (tenglar - bir xil o‘rin)."""
+    rows = list(items)
+    for row, rank in zip(rows, rank_desc([r["total_absent"] for r in rows])):
+        row["rank"] = rank
+    rows.sort(key=lambda x: x["rank"])
+    return rows
+
+
+def build_university_rollup(*, semester_id: int | None = None) -> dict:
+    progress = {"status": "catalog", "started_at": time.time(), "faculties_total": 0, "faculties_done": 0,
+                "groups_total": 0, "groups_done": 0}
+    try:
+        return _build(semester_id, progress)
+    except Exception as e:
+        _set_progress(semester_id, {**progress, "status": "failed", "error": str(e)})
+        raise
+
+
+def _build(semester_id: int | None, progress: dict) -> dict:
+    faculties = get_attendance_filter_options()["faculties"]
+    progress["faculties_total"] = len(faculties)
+    _set_progress(semester_id, progress)
+
+    # Bitta client - shu build yuborgan so‘rovlar sanog‘i (parallel so‘rovlarnikisiz)
+    client = HemisClient()
+
+    # 1. Kataloglar (keshda) - barcha guruhlar bitta ro‘yxatga
+    groups: list[dict] = []
+    c_map: dict = {}
+    group_faculty: dict[int, dict] = {}
+    with phase("rollup_catalog"):
+        for fac in faculties:
+            catalog = get_faculty_catalog(fac["id"], client=client)
+            fac_groups = catalog.select_groups()
+            groups.extend(fac_groups)
+            # o‘quv reja id lari universitet bo‘yicha yagona - xaritalarni birlashtirsa bo‘ladi
+            c_map.update(catalog.curriculum_map())
+            for g in fac_groups:
+                group_faculty[g["id"]] = fac
+            progress["faculties_done"] += 1
+    progress.update(status="groups", groups_total=len(groups))
+    _set_progress(semester_id, progress)
+
+    # 2. Bitta navbat: keshdagilar get_many bilan, qolganlari HEMIS_ROLLUP_WORKERS parallel
+    by_faculty: dict[int, _Totals] = {}
+    by_form: dict[str, _Totals] = {}
+    by_specialty: dict[tuple, _Totals] = {}
+    total = _Totals()
+    last_report = time.monotonic()
+    with phase("rollup_groups"):
+        for grp, columns in _iter_group_rows(client, groups, c_map, semester_id,
+                                             max_workers=settings.HEMIS_ROLLUP_WORKERS):
+            fac = group_faculty[grp["id"]]
+            meta = c_map.get(grp.get("_curriculum"), {})
+            form = meta.get("form") or ""
+            by_faculty.setdefault(fac["id"], _Totals()).add_group(columns)
+            by_form.setdefault(form, _Totals()).add_group(columns)
+            by_specialty.setdefault((fac["id"], meta.get("specialty") or "", form), _Totals()).add_group(columns)
+            total.add_group(columns)
+
+            progress["groups_done"] += 1
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                _set_progress(semester_id, progress)
+
+    failed = len(groups) - progress["groups_done"]
+    progress.update(status="done", groups_failed=failed, hemis_calls=client.calls)
+    _set_progress(semester_id, progress)
+    if failed:
+        logger.warning("Attendance rollup: %s of %s groups failed", failed, len(groups))
+
+    fac_names = {f["id"]: f["name"] for f in faculties}
+    return {
+        "semester_id": semester_id,
+        "totals": total.to_dict(),
+        "faculties": _ranked_by_absent(
+            t.to_dict(faculty_id=fid, faculty=fac_names.get(fid, "")) for fid, t in by_faculty.items()
+        ),
+        "forms": _ranked_by_absent(t.to_dict(education_form=form) for form, t in by_form.items()),
+        "specialties": _ranked_by_absent(
+            t.to_dict(faculty_id=fid, faculty=fac_names.get(fid, ""), specialty=spec, education_form=form)
+            for (fid, spec, form), t in by_specialty.items()
+        ),
+        "groups": {"total": len(groups), "loaded": progress["groups_done"], "failed": failed},
+    }
@@ -0,0 +1,231 @@
+# backend/monitoring/search_index.py
+# Keshdagi ro‘yxatlar (xodimlar, davomat qatorlari) ustida jarayon ichidagi
+# inverted index: F.I.O. bo‘yicha qidiruv HEMIS'ga so‘rovsiz, millisekundlarda.
+import bisect
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+from django.conf import settings
+
+# Kirill -> lotin (o‘zbek imlosi); ш/ч -> sh/ch lotin yozuvi bilan bir xil token beradi
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo", "ж": "j",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "x", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "", "ы": "i", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya", "ў": "o", "қ": "q", "ғ": "g", "ҳ": "h",
+}
+# o‘/o'/oʻ/o` va g‘ ... - tutuq belgisining barcha variantlari olib tashlanadi
+_APOSTROPHES = "'‘’ʻʼ`´"
+_TRANSLATE = str.maketrans({**_CYRILLIC_TO_LATIN, **{ch: "" for ch in _APOSTROPHES}})
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+# е so‘z boshida va unlidan keyin "ye" o‘qiladi (Евгений, Чориев -> yevgeniy, choriyev)
+_CYRILLIC_YE_RE = re.compile(r"(?<![бвгджзйклмнпрстфхцчшщқғҳ])е")
+
+# Qisman mos (trigram) token uchun minimal umumiy trigramlar ulushi
+TRIGRAM_THRESHOLD = 0.6
+SCORE_EXACT = 3.0
+SCORE_PREFIX = 2.0
+
+
+def normalize_text(value: Any) -> str:
+    text = str(value or "").lower()
+    if "е" in text:
+        text = _CYRILLIC_YE_RE.sub("ye", text)
+    return text.translate(_TRANSLATE)
+
+
+def tokenize(value: Any) -> list[str]:
+    return _TOKEN_RE.findall(normalize_text(value))
+
+
+def _trigrams(token: str) -> set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class SearchIndex:
+    """
+    Inverted index: token -> hujjat kalitlari, trigram -> tokenlar.
+    update() yangi to‘liq ro‘yxatni oladi, lekin faqat matni o‘zgargan/yangi/o‘chgan
+    hujjatlarni qayta indekslaydi (refresh'dan keyin inkremental qayta qurish).
+    So‘rovdagi har bir token mos kelishi kerak (AND): aniq, prefiks yoki trigram.
+    """
+
+    def __init__(self, *, key: Callable[[Any], Hashable], text: Callable[[Any], str]):
+        self._key = key
+        self._text = text
+        self._items: dict[Hashable, Any] = {}
+        self._texts: dict[Hashable, str] = {}
+        self._tokens: dict[Hashable, tuple[str, ...]] = {}
+        self._position: dict[Hashable, int] = {}
+        self._postings: dict[str, set[Hashable]] = {}
+        self._trigram_tokens: dict[str, set[str]] = {}
+        self._sorted_tokens: list[str] | None = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def update(self, items: Iterable[Any]) -> dict:
+        with self._lock:
+            stats = {"added": 0, "changed": 0, "removed": 0}
+            position: dict[Hashable, int] = {}
+            for item in items:
+                k = self._key(item)
+                if k in position:
+                    continue
+                position[k] = len(position)
+                self._items[k] = item
+                text = self._text(item)
+                if self._texts.get(k) == text:
+                    continue
+                self._texts[k] = text
+                tokens = tuple(dict.fromkeys(tokenize(text)))
+                old = self._tokens.get(k)
+                if old is None:
+                    stats["added"] += 1
+                    self._index(k, tokens)
+                elif old != tokens:
+                    stats["changed"] += 1
+                    self._unindex(k, old)
+                    self._index(k, tokens)
+
+            for k in [k for k in self._items if k not in position]:
+                self._unindex(k, self._tokens[k])
+                del self._items[k]
+                del self._texts[k]
+                stats["removed"] += 1
+
+            self._position = position
+            return stats
+
+    def _index(self, k: Hashable, tokens: tuple[str, ...]) -> None:
+        self._tokens[k] = tokens
+        for tok in tokens:
+            docs = self._postings.get(tok)
+            if docs is None:
+                self._postings[tok] = {k}
+                self._sorted_tokens = None
+                for tri in _trigrams(tok):
+                    self._trigram_tokens.setdefault(tri, set()).add(tok)
+            else:
+                docs.add(k)
+
+    def _unindex(self, k: Hashable, tokens: tuple[str, ...]) -> None:
+        del self._tokens[k]
+        for tok in tokens:
+            docs = self._postings.get(tok)
+            if docs is None:
+                continue
+            docs.discard(k)
+            if not docs:
+                del self._postings[tok]
+                self._sorted_tokens = None
+                for tri in _trigrams(tok):
+                    bucket = self._trigram_tokens.get(tri)
+                    if bucket is not None:
+                        bucket.discard(tok)
+                        if not bucket:
+                            del self._trigram_tokens[tri]
+
+    def _token_scores(self, qtok: str) -> dict[str, float]:
+        """So‘rov tokeni -> {indeksdagi token: ball}."""
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        vocab = self._sorted_tokens
+
+        scores: dict[str, float] = {}
+        i = bisect.bisect_left(vocab, qtok)
+        while i < len(vocab) and vocab[i].startswith(qtok):
+            scores[vocab[i]] = SCORE_EXACT if vocab[i] == qtok else SCORE_PREFIX
+            i += 1
+
+        qtris = _trigrams(qtok)
+        if qtris:
+            shared: dict[str, int] = {}
+            for tri in qtris:
+                for tok in self._trigram_tokens.get(tri, ()):
+                    shared[tok] = shared.get(tok, 0) + 1
+            for tok, n in shared.items():
+                similarity = n / len(qtris)
+                if similarity >= TRIGRAM_THRESHOLD and tok not in scores:
+                    scores[tok] = similarity
+        return scores
+
+    def search(self, query: str) -> dict[Hashable, float]:
+        """Barcha so‘rov tokenlariga mos hujjatlar: {kalit: ball}."""
+        qtokens = list(dict.fromkeys(tokenize(query)))
+        if not qtokens:
+            return {}
+        with self._lock:
+            result: dict[Hashable, float] | None = None
+            for qtok in qtokens:
+                doc_scores: dict[Hashable, float] = {}
+                for tok, score in self._token_scores(qtok).items():
+                    for k in self._postings[tok]:
+                        if score > doc_scores.get(k, 0.0):
+                            doc_scores[k] = score
+                if result is None:
+                    result = doc_scores
+                else:
+                    result = {k: s + doc_scores[k] for k, s in result.items() if k in doc_scores}
+                if not result:
+                    return {}
+            return result or {}
+
+    def ranked(self, query: str) -> list[Any]:
+        """Mos elementlar: ball bo‘yicha, teng bo‘lsa asl tartibda."""
+        scores = self.search(query)
+        with self._lock:
+            keys = sorted(scores, key=lambda k: (-scores[k], self._position.get(k, 0)))
+            return [self._items[k] for k in keys]
+
+    def filter(self, query: str) -> list[Any]:
+        """Mos elementlar oxirgi update() dagi tartibda (masalan, tartiblangan natija to‘plami)."""
+        scores = self.search(query)
+        with self._lock:
+            keys = sorted(scores, key=lambda k: self._position.get(k, 0))
+            return [self._items[k] for k in keys]
+
+
+class _Registered:
+    __slots__ = ("index", "version", "lock")
+
+    def __init__(self, index: SearchIndex):
+        self.index = index
+        self.version = None
+        self.lock = threading.Lock()
+
+
+_registry: "OrderedDict[str, _Registered]" = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def get_index(
+    name: str,
+    version: Any,
+    load_items: Callable[[], Iterable[Any]],
+    *,
+    key: Callable[[Any], Hashable],
+    text: Callable[[Any], str],
+) -> SearchIndex:
+    """
+    Nomlangan indeks (jarayon bo‘yicha, LRU). `version` - manba keshdagi yozuvning
+    built_at qiymati: o‘zgarsa indeks yangi ro‘yxat bilan inkremental yangilanadi.
+    """
+    with _registry_lock:
+        reg = _registry.get(name)
+        if reg is None:
+            reg = _registry[name] = _Registered(SearchIndex(key=key, text=text))
+        _registry.move_to_end(name)
+        while len(_registry) > settings.HEMIS_SEARCH_INDEX_MAX:
+            _registry.popitem(last=False)
+
+    if reg.version != version:
+        with reg.lock:
+            if reg.version != version:
+                reg.index.update(load_items())
+                reg.version = version
+    return reg.index
@@ -1,9 +1,17 @@
 # backend/monitoring/services.py
 import logging
 import time
+from array import array
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from django.core.cache import cache
-from hemis_client.services.hemis_api import HemisClient
+from django.conf import settings
+from hemis_client.services.hemis_api import HemisClient, extract_page_count
+from hemis_client.services.metrics import observe_phase, phase
+
+from .aggregation import cube, marginal, nonzero, percent, percentiles, rank_desc, remainder, unravel
+from .cache import build_in_background, derived_entry, get_or_build, hemis_cache, refresh
+from .columnar import STUDENT_DIMENSIONS, StudentColumns
+from .department_tree import get_department_tree
+from .snapshots import snapshot_table
 
 logger = logging.getLogger(__name__)
 
@@ -19,19 +27,81 @@ def fetch_count_with_retry(client, **kwargs) -> int:
             time.sleep(0.7 * (attempt + 1))
     return 0
 
+FACULTY_TABLE_CACHE_KEY = "faculty_table_data_optimized_v5"
+DASHBOARD_SUMMARY_CACHE_KEY = "dashboard_summary_v1"
+STUDENT_DATASET_CACHE_KEY = "student_dataset_v1"
+CONTINGENT_REPORT_CACHE_KEY = "contingent_report_v1"
+DEFAULT_REPORT_DIMS = ("faculty", "education_form")
+
+
+def get_faculty_table_entry() -> dict:
+    """
+    Kesh yozuvi: {"value": jadval, "built_at": epoch}.
+    TTL tugagach eski jadval qaytarilaveradi va fonda bitta yangilash ketadi.
+    """
+    return get_or_build(
+        FACULTY_TABLE_CACHE_KEY,
+        _build_faculty_table,
+        ttl=settings.HEMIS_FACULTY_TABLE_TTL,
+        stale_ttl=settings.HEMIS_FACULTY_TABLE_STALE_TTL,
+        on_built=snapshot_faculty_table,
+        encode=True,
+    )
+
+
+def refresh_faculty_table() -> dict:
+    """Jadvalni majburan qayta hisoblab keshga yozadi (warmer uchun)."""
+    return refresh(
+        FACULTY_TABLE_CACHE_KEY,
+        _build_faculty_table,
+        ttl=settings.HEMIS_FACULTY_TABLE_TTL,
+        stale_ttl=settings.HEMIS_FACULTY_TABLE_STALE_TTL,
+        on_built=snapshot_faculty_table,
+        encode=True,
+    )
+
+
+def peek_faculty_table_entry() -> dict | None:
+    """Faqat keshdagi jadval (HEMIS so‘rovisiz); yo‘q bo‘lsa fonda quriladi va None qaytadi."""
+    entry = hemis_cache.get(FACULTY_TABLE_CACHE_KEY)
+    if entry is None:
+        build_in_background(
+            FACULTY_TABLE_CACHE_KEY,
+            _build_faculty_table,
+            ttl=settings.HEMIS_FACULTY_TABLE_TTL,
+            stale_ttl=settings.HEMIS_FACULTY_TABLE_STALE_TTL,
+            on_built=snapshot_faculty_table,
+            encode=True,
+        )
+    return entry
+
+
 def get_faculty_table_data() -> dict:
-    cache_key = "faculty_table_data_optimized_v4"
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        return cached_data
+    return get_faculty_table_entry()["value"]
+
+
+def snapshot_faculty_table(entry: dict) -> None:
+    """Yangi hisoblangan jadval -> ContingentSnapshot (tarix / trend uchun)."""
+    snapshot_table(entry["value"], entry["built_at"])
 
+
+def _build_faculty_table() -> dict:
     client = HemisClient()
 
-    dept_data = client.get_department_list(limit=1000)
-    items = dept_data.get("data", {}).get("items", []) if isinstance(dept_data, dict) else []
-    all_faculties = [item for item in items if item.get("structureType", {}).get("code") == "11"]
+    # Fakultetlar keshlangan bo‘limlar daraxtidan (structureType 11 indeksi)
+    tree = get_department_tree()
+    all_faculties = tree.faculties()
+    all_forms = _parse_forms(client.get_education_forms())
+
+    if settings.HEMIS_FACULTY_TABLE_MODE == "scan":
+        active_faculties, active_form_ids, matrix_data = _scan_matrix(client, all_faculties, all_forms, tree.faculty)
+    else:
+        active_faculties, active_form_ids, matrix_data = _probe_matrix(client, all_faculties, all_forms)
+
+    return _assemble_faculty_table(all_forms, active_faculties, active_form_ids, matrix_data)
 
-    ed_forms_raw = client.get_education_forms()
+
+def _parse_forms(ed_forms_raw: list[dict]) -> dict:
     all_forms = {}
     for form in ed_forms_raw:
         try:
@@ -40,7 +110,12 @@ def get_faculty_table_data() -> dict:
                 all_forms[f_id] = {"name": form.get("name", "Noma'lum"), "code": form.get("code")}
         except (ValueError, TypeError):
             continue
+    return all_forms
+
 
+def _assemble_faculty_table(
+    all_forms: dict, active_faculties: list[dict], active_form_ids: list[int], matrix_data: dict
+) -> dict:
     standard_order_names = [
         "Kunduzgi",
         "Sirtqi",
@@ -57,11 +132,80 @@ def get_faculty_table_data() -> dict:
         "Qo‘shma (Masofaviy)",
     ]
 
+    # (fakultet, shakl) matritsasi zich indekslarda: qator/ustun yig‘indilari va
+    # "boshqa" qoldig‘i (fakultet jami - shakllar yig‘indisi) vektorli hisoblanadi
+    form_pos = {form_id: j for j, form_id in enumerate(active_form_ids)}
+    fac_pos = {fac["id"]: i for i, fac in enumerate(active_faculties)}
+    cells = [
+        (fac_pos[fac_id], form_pos[form_id], val)
+        for (fac_id, form_id), val in matrix_data.items()
+        if fac_id in fac_pos and form_id in form_pos and val > 0
+    ]
+    shape = (len(active_faculties), len(active_form_ids))
+    grid = cube(
+        [array("I", (c[0] for c in cells)), array("I", (c[1] for c in cells))],
+        shape,
+        weights=array("q", (c[2] for c in cells)),
+    )
+    row_breakdown = marginal(grid, shape, (0,))
+    form_totals = marginal(grid, shape, (1,))
+    others = remainder([fac.get("total", 0) for fac in active_faculties], row_breakdown)
+    has_other_data = any(others)
+
+    final_rows = []
+    grand_total = 0
+    width = shape[1]
+    for i, fac in enumerate(active_faculties):
+        # jami = max(HEMIS jami, shakllar yig‘indisi) = yig‘indi + qoldiq
+        row_sum = row_breakdown[i] + others[i]
+        if row_sum <= 0:
+            continue
+        row_vals = {
+            str(form_id): grid[i * width + j]
+            for j, form_id in enumerate(active_form_ids)
+            if grid[i * width + j] > 0
+        }
+        if others[i] > 0:
+            row_vals["other"] = others[i]
+        final_rows.append({"faculty_id": fac["id"], "faculty_name": fac["name"], "values": row_vals, "total": row_sum})
+        grand_total += row_sum
+
+    final_rows.sort(key=lambda x: x["faculty_name"])
+
+    sorted_active_ids = sorted(
+        active_form_ids,
+        key=lambda x: (
+            standard_order_names.index(all_forms[x]["name"]) if all_forms[x]["name"] in standard_order_names else 999,
+            x,
+        ),
+    )
+
+    columns_meta = [{"id": form_id, "name": all_forms[form_id]["name"]} for form_id in sorted_active_ids]
+    if has_other_data:
+        columns_meta.append({"id": "other", "name": "Boshqa"})
+
+    totals_by_form = {str(form_id): form_totals[form_pos[form_id]] for form_id in sorted_active_ids}
+    if has_other_data:
+        totals_by_form["other"] = sum(others)
+
+    return {
+        "columns": columns_meta,
+        "rows": final_rows,
+        "totals": {"by_form": totals_by_form, "grand_total": grand_total},
+    }
+
+
+def _probe_matrix(client, all_faculties: list[dict], all_forms: dict) -> tuple[list[dict], list[int], dict]:
+    """
+    Count-probing rejimi: har fakultet, har ta'lim shakli va har (fakultet, shakl)
+    katak uchun alohida student-list?limit=1 so‘rovi (totalCount).
+    """
     active_faculties = []
     active_form_ids = []
     form_total_counts = {}
 
     # ✅ max_workers=4 (429 kamayadi)
+    started = time.perf_counter()
     with ThreadPoolExecutor(max_workers=4) as executor:
         f_futures = {
             executor.submit(fetch_count_with_retry, client, department_id=f["id"], student_status_id=11): f
@@ -77,6 +221,8 @@ def get_faculty_table_data() -> dict:
             c = ft.result()
             if c > 0:
                 active_faculties.append({"id": fac["id"], "name": fac.get("name", ""), "total": c})
+        # Ikkala probe bitta pool'da parallel: har biri uchun oxirgi javobgacha vaqt
+        observe_phase("faculty_probe", time.perf_counter() - started)
 
         for ft in as_completed(form_futures):
             fid = form_futures[ft]
@@ -84,10 +230,11 @@ def get_faculty_table_data() -> dict:
             if c > 0:
                 active_form_ids.append(fid)
                 form_total_counts[fid] = c
+        observe_phase("form_probe", time.perf_counter() - started)
 
     matrix_data = {}
 
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    with phase("matrix_cells"), ThreadPoolExecutor(max_workers=4) as executor:
         cell_futures = {}
         for fac in active_faculties:
             for fid in active_form_ids:
@@ -106,77 +253,253 @@ def get_faculty_table_data() -> dict:
             if val > 0:
                 matrix_data[(fac_id, form_id)] = val
 
-    final_rows = []
-    grand_total = 0
-    table_form_totals = {fid: 0 for fid in active_form_ids}
-    table_form_totals["other"] = 0
-    has_other_data = False
+    return active_faculties, active_form_ids, matrix_data
+
+
+class _StudentScanner:
+    """
+    student-list sahifalarini StudentColumns ga yig‘adi (fakultet, shakl, kurs, jins kodlari).
+    Sync va async scan uchun umumiy; matritsa va kontingent hisobotlari shu ustunlardan.
+    """
+
+    def __init__(self, all_faculties: list[dict], faculty_of: dict | None = None):
+        self.faculty_names = {f["id"]: f.get("name", "") for f in all_faculties}
+        # bo‘lim id -> fakultet id (DepartmentTree.faculty), istalgan chuqurlikda
+        self.faculty_of = faculty_of or {}
+        self.columns = StudentColumns()
+
+    def _faculty_id(self, dept: dict):
+        fac_id = dept.get("id")
+        if fac_id not in self.faculty_names and fac_id in self.faculty_of:
+            fac_id = self.faculty_of[fac_id]
+        if fac_id not in self.faculty_names:
+            # Talaba kafedra/bo‘limga bog‘langan bo‘lsa - ota fakultetga o‘tkazamiz
+            parent = dept.get("parent")
+            fac_id = parent.get("id") if isinstance(parent, dict) else parent
+            if fac_id not in self.faculty_names:
+                fac_id = None
+        return fac_id
+
+    def consume(self, payload: dict) -> None:
+        data_node = payload.get("data") if isinstance(payload, dict) else None
+        items = data_node.get("items", []) if isinstance(data_node, dict) else []
+        for st in items:
+            fac_id = self._faculty_id(st.get("department") or {})
+
+            form = st.get("educationForm") or {}
+            try:
+                form_id = int(form.get("code") or form.get("id") or 0)
+            except (TypeError, ValueError):
+                form_id = 0
+            level = st.get("level") if isinstance(st.get("level"), dict) else {}
+            gender = st.get("gender") if isinstance(st.get("gender"), dict) else {}
+
+            self.columns.append(
+                {
+                    "faculty": fac_id,
+                    "education_form": form_id or None,
+                    "course": level.get("code") or None,
+                    "gender": gender.get("code") or None,
+                },
+                {
+                    "faculty": self.faculty_names.get(fac_id),
+                    "education_form": form.get("name"),
+                    "course": level.get("name"),
+                    "gender": gender.get("name"),
+                },
+            )
 
-    for fac in active_faculties:
-        fac_id = fac["id"]
-        row_vals = {}
-        row_sum_breakdown = 0
 
+def _student_matrix(
+    columns: StudentColumns, all_faculties: list[dict], all_forms: dict
+) -> tuple[list[dict], list[int], dict]:
+    """(fakultet, shakl) kubi va uning chetki yig‘indilari - _probe_matrix bilan bir xil natija."""
+    shape = (columns.size("faculty"), columns.size("education_form"))
+    cells = cube([columns.codes["faculty"], columns.codes["education_form"]], shape)
+    faculty_counts = marginal(cells, shape, (0,))
+    form_counts = marginal(cells, shape, (1,))
+    fac_code = {key: i for i, key in enumerate(columns.keys("faculty")) if key is not None}
+    form_code = {key: j for j, key in enumerate(columns.keys("education_form")) if key is not None}
+
+    active_faculties = [
+        {"id": f["id"], "name": f.get("name", ""), "total": faculty_counts[fac_code[f["id"]]]}
+        for f in all_faculties
+        if f["id"] in fac_code and faculty_counts[fac_code[f["id"]]] > 0
+    ]
+    active_form_ids = [fid for fid in all_forms.keys() if fid in form_code and form_counts[form_code[fid]] > 0]
+
+    width = shape[1]
+    matrix_data = {}
+    for fac in active_faculties:
         for form_id in active_form_ids:
-            val = matrix_data.get((fac_id, form_id), 0)
+            val = cells[fac_code[fac["id"]] * width + form_code[form_id]]
             if val > 0:
-                row_vals[str(form_id)] = val
-                row_sum_breakdown += val
-                table_form_totals[form_id] += val
-
-        api_total = fac.get("total", 0)
-        diff = api_total - row_sum_breakdown
-
-        if diff > 0:
-            row_vals["other"] = diff
-            has_other_data = True
-            table_form_totals["other"] += diff
-            row_sum = api_total
-        else:
-            row_sum = max(api_total, row_sum_breakdown)
+                matrix_data[(fac["id"], form_id)] = val
+    return active_faculties, active_form_ids, matrix_data
+
+
+def _scan_students(client, all_faculties: list[dict], faculty_of: dict | None = None) -> StudentColumns:
+    """
+    student-list (status 11) katta sahifalarda bir marta o‘qiladi; har talaba -
+    ustunlardagi bitta qator. So‘rovlar soni = sahifalar soni.
+    """
+    page_size = settings.HEMIS_STUDENT_SCAN_PAGE_SIZE
+    scanner = _StudentScanner(all_faculties, faculty_of)
+
+    with phase("student_scan"):
+        first = client.get_student_list(page=1, limit=page_size, student_status_id=11)
+        scanner.consume(first)
+        page_count = extract_page_count(first, page_size)
+
+        # ✅ max_workers=4 (429 kamayadi)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(client.get_student_list, page=p, limit=page_size, student_status_id=11)
+                for p in range(2, page_count + 1)
+            ]
+            for ft in as_completed(futures):
+                scanner.consume(ft.result())
+
+    return scanner.columns
+
+
+def _scan_matrix(
+    client, all_faculties: list[dict], all_forms: dict, faculty_of: dict | None = None
+) -> tuple[list[dict], list[int], dict]:
+    """
+    Scan rejimi: butun matritsa (fakultet, shakl) -> soni bitta skandan, vektorli.
+    Skan natijasi kontingent hisobotlari uchun ham keshga yoziladi.
+    """
+    columns = _scan_students(client, all_faculties, faculty_of)
+    store_student_dataset(columns)
+    return _student_matrix(columns, all_faculties, all_forms)
+
+
+# -----------------------
+# STUDENT DATASET / CONTINGENT REPORT
+# -----------------------
+def get_student_dataset_entry() -> dict:
+    """Kesh yozuvi: {"value": StudentColumns, "built_at"} - barcha kontingent kublari manbai."""
+    return get_or_build(
+        STUDENT_DATASET_CACHE_KEY,
+        _build_student_dataset,
+        ttl=settings.HEMIS_STUDENT_DATASET_TTL,
+        stale_ttl=settings.HEMIS_STUDENT_DATASET_STALE_TTL,
+    )
 
-        if row_sum > 0:
-            final_rows.append(
-                {"faculty_id": fac_id, "faculty_name": fac["name"], "values": row_vals, "total": row_sum}
-            )
-            grand_total += row_sum
 
-    final_rows.sort(key=lambda x: x["faculty_name"])
+def refresh_student_dataset() -> dict:
+    return refresh(
+        STUDENT_DATASET_CACHE_KEY,
+        _build_student_dataset,
+        ttl=settings.HEMIS_STUDENT_DATASET_TTL,
+        stale_ttl=settings.HEMIS_STUDENT_DATASET_STALE_TTL,
+    )
 
-    sorted_active_ids = sorted(
-        active_form_ids,
-        key=lambda x: (
-            standard_order_names.index(all_forms[x]["name"]) if all_forms[x]["name"] in standard_order_names else 999,
-            x,
-        ),
+
+def store_student_dataset(columns: StudentColumns) -> dict:
+    """Tayyor skan (fakultet jadvali scan rejimida) - qayta skanlamasdan keshga."""
+    return refresh(
+        STUDENT_DATASET_CACHE_KEY,
+        lambda: columns,
+        ttl=settings.HEMIS_STUDENT_DATASET_TTL,
+        stale_ttl=settings.HEMIS_STUDENT_DATASET_STALE_TTL,
     )
 
-    columns_meta = [{"id": form_id, "name": all_forms[form_id]["name"]} for form_id in sorted_active_ids]
-    if has_other_data:
-        columns_meta.append({"id": "other", "name": "Boshqa"})
 
-    totals_by_form = {str(form_id): table_form_totals[form_id] for form_id in sorted_active_ids}
-    if has_other_data:
-        totals_by_form["other"] = table_form_totals["other"]
+def _build_student_dataset() -> StudentColumns:
+    tree = get_department_tree()
+    return _scan_students(HemisClient(), tree.faculties(), tree.faculty)
+
+
+def parse_report_dims(raw: str | None) -> tuple[str, ...]:
+    if not raw:
+        return DEFAULT_REPORT_DIMS
+    dims = tuple(d.strip() for d in raw.split(",") if d.strip())
+    unknown = [d for d in dims if d not in STUDENT_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dims: {', '.join(unknown)} (allowed: {', '.join(STUDENT_DIMENSIONS)})")
+    if not dims or len(set(dims)) != len(dims):
+        raise ValueError("dims must be a non-empty list without duplicates")
+    return dims
+
+
+def get_contingent_report_entry(dims: tuple[str, ...] = DEFAULT_REPORT_DIMS) -> dict:
+    """
+    Ko‘p o‘lchamli kontingent (masalan, fakultet x shakl x kurs x jins): bitta lokal
+    skandan, har dataset yozuviga va dims ga bir marta hisoblanadi (ETag bilan).
+    """
+    return derived_entry(
+        f"{CONTINGENT_REPORT_CACHE_KEY}:{','.join(dims)}",
+        get_student_dataset_entry(),
+        lambda columns: build_contingent_report(columns, dims),
+        timeout=settings.HEMIS_STUDENT_DATASET_TTL + settings.HEMIS_STUDENT_DATASET_STALE_TTL,
+        encode=True,
+    )
 
-    response_data = {
-        "columns": columns_meta,
-        "rows": final_rows,
-        "totals": {"by_form": totals_by_form, "grand_total": grand_total},
+
+def _dim_fields(columns: StudentColumns, dim: str, key) -> dict:
+    return {f"{dim}_id": key, dim: columns.label(dim, key) if key is not None else "Noma'lum"}
+
+
+def _ranked(items: list[dict], counts: list[int], total: int) -> list[dict]:
+    for item, count, pct, rank in zip(items, counts, percent(counts, total), rank_desc(counts)):
+        item.update(count=count, percent=pct, rank=rank)
+    items.sort(key=lambda x: x["rank"])
+    return items
+
+
+def build_contingent_report(columns: StudentColumns, dims: tuple[str, ...]) -> dict:
+    shape = tuple(columns.size(d) for d in dims)
+    cells = cube([columns.codes[d] for d in dims], shape)
+    total = len(columns)
+
+    # faqat bo‘sh bo‘lmagan kataklar
+    filled = nonzero(cells)
+    counts = [cells[i] for i in filled]
+    codes = unravel(filled, shape)
+    keys = [columns.keys(d) for d in dims]
+    rows = [
+        {k: v for d, dim in enumerate(dims) for k, v in _dim_fields(columns, dim, keys[d][codes[d][n]]).items()}
+        for n in range(len(filled))
+    ]
+
+    marginals = {}
+    for d, dim in enumerate(dims):
+        by_key = marginal(cells, shape, (d,))
+        present = nonzero(by_key)
+        marginals[dim] = _ranked(
+            [_dim_fields(columns, dim, keys[d][c]) for c in present], [by_key[c] for c in present], total
+        )
+
+    return {
+        "dims": list(dims),
+        "total": total,
+        "cells": len(rows),
+        "cell_percentiles": percentiles(counts),
+        "rows": _ranked(rows, counts, total),
+        "marginals": marginals,
     }
 
-    cache.set(cache_key, response_data, timeout=3600)
-    return response_data
 
+def get_dashboard_summary_entry() -> dict:
+    # ✅ fakultet jadvali keshidan hosil qilinadi (alohida HEMIS so‘rovi yo‘q),
+    # har jadval yozuviga bir marta - ETag va siqilgan variantlari bilan
+    return summary_entry_for(get_faculty_table_entry())
 
-def get_dashboard_summary() -> dict:
-    # ✅ v4 cache ni o‘qiymiz
-    cached_table = cache.get("faculty_table_data_optimized_v4")
-    if cached_table:
-        return _derive_summary_from_table(cached_table)
 
-    table_data = get_faculty_table_data()
-    return _derive_summary_from_table(table_data)
+def summary_entry_for(table_entry: dict) -> dict:
+    return derived_entry(
+        DASHBOARD_SUMMARY_CACHE_KEY,
+        table_entry,
+        _derive_summary_from_table,
+        timeout=settings.HEMIS_FACULTY_TABLE_TTL + settings.HEMIS_FACULTY_TABLE_STALE_TTL,
+        encode=True,
+    )
+
+
+def get_dashboard_summary() -> dict:
+    return get_dashboard_summary_entry()["value"]
 
 
 def _derive_summary_from_table(table_data: dict) -> dict:
@@ -0,0 +1,202 @@
+# backend/monitoring/snapshots.py
+# Kontingent tarixi: har hisoblangan fakultet x shakl jadvali DB ga sanali nusxa
+# sifatida yoziladi; trend (kun/hafta) va "oxirgi nusxaga nisbatan farq" HEMIS'ga
+# murojaatsiz, indekslangan so‘rovlar bilan hisoblanadi.
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncWeek
+from django.utils import timezone
+
+from .models import ContingentCell, ContingentSnapshot
+
+logger = logging.getLogger(__name__)
+
+TREND_PERIODS = {"day": TruncDay, "week": TruncWeek}
+TREND_SPLITS = ("faculty", "form")
+
+
+def _aware(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=dt_timezone.utc)
+
+
+def save_contingent_snapshot(table: dict, built_at: float) -> ContingentSnapshot | None:
+    """
+    Jadvalni nusxa sifatida saqlaydi. Shu built_at allaqachon bor bo‘lsa yoki oxirgi
+    nusxadan keyin HEMIS_SNAPSHOT_MIN_INTERVAL o‘tmagan bo‘lsa - saqlanmaydi (None).
+    """
+    built = _aware(built_at)
+    last = ContingentSnapshot.objects.order_by("-taken_at").values("taken_at", "built_at").first()
+    if last and 0 <= (built - last["taken_at"]).total_seconds() < settings.HEMIS_SNAPSHOT_MIN_INTERVAL:
+        return None
+
+    forms = {str(col["id"]): col["name"] for col in table.get("columns", [])}
+    faculties = {str(row["faculty_id"]): row["faculty_name"] for row in table.get("rows", [])}
+    cells = [
+        (row["faculty_id"], str(form_id), count)
+        for row in table.get("rows", [])
+        for form_id, count in row.get("values", {}).items()
+        if count > 0
+    ]
+
+    with transaction.atomic():
+        snapshot, created = ContingentSnapshot.objects.get_or_create(
+            built_at=built,
+            defaults={
+                "taken_at": built,
+                "mode": settings.HEMIS_FACULTY_TABLE_MODE,
+                "grand_total": table.get("totals", {}).get("grand_total", 0),
+                "faculties": faculties,
+                "forms": forms,
+            },
+        )
+        if not created:
+            return None
+        ContingentCell.objects.bulk_create([
+            ContingentCell(snapshot=snapshot, faculty_id=fac_id, form_id=form_id, count=count)
+            for fac_id, form_id, count in cells
+        ])
+    logger.info("Contingent snapshot saved: %s (%s cells)", snapshot.taken_at, len(cells))
+    return snapshot
+
+
+def snapshot_table(table: dict, built_at: float) -> None:
+    """Jadval builder'idan keyin chaqiriladi: xato jadval hisoblashni buzmaydi."""
+    if not settings.HEMIS_SNAPSHOTS_ENABLED:
+        return
+    try:
+        save_contingent_snapshot(table, built_at)
+    except Exception as e:
+        logger.warning("Contingent snapshot failed: %s", e)
+
+
+# -----------------------
+# TRENDS
+# -----------------------
+def _bucket_snapshots(period: str, since: datetime | None, until: datetime | None) -> dict[int, datetime]:
+    """Har kun/hafta uchun oxirgi nusxa: snapshot id -> bucket boshi."""
+    qs = ContingentSnapshot.objects.all()
+    if since:
+        qs = qs.filter(taken_at__gte=since)
+    if until:
+        qs = qs.filter(taken_at__lt=until)
+    # Bucket ichida taken_at bo‘yicha eng so‘nggisi (id emas - orqaga to‘ldirilgan nusxalar ham bo‘ladi)
+    latest: dict[datetime, tuple[datetime, int]] = {}
+    rows = qs.annotate(bucket=TREND_PERIODS[period]("taken_at")).values_list("bucket", "taken_at", "id")
+    for bucket, taken_at, snap_id in rows.order_by():
+        if bucket not in latest or taken_at > latest[bucket][0]:
+            latest[bucket] = (taken_at, snap_id)
+    return {snap_id: bucket for bucket, (_, snap_id) in latest.items()}
+
+
+def contingent_trend(
+    *,
+    faculty_id: int | None = None,
+    form_id: str | None = None,
+    split: str | None = None,
+    period: str = "day",
+    days: int = 90,
+) -> dict:
+    """
+    Kun/hafta bo‘yicha talabalar soni (har bucket - uning oxirgi nusxasi).
+    faculty_id / form_id - filtr; split="faculty"|"form" - har biri alohida seriya.
+    """
+    if period not in TREND_PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    if split and split not in TREND_SPLITS:
+        raise ValueError(f"Unknown split: {split}")
+
+    since = timezone.now() - timedelta(days=days) if days else None
+    buckets = _bucket_snapshots(period, since, None)
+
+    cells = ContingentCell.objects.filter(snapshot_id__in=list(buckets))
+    if faculty_id:
+        cells = cells.filter(faculty_id=faculty_id)
+    if form_id:
+        cells = cells.filter(form_id=str(form_id))
+
+    split_field = {"faculty": "faculty_id", "form": "form_id"}.get(split)
+    group_fields = ["snapshot_id"] + ([split_field] if split_field else [])
+    rows = cells.values(*group_fields).annotate(total=Sum("count")).order_by()
+
+    names = _latest_names() if split else {}
+    series: dict[str, dict] = {}
+    for row in rows:
+        key = str(row[split_field]) if split_field else "total"
+        s = series.get(key)
+        if s is None:
+            s = series[key] = {
+                "key": key,
+                "name": names.get(split, {}).get(key, key) if split else "Jami",
+                "points": {},
+            }
+        s["points"][row["snapshot_id"]] = row["total"]
+
+    # Bucket bo‘yicha tartib; nusxada yo‘q seriya nuqtasi - 0
+    ordered = sorted(buckets.items(), key=lambda x: x[1])
+    result = []
+    for s in sorted(series.values(), key=lambda x: x["name"]):
+        result.append({
+            "key": s["key"],
+            "name": s["name"],
+            "points": [
+                {"date": bucket.date().isoformat(), "snapshot_id": sid, "total": s["points"].get(sid, 0)}
+                for sid, bucket in ordered
+            ],
+        })
+    return {"period": period, "split": split, "series": result}
+
+
+def _latest_names() -> dict:
+    snap = ContingentSnapshot.objects.order_by("-taken_at").values("faculties", "forms").first() or {}
+    return {"faculty": snap.get("faculties", {}), "form": snap.get("forms", {})}
+
+
+# -----------------------
+# DIFF
+# -----------------------
+def diff_against_last_snapshot(table: dict, built_at: float) -> dict | None:
+    """
+    Jonli jadval va undan oldingi oxirgi nusxa: umumiy, fakultet va shakl bo‘yicha farq.
+    Nusxa bo‘lmasa - None.
+    """
+    snapshot = (
+        ContingentSnapshot.objects.filter(built_at__lt=_aware(built_at)).order_by("-taken_at").first()
+    )
+    if snapshot is None:
+        return None
+
+    prev_fac: dict[str, int] = {}
+    prev_form: dict[str, int] = {}
+    for fac_id, form_id, count in snapshot.cells.values_list("faculty_id", "form_id", "count"):
+        prev_fac[str(fac_id)] = prev_fac.get(str(fac_id), 0) + count
+        prev_form[form_id] = prev_form.get(form_id, 0) + count
+
+    cur_fac = {str(row["faculty_id"]): row["total"] for row in table.get("rows", [])}
+    cur_form = {str(k): v for k, v in table.get("totals", {}).get("by_form", {}).items()}
+    fac_names = {**snapshot.faculties, **{str(r["faculty_id"]): r["faculty_name"] for r in table.get("rows", [])}}
+    form_names = {**snapshot.forms, **{str(c["id"]): c["name"] for c in table.get("columns", [])}}
+
+    def compare(current: dict, previous: dict, names: dict) -> list[dict]:
+        keys = sorted(set(current) | set(previous), key=lambda k: names.get(k, k))
+        return [
+            {
+                "id": k,
+                "name": names.get(k, k),
+                "current": current.get(k, 0),
+                "previous": previous.get(k, 0),
+                "delta": current.get(k, 0) - previous.get(k, 0),
+            }
+            for k in keys
+        ]
+
+    grand = table.get("totals", {}).get("grand_total", 0)
+    return {
+        "snapshot": {"id": snapshot.id, "taken_at": snapshot.taken_at.isoformat()},
+        "grand_total": {"current": grand, "previous": snapshot.grand_total, "delta": grand - snapshot.grand_total},
+        "faculties": compare(cur_fac, prev_fac, fac_names),
+        "forms": compare(cur_form, prev_form, form_names),
+    }
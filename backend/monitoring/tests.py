@@ -1,3 +1,1644 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from urllib.parse import urlencode
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from hemis_client.services import hemis_async, rate_limiter
+from hemis_client.services.fake_hemis import build_fake_hemis, install_fake_hemis
+from hemis_client.services.hemis_api import HemisClient
+from rest_framework.renderers import JSONRenderer
+
+from . import (
+    aggregation,
+    async_services,
+    attendance_services,
+    cache,
+    employee_services,
+    renderers,
+    rollup,
+    search_index,
+    services,
+    warehouse,
+)
+from .cache import aget_or_build, derived_entry, get_or_build, hemis_cache, refresh
+from .catalog import get_faculty_catalog
+from .columnar import AttendanceColumns, StudentColumns
+from .conditional import cached_entry_response
+from .department_tree import get_department_tree_entry
+from .management.commands import benchmark_hemis
+from .models import AttendanceFact, AttendanceGroupSync, ContingentSnapshot
+from .snapshots import contingent_trend, diff_against_last_snapshot, save_contingent_snapshot
+
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-default"},
+    "hemis": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-hemis",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
+
+@override_settings(CACHES=TEST_CACHES, HEMIS_RATE_LIMIT=0, HEMIS_SNAPSHOTS_ENABLED=False)
+class CacheTestCase(SimpleTestCase):
+    """Har test toza lokal hemis keshi bilan."""
+
+    def setUp(self):
+        hemis_cache.clear()
+        with search_index._registry_lock:
+            search_index._registry.clear()
+        rate_limiter._limiter = None
+        self.addCleanup(hemis_cache.clear)
+
+
+@override_settings(HEMIS_FAKE=True)
+class FakeHemisTestCase(CacheTestCase):
+    """Bundled soxta HEMIS ustida (tarmoqsiz); o‘lchami FAKE_OPTIONS bilan."""
+
+    FAKE_OPTIONS = {"faculties": 2, "groups": 120, "students": 3000, "employees": 50}
+
+    def setUp(self):
+        super().setUp()
+        self.fake = build_fake_hemis(self.FAKE_OPTIONS)
+        install_fake_hemis(self.fake)
+        self.addCleanup(install_fake_hemis, None)
+
+
+# -----------------------
+# CONDITIONAL GET (ETag / 304)
+# -----------------------
+class CachedEntryResponseTests(SimpleTestCase):
+    BUILT_AT = 1_700_000_000.0
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.entry = {"value": {"rows": [1, 2, 3]}, "built_at": self.BUILT_AT}
+        renderers.encode_entry(self.entry, {"generated_at": "2023-11-14T22:13:20Z"})
+        # brotli o‘rnatilmagan bo‘lsa ham muzokarani tekshirish uchun
+        self.entry.setdefault("br", b"br-body")
+
+    def _get(self, **headers):
+        return cached_entry_response(self.factory.get("/x", **headers), self.entry)
+
+    def test_plain_body_with_validators(self):
+        resp = self._get()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, self.entry["body"])
+        self.assertEqual(resp["ETag"], f'"{self.entry["etag"]}"')
+        self.assertEqual(resp["Last-Modified"], http_date(self.BUILT_AT))
+        self.assertEqual(resp["Vary"], "Accept-Encoding")
+        self.assertEqual(resp["Cache-Control"], "no-cache")
+        self.assertFalse(resp.has_header("Content-Encoding"))
+
+    def test_precompressed_variants_have_own_etag(self):
+        resp = self._get(HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(resp["ETag"], f'"{self.entry["etag"]}-gzip"')
+        self.assertEqual(gzip.decompress(resp.content), self.entry["body"])
+
+        resp = self._get(HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(resp["Content-Encoding"], "br")
+        self.assertEqual(resp["ETag"], f'"{self.entry["etag"]}-br"')
+        self.assertEqual(resp.content, self.entry["br"])
+        self.assertEqual(resp["Vary"], "Accept-Encoding")
+
+    def test_q_zero_and_wildcard(self):
+        self.assertEqual(self._get(HTTP_ACCEPT_ENCODING="br;q=0, gzip")["Content-Encoding"], "gzip")
+        self.assertFalse(self._get(HTTP_ACCEPT_ENCODING="br;q=0, gzip;q=0").has_header("Content-Encoding"))
+        self.assertEqual(self._get(HTTP_ACCEPT_ENCODING="*")["Content-Encoding"], "br")
+
+    def test_missing_variant_falls_back_to_identity(self):
+        del self.entry["br"]
+        resp = self._get(HTTP_ACCEPT_ENCODING="br")
+        self.assertFalse(resp.has_header("Content-Encoding"))
+        self.assertEqual(resp["ETag"], f'"{self.entry["etag"]}"')
+        self.assertEqual(resp.content, self.entry["body"])
+
+    def test_if_none_match_returns_304_for_any_variant(self):
+        etag = self.entry["etag"]
+        for header in (f'"{etag}"', f'"{etag}-gzip"', f'W/"{etag}-br"', f'"other", "{etag}"', "*"):
+            with self.subTest(header=header):
+                resp = self._get(HTTP_IF_NONE_MATCH=header, HTTP_ACCEPT_ENCODING="gzip")
+                self.assertEqual(resp.status_code, 304)
+                self.assertEqual(resp.content, b"")
+                self.assertEqual(resp["ETag"], f'"{etag}-gzip"')
+                self.assertEqual(resp["Vary"], "Accept-Encoding")
+
+    def test_changed_etag_returns_body(self):
+        resp = self._get(HTTP_IF_NONE_MATCH='"0123456789abcdef01234567-gzip"')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, self.entry["body"])
+
+    def test_if_modified_since(self):
+        self.assertEqual(self._get(HTTP_IF_MODIFIED_SINCE=http_date(self.BUILT_AT)).status_code, 304)
+        self.assertEqual(self._get(HTTP_IF_MODIFIED_SINCE=http_date(self.BUILT_AT + 60)).status_code, 304)
+        self.assertEqual(self._get(HTTP_IF_MODIFIED_SINCE=http_date(self.BUILT_AT - 60)).status_code, 200)
+        self.assertEqual(self._get(HTTP_IF_MODIFIED_SINCE="not a date").status_code, 200)
+
+    def test_if_none_match_takes_precedence_over_if_modified_since(self):
+        resp = self._get(HTTP_IF_NONE_MATCH='"stale"', HTTP_IF_MODIFIED_SINCE=http_date(self.BUILT_AT + 60))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_etag_follows_body(self):
+        other = {"value": {"rows": [1, 2, 4]}, "built_at": self.BUILT_AT}
+        renderers.encode_entry(other, {"generated_at": "2023-11-14T22:13:20Z"})
+        self.assertNotEqual(other["etag"], self.entry["etag"])
+
+    @skipUnless(renderers.brotli is not None, "brotli o‘rnatilmagan")
+    def test_brotli_variant_decodes_to_body(self):
+        entry = {"value": {"rows": list(range(100))}, "built_at": self.BUILT_AT}
+        renderers.encode_entry(entry, {})
+        self.assertEqual(renderers.brotli.decompress(entry["br"]), entry["body"])
+
+
+class FacultyTableConditionalTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 3, "groups": 30, "students": 900, "employees": 10}
+    URL = "/api/monitoring/faculty-table-data/"
+
+    def test_revalidation_skips_body(self):
+        first = self.client.get(self.URL, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Content-Encoding"], "gzip")
+        calls = HemisClient.request_count
+        again = self.client.get(self.URL, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again["ETag"], first["ETag"])
+        self.assertEqual(HemisClient.request_count, calls)
+
+
+class FacultyTableModeTests(FakeHemisTestCase):
+    # kafedralar soni fakultetlardan ko‘p - talabalar fakultetga daraxt orqali bog‘lanadi
+    FAKE_OPTIONS = {"faculties": 4, "groups": 40, "students": 1300, "employees": 10}
+
+    def _build(self, mode: str, builder) -> dict:
+        with override_settings(HEMIS_FACULTY_TABLE_MODE=mode, HEMIS_STUDENT_SCAN_PAGE_SIZE=200):
+            return builder()
+
+    def test_scan_and_count_modes_build_the_same_table(self):
+        count = self._build("count", services._build_faculty_table)
+        scan = self._build("scan", services._build_faculty_table)
+        self.assertEqual(scan, count)
+        self.assertGreater(sum(row["total"] for row in count["rows"]), 0)
+
+    def test_async_modes_match_sync_table(self):
+        async def abuild():
+            try:
+                return await async_services._abuild_faculty_table()
+            finally:
+                await hemis_async.aclose_async_client()
+
+        expected = self._build("count", services._build_faculty_table)
+        for mode in ("count", "scan"):
+            with self.subTest(mode=mode):
+                self.assertEqual(self._build(mode, lambda: asyncio.run(abuild())), expected)
+
+
+# -----------------------
+# RENDERER
+# -----------------------
+RENDER_PAYLOAD = {
+    "rows": [
+        {"faculty_id": 100, "faculty_name": "Ta'lim fakulteti", "values": {"11": 120, "other": 0}, "total": 120},
+        {"faculty_id": 101, "faculty_name": "O‘zbek \"filologiyasi\"\n\u2028\u2029\t", "values": {}, "total": 0},
+    ],
+    "totals": {"by_form": {11: 120, 13: 0}, "grand_total": 120},
+    "percent": [12.5, 0.1, 33.33, -0.0, 2 ** 40],
+    "flags": [True, False, None],
+    "pair": (1, "a"),
+    "generated_at": datetime(2026, 3, 2, 10, 0, 0, 123456, tzinfo=dt_timezone.utc),
+    "day": date(2026, 3, 2),
+    "ratio": Decimal("1.50"),
+    "uid": uuid.UUID(int=5),
+    "empty": {},
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def assertSameAsDrf(self, data):
+        expected = JSONRenderer().render(data)
+        self.assertEqual(renderers.FastJSONRenderer().render(data), expected)
+        self.assertEqual(renderers.encode_json(data), expected)
+
+    @skipUnless(renderers.orjson is not None, "orjson o‘rnatilmagan")
+    def test_orjson_output_matches_drf(self):
+        self.assertSameAsDrf(RENDER_PAYLOAD)
+        self.assertSameAsDrf([])
+        self.assertSameAsDrf("\u2028")
+
+    def test_fallback_output_matches_drf(self):
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertSameAsDrf(RENDER_PAYLOAD)
+
+    def test_exponent_floats_differ_only_in_spelling(self):
+        # orjson 1e20, DRF 1e+20 - qiymat bir xil
+        data = {"big": 1e20, "small": 1.5e-7}
+        self.assertEqual(json.loads(renderers.encode_json(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_entry_body_matches_rendered_dict(self):
+        meta = {"generated_at": datetime(2026, 3, 2, tzinfo=dt_timezone.utc), "stale": False}
+        for value in (RENDER_PAYLOAD, {}):
+            with self.subTest(keys=len(value)):
+                entry = {"value": value}
+                renderers.encode_entry(entry, meta)
+                body = renderers.FastJSONRenderer().render(renderers.entry_body(entry, meta))
+                self.assertEqual(body, JSONRenderer().render({**value, "meta": meta}))
+                self.assertEqual(entry["body"], body)
+
+    def test_indent_and_none_follow_drf(self):
+        context = {"indent": 2}
+        self.assertEqual(renderers.FastJSONRenderer().render(RENDER_PAYLOAD, renderer_context=context),
+                         JSONRenderer().render(RENDER_PAYLOAD, renderer_context=context))
+        self.assertEqual(renderers.FastJSONRenderer().render(None), b"")
+
+
+# -----------------------
+# AGGREGATION (numpy / oddiy sikllar)
+# -----------------------
+BASELINE_FORMS = {
+    11: {"name": "Kunduzgi", "code": 11},
+    13: {"name": "Sirtqi", "code": 13},
+    15: {"name": "Kechki", "code": 15},
+    16: {"name": "Masofaviy", "code": 16},
+}
+BASELINE_FACULTIES = [
+    {"id": 1, "name": "Fizika-matematika", "total": 620},
+    {"id": 2, "name": "Filologiya", "total": 410},
+    {"id": 3, "name": "Tarix", "total": 95},
+]
+BASELINE_MATRIX = {(1, 11): 400, (1, 13): 150, (2, 11): 300, (2, 15): 60, (2, 16): 50, (3, 13): 80}
+# Vektorlashtirishdan oldingi (dict sikllari) _assemble_faculty_table natijasi
+BASELINE_TABLE = {
+    "columns": [
+        {"id": 11, "name": "Kunduzgi"},
+        {"id": 13, "name": "Sirtqi"},
+        {"id": 15, "name": "Kechki"},
+        {"id": 16, "name": "Masofaviy"},
+        {"id": "other", "name": "Boshqa"},
+    ],
+    "rows": [
+        {"faculty_id": 2, "faculty_name": "Filologiya", "values": {"11": 300, "15": 60, "16": 50}, "total": 410},
+        {"faculty_id": 1, "faculty_name": "Fizika-matematika",
+         "values": {"11": 400, "13": 150, "other": 70}, "total": 620},
+        {"faculty_id": 3, "faculty_name": "Tarix", "values": {"13": 80, "other": 15}, "total": 95},
+    ],
+    "totals": {"by_form": {"11": 700, "13": 230, "15": 60, "16": 50, "other": 85}, "grand_total": 1125},
+}
+
+
+def _student_columns(n: int, seed: int = 7) -> StudentColumns:
+    rng = random.Random(seed)
+    columns = StudentColumns()
+    for _ in range(n):
+        keys = {
+            "faculty": rng.choice([1, 2, 3, 4]),
+            "education_form": rng.choice(["11", "13", "15"]),
+            "course": rng.choice(["1", "2", "3", "4"]),
+            "gender": rng.choice(["11", "12"]),
+        }
+        columns.append(keys, {d: f"{d}-{k}" for d, k in keys.items()})
+    return columns
+
+
+class AggregationPathTests(SimpleTestCase):
+    """numpy bor/yo‘q - natija bir xil bo‘lishi kerak; numpy yo‘q bo‘lsa faqat oddiy yo‘l tekshiriladi."""
+
+    def _python(self, fn, *args, **kwargs):
+        with mock.patch.object(aggregation, "np", None):
+            return fn(*args, **kwargs)
+
+    def _table(self):
+        return services._assemble_faculty_table(BASELINE_FORMS, BASELINE_FACULTIES, [11, 13, 15, 16], BASELINE_MATRIX)
+
+    def test_python_path_matches_baseline_table(self):
+        self.assertEqual(self._python(self._table), BASELINE_TABLE)
+
+    @skipUnless(aggregation.np is not None, "numpy o‘rnatilmagan")
+    def test_numpy_path_matches_baseline_table(self):
+        self.assertEqual(self._table(), BASELINE_TABLE)
+
+    @skipUnless(aggregation.np is not None, "numpy o‘rnatilmagan")
+    def test_numpy_and_python_primitives_agree(self):
+        rng = random.Random(3)
+        for shape in [(3,), (2, 4), (3, 1, 5), (2, 3, 2, 2), (4, 0)]:
+            with self.subTest(shape=shape):
+                n = 200 if all(shape) else 0
+                codes = [array("I", (rng.randrange(s) for _ in range(n))) for s in shape]
+                counts = array("I", (rng.randint(0, 40) for _ in range(n)))
+                for weights in (None, counts):
+                    self.assertEqual(aggregation.cube(codes, shape, weights),
+                                     self._python(aggregation.cube, codes, shape, weights))
+                flat = aggregation.cube(codes, shape)
+                self.assertEqual(aggregation.marginal(flat, shape, (0,)),
+                                 self._python(aggregation.marginal, flat, shape, (0,)))
+                filled = aggregation.nonzero(flat)
+                self.assertEqual(filled, self._python(aggregation.nonzero, flat))
+                self.assertEqual(aggregation.unravel(filled, shape), self._python(aggregation.unravel, filled, shape))
+
+        values = [rng.randint(0, 20) for _ in range(50)]
+        for fn, args in [
+            (aggregation.rank_desc, (values,)),
+            (aggregation.percentiles, (values,)),
+            (aggregation.percent, (values, sum(values))),
+            (aggregation.remainder, (values, values[::-1])),
+            (aggregation.threshold_indices, ([values, values[::-1]], [5, 10])),
+            (aggregation.column_sum, (array("I", values),)),
+        ]:
+            with self.subTest(fn=fn.__name__):
+                self.assertEqual(fn(*args), self._python(fn, *args))
+
+    @skipUnless(aggregation.np is not None, "numpy o‘rnatilmagan")
+    def test_contingent_report_is_identical_on_both_paths(self):
+        columns = _student_columns(500)
+        dims = ("faculty", "education_form", "course", "gender")
+        self.assertEqual(services.build_contingent_report(columns, dims),
+                         self._python(services.build_contingent_report, columns, dims))
+
+    def test_python_report_adds_up(self):
+        columns = _student_columns(500)
+        report = self._python(services.build_contingent_report, columns, ("faculty", "gender"))
+        self.assertEqual(report["total"], 500)
+        self.assertEqual(sum(r["count"] for r in report["rows"]), 500)
+        for dim in ("faculty", "gender"):
+            self.assertEqual(sum(r["count"] for r in report["marginals"][dim]), 500)
+
+
+# -----------------------
+# CACHE (SWR + single-flight)
+# -----------------------
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class GetOrBuildTests(CacheTestCase):
+    KEY = "test_entry"
+
+    def _counting_builder(self, value="new", gate: threading.Event | None = None):
+        calls = []
+
+        def builder():
+            calls.append(threading.current_thread().name)
+            if gate is not None:
+                gate.wait(5)
+            return value
+
+        return builder, calls
+
+    def test_fresh_entry_is_returned_without_building(self):
+        hemis_cache.set(self.KEY, {"value": "cached", "built_at": time.time()})
+        builder, calls = self._counting_builder()
+        self.assertEqual(get_or_build(self.KEY, builder, ttl=60)["value"], "cached")
+        self.assertEqual(calls, [])
+
+    def test_stale_entry_is_served_while_one_refresh_runs(self):
+        stale = {"value": "old", "built_at": time.time() - 120}
+        hemis_cache.set(self.KEY, stale, timeout=600)
+        gate = threading.Event()
+        builder, calls = self._counting_builder(gate=gate)
+        seen = []
+
+        try:
+            for _ in range(5):
+                seen.append(get_or_build(self.KEY, builder, ttl=60, stale_ttl=600)["value"])
+            # fon yangilash ketayotganda ham eski qiymat, yangi build boshlanmaydi
+            self.assertEqual(seen, ["old"] * 5)
+            self.assertTrue(_wait_for(lambda: len(calls) == 1))
+        finally:
+            gate.set()
+
+        self.assertTrue(_wait_for(lambda: hemis_cache.get(self.KEY)["value"] == "new"))
+        self.assertTrue(_wait_for(lambda: hemis_cache.get(cache._lock_key(self.KEY)) is None))
+        self.assertEqual(len(calls), 1)
+        self.assertGreater(hemis_cache.get(self.KEY)["built_at"], stale["built_at"])
+
+    def test_concurrent_misses_build_once(self):
+        gate = threading.Event()
+        builder, calls = self._counting_builder(gate=gate)
+        results = []
+        errors = []
+
+        def call():
+            try:
+                results.append(get_or_build(self.KEY, builder, ttl=60))
+            except Exception as e:  # pragma: no cover - test xatosini ko‘rsatish uchun
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(16)]
+        for t in threads:
+            t.start()
+        self.assertTrue(_wait_for(lambda: len(calls) == 1))
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 16)
+        self.assertEqual({id(r) for r in results}, {id(results[0])})
+        self.assertEqual(results[0]["value"], "new")
+        self.assertEqual(cache._inflight, {})
+
+    def test_build_error_reaches_all_waiters_and_is_not_cached(self):
+        gate = threading.Event()
+        calls = []
+
+        def failing():
+            calls.append(1)
+            gate.wait(5)
+            raise RuntimeError("HEMIS down")
+
+        errors = []
+
+        def call():
+            try:
+                get_or_build(self.KEY, failing, ttl=60)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        self.assertTrue(_wait_for(lambda: len(calls) == 1))
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(errors, ["HEMIS down"] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(hemis_cache.get(self.KEY))
+        self.assertIsNone(hemis_cache.get(cache._lock_key(self.KEY)))
+
+    def test_waits_for_other_worker_holding_the_lock(self):
+        # Boshqa jarayon lock'ni ushlagan: bu worker qurmaydi, natija keshga tushishini kutadi
+        hemis_cache.add(cache._lock_key(self.KEY), 12345, timeout=60)
+        builder, calls = self._counting_builder()
+
+        def other_worker_finishes():
+            time.sleep(0.05)
+            hemis_cache.set(self.KEY, {"value": "from-other", "built_at": time.time()})
+
+        threading.Thread(target=other_worker_finishes).start()
+        with mock.patch.object(cache, "LOCK_POLL_INTERVAL", 0.01):
+            entry = get_or_build(self.KEY, builder, ttl=60)
+        self.assertEqual(entry["value"], "from-other")
+        self.assertEqual(calls, [])
+
+    def test_refresh_rebuilds_fresh_entry_and_runs_hook(self):
+        hemis_cache.set(self.KEY, {"value": "cached", "built_at": time.time()})
+        built = []
+        entry = refresh(self.KEY, lambda: "rebuilt", ttl=60, on_built=built.append)
+        self.assertEqual(entry["value"], "rebuilt")
+        self.assertEqual(hemis_cache.get(self.KEY)["value"], "rebuilt")
+        self.assertEqual(built, [entry])
+
+    def test_refresh_hook_error_keeps_entry(self):
+        def broken_hook(entry):
+            raise ValueError("snapshot failed")
+
+        entry = refresh(self.KEY, lambda: "rebuilt", ttl=60, on_built=broken_hook)
+        self.assertEqual(hemis_cache.get(self.KEY), entry)
+
+    def test_refresh_encode_adds_body_and_etag(self):
+        entry = refresh(self.KEY, lambda: {"a": 1}, ttl=60, encode=True)
+        self.assertEqual(entry["json"], b'{"a":1}')
+        self.assertTrue(entry["body"].startswith(b'{"a":1,"meta":'))
+        self.assertEqual(len(entry["etag"]), 24)
+
+
+class DerivedEntryTests(CacheTestCase):
+    def test_derived_value_follows_source_built_at(self):
+        derives = []
+
+        def derive(value):
+            derives.append(value)
+            return {"total": sum(value)}
+
+        source = {"value": [1, 2, 3], "built_at": 1000.0}
+        first = derived_entry("test_derived", source, derive, timeout=60)
+        again = derived_entry("test_derived", source, derive, timeout=60)
+        self.assertEqual(first, again)
+        self.assertEqual(first, {"value": {"total": 6}, "built_at": 1000.0})
+        self.assertEqual(len(derives), 1)
+
+        # Manba qayta qurildi - hosila ham (eski built_at yozuvi ishlatilmaydi)
+        rebuilt = {"value": [10, 20], "built_at": 2000.0}
+        self.assertEqual(derived_entry("test_derived", rebuilt, derive, timeout=60)["value"], {"total": 30})
+        self.assertEqual(len(derives), 2)
+
+        # Eski manba yozuvi (masalan, boshqa worker'da) - o‘zining hosilasini oladi
+        self.assertEqual(derived_entry("test_derived", source, derive, timeout=60)["value"], {"total": 6})
+        self.assertEqual(len(derives), 2)
+
+    def test_encoded_derived_entry_has_same_built_at(self):
+        source = {"value": {"n": 1}, "built_at": 1234.5}
+        entry = derived_entry("test_derived_enc", source, lambda v: {"m": v["n"] + 1}, timeout=60, encode=True)
+        self.assertEqual(entry["built_at"], 1234.5)
+        self.assertIn("etag", entry)
+        self.assertTrue(entry["body"].startswith(b'{"m":2,'))
+
+
+def _file_caches(location: str) -> dict:
+    return {
+        "default": TEST_CACHES["default"],
+        "hemis": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+    }
+
+
+def _race_for_lock(barrier, results, key):
+    barrier.wait(5)
+    results.put(cache._acquire_lock(key, 60))
+
+
+def _race_to_build(barrier, marker_dir, key):
+    def builder():
+        with open(os.path.join(marker_dir, f"build-{os.getpid()}"), "w"):
+            pass
+        time.sleep(0.3)
+        return "built"
+
+    barrier.wait(5)
+    with mock.patch.object(cache, "LOCK_POLL_INTERVAL", 0.05):
+        cache.get_or_build(key, builder, ttl=60)
+
+
+class FileLockTests(SimpleTestCase):
+    """FileBasedCache ustida worker'lar orasidagi lock (add() u yerda atomar emas)."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        override = override_settings(CACHES=_file_caches(os.path.join(self.tmp, "cache")))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.ctx = multiprocessing.get_context("fork")
+
+    def test_only_one_process_wins_a_simultaneous_race(self):
+        for attempt in range(5):
+            barrier, results = self.ctx.Barrier(6), self.ctx.Queue()
+            procs = [self.ctx.Process(target=_race_for_lock, args=(barrier, results, f"race{attempt}"))
+                     for _ in range(6)]
+            for p in procs:
+                p.start()
+            won = [results.get(timeout=10) for _ in procs]
+            for p in procs:
+                p.join(10)
+            self.assertEqual(won.count(True), 1, won)
+
+    def test_only_one_thread_wins(self):
+        barrier = threading.Barrier(8)
+        won = []
+
+        def race():
+            barrier.wait(5)
+            won.append(cache._acquire_lock("threads", 60))
+
+        threads = [threading.Thread(target=race) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(won.count(True), 1, won)
+
+    def test_concurrent_workers_build_once(self):
+        markers = os.path.join(self.tmp, "markers")
+        os.makedirs(markers)
+        barrier = self.ctx.Barrier(4)
+        procs = [self.ctx.Process(target=_race_to_build, args=(barrier, markers, "crawl")) for _ in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(20)
+        self.assertEqual([p.exitcode for p in procs], [0] * 4)
+        self.assertEqual(len(os.listdir(markers)), 1)
+        self.assertEqual(hemis_cache.get("crawl")["value"], "built")
+
+    def test_release_and_stale_lock(self):
+        self.assertTrue(cache._acquire_lock("k", 60))
+        self.assertFalse(cache._acquire_lock("k", 60))
+        cache._release_lock("k")
+        self.assertTrue(cache._acquire_lock("k", 60))
+
+        # egasi o‘lgan lock (lock_timeout dan eski) olib tashlanadi
+        path = cache._lock_path(cache._lock_dir(), "k")
+        old = time.time() - 120
+        os.utime(path, (old, old))
+        self.assertTrue(cache._acquire_lock("k", 60))
+        self.assertFalse(cache._acquire_lock("k", 60))
+        self.assertEqual([f for f in os.listdir(cache._lock_dir()) if f.endswith(".stale")], [])
+
+
+# -----------------------
+# ASYNC CLIENT
+# -----------------------
+class AsyncBuildClientTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 2, "groups": 20, "students": 400, "employees": 10}
+
+    def test_builds_on_one_loop_share_one_client(self):
+        opened = []
+
+        class RecordingClient(hemis_async.AsyncHemisClient):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                opened.append(self)
+
+        faculty_id = attendance_services.get_attendance_filter_options()["faculties"][0]["id"]
+
+        async def run():
+            for _ in range(2):
+                await async_services._abuild_faculty_table()
+            columns = await async_services._acollect_attendance_columns(faculty_id=faculty_id)
+            self.assertIs(hemis_async.get_async_client(), opened[0])
+            await hemis_async.aclose_async_client()
+            return columns
+
+        with mock.patch.object(hemis_async, "AsyncHemisClient", RecordingClient):
+            columns = async_to_sync(run)()
+
+        self.assertGreater(len(columns), 0)
+        self.assertEqual(len(opened), 1)
+        self.assertTrue(opened[0].client.is_closed)
+
+    def test_concurrency_limit_is_per_host_not_per_client(self):
+        async def run():
+            first, second = hemis_async.AsyncHemisClient(), hemis_async.AsyncHemisClient()
+            try:
+                return hemis_async.host_semaphore(first.host) is hemis_async.host_semaphore(second.host)
+            finally:
+                await first.aclose()
+                await second.aclose()
+
+        self.assertTrue(asyncio.run(run()))
+
+    def test_async_view_builds_on_the_request_loop(self):
+        with mock.patch.object(async_services, "get_async_client", wraps=hemis_async.get_async_client) as spy, \
+                mock.patch("asgiref.sync.AsyncToSync.__call__") as new_loop:
+            entry = asyncio.run(async_services.aget_faculty_table_entry())
+        new_loop.assert_not_called()
+        self.assertGreater(spy.call_count, 0)
+        self.assertIn("etag", entry)
+
+    def test_async_attendance_matches_sync_page(self):
+        faculty_id = attendance_services.get_attendance_filter_options()["faculties"][0]["id"]
+        with mock.patch("asgiref.sync.AsyncToSync.__call__") as new_loop:
+            page = asyncio.run(async_services.aget_attendance_stat(faculty_id=faculty_id, limit=10))
+        new_loop.assert_not_called()
+        self.assertEqual(page, attendance_services.get_attendance_stat(faculty_id=faculty_id, limit=10))
+        self.assertGreater(page["count"], 0)
+
+
+class AsyncGetOrBuildTests(CacheTestCase):
+    KEY = "test_async_entry"
+
+    def test_concurrent_misses_build_once(self):
+        calls = []
+
+        async def builder():
+            calls.append(threading.current_thread().name)
+            await asyncio.sleep(0.05)
+            return "new"
+
+        async def run():
+            return await asyncio.gather(*(aget_or_build(self.KEY, builder, ttl=60) for _ in range(5)))
+
+        loop_thread = threading.current_thread().name
+        entries = asyncio.run(run())
+        self.assertEqual({e["value"] for e in entries}, {"new"})
+        self.assertEqual(calls, [loop_thread])
+        self.assertIsNone(hemis_cache.get(cache._lock_key(self.KEY)))
+
+    def test_stale_entry_is_served_while_refresh_task_runs(self):
+        hemis_cache.set(self.KEY, {"value": "old", "built_at": time.time() - 120}, timeout=600)
+        calls = []
+
+        async def builder():
+            calls.append(1)
+            return "new"
+
+        async def run():
+            seen = [(await aget_or_build(self.KEY, builder, ttl=60, stale_ttl=600))["value"] for _ in range(3)]
+            # fon Task'i shu loop'da tugashini kutamiz
+            for _ in range(100):
+                if (await hemis_cache.aget(self.KEY))["value"] == "new":
+                    break
+                await asyncio.sleep(0.01)
+            return seen
+
+        self.assertEqual(asyncio.run(run()), ["old"] * 3)
+        self.assertEqual(calls, [1])
+        self.assertEqual(hemis_cache.get(self.KEY)["value"], "new")
+
+    def test_failed_build_is_not_cached_and_lock_is_released(self):
+        async def builder():
+            raise RuntimeError("HEMIS down")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(aget_or_build(self.KEY, builder, ttl=60))
+        self.assertIsNone(hemis_cache.get(self.KEY))
+        self.assertIsNone(hemis_cache.get(cache._lock_key(self.KEY)))
+
+
+# -----------------------
+# DEPARTMENT TREE
+# -----------------------
+class DepartmentTreeCountsTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 3, "groups": 30, "students": 900, "employees": 60}
+    URL = "/api/monitoring/department-tree/"
+
+    def setUp(self):
+        super().setUp()
+        get_department_tree_entry()
+
+    def test_cold_counts_do_not_block_on_crawls(self):
+        calls = HemisClient.request_count
+        with mock.patch.object(services, "build_in_background", return_value=True) as table_build, \
+                mock.patch.object(employee_services, "build_in_background", return_value=True) as crawl:
+            resp = self.client.get(self.URL, {"depth": 1})
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertIs(body["counts_pending"], True)
+        self.assertNotIn("employees_total", body["roots"][0])
+        self.assertEqual(HemisClient.request_count, calls)
+        self.assertEqual(table_build.call_args.args[0], services.FACULTY_TABLE_CACHE_KEY)
+        crawl.assert_called_once()
+
+    def test_counts_come_from_warm_cache(self):
+        employee_services.get_employee_dataset_entry(employee_type="all")
+        services.get_faculty_table_entry()
+        calls = HemisClient.request_count
+        body = self.client.get(self.URL).json()
+        self.assertEqual(HemisClient.request_count, calls)
+        self.assertNotIn("counts_pending", body)
+        self.assertEqual(sum(r["employees_total"] for r in body["roots"]), len(self.fake.employees))
+        self.assertGreater(sum(r["students_total"] for r in body["roots"]), 0)
+
+    def test_counts_can_be_skipped(self):
+        with mock.patch.object(services, "build_in_background") as table_build:
+            body = self.client.get(self.URL, {"counts": 0}).json()
+        table_build.assert_not_called()
+        self.assertNotIn("counts_pending", body)
+
+
+class DepartmentListFromTreeTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 3, "groups": 30, "students": 300, "employees": 30}
+    URL = "/api/monitoring/department-list/"
+
+    def test_pages_come_from_the_tree(self):
+        body = self.client.get(self.URL, {"limit": 2, "page": 2}).json()["data"]
+        self.assertEqual(len(body["items"]), 2)
+        self.assertEqual(body["pagination"]["currentPage"], 2)
+        self.assertEqual(body["pagination"]["pageCount"], -(-body["pagination"]["totalCount"] // 2))
+
+    def test_zero_limit_is_clamped(self):
+        resp = self.client.get(self.URL, {"limit": 0})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["data"]["pagination"]["perPage"], 1)
+
+    def test_non_numeric_params_are_bad_requests(self):
+        for params in ({"_parent": "abc"}, {"limit": "ten"}, {"page": "x"}):
+            with self.subTest(**params):
+                self.assertEqual(self.client.get(self.URL, params).status_code, 400)
+
+
+# -----------------------
+# EMPLOYEES
+# -----------------------
+class EmployeeQueryTests(CacheTestCase):
+    URL = "/api/monitoring/employee-list/"
+
+    def _cache_dataset(self, department_id: int, items: list[dict]) -> None:
+        key = employee_services._dataset_key("teacher", department_id)
+        hemis_cache.set(key, {"value": items, "built_at": time.time()})
+
+    def test_department_dataset_keeps_child_units(self):
+        self._cache_dataset(5, [
+            {"id": 1, "full_name": "Aliyev Anvar", "department": {"id": 5}},
+            {"id": 2, "full_name": "Karimova Dilnoza", "department": {"id": 51}},
+        ])
+        value = employee_services.query_employees(department_id=5)["value"]
+        self.assertEqual([i["id"] for i in value["items"]], [1, 2])
+        self.assertEqual(value["pagination"]["totalCount"], 2)
+
+    def test_search_with_bad_numbers_is_a_bad_request(self):
+        for params in ({"_department": "x"}, {"page": "one"}, {"limit": "ten"}):
+            with self.subTest(**params):
+                resp = self.client.get(self.URL, {"search": "ali", **params})
+                self.assertEqual(resp.status_code, 400)
+
+    def test_unknown_type_is_a_bad_request(self):
+        resp = self.client.get(self.URL, {"search": "ali", "type": "student"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json(), {"error": "Unknown employee type: student"})
+
+
+# -----------------------
+# SEARCH INDEX
+# -----------------------
+def _attendance_row(entity: str, group: str = "AT-21", absent: int = 4, **extra) -> dict:
+    row = {
+        "student_id": 0, "entity": entity, "specialty": "Axborot texnologiyalari", "education_form": "Kunduzgi",
+        "group": group, "semester": "-", "subjects": 5, "lessons": 40,
+        "absent_on": absent, "absent_off": 0, "total_absent": absent, "total_percent": absent * 2.5,
+    }
+    row.update(extra)
+    return row
+
+
+def _columns(rows: list[dict]) -> AttendanceColumns:
+    columns = AttendanceColumns()
+    for row in rows:
+        columns.append(row)
+    return columns
+
+
+class SearchNormalizationTests(SimpleTestCase):
+    def test_cyrillic_and_latin_give_same_tokens(self):
+        self.assertEqual(search_index.tokenize("Шоира Чориева"), ["shoira", "choriyeva"])
+        self.assertEqual(search_index.tokenize("Shoira Choriyeva"), ["shoira", "choriyeva"])
+        self.assertEqual(search_index.tokenize("Евгений"), ["yevgeniy"])
+
+    def test_apostrophe_variants_are_dropped(self):
+        variants = ["G‘ulomov O‘tkir", "G'ulomov O'tkir", "Gʻulomov Oʻtkir", "G`ulomov O`tkir", "Ғуломов Ўткир"]
+        for value in variants:
+            with self.subTest(value=value):
+                self.assertEqual(search_index.tokenize(value), ["gulomov", "otkir"])
+
+    def test_query_matches_exact_prefix_and_typo(self):
+        index = search_index.SearchIndex(key=lambda r: r["id"], text=lambda r: r["name"])
+        index.update([{"id": 1, "name": "Aliyev Jasur"}, {"id": 2, "name": "Karimova Dilnoza"}])
+        self.assertEqual([r["id"] for r in index.ranked("jasur aliyev")], [1])
+        self.assertEqual([r["id"] for r in index.ranked("Кари")], [2])
+        self.assertEqual([r["id"] for r in index.ranked("karimovva")], [2])
+        # barcha tokenlar mos kelishi kerak (AND)
+        self.assertEqual(index.ranked("aliyev dilnoza"), [])
+
+    def test_update_reindexes_only_changed_items(self):
+        index = search_index.SearchIndex(key=lambda r: r["id"], text=lambda r: r["name"])
+        index.update([{"id": 1, "name": "Aliyev Jasur"}, {"id": 2, "name": "Karimova Dilnoza"}])
+        stats = index.update([{"id": 2, "name": "Karimova Dilnoza"}, {"id": 3, "name": "Rahimov Bobur"},
+                              {"id": 1, "name": "Aliyev Sardor"}])
+        self.assertEqual(stats, {"added": 1, "changed": 1, "removed": 0})
+        self.assertEqual(index.ranked("jasur"), [])
+        self.assertEqual([r["id"] for r in index.ranked("sardor")], [1])
+        self.assertEqual(index.update([{"id": 3, "name": "Rahimov Bobur"}])["removed"], 2)
+        self.assertEqual(len(index), 1)
+
+
+class AttendanceSearchTests(CacheTestCase):
+    QUERY = {
+        "faculty_id": 1, "education_type_id": None, "education_form_id": None,
+        "semester_id": None, "order": "total_absent",
+    }
+
+    def _search(self, rows: list[dict], search: str, offset: int = 0, limit: int = 50):
+        return attendance_services._search_result_set(
+            {**self.QUERY, "search": search}, offset, limit, lambda **kw: _columns(rows), False
+        )
+
+    def test_namesakes_in_one_group_are_not_collapsed(self):
+        rows = [
+            _attendance_row("Aliyev Jasur", absent=9),
+            _attendance_row("Aliyev Jasur", absent=3),
+            _attendance_row("Aliyev Jasur", group="AT-22", absent=5),
+            _attendance_row("Karimov Bobur", absent=7),
+        ]
+        found, count = self._search(rows, "aliyev jasur")
+        self.assertEqual(count, 3)
+        self.assertEqual([(r["group"], r["total_absent"]) for r in found], [("AT-21", 9), ("AT-22", 5), ("AT-21", 3)])
+
+    def test_search_pages_follow_base_order(self):
+        rows = [_attendance_row(f"Aliyev Talaba{i}", absent=i) for i in range(1, 8)]
+        rows.append(_attendance_row("Karimov Bobur", absent=100))
+        first, count = self._search(rows, "Алиев", limit=4)
+        second, _ = self._search(rows, "Алиев", offset=4, limit=4)
+        self.assertEqual(count, 7)
+        self.assertEqual([r["total_absent"] for r in first + second], [7, 6, 5, 4, 3, 2, 1])
+
+
+# -----------------------
+# FACULTY CATALOG
+# -----------------------
+class FacultyCatalogTests(FakeHemisTestCase):
+    FACULTY_ID = 100
+
+    def _expected_groups(self, form_id=None, type_id=None) -> list[int]:
+        curricula = {
+            c["id"] for c in self.fake.curricula
+            if c["department"]["id"] == self.FACULTY_ID
+            and (form_id is None or int(c["educationForm"]["code"]) == form_id)
+            and (type_id is None or c["specialty"]["educationType"]["id"] == type_id)
+        }
+        return sorted(g["id"] for g in self.fake.groups if g["_curriculum"] in curricula)
+
+    def test_select_groups_filters_by_form_and_type(self):
+        catalog = get_faculty_catalog(self.FACULTY_ID)
+        cases = [(None, None), (11, None), (None, 12), (11, 11), (13, 12)]
+        for form_id, type_id in cases:
+            with self.subTest(form=form_id, type=type_id):
+                groups = catalog.select_groups(education_form_id=form_id, education_type_id=type_id)
+                self.assertEqual(sorted(g["id"] for g in groups), self._expected_groups(form_id, type_id))
+        self.assertEqual(catalog.select_groups(education_form_id=99), [])
+
+    def test_curriculum_map_matches_selected_curricula(self):
+        catalog = get_faculty_catalog(self.FACULTY_ID)
+        mapping = catalog.curriculum_map(education_form_id=11, education_type_id=11)
+        expected = {
+            c["id"]: {"specialty": c["specialty"]["name"], "form": c["educationForm"]["name"]}
+            for c in self.fake.curricula
+            if c["department"]["id"] == self.FACULTY_ID
+            and c["educationForm"]["code"] == "11" and c["specialty"]["educationType"]["id"] == 11
+        }
+        self.assertTrue(expected)
+        self.assertEqual(mapping, expected)
+        self.assertEqual(set(catalog.curriculum_map()), set(catalog.curricula))
+
+    def test_catalog_is_cached_until_source_counts_change(self):
+        get_faculty_catalog(self.FACULTY_ID)
+        self.fake.reset_stats()
+        get_faculty_catalog(self.FACULTY_ID)
+        self.assertEqual(self.fake.stats()["total"], 0)
+
+        # Staleness tekshiruvi: totalCount o‘zgarsa katalog qayta quriladi
+        hemis_cache.delete(f"faculty_catalog_v1:{self.FACULTY_ID}:checked")
+        group = dict(self.fake.groups[0], id=len(self.fake.groups) + 1)
+        self.fake.groups.append(group)
+        catalog = get_faculty_catalog(self.FACULTY_ID)
+        self.assertIn(group["id"], [g["id"] for g in catalog.select_groups()])
+
+
+# -----------------------
+# ATTENDANCE GROUP CACHE
+# -----------------------
+class AttendanceGroupCacheTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 2, "groups": 30, "students": 1000, "employees": 10}
+
+    def test_semesters_share_group_cache_and_label_on_read(self):
+        faculty_id = attendance_services.get_attendance_filter_options()["faculties"][0]["id"]
+        with mock.patch.object(HemisClient, "get_attendance_stat", autospec=True,
+                               side_effect=HemisClient.get_attendance_stat) as stat:
+            plain = attendance_services._collect_attendance_columns(faculty_id=faculty_id)
+            fetched = stat.call_count
+            labelled = attendance_services._collect_attendance_columns(faculty_id=faculty_id, semester_id=3)
+
+        self.assertGreater(fetched, 0)
+        self.assertEqual(stat.call_count, fetched)
+        self.assertEqual({r["semester"] for r in plain.iter_rows()}, {"-"})
+        self.assertEqual({r["semester"] for r in labelled.iter_rows()}, {"3"})
+        self.assertEqual([r["entity"] for r in labelled.iter_rows()], [r["entity"] for r in plain.iter_rows()])
+        self.assertEqual(labelled.sum("total_absent"), plain.sum("total_absent"))
+
+    def test_async_collect_uses_same_entries(self):
+        faculty_id = attendance_services.get_attendance_filter_options()["faculties"][0]["id"]
+        sync_columns = attendance_services._collect_attendance_columns(faculty_id=faculty_id, semester_id=5)
+        with mock.patch.object(hemis_async.AsyncHemisClient, "get_attendance_stat") as stat:
+            columns = async_to_sync(async_services._acollect_attendance_columns)(faculty_id=faculty_id, semester_id=5)
+        stat.assert_not_called()
+        self.assertEqual(list(columns.iter_rows()), list(sync_columns.iter_rows()))
+
+    def test_label_does_not_touch_cached_columns(self):
+        columns = _columns([_attendance_row("Aliyev Jasur"), _attendance_row("Karimov Bobur", group="AT-22")])
+        labelled = columns.with_label("semester", "2")
+        self.assertEqual([r["semester"] for r in labelled.iter_rows()], ["2", "2"])
+        self.assertEqual([r["semester"] for r in columns.iter_rows()], ["-", "-"])
+        self.assertEqual([r["group"] for r in labelled.iter_rows()], ["AT-21", "AT-22"])
+
+
+# -----------------------
+# ATTENDANCE CURSORS
+# -----------------------
+@override_settings(HEMIS_ATTENDANCE_CURSOR_MAX_AGE=600)
+class AttendanceCursorTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 2, "groups": 40, "students": 1500, "employees": 10}
+    URL = "/api/monitoring/attendance/stat/"
+    CHUNK = 7
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(attendance_services, "RESULT_SET_CHUNK_SIZE", self.CHUNK)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.faculty_id = attendance_services.get_attendance_filter_options()["faculties"][0]["id"]
+
+    def _get(self, **params):
+        return self.client.get(f"{self.URL}?{urlencode(params)}")
+
+    def _walk(self, **params) -> list[dict]:
+        resp = self._get(**params)
+        pages = [resp.json()]
+        while pages[-1]["next_cursor"]:
+            resp = self._get(cursor=pages[-1]["next_cursor"])
+            self.assertEqual(resp.status_code, 200)
+            pages.append(resp.json())
+        return pages
+
+    def test_page_and_limit_must_be_positive(self):
+        for url in (self.URL, "/api/monitoring/async/attendance/stat/"):
+            for params in ({"page": 0}, {"page": -1}, {"limit": 0}, {"limit": -5}):
+                with self.subTest(url=url, **params):
+                    resp = self.client.get(url, {"faculty_id": self.faculty_id, **params})
+                    self.assertEqual(resp.status_code, 400)
+                    self.assertIn("must be >= 1", resp.json()["error"])
+
+    def test_limit_is_capped(self):
+        with mock.patch.object(attendance_services, "ATTENDANCE_MAX_LIMIT", 5):
+            body = self._get(faculty_id=self.faculty_id, limit=10000).json()
+        self.assertEqual(len(body["rows"]), 5)
+        self.assertEqual(attendance_services.decode_attendance_cursor(body["next_cursor"])[1:], (5, 5))
+
+    def test_cursor_round_trip(self):
+        query, offset, limit = {"faculty_id": 1, "order": "percent", "search": "ali"}, 15, 5
+        cursor = attendance_services._make_cursor(query, offset, limit)
+        self.assertEqual(attendance_services.decode_attendance_cursor(cursor), (query, offset, limit))
+
+    def test_pages_are_stable_across_chunk_boundaries(self):
+        full = self._get(faculty_id=self.faculty_id, limit=10000).json()
+        self.assertGreater(full["count"], 3 * self.CHUNK)
+
+        # limit=5, bo‘lak=7: sahifalar bo‘lak chegarasini kesib o‘tadi
+        pages = self._walk(faculty_id=self.faculty_id, limit=5)
+        self.assertEqual([r for p in pages for r in p["rows"]], full["rows"])
+        self.assertEqual({p["count"] for p in pages}, {full["count"]})
+        self.assertTrue(all(len(p["rows"]) == 5 for p in pages[:-1]))
+
+        # prev_cursor oldingi sahifani aynan qaytaradi
+        back = self._get(cursor=pages[3]["prev_cursor"]).json()
+        self.assertEqual(back["rows"], pages[2]["rows"])
+
+    def test_result_set_rebuilt_when_chunks_evicted(self):
+        first = self._get(faculty_id=self.faculty_id, limit=5).json()
+        second = self._get(cursor=first["next_cursor"]).json()
+        meta_key, _meta = attendance_services._result_set_meta(
+            attendance_services.decode_attendance_cursor(first["next_cursor"])[0]
+        )
+        hemis_cache.delete(f"{meta_key}:0")
+        again = self._get(cursor=first["next_cursor"]).json()
+        self.assertEqual(again["rows"], second["rows"])
+
+    def test_tampered_cursor_is_rejected(self):
+        cursor = self._get(faculty_id=self.faculty_id, limit=5).json()["next_cursor"]
+        payload, signature = cursor.rsplit(":", 1)
+        for bad in (f"{payload}:{signature[:-1]}x", f"x{cursor}", "garbage"):
+            with self.subTest(cursor=bad):
+                resp = self._get(cursor=bad)
+                self.assertEqual(resp.status_code, 400)
+                self.assertEqual(resp.json(), {"error": "Invalid cursor"})
+
+    def test_cursor_signed_elsewhere_is_rejected(self):
+        query = {"faculty_id": self.faculty_id, "education_type_id": None, "education_form_id": None,
+                 "semester_id": None, "order": "total_absent"}
+        forged = signing.dumps({"q": query, "o": 0, "l": 5}, salt="other", compress=True)
+        self.assertEqual(self._get(cursor=forged).status_code, 400)
+
+    def test_expired_cursor_is_rejected(self):
+        query = {"faculty_id": self.faculty_id, "education_type_id": None, "education_form_id": None,
+                 "semester_id": None, "order": "total_absent"}
+        with mock.patch("django.core.signing.time.time", return_value=time.time() - 601):
+            cursor = attendance_services._make_cursor(query, 5, 5)
+        resp = self._get(cursor=cursor)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json(), {"error": "Cursor expired"})
+
+
+# -----------------------
+# ATTENDANCE EXPORT
+# -----------------------
+class AttendanceExportTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 2, "groups": 30, "students": 900, "employees": 10}
+    URL = "/api/monitoring/attendance/export/"
+    FIELDS = attendance_services.ATTENDANCE_EXPORT_FIELDS
+
+    def setUp(self):
+        super().setUp()
+        self.faculty_id = attendance_services.get_attendance_filter_options()["faculties"][0]["id"]
+        self.groups, _c_map = attendance_services._resolve_target_groups(self.faculty_id, None, None)
+        # to‘liq ro‘yxat (guruhlar tugash tartibida keladi - saralab solishtiriladi)
+        columns = attendance_services._collect_attendance_columns(faculty_id=self.faculty_id)
+        self.expected = [[r[f] for f in self.FIELDS] for r in columns.iter_rows()]
+        self.assertGreater(len(self.expected), 0)
+        hemis_cache.clear()
+
+    def _export(self, fmt: str):
+        resp = self.client.get(self.URL, {"faculty_id": self.faculty_id, "export_format": fmt})
+        self.assertEqual(resp.status_code, 200)
+        return resp, b"".join(resp.streaming_content).decode("utf-8")
+
+    def _failing_group(self):
+        failing = self.groups[-1]["id"]
+        original = HemisClient.get_attendance_stat
+
+        def flaky(client, params=None):
+            if params and params.get("_group") == failing:
+                raise ConnectionError("HEMIS reset")
+            return original(client, params=params)
+
+        return failing, mock.patch.object(HemisClient, "get_attendance_stat", flaky)
+
+    def test_csv_body_and_headers(self):
+        resp, body = self._export("csv")
+        self.assertEqual(resp["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(resp["Content-Disposition"], f'attachment; filename="attendance_{self.faculty_id}.csv"')
+        self.assertTrue(body.startswith("\ufeff"))
+        lines = list(csv.reader(io.StringIO(body[1:])))
+        self.assertEqual(lines[0], self.FIELDS)
+        # CSV'da hamma qiymat satr, None - bo‘sh
+        expected = [["" if v is None else str(v) for v in row] for row in self.expected]
+        self.assertEqual(sorted(lines[1:]), sorted(expected))
+
+    def test_ndjson_body_and_headers(self):
+        resp, body = self._export("ndjson")
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson; charset=utf-8")
+        self.assertEqual(resp["Content-Disposition"], f'attachment; filename="attendance_{self.faculty_id}.ndjson"')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertTrue(all(list(r) == self.FIELDS for r in rows))
+        self.assertEqual(sorted([list(r.values()) for r in rows], key=repr), sorted(self.expected, key=repr))
+
+    def test_failed_group_ends_with_error_trailer(self):
+        failing, patcher = self._failing_group()
+        with patcher:
+            _resp, ndjson = self._export("ndjson")
+        hemis_cache.clear()
+        with patcher:
+            _resp, text = self._export("csv")
+
+        trailer = f"1 group(s) could not be loaded: {failing}"
+        self.assertEqual(json.loads(ndjson.splitlines()[-1]), {"error": trailer})
+        self.assertEqual(list(csv.reader(io.StringIO(text)))[-1], [f"# error: {trailer}"])
+
+    def test_error_mid_stream_ends_with_error_line(self):
+        original_set = hemis_cache.set
+        calls = []
+
+        def failing_set(key, *args, **kwargs):
+            # birinchi guruh yoziladi, keyingisida kesh "uziladi"
+            if key.startswith("attendance_group_"):
+                calls.append(key)
+                if len(calls) == 2:
+                    raise OSError("cache unavailable")
+            return original_set(key, *args, **kwargs)
+
+        with mock.patch.object(hemis_cache, "set", failing_set):
+            _resp, body = self._export("ndjson")
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(lines[-1], {"error": "cache unavailable"})
+        self.assertTrue(all("error" not in r for r in lines[:-1]))
+        self.assertLess(len(lines) - 1, len(self.expected))
+
+
+# -----------------------
+# ATTENDANCE RISK (top-K)
+# -----------------------
+class AttendanceRiskTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 3, "groups": 600, "students": 12000, "employees": 30}
+    MAX_WORKERS = 4
+    URL = "/api/monitoring/attendance/risk/"
+
+    def _top(self, **kwargs) -> dict:
+        return attendance_services._build_risk(attendance_services._risk_query(**kwargs), False)
+
+    def _all_rows(self) -> list[dict]:
+        rows = []
+        for fac in attendance_services.get_attendance_filter_options()["faculties"]:
+            groups, c_map = attendance_services._resolve_target_groups(fac["id"], None, None)
+            for _grp, columns in attendance_services._iter_group_rows(HemisClient(), groups, c_map, None):
+                rows.extend({**r, "faculty_id": fac["id"], "faculty": fac["name"]} for r in columns.iter_rows())
+        return rows
+
+    def test_top_k_matches_full_sort_over_many_groups(self):
+        for order in attendance_services.RISK_ORDERS:
+            with self.subTest(order=order):
+                top = self._top(order=order, k=25)
+                expected = sorted(
+                    (r for r in self._all_rows() if r["total_absent"] >= 1),
+                    key=attendance_services.ATTENDANCE_ORDERINGS[order],
+                )[:25]
+                self.assertEqual(top["rows"], expected)
+                self.assertEqual(top["scanned_groups"], 600)
+
+    def test_in_flight_groups_are_bounded(self):
+        """Iste'molchi sekin bo‘lsa ham HEMIS dan olingan, lekin berilmagan guruhlar oynadan oshmaydi."""
+        calls = []
+        consumed = []
+        original_fetch = HemisClient.get_attendance_stat
+        original_iter = attendance_services._iter_group_rows
+
+        def counting_fetch(client, *args, **kwargs):
+            calls.append(1)
+            return original_fetch(client, *args, **kwargs)
+
+        def bounded_iter(*args, **kwargs):
+            kwargs["max_workers"] = self.MAX_WORKERS
+            for item in original_iter(*args, **kwargs):
+                consumed.append(1)
+                self.assertLessEqual(len(calls) - len(consumed), self.MAX_WORKERS * 2)
+                yield item
+
+        with mock.patch.object(HemisClient, "get_attendance_stat", counting_fetch), \
+                mock.patch.object(attendance_services, "_iter_group_rows", bounded_iter):
+            top = self._top(k=10)
+
+        self.assertEqual(len(top["rows"]), 10)
+        self.assertEqual(len(consumed), 600)
+        self.assertEqual(len(calls), 600)
+
+    def test_university_scan_runs_in_background_with_one_queue(self):
+        queues = []
+        original_iter = attendance_services._iter_group_rows
+
+        def recording_iter(client, groups, *args, **kwargs):
+            queues.append(len(groups))
+            return original_iter(client, groups, *args, **kwargs)
+
+        with mock.patch.object(attendance_services, "_iter_group_rows", recording_iter):
+            resp = self.client.get(self.URL, {"k": 10})
+            self.assertEqual(resp.status_code, 202)
+            self.assertEqual(resp.json()["status"], "running")
+            self.assertIn(resp.json()["progress"]["status"], ("queued", "catalog", "groups", "done"))
+            self.assertTrue(_wait_for(lambda: self.client.get(self.URL, {"k": 10}).status_code == 200, timeout=30))
+
+        body = self.client.get(self.URL, {"k": 10}).json()
+        self.assertEqual(body["rows"], self._top(k=10)["rows"])
+        # barcha fakultet guruhlari bitta navbatda
+        self.assertEqual(queues, [600])
+
+    def test_faculty_scan_is_served_in_the_request(self):
+        faculty_id = attendance_services.get_attendance_filter_options()["faculties"][0]["id"]
+        resp = self.client.get(self.URL, {"k": 5, "faculty_id": faculty_id})
+        self.assertEqual(resp.status_code, 200)
+        rows = resp.json()["rows"]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual({r["faculty_id"] for r in rows}, {faculty_id})
+        # qator kaliti (frontend) - talaba id + guruh
+        self.assertTrue(all(r["student_id"] for r in rows))
+
+
+# -----------------------
+# UNIVERSITY ROLLUP
+# -----------------------
+class UniversityRollupTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 3, "groups": 150, "students": 3000, "employees": 30}
+
+    def test_hemis_calls_are_counted_per_build(self):
+        # fakultetlar ro‘yxati oldindan keshga - build faqat kataloglar va guruhlarni so‘raydi
+        attendance_services.get_attendance_filter_options()
+        stop = threading.Event()
+
+        def other_traffic():
+            client = HemisClient()
+            while not stop.is_set():
+                client.get_education_forms()
+
+        noise = threading.Thread(target=other_traffic)
+        noise.start()
+        try:
+            value = rollup.build_university_rollup()
+        finally:
+            stop.set()
+            noise.join()
+
+        progress = rollup.get_rollup_progress()
+        self.assertEqual(progress["status"], "done")
+        # 3 fakultet x (curriculum-list + group-list) + 150 guruh
+        self.assertEqual(progress["hemis_calls"], 3 * 2 + 150)
+        self.assertEqual(value["groups"], {"total": 150, "loaded": 150, "failed": 0})
+        self.assertEqual(value["totals"]["groups"], 150)
+        self.assertEqual(sum(f["total_absent"] for f in value["faculties"]), value["totals"]["total_absent"])
+
+
+# -----------------------
+# ATTENDANCE WAREHOUSE
+# -----------------------
+def _fact_item(student_id: int, *, absent_on: int = 2, absent_off: int = 0, **extra) -> dict:
+    return {
+        "student": {"id": student_id, "full_name": f"Talaba {student_id}"},
+        "subjects": 6, "lessons": 120, "absent_on": absent_on, "absent_off": absent_off,
+        "total_percent": round((absent_on + absent_off) * 100 / 120, 2),
+        **extra,
+    }
+
+
+class WarehouseParseTests(SimpleTestCase):
+    GROUP = {"id": 7, "name": "G-7", "_curriculum": 3}
+
+    def _semester_of(self, item: dict, semester=5):
+        facts = warehouse._parse_facts([item], self.GROUP, {}, "F", semester)
+        return facts["1"]["semester"]
+
+    def test_semester_from_item_code(self):
+        self.assertEqual(self._semester_of(_fact_item(1, semester={"code": "13", "name": "3-semestr"})), 13)
+
+    def test_semester_falls_back_to_argument(self):
+        self.assertEqual(self._semester_of(_fact_item(1)), 5)
+        self.assertEqual(self._semester_of(_fact_item(1, semester=None)), 5)
+        self.assertEqual(self._semester_of(_fact_item(1, semester={"name": "3-semestr"})), 5)
+        self.assertEqual(self._semester_of(_fact_item(1, semester={"code": ""})), 5)
+        self.assertIsNone(self._semester_of(_fact_item(1), semester=None))
+
+
+class WarehouseSyncTests(FakeHemisTestCase, TestCase):
+    FAKE_OPTIONS = {"faculties": 1, "groups": 12, "students": 300, "employees": 10}
+    DAY1, DAY2, DAY3 = date(2026, 3, 2), date(2026, 3, 3), date(2026, 3, 4)
+
+    def setUp(self):
+        super().setUp()
+        self.faculty_id = self.fake.faculties[0]["id"]
+        # Sinxronlash faqat faol (status 11) talabalarni oladi
+        self.active = [st for st in self.fake.students if st["studentStatus"]["code"] == "11"]
+
+    def _sync(self, day: date) -> dict:
+        with mock.patch.object(warehouse.timezone, "localdate", return_value=day):
+            return warehouse.sync_faculty_attendance(self.faculty_id, semester=3)
+
+    def _fact_writes(self, queries) -> list[str]:
+        table = AttendanceFact._meta.db_table
+        return [q["sql"] for q in queries if table in q["sql"] and not q["sql"].lstrip().upper().startswith("SELECT")]
+
+    def test_unchanged_sync_writes_no_facts(self):
+        first = self._sync(self.DAY1)
+        self.assertEqual(first["inserted"], len(self.active))
+        with CaptureQueriesContext(connection) as ctx:
+            second = self._sync(self.DAY2)
+        self.assertEqual(self._fact_writes(ctx.captured_queries), [])
+        self.assertEqual(second["unchanged"], len(self.active))
+        self.assertEqual(set(AttendanceGroupSync.objects.values_list("last_seen", flat=True)), {self.DAY2})
+        self.assertEqual(warehouse.attendance_report(faculty_id=self.faculty_id)["synced_until"], "2026-03-03")
+        # Joriy qatorlar last_seen gacha amal qiladi (period_end qayta yozilmagan)
+        report = warehouse.attendance_report(group_by="semester", as_of=self.DAY2)
+        self.assertEqual(report["rows"][0]["students"], len(self.active))
+        self.assertEqual(report["rows"][0]["semester"], 3)
+
+    def test_changed_fact_is_versioned_and_same_day_update_is_batched(self):
+        self._sync(self.DAY1)
+        student = self.active[0]
+        original = dict(self.fake.attendance[student["id"]])
+        self.fake.attendance[student["id"]].update(absent_on=original["absent_on"] + 10)
+
+        stats = self._sync(self.DAY3)
+        self.assertEqual((stats["closed"], stats["inserted"]), (1, 1))
+
+        # Bugun ochilgan qator bugun yana o‘zgarsa - joyida, bitta bulk_update bilan
+        self.fake.attendance[student["id"]].update(absent_on=original["absent_on"] + 20)
+        with CaptureQueriesContext(connection) as ctx:
+            stats = self._sync(self.DAY3)
+        self.assertEqual((stats["updated"], stats["closed"], stats["inserted"]), (1, 0, 0))
+        self.assertEqual(len(self._fact_writes(ctx.captured_queries)), 1)
+
+        key = str(student["id"])
+        history = list(AttendanceFact.objects.filter(student_key=key).order_by("period_start")
+                       .values_list("absent_on", "period_start", "period_end", "is_current"))
+        self.assertEqual(history, [
+            (original["absent_on"], self.DAY1, date(2026, 3, 3), False),
+            (original["absent_on"] + 20, self.DAY3, self.DAY3, True),
+        ])
+
+        def absent_on_at(day):
+            rows = warehouse.attendance_report(group_by="faculty", as_of=day)["rows"]
+            return rows[0]["absent_on"]
+
+        self.assertEqual(absent_on_at(self.DAY3) - absent_on_at(self.DAY2), 20)
+
+
+# -----------------------
+# CONTINGENT SNAPSHOTS
+# -----------------------
+FORM_NAMES = {"11": "Kunduzgi", "13": "Sirtqi"}
+FACULTY_NAMES = {100: "1-fakultet", 101: "2-fakultet"}
+
+
+def _contingent_table(counts: dict[int, dict[str, int]]) -> dict:
+    """{faculty_id: {form_id: son}} -> get_faculty_table_data() shaklidagi jadval."""
+    by_form: dict[str, int] = {}
+    rows = []
+    for fac_id, values in counts.items():
+        for form_id, count in values.items():
+            by_form[form_id] = by_form.get(form_id, 0) + count
+        rows.append({"faculty_id": fac_id, "faculty_name": FACULTY_NAMES[fac_id], "values": values,
+                     "total": sum(values.values())})
+    return {
+        "columns": [{"id": int(i), "name": n} for i, n in FORM_NAMES.items()],
+        "rows": rows,
+        "totals": {"by_form": by_form, "grand_total": sum(by_form.values())},
+    }
+
+
+def _epoch(*args) -> float:
+    return datetime(*args, tzinfo=dt_timezone.utc).timestamp()
+
+
+@override_settings(HEMIS_SNAPSHOT_MIN_INTERVAL=3600)
+class ContingentSnapshotTests(TestCase):
+    def test_min_interval_and_backfill(self):
+        table = _contingent_table({100: {"11": 5, "13": 0}})
+        first = save_contingent_snapshot(table, _epoch(2026, 3, 2, 10))
+        self.assertEqual(first.grand_total, 5)
+        self.assertEqual(list(first.cells.values_list("faculty_id", "form_id", "count")), [(100, "11", 5)])
+        self.assertEqual(first.forms, FORM_NAMES)
+
+        self.assertIsNone(save_contingent_snapshot(table, _epoch(2026, 3, 2, 10, 30)))
+        self.assertIsNotNone(save_contingent_snapshot(table, _epoch(2026, 3, 2, 11)))
+        # Oxirgidan oldingi vaqt (orqaga to‘ldirish) interval bilan cheklanmaydi
+        self.assertIsNotNone(save_contingent_snapshot(table, _epoch(2026, 3, 1, 10)))
+        self.assertEqual(ContingentSnapshot.objects.count(), 3)
+
+    @override_settings(HEMIS_SNAPSHOT_MIN_INTERVAL=0)
+    def test_same_built_at_is_saved_once(self):
+        table = _contingent_table({100: {"11": 5}})
+        self.assertIsNotNone(save_contingent_snapshot(table, _epoch(2026, 3, 2, 10)))
+        self.assertIsNone(save_contingent_snapshot(_contingent_table({100: {"11": 6}}), _epoch(2026, 3, 2, 10)))
+        self.assertEqual(ContingentSnapshot.objects.get().grand_total, 5)
+
+    def _history(self):
+        save_contingent_snapshot(_contingent_table({100: {"11": 5}}), _epoch(2026, 3, 2, 8))
+        save_contingent_snapshot(_contingent_table({100: {"11": 7}}), _epoch(2026, 3, 2, 15))
+        save_contingent_snapshot(_contingent_table({100: {"11": 9}, 101: {"13": 3}}), _epoch(2026, 3, 3, 9))
+
+    def test_trend_uses_last_snapshot_of_each_bucket(self):
+        self._history()
+        daily = contingent_trend(days=0)
+        self.assertEqual([(p["date"], p["total"]) for p in daily["series"][0]["points"]],
+                         [("2026-03-02", 7), ("2026-03-03", 12)])
+        # 2-3 mart - bir hafta (dushanbadan)
+        weekly = contingent_trend(period="week", days=0)
+        self.assertEqual([(p["date"], p["total"]) for p in weekly["series"][0]["points"]], [("2026-03-02", 12)])
+
+    def test_trend_split_and_filters(self):
+        self._history()
+        by_faculty = contingent_trend(split="faculty", days=0)["series"]
+        self.assertEqual([(s["key"], s["name"], [p["total"] for p in s["points"]]) for s in by_faculty],
+                         [("100", "1-fakultet", [7, 9]), ("101", "2-fakultet", [0, 3])])
+        only_form = contingent_trend(form_id="13", days=0)["series"]
+        self.assertEqual([p["total"] for p in only_form[0]["points"]], [0, 3])
+        with self.assertRaises(ValueError):
+            contingent_trend(period="month")
+        with self.assertRaises(ValueError):
+            contingent_trend(split="group")
+
+    def test_diff_against_previous_snapshot(self):
+        self.assertIsNone(diff_against_last_snapshot(_contingent_table({100: {"11": 5}}), _epoch(2026, 3, 2, 8)))
+        self._history()
+        live = _contingent_table({100: {"11": 4}, 101: {"13": 6}})
+        diff = diff_against_last_snapshot(live, _epoch(2026, 3, 4, 9))
+        self.assertEqual(diff["grand_total"], {"current": 10, "previous": 12, "delta": -2})
+        self.assertEqual([(f["id"], f["previous"], f["delta"]) for f in diff["faculties"]],
+                         [("100", 9, -5), ("101", 3, 3)])
+        self.assertEqual([(f["name"], f["delta"]) for f in diff["forms"]], [("Kunduzgi", -5), ("Sirtqi", 3)])
+        # Jadvalning o‘z nusxasi emas - undan oldingisi bilan solishtiriladi
+        own = diff_against_last_snapshot(live, _epoch(2026, 3, 3, 9))
+        self.assertEqual(own["grand_total"]["previous"], 7)
+
+
+# -----------------------
+# TRACES
+# -----------------------
+class TraceAccessTests(FakeHemisTestCase, TestCase):
+    FAKE_OPTIONS = {"faculties": 2, "groups": 10, "students": 200, "employees": 10}
+    URL = "/api/monitoring/faculty-table-data/"
+
+    def _traced_get(self):
+        return self.client.get(self.URL, HTTP_X_HEMIS_TRACE="1")
+
+    def test_trace_header_is_off_by_default(self):
+        self.assertFalse(settings.HEMIS_TRACE_HEADER_ENABLED)
+        self.assertNotIn("X-Hemis-Trace-Id", self._traced_get())
+
+    @override_settings(HEMIS_TRACE_HEADER_ENABLED=True)
+    def test_trace_endpoints_are_admin_only(self):
+        trace_id = self._traced_get()["X-Hemis-Trace-Id"]
+        urls = ("/api/monitoring/traces/", f"/api/monitoring/traces/{trace_id}/")
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(User.objects.create_user("teacher", password="x"))
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        items = self.client.get(urls[0]).json()["items"]
+        self.assertEqual(items[0]["id"], trace_id)
+        detail = self.client.get(urls[1]).json()
+        self.assertEqual(detail["path"], self.URL)
+        self.assertGreater(len(detail["calls"]), 0)
+        self.assertEqual(self.client.get("/api/monitoring/traces/missing/").status_code, 404)
+
+
+# -----------------------
+# METRICS
+# -----------------------
+class MetricsViewTests(FakeHemisTestCase):
+    FAKE_OPTIONS = {"faculties": 2, "groups": 10, "students": 200, "employees": 10}
+
+    def scrape(self) -> dict[str, float]:
+        response = self.client.get("/api/monitoring/metrics/")
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if line and not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_exposition_has_help_and_type_for_every_metric(self):
+        body = self.client.get("/api/monitoring/metrics/").content.decode()
+        for name, kind in (("hemis_requests_total", "counter"), ("hemis_request_duration_seconds", "histogram"),
+                           ("monitoring_cache_requests_total", "counter")):
+            self.assertIn(f"# HELP {name} ", body)
+            self.assertIn(f"# TYPE {name} {kind}\n", body)
+        self.assertEqual(self.client.post("/api/monitoring/metrics/").status_code, 405)
+
+    def test_counters_follow_hemis_calls_and_cache_lookups(self):
+        before = self.scrape()
+        self.client.get("/api/monitoring/faculty-table-data/")
+        middle = self.scrape()
+        calls = self.fake.stats()["calls"]
+        self.assertGreater(calls.get("student-list", 0), 0)
+
+        def delta(sample, start, end):
+            return end.get(sample, 0) - start.get(sample, 0)
+
+        for endpoint, count in calls.items():
+            with self.subTest(endpoint=endpoint):
+                self.assertEqual(delta(f'hemis_requests_total{{endpoint="{endpoint}",status="200"}}', before, middle),
+                                 count)
+                self.assertEqual(delta(f'hemis_request_duration_seconds_count{{endpoint="{endpoint}"}}',
+                                       before, middle), count)
+
+        self.fake.reset_stats()
+        self.client.get("/api/monitoring/faculty-table-data/")
+        after = self.scrape()
+        self.assertEqual(self.fake.stats()["total"], 0)
+        self.assertEqual(delta('hemis_requests_total{endpoint="student-list",status="200"}', middle, after), 0)
+        hits = [k for k in after if k.startswith("monitoring_cache_requests_total") and 'result="hit"' in k]
+        self.assertGreater(sum(delta(k, middle, after) for k in hits), 0)
+
+
+# -----------------------
+# BENCHMARK
+# -----------------------
+@mock.patch.dict(benchmark_hemis.SIZES, {"tiny": {"faculties": 2, "groups": 20, "students": 300, "employees": 20}})
+class BenchmarkCommandTests(SimpleTestCase):
+    ARGS = ["--sizes", "tiny", "--scenarios", "faculty_table,attendance_options", "--concurrency", "1",
+            "--warm-runs", "1", "--latency-ms", "0", "--jitter-ms", "0", "--no-memory"]
+
+    def run_command(self, *extra) -> tuple[dict, str]:
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.json")
+            call_command("benchmark_hemis", *self.ARGS, "--output", path, *extra, stdout=out)
+            with open(path, encoding="utf-8") as f:
+                return json.load(f), out.getvalue()
+
+    def test_reports_cold_and_warm_hemis_calls(self):
+        report, output = self.run_command()
+        results = {r["scenario"]: r for r in report["results"]}
+        self.assertEqual(set(results), {"faculty_table", "attendance_options"})
+        for name, r in results.items():
+            with self.subTest(scenario=name):
+                self.assertEqual((r["size"], r["concurrency"], r["peak_memory_kb"]), ("tiny", 1, None))
+                self.assertGreater(r["cold"]["hemis_calls"], 0)
+                self.assertEqual(r["cold"]["hemis_calls"], sum(r["cold"]["by_endpoint"].values()))
+                # Iliq o‘tish keshdan - HEMIS'ga so‘rov ketmaydi
+                self.assertEqual(r["warm"]["hemis_calls"], 0)
+                self.assertIn(f"({r['cold']['hemis_calls']} calls, 0 429)", output)
+        self.assertFalse(settings.HEMIS_FAKE)
+
+    def test_more_calls_than_baseline_is_a_regression(self):
+        report, _ = self.run_command()
+        for r in report["results"]:
+            r["cold"]["hemis_calls"] -= 1
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(report, f)
+        self.addCleanup(os.unlink, f.name)
+        with self.assertRaisesMessage(CommandError, "2 ta regressiya"):
+            self.run_command("--baseline", f.name, "--fail-on-regression")
+
+    def test_unknown_size_is_rejected(self):
+        with self.assertRaisesMessage(CommandError, "Noma'lum o‘lcham: huge"):
+            call_command("benchmark_hemis", "--sizes", "huge", stdout=io.StringIO())
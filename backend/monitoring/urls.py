@@ -1,16 +1,37 @@
 # backend/monitoring/urls.py
 from django.urls import path
-from .views import StudentContingentSummaryView, FacultyTableDataView, EmployeeListView, DepartmentListView
-from .views_attendance import attendance_options_view, attendance_stat_view
+from .views import StudentContingentSummaryView, FacultyTableDataView, EmployeeListView, EmployeeAggregateView, DepartmentListView, DepartmentTreeView, ContingentTrendView, ContingentDiffView, ContingentReportView
+from .views_attendance import attendance_export_view, attendance_options_view, attendance_report_view, attendance_risk_view, attendance_rollup_view, attendance_stat_view
+from .views_async import attendance_stat_async_view, faculty_table_async_view, student_contingent_async_view
+from .views_metrics import metrics_view, trace_detail_view, traces_view
 
 urlpatterns = [
     path("student-contingent/", StudentContingentSummaryView.as_view()),
     path("faculty-table-data/", FacultyTableDataView.as_view()),
+    path("contingent/trend/", ContingentTrendView.as_view()),
+    path("contingent/diff/", ContingentDiffView.as_view()),
+    path("contingent/report/", ContingentReportView.as_view()),
 
     # ✅ Attendance
     path("attendance/options/", attendance_options_view),
     path("attendance/stat/", attendance_stat_view),
+    path("attendance/export/", attendance_export_view),
+    path("attendance/report/", attendance_report_view),
+    path("attendance/risk/", attendance_risk_view),
+    path("attendance/rollup/", attendance_rollup_view),
     path("employee-list/", EmployeeListView.as_view()),
+    path("employees/", EmployeeAggregateView.as_view()),
     path("department-list/", DepartmentListView.as_view()),
+    path("department-tree/", DepartmentTreeView.as_view()),
+
+    # ⚡ Async (ASGI) variantlar - bir xil javob, thread'siz HEMIS fan-out
+    path("async/student-contingent/", student_contingent_async_view),
+    path("async/faculty-table-data/", faculty_table_async_view),
+    path("async/attendance/stat/", attendance_stat_async_view),
+
+    # 📈 Prometheus metrikalari
+    path("metrics/", metrics_view),
+    path("traces/", traces_view),
+    path("traces/<str:trace_id>/", trace_detail_view),
 
 ]
@@ -4,19 +4,39 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
-from .services import get_faculty_table_data, get_dashboard_summary
+from .cache import entry_age, entry_meta
+from .conditional import cached_entry_response
+from .department_tree import department_counts, get_department_tree_entry, serialize_subtree
+from .renderers import entry_body
+from .employee_services import peek_employee_dataset_entry, query_employees
+from .services import (
+    get_contingent_report_entry,
+    get_dashboard_summary_entry,
+    get_faculty_table_entry,
+    parse_report_dims,
+    peek_faculty_table_entry,
+)
+from .snapshots import contingent_trend, diff_against_last_snapshot
 from hemis_client.services.hemis_api import HemisClient
 
 logger = logging.getLogger(__name__)
 
 
+def _entry_response(request, entry: dict):
+    # Ma'lumot yoshi: body'da generated_at, header'da Age (sekund).
+    if "etag" in entry:
+        # Tayyor tana: ETag/304 va oldindan siqilgan variantlar
+        return cached_entry_response(request, entry)
+    # Tana oldindan kodlangan qiymatdan yig‘iladi (FastJSONRenderer uni o‘zgartirmaydi)
+    return Response(entry_body(entry, entry_meta(entry)), headers={"Age": str(entry_age(entry))})
+
+
 class FacultyTableDataView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
         try:
-            data = get_faculty_table_data()
-            return Response(data)
+            return _entry_response(request, get_faculty_table_entry())
         except Exception as e:
             logger.error("FacultyTableDataView error: %s", e, exc_info=True)
             return Response({"error": str(e)}, status=500)
@@ -27,8 +47,7 @@ class StudentContingentSummaryView(APIView):
 
     def get(self, request):
         try:
-            data = get_dashboard_summary()
-            return Response(data)
+            return _entry_response(request, get_dashboard_summary_entry())
         except Exception as e:
             logger.error("StudentContingentSummaryView error: %s", e, exc_info=True)
             return Response({"error": str(e)}, status=500)
@@ -38,27 +57,219 @@ class EmployeeListView(APIView):
 
     def get(self, request):
         try:
-            client = HemisClient()
             # Query paramlarni dict qilib yuboramiz
             params = request.query_params.dict()
+            if params.get("search", "").strip():
+                # HEMIS search'ga ishonmaymiz: keshdagi ro‘yxat indeksidan, HEMIS shaklida
+                department = params.get("_department")
+                result = query_employees(
+                    department_id=int(department) if department else None,
+                    employee_type=params.get("type") or "teacher",
+                    search=params["search"],
+                    page=int(params.get("page") or 1),
+                    limit=int(params.get("limit") or 20),
+                )["value"]
+                return Response({"success": True, "data": {
+                    "items": result["items"],
+                    "pagination": result["pagination"],
+                }})
+            client = HemisClient()
             data = client.get_employee_list(params)
             return Response(data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
         except Exception as e:
             logger.error("EmployeeListView error: %s", e, exc_info=True)
             return Response({"error": str(e)}, status=500)
 
+class EmployeeAggregateView(APIView):
+    """
+    Kafedra xodimlari: to‘liq ro‘yxat serverda keshlanadi, javobda faqat
+    so‘ralgan sahifa + mehnat shakli / status facet sanoqlari.
+    Params: department, type, employment_form, status, search, page, limit (0 - hammasi), refresh
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            qp = request.query_params
+            department = qp.get("department") or qp.get("_department")
+            entry = query_employees(
+                department_id=int(department) if department else None,
+                employee_type=qp.get("type") or "teacher",
+                employment_form=qp.get("employment_form"),
+                status=qp.get("status"),
+                search=qp.get("search"),
+                page=int(qp.get("page") or 1),
+                limit=int(qp.get("limit") or 50),
+                force_refresh=qp.get("refresh") in ("1", "true"),
+            )
+            return _entry_response(request, entry)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error("EmployeeAggregateView error: %s", e, exc_info=True)
+            return Response({"error": str(e)}, status=500)
+
+# Daraxt indeksidan javob berish mumkin bo‘lgan department-list parametrlari
+DEPARTMENT_TREE_PARAMS = {"limit", "page", "active", "_structure_type", "_parent"}
+
+
 class DepartmentListView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
         try:
-            client = HemisClient()
             params = request.query_params.dict()
+            if set(params) <= DEPARTMENT_TREE_PARAMS:
+                return Response(self._from_tree(params))
+
+            client = HemisClient()
             # Default limit if not provided
             if "limit" not in params:
                  params["limit"] = 1000
             data = client.get_department_list(params=params)
             return Response(data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
         except Exception as e:
             logger.error("DepartmentListView error: %s", e, exc_info=True)
             return Response({"error": str(e)}, status=500)
+
+    @staticmethod
+    def _from_tree(params: dict) -> dict:
+        # HEMIS javobi shaklida, lekin keshlangan daraxtdan (structure type / parent indekslari)
+        tree = get_department_tree_entry()["value"]
+        if params.get("_parent"):
+            parent = int(params["_parent"])
+            items = [tree.items[c] for c in tree.children.get(parent, [])]
+        elif params.get("_structure_type"):
+            items = tree.of_type(params["_structure_type"])
+        else:
+            items = list(tree.items.values())
+        if params.get("_parent") and params.get("_structure_type"):
+            items = [i for i in items if str((i.get("structureType") or {}).get("code")) == params["_structure_type"]]
+        if params.get("active") in ("true", "1"):
+            items = [i for i in items if i.get("active") is not False]
+
+        # limit=0 / manfiy - bo‘linmaydi, kamida 1
+        limit = max(1, int(params.get("limit") or 1000))
+        page = max(1, int(params.get("page") or 1))
+        total = len(items)
+        return {"success": True, "data": {
+            "items": items[(page - 1) * limit:page * limit],
+            "pagination": {
+                "totalCount": total,
+                "currentPage": page,
+                "pageCount": -(-total // limit),
+                "perPage": limit,
+            },
+        }}
+
+
+class DepartmentTreeView(APIView):
+    """
+    Bo‘limlar daraxti: ?root=<id> (pastki daraxt + ajdodlar), ?depth=<n>,
+    ?counts=0 - xodim/talaba yig‘indilarisiz. Hammasi keshdan, bo‘lim bo‘yicha HEMIS so‘rovisiz.
+    Yig‘indilar faqat keshda tayyor ro‘yxatlardan (warm_hemis_cache quradi); yo‘q bo‘lsa
+    ular fonda quriladi va javobda counts_pending=true - so‘rov crawl'ni kutmaydi.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            entry = get_department_tree_entry()
+            tree = entry["value"]
+            qp = request.query_params
+            depth = int(qp["depth"]) if qp.get("depth") else None
+
+            counts = None
+            counts_pending = False
+            if qp.get("counts", "1") not in ("0", "false"):
+                # ikkala manba ham tekshiriladi - yo‘qlari bir vaqtda fonda qurila boshlaydi
+                employees = peek_employee_dataset_entry(employee_type="all")
+                table = peek_faculty_table_entry()
+                if employees is None or table is None:
+                    counts_pending = True
+                else:
+                    counts = department_counts(tree, employees["value"], table["value"].get("rows", []))
+
+            root = qp.get("root")
+            if root:
+                root_id = int(root)
+                if root_id not in tree:
+                    return Response({"error": "Department not found"}, status=404)
+                data = {
+                    "root": serialize_subtree(tree, root_id, counts, depth),
+                    "ancestors": [
+                        {"id": a, "name": tree.items[a].get("name", "")} for a in tree.ancestors(root_id)
+                    ],
+                    "faculty_id": tree.faculty_of(root_id),
+                }
+            else:
+                data = {"roots": [serialize_subtree(tree, r, counts, depth) for r in tree.roots]}
+            if counts_pending:
+                data["counts_pending"] = True
+            return _entry_response(request, {"value": data, "built_at": entry["built_at"]})
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error("DepartmentTreeView error: %s", e, exc_info=True)
+            return Response({"error": str(e)}, status=500)
+
+
+class ContingentTrendView(APIView):
+    """
+    Kontingent tarixi (DB dagi nusxalardan, HEMIS so‘rovisiz):
+    ?period=day|week, ?days=90, ?faculty_id=, ?form_id=, ?split=faculty|form.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            qp = request.query_params
+            data = contingent_trend(
+                faculty_id=int(qp["faculty_id"]) if qp.get("faculty_id") else None,
+                form_id=qp.get("form_id") or None,
+                split=qp.get("split") or None,
+                period=qp.get("period") or "day",
+                days=int(qp.get("days") or 90),
+            )
+            return Response(data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error("ContingentTrendView error: %s", e, exc_info=True)
+            return Response({"error": str(e)}, status=500)
+
+
+class ContingentDiffView(APIView):
+    """Jonli fakultet jadvali va oxirgi saqlangan nusxa orasidagi farq."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            entry = get_faculty_table_entry()
+            diff = diff_against_last_snapshot(entry["value"], entry["built_at"])
+            return _entry_response(request, {"value": {"diff": diff}, "built_at": entry["built_at"]})
+        except Exception as e:
+            logger.error("ContingentDiffView error: %s", e, exc_info=True)
+            return Response({"error": str(e)}, status=500)
+
+
+class ContingentReportView(APIView):
+    """
+    Ko‘p o‘lchamli kontingent (keshdagi talabalar skanidan, har katak uchun HEMIS so‘rovisiz):
+    ?dims=faculty,education_form,course,gender (istalgan tartib/kombinatsiya).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            dims = parse_report_dims(request.query_params.get("dims"))
+            return _entry_response(request, get_contingent_report_entry(dims))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error("ContingentReportView error: %s", e, exc_info=True)
+            return Response({"error": str(e)}, status=500)
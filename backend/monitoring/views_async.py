@@ -0,0 +1,79 @@
+# backend/monitoring/views_async.py
+# ASGI (core/asgi.py) ostida ishlaydigan async view'lar: HEMIS fan-out'i thread'siz,
+# bitta pool'langan AsyncHemisClient orqali bajariladi. Javoblar sync view'lar bilan bir xil.
+import logging
+
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .attendance_services import DEFAULT_ATTENDANCE_ORDER
+from .async_services import aget_attendance_stat, aget_dashboard_summary_entry, aget_faculty_table_entry
+from .cache import entry_age, entry_meta
+from .conditional import cached_entry_response
+from .renderers import encode_json, entry_body
+
+logger = logging.getLogger(__name__)
+
+def _json_response(body: bytes) -> HttpResponse:
+    return HttpResponse(body, content_type="application/json")
+
+
+def _entry_response(request, entry: dict) -> HttpResponse:
+    if "etag" in entry:
+        return cached_entry_response(request, entry)
+    resp = _json_response(entry_body(entry, entry_meta(entry)))
+    resp["Age"] = str(entry_age(entry))
+    return resp
+
+
+@require_GET
+async def faculty_table_async_view(request):
+    try:
+        return _entry_response(request, await aget_faculty_table_entry())
+    except Exception as e:
+        logger.error("faculty_table_async_view error: %s", e, exc_info=True)
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@require_GET
+async def student_contingent_async_view(request):
+    try:
+        return _entry_response(request, await aget_dashboard_summary_entry())
+    except Exception as e:
+        logger.error("student_contingent_async_view error: %s", e, exc_info=True)
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@require_GET
+async def attendance_stat_async_view(request):
+    try:
+        faculty_id = request.GET.get("faculty_id")
+        cursor = request.GET.get("cursor")
+        if not faculty_id and not cursor:
+            return JsonResponse({"error": "faculty_id is required"}, status=400)
+
+        education_type_id = request.GET.get("education_type_id")
+        education_form_id = request.GET.get("education_form_id")
+        semester_id = request.GET.get("semester_id")
+
+        page = int(request.GET.get("page") or 1)
+        limit = int(request.GET.get("limit") or 200)
+        order = request.GET.get("order") or DEFAULT_ATTENDANCE_ORDER
+
+        data = await aget_attendance_stat(
+            faculty_id=int(faculty_id) if faculty_id else None,
+            education_type_id=int(education_type_id) if education_type_id else None,
+            education_form_id=int(education_form_id) if education_form_id else None,
+            semester_id=int(semester_id) if semester_id else None,
+            order=order,
+            search=request.GET.get("search"),
+            page=page,
+            limit=limit,
+            cursor=cursor,
+        )
+        return _json_response(encode_json(data))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error("attendance_stat_async_view error: %s", e, exc_info=True)
+        return JsonResponse({"error": str(e)}, status=500)
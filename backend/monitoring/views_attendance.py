@@ -1,9 +1,26 @@
+import csv
+import json
 import logging
+from datetime import date
+
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from .attendance_services import get_attendance_filter_options, get_attendance_stat
+from .attendance_services import (
+    ATTENDANCE_EXPORT_FIELDS,
+    DEFAULT_ATTENDANCE_ORDER,
+    get_attendance_filter_options,
+    get_attendance_risk_entry,
+    get_attendance_stat,
+    iter_attendance_rows,
+)
+from .cache import entry_age, entry_meta
+from .conditional import cached_entry_response
+from .renderers import entry_body
+from .rollup import get_university_rollup
+from .warehouse import attendance_report
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +49,8 @@ def attendance_options_view(request):
 def attendance_stat_view(request):
     try:
         faculty_id = request.query_params.get("faculty_id")
-        if not faculty_id:
+        cursor = request.query_params.get("cursor")
+        if not faculty_id and not cursor:
             return Response({"error": "faculty_id is required"}, status=400)
 
         education_type_id = request.query_params.get("education_type_id")
@@ -41,16 +59,194 @@ def attendance_stat_view(request):
 
         page = int(request.query_params.get("page") or 1)
         limit = int(request.query_params.get("limit") or 200)
+        order = request.query_params.get("order") or DEFAULT_ATTENDANCE_ORDER
 
         data = get_attendance_stat(
-            faculty_id=int(faculty_id),
+            faculty_id=int(faculty_id) if faculty_id else None,
             education_type_id=int(education_type_id) if education_type_id else None,
             education_form_id=int(education_form_id) if education_form_id else None,
             semester_id=int(semester_id) if semester_id else None,
+            order=order,
+            search=request.query_params.get("search"),
             page=page,
             limit=limit,
+            cursor=cursor,
         )
         return Response(data)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
     except Exception as e:
         logger.error("attendance_stat_view error: %s", e, exc_info=True)
         return Response({"error": str(e)}, status=500)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def attendance_risk_view(request):
+    """
+    Top-K xavf guruhidagi talabalar: ?faculty_id= (bo‘lmasa - butun universitet),
+    ?order=total_absent|percent, ?k=, ?min_absent=, ?min_percent=.
+    Universitet bo‘yicha natija fonda quriladi - tayyor bo‘lguncha 202 + progress.
+    """
+    try:
+        qp = request.query_params
+        faculty_id = qp.get("faculty_id")
+        education_type_id = qp.get("education_type_id")
+        education_form_id = qp.get("education_form_id")
+        semester_id = qp.get("semester_id")
+        k = qp.get("k")
+        min_absent = qp.get("min_absent")
+        min_percent = qp.get("min_percent")
+
+        entry, progress = get_attendance_risk_entry(
+            faculty_id=int(faculty_id) if faculty_id else None,
+            education_type_id=int(education_type_id) if education_type_id else None,
+            education_form_id=int(education_form_id) if education_form_id else None,
+            semester_id=int(semester_id) if semester_id else None,
+            order=qp.get("order") or "total_absent",
+            k=int(k) if k else None,
+            min_absent=int(min_absent) if min_absent else None,
+            min_percent=float(min_percent) if min_percent else None,
+            force_refresh=qp.get("refresh") in ("1", "true"),
+        )
+        if entry is None:
+            return Response({"status": "running", "progress": progress}, status=202)
+        return cached_entry_response(request, entry)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error("attendance_risk_view error: %s", e, exc_info=True)
+        return Response({"error": str(e)}, status=500)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def attendance_rollup_view(request):
+    """
+    Universitet bo‘yicha davomat: fakultet, ta'lim shakli va mutaxassislik kesimida.
+    Natija hali bo‘lmasa fonda quriladi - 202 + progress (shu URL qayta so‘raladi).
+    """
+    try:
+        semester_id = request.query_params.get("semester_id")
+        entry, progress = get_university_rollup(
+            semester_id=int(semester_id) if semester_id else None,
+            force_refresh=request.query_params.get("refresh") in ("1", "true"),
+        )
+        if entry is None:
+            return Response({"status": "running", "progress": progress}, status=202)
+        if not progress:
+            return cached_entry_response(request, entry)
+        # Eskirgan natija berildi, fonda yangilanmoqda
+        meta = {**entry_meta(entry), "progress": progress}
+        return Response(entry_body(entry, meta), headers={"Age": str(entry_age(entry))})
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error("attendance_rollup_view error: %s", e, exc_info=True)
+        return Response({"error": str(e)}, status=500)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def attendance_report_view(request):
+    """Davomat omboridan (sync_attendance_facts) agregat hisobot - HEMIS'ga murojaatsiz."""
+    try:
+        faculty_id = request.query_params.get("faculty_id")
+        semester = request.query_params.get("semester")
+        as_of = request.query_params.get("as_of")
+
+        data = attendance_report(
+            group_by=request.query_params.get("group_by") or "faculty",
+            faculty_id=int(faculty_id) if faculty_id else None,
+            semester=int(semester) if semester else None,
+            as_of=date.fromisoformat(as_of) if as_of else None,
+        )
+        return Response(data)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error("attendance_report_view error: %s", e, exc_info=True)
+        return Response({"error": str(e)}, status=500)
+
+
+class _Echo:
+    """csv.writer uchun: yozilgan qatorni bufersiz qaytaradi."""
+
+    def write(self, value):
+        return value
+
+
+def _export_lines(rows, failed: list[int], line, error_line):
+    """
+    Sarlavhalar yuborilgandan keyingi xatolar: qatorlar to‘xtaydi va oxirgi qator - xato
+    (mijoz faylni to‘liq deb qabul qilmasligi uchun). Olinmagan guruhlar ham shunday bildiriladi.
+    """
+    try:
+        for row in rows:
+            yield line(row)
+    except Exception as e:
+        logger.error("attendance export stream error: %s", e, exc_info=True)
+        yield error_line(str(e))
+        return
+    if failed:
+        yield error_line(f"{len(failed)} group(s) could not be loaded: {', '.join(map(str, failed))}")
+
+
+def _csv_stream(rows, failed: list[int]):
+    writer = csv.writer(_Echo())
+    # BOM - Excel UTF-8 (o‘zbekcha harflar) ni to‘g‘ri ochishi uchun
+    yield "\ufeff" + writer.writerow(ATTENDANCE_EXPORT_FIELDS)
+    yield from _export_lines(
+        rows, failed,
+        lambda row: writer.writerow([row.get(f) for f in ATTENDANCE_EXPORT_FIELDS]),
+        lambda error: writer.writerow([f"# error: {error}"]),
+    )
+
+
+def _ndjson_stream(rows, failed: list[int]):
+    yield from _export_lines(
+        rows, failed,
+        lambda row: json.dumps({f: row.get(f) for f in ATTENDANCE_EXPORT_FIELDS}, ensure_ascii=False) + "\n",
+        lambda error: json.dumps({"error": error}, ensure_ascii=False) + "\n",
+    )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def attendance_export_view(request):
+    """
+    Fakultet davomatini CSV / NDJSON oqim sifatida beradi: qatorlar har bir guruh
+    tayyor bo‘lishi bilan yuboriladi, to‘liq ro‘yxat xotirada yig‘ilmaydi.
+    """
+    try:
+        faculty_id = request.query_params.get("faculty_id")
+        if not faculty_id:
+            return Response({"error": "faculty_id is required"}, status=400)
+
+        fmt = request.query_params.get("export_format") or "csv"
+        if fmt not in ("csv", "ndjson"):
+            return Response({"error": "export_format must be csv or ndjson"}, status=400)
+
+        education_type_id = request.query_params.get("education_type_id")
+        education_form_id = request.query_params.get("education_form_id")
+        semester_id = request.query_params.get("semester_id")
+
+        # Katalog va birinchi guruh shu yerda olinadi - xatosi 4xx/5xx bo‘lib qaytadi
+        rows, failed = iter_attendance_rows(
+            faculty_id=int(faculty_id),
+            education_type_id=int(education_type_id) if education_type_id else None,
+            education_form_id=int(education_form_id) if education_form_id else None,
+            semester_id=int(semester_id) if semester_id else None,
+        )
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error("attendance_export_view error: %s", e, exc_info=True)
+        return Response({"error": str(e)}, status=500)
+
+    if fmt == "csv":
+        response = StreamingHttpResponse(_csv_stream(rows, failed), content_type="text/csv; charset=utf-8")
+    else:
+        response = StreamingHttpResponse(_ndjson_stream(rows, failed), content_type="application/x-ndjson; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="attendance_{faculty_id}.{fmt}"'
+    return response
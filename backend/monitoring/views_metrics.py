@@ -0,0 +1,35 @@
+# backend/monitoring/views_metrics.py
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from hemis_client.services.metrics import render_prometheus
+
+from .middleware import get_trace, recent_traces
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics_view(request):
+    # Prometheus scrape: shu worker jarayonining HEMIS / kesh / bosqich metrikalari
+    return HttpResponse(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# Trace'larda so‘rov yo‘llari va HEMIS parametrlari bor - faqat admin (is_staff)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def traces_view(request):
+    # So‘nggi trace'lar (qisqacha): id, yo‘l, davomiylik, HEMIS chaqiruvlari soni
+    return Response({"items": recent_traces()})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def trace_detail_view(request, trace_id: str):
+    trace = get_trace(trace_id)
+    if trace is None:
+        return Response({"error": "Trace topilmadi yoki muddati o‘tgan"}, status=404)
+    return Response(trace)
@@ -0,0 +1,246 @@
+# backend/monitoring/warehouse.py
+# Davomat ombori: talaba x guruh davomati AttendanceFact jadvalida sanalar oralig‘i
+# bilan saqlanadi. Sinxronlash faqat yangi/o‘zgargan qatorlarni va guruhga bitta
+# last_seen yozuvini yozadi; hisobotlar (fakultet, guruh, mutaxassislik, semestr,
+# shakl) HEMIS'ga murojaatsiz SQL agregat.
+import concurrent.futures
+import hashlib
+import logging
+import time
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+from hemis_client.services.hemis_api import HemisClient, extract_items
+from hemis_client.services.metrics import observe_phase
+
+from .attendance_services import _group_stat_params, _student_name
+from .catalog import _to_int, get_faculty_catalog
+from .models import AttendanceFact, AttendanceGroupSync
+
+logger = logging.getLogger(__name__)
+
+SYNC_WORKERS = 20
+UPDATE_BATCH_SIZE = 500
+
+# Fakt qiymatlari: shulardan biri o‘zgarsa - yangi qator (tarix saqlanadi)
+FACT_FIELDS = (
+    "faculty_name", "group_name", "curriculum_id", "specialty", "education_form", "semester",
+    "student_name", "subjects", "lessons", "absent_on", "absent_off", "total_absent", "percent",
+)
+
+REPORT_GROUPINGS = {
+    "faculty": ("faculty_id", "faculty_name"),
+    "group": ("group_id", "group_name", "faculty_id"),
+    "specialty": ("specialty",),
+    "semester": ("semester",),
+    "education_form": ("education_form",),
+}
+
+
+def _student_key(it: dict, name: str) -> str:
+    student = it.get("student") or it.get("_student") or {}
+    sid = student.get("id") if isinstance(student, dict) else None
+    if sid is not None:
+        return str(sid)
+    return "n:" + hashlib.sha1(name.encode()).hexdigest()[:16]
+
+
+def _parse_facts(items: list[dict], grp: dict, curriculum: dict, faculty_name: str,
+                 semester: int | None) -> dict[str, dict]:
+    """student_key -> fakt qiymatlari. Qoldirmagan talabalar ham yoziladi (guruh hajmi uchun)."""
+    facts = {}
+    for it in items:
+        name = _student_name(it) or ""
+        abs_on = int(it.get("absent_on") or it.get("ABSENT_ON") or 0)
+        abs_off = int(it.get("absent_off") or it.get("ABSENT_OFF") or 0)
+        # HEMIS semestrni bermasa (yoki kodsiz) - sinxronlash argumenti (--semester)
+        item_semester = it.get("semester")
+        item_code = _to_int(item_semester.get("code")) if isinstance(item_semester, dict) else None
+        facts[_student_key(it, name)] = {
+            "faculty_name": faculty_name,
+            "group_name": grp.get("name") or "",
+            "curriculum_id": _to_int(grp.get("_curriculum")),
+            "specialty": curriculum.get("specialty") or "",
+            "education_form": curriculum.get("form") or "",
+            "semester": item_code if item_code is not None else semester,
+            "student_name": name[:255],
+            "subjects": int(it.get("subjects") or 0),
+            "lessons": int(it.get("lessons") or 0),
+            "absent_on": abs_on,
+            "absent_off": abs_off,
+            "total_absent": abs_on + abs_off,
+            "percent": float(it.get("total_percent") or 0),
+        }
+    return facts
+
+
+def _current_facts(faculty_id: int) -> dict[int, dict[str, tuple[int, date, tuple]]]:
+    """group_id -> student_key -> (fakt id, period_start, qiymatlar) - bitta so‘rov."""
+    current: dict[int, dict[str, tuple[int, date, tuple]]] = {}
+    rows = AttendanceFact.objects.filter(faculty_id=faculty_id, is_current=True).values_list(
+        "id", "group_id", "student_key", "period_start", *FACT_FIELDS
+    )
+    for fact_id, group_id, key, start, *values in rows.iterator(chunk_size=2000):
+        current.setdefault(group_id, {})[key] = (fact_id, start, tuple(values))
+    return current
+
+
+def _update_in_batches(ids: list[int], **values) -> None:
+    for i in range(0, len(ids), UPDATE_BATCH_SIZE):
+        AttendanceFact.objects.filter(id__in=ids[i:i + UPDATE_BATCH_SIZE]).update(**values)
+
+
+def _apply_group(faculty_id: int, group_id: int, fresh: dict[str, dict],
+                 existing: dict[str, tuple[int, date, tuple]], today: date, stats: dict) -> None:
+    """
+    Bitta guruh farqi: o‘zgarmagan qatorlar yozilmaydi (amal qilishi guruhning last_seen
+    sanasidan), o‘zgargan - yopilib yangisi qo‘shiladi. Barchasi bitta tranzaksiyada.
+    """
+    same_day, close, create = [], [], []
+    unchanged = 0
+    for key, values in fresh.items():
+        old = existing.get(key)
+        row = tuple(values[f] for f in FACT_FIELDS)
+        if old is not None and old[2] == row:
+            unchanged += 1
+            continue
+        if old is not None:
+            if old[1] == today:
+                # Bugun ochilgan qator - tarixga yozmasdan joyida yangilanadi
+                same_day.append(AttendanceFact(id=old[0], **values))
+                continue
+            close.append(old[0])
+        create.append(AttendanceFact(
+            faculty_id=faculty_id, group_id=group_id, student_key=key,
+            period_start=today, period_end=today, **values,
+        ))
+    # Guruhdan chiqqan (yoki faol bo‘lmay qolgan) talabalar
+    close.extend(old[0] for key, old in existing.items() if key not in fresh)
+
+    with transaction.atomic():
+        AttendanceFact.objects.bulk_update(same_day, FACT_FIELDS, batch_size=UPDATE_BATCH_SIZE)
+        # Yopilgan qator kechagacha amal qilgan
+        _update_in_batches(close, is_current=False, period_end=today - timedelta(days=1))
+        AttendanceFact.objects.bulk_create(create, batch_size=UPDATE_BATCH_SIZE)
+        # Joriy qatorlar bugungacha tasdiqlandi - guruh bo‘yicha bitta yozuv
+        AttendanceGroupSync.objects.bulk_create(
+            [AttendanceGroupSync(group_id=group_id, faculty_id=faculty_id, last_seen=today)],
+            update_conflicts=True, unique_fields=["group_id"], update_fields=["faculty_id", "last_seen"],
+        )
+    stats["unchanged"] += unchanged
+    stats["updated"] += len(same_day)
+    stats["closed"] += len(close)
+    stats["inserted"] += len(create)
+
+
+def sync_faculty_attendance(faculty_id: int, *, faculty_name: str = "", semester: int | None = None,
+                            force_refresh: bool = False) -> dict:
+    """
+    Fakultet guruhlari davomatini HEMIS dan olib omborga yozadi. Olinmagan guruhlar
+    tegilmaydi; katalogda yo‘q bo‘lib qolgan guruhlarning joriy qatorlari yopiladi.
+    """
+    started = time.perf_counter()
+    today = timezone.localdate()
+    catalog = get_faculty_catalog(faculty_id, force_refresh=force_refresh)
+    groups = catalog.select_groups()
+    c_map = catalog.curriculum_map()
+    existing = _current_facts(faculty_id)
+    stats = {"faculty_id": faculty_id, "groups": len(groups), "failed": 0,
+             "inserted": 0, "updated": 0, "unchanged": 0, "closed": 0}
+
+    client = HemisClient()
+
+    def fetch(grp):
+        return extract_items(client.get_attendance_stat(params=_group_stat_params(grp["id"])))
+
+    # HEMIS parallel, DB yozuvlari shu thread'da - guruh tayyor bo‘lishi bilan
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SYNC_WORKERS) as executor:
+        futures = {executor.submit(fetch, g): g for g in groups}
+        for f in concurrent.futures.as_completed(futures):
+            grp = futures[f]
+            try:
+                items = f.result()
+            except Exception as e:
+                logger.warning("Attendance sync failed (group=%s): %s", grp.get("id"), e)
+                stats["failed"] += 1
+                existing.pop(grp["id"], None)
+                continue
+            fresh = _parse_facts(items, grp, c_map.get(grp.get("_curriculum"), {}), faculty_name, semester)
+            _apply_group(faculty_id, grp["id"], fresh, existing.pop(grp["id"], {}), today, stats)
+
+    stale = [old[0] for rows in existing.values() for old in rows.values()]
+    if stale:
+        _update_in_batches(stale, is_current=False, period_end=today - timedelta(days=1))
+        stats["closed"] += len(stale)
+
+    stats["duration"] = round(time.perf_counter() - started, 3)
+    observe_phase("attendance_sync", stats["duration"])
+    logger.info("Attendance sync: %s", stats)
+    return stats
+
+
+# -----------------------
+# REPORTS
+# -----------------------
+def attendance_report(
+    *,
+    group_by: str = "faculty",
+    faculty_id: int | None = None,
+    semester: int | None = None,
+    as_of: date | None = None,
+) -> dict:
+    """
+    Ombordagi faktlar bo‘yicha agregat. as_of berilsa - o‘sha kunda amal qilgan qatorlar,
+    aks holda joriylari. Har qator: talabalar, qoldirganlar, dars/qoldirish yig‘indilari.
+    """
+    if group_by not in REPORT_GROUPINGS:
+        raise ValueError(f"Unknown group_by: {group_by}")
+
+    qs = AttendanceFact.objects.all()
+    if as_of:
+        # Yopilgan qator - period_end gacha; joriy qator - guruh oxirgi ko‘rilgan kungacha
+        seen = AttendanceGroupSync.objects.filter(last_seen__gte=as_of).values("group_id")
+        qs = qs.filter(period_start__lte=as_of).filter(
+            Q(is_current=False, period_end__gte=as_of) | Q(is_current=True, group_id__in=seen)
+        )
+    else:
+        qs = qs.filter(is_current=True)
+    if faculty_id:
+        qs = qs.filter(faculty_id=faculty_id)
+    if semester:
+        qs = qs.filter(semester=semester)
+
+    rows = (
+        qs.values(*REPORT_GROUPINGS[group_by])
+        .annotate(
+            students=Count("id"),
+            absent_students=Count("id", filter=Q(total_absent__gt=0)),
+            lessons=Sum("lessons"),
+            absent_on=Sum("absent_on"),
+            absent_off=Sum("absent_off"),
+            total_absent=Sum("total_absent"),
+            avg_percent=Avg("percent"),
+        )
+        .order_by("-total_absent", *REPORT_GROUPINGS[group_by])
+    )
+    result = []
+    for row in rows:
+        row["avg_percent"] = round(row["avg_percent"] or 0, 2)
+        result.append(row)
+
+    return {
+        "group_by": group_by,
+        "as_of": as_of.isoformat() if as_of else None,
+        "synced_until": _synced_until(faculty_id),
+        "rows": result,
+    }
+
+
+def _synced_until(faculty_id: int | None) -> str | None:
+    qs = AttendanceGroupSync.objects.all()
+    if faculty_id:
+        qs = qs.filter(faculty_id=faculty_id)
+    last = qs.aggregate(last=Max("last_seen"))["last"]
+    return last.isoformat() if last else None
@@ -30,6 +30,11 @@ export async function getStudentContingentMatrix(): Promise<StudentMatrixRespons
   return resp.data as StudentMatrixResponse;
 }
 
+// Kesh yozuvi qachon hisoblangani (yoshi "Age" header'ida ham keladi)
+export interface CacheMeta {
+  generated_at: string;
+}
+
 export interface FacultyTableResponse {
   columns: { id: number | string; name: string }[];
   rows: {
@@ -42,6 +47,7 @@ export interface FacultyTableResponse {
     by_form: Record<string, number>;
     grand_total: number;
   };
+  meta?: CacheMeta;
 }
 
 export async function getFacultyTableData(): Promise<FacultyTableResponse> {
@@ -53,6 +59,7 @@ export interface StudentContingentSummary {
   total_students: number;
   faculty_counts: { faculty_name: string; count: number }[];
   education_form_counts: { form_name: string; count: number }[];
+  meta?: CacheMeta;
 }
 
 export async function getStudentContingentSummary(): Promise<StudentContingentSummary> {
@@ -94,6 +101,8 @@ export interface DepartmentListResponse {
 
 
 export interface AttendanceRow {
+  // HEMIS talaba id'si (0 - HEMIS bermagan)
+  student_id: number;
   entity: string;
   specialty?: string;
   education_form?: string;
@@ -114,9 +123,122 @@ export interface AttendanceRow {
   total_percent: number;
 }
 
+export type AttendanceOrder = "total_absent" | "percent" | "group" | "name";
+
 export interface AttendanceStatResponse {
   rows: AttendanceRow[];
   count: number;
+  order?: AttendanceOrder;
+  // Keyingi/oldingi sahifa uchun server bergan token (filtrlarni o'z ichiga oladi)
+  next_cursor?: string | null;
+  prev_cursor?: string | null;
+}
+
+// Top-K xavf guruhidagi talabalar (faculty_id bo'lmasa - butun universitet)
+export type AttendanceRiskOrder = "total_absent" | "percent";
+
+export interface AttendanceRiskRow extends AttendanceRow {
+  faculty_id: number;
+  faculty: string;
+}
+
+export interface AttendanceRiskResponse {
+  rows: AttendanceRiskRow[];
+  order: AttendanceRiskOrder;
+  k: number;
+  thresholds: { min_absent: number; min_percent: number };
+  scanned_groups: number;
+  scanned_rows: number;
+  meta?: CacheMeta;
+}
+
+export interface AttendanceRiskProgress {
+  status: "queued" | "catalog" | "groups" | "done" | "failed";
+  started_at: number;
+  updated_at: number;
+  groups_total?: number;
+  groups?: number;
+  rows?: number;
+  error?: string;
+}
+
+// Butun universitet ro'yxati fonda quriladi: 202 -> progress (shu so'rov qayta yuboriladi)
+export type AttendanceRiskResult =
+  | { ready: true; data: AttendanceRiskResponse }
+  | { ready: false; progress: AttendanceRiskProgress | null };
+
+export async function getAttendanceRisk(params?: {
+  faculty_id?: number;
+  education_type_id?: number;
+  education_form_id?: number;
+  semester_id?: number;
+  order?: AttendanceRiskOrder;
+  k?: number;
+  min_absent?: number;
+  min_percent?: number;
+}): Promise<AttendanceRiskResult> {
+  const resp = await http.get("/monitoring/attendance/risk/", { params });
+  if (resp.status === 202) {
+    return { ready: false, progress: resp.data.progress ?? null };
+  }
+  return { ready: true, data: resp.data as AttendanceRiskResponse };
+}
+
+// Universitet bo'yicha davomat yig'indisi (fonda quriladi: 202 -> progress)
+export interface AttendanceRollupTotals {
+  groups: number;
+  absent_students: number;
+  absent_on: number;
+  absent_off: number;
+  total_absent: number;
+  lessons: number;
+  absent_percent: number;
+  avg_percent: number;
+  percent_percentiles: { p50: number; p75: number; p90: number; p95: number };
+}
+
+export interface AttendanceRollupProgress {
+  status: "queued" | "catalog" | "groups" | "done" | "failed";
+  started_at: number;
+  updated_at: number;
+  faculties_total?: number;
+  faculties_done?: number;
+  groups_total?: number;
+  groups_done?: number;
+  error?: string;
+}
+
+export interface AttendanceRollupResponse {
+  semester_id: number | null;
+  totals: AttendanceRollupTotals;
+  // rank - total_absent bo'yicha o'rin (1 - eng ko'p)
+  faculties: (AttendanceRollupTotals & { faculty_id: number; faculty: string; rank: number })[];
+  forms: (AttendanceRollupTotals & { education_form: string; rank: number })[];
+  specialties: (AttendanceRollupTotals & {
+    rank: number;
+    faculty_id: number;
+    faculty: string;
+    specialty: string;
+    education_form: string;
+  })[];
+  groups: { total: number; loaded: number; failed: number };
+  // progress - eskirgan natija berilib, fonda yangilanayotgan bo'lsa
+  meta?: CacheMeta & { progress?: AttendanceRollupProgress };
+}
+
+export type AttendanceRollupResult =
+  | { ready: true; data: AttendanceRollupResponse }
+  | { ready: false; progress: AttendanceRollupProgress | null };
+
+export async function getAttendanceRollup(params?: {
+  semester_id?: number;
+  refresh?: 1;
+}): Promise<AttendanceRollupResult> {
+  const resp = await http.get("/monitoring/attendance/rollup/", { params });
+  if (resp.status === 202) {
+    return { ready: false, progress: resp.data.progress ?? null };
+  }
+  return { ready: true, data: resp.data as AttendanceRollupResponse };
 }
 
 export async function getAttendanceOptions(params?: {
@@ -127,12 +249,15 @@ export async function getAttendanceOptions(params?: {
 }
 
 export async function getAttendanceStat(params: {
-  faculty_id: number;
+  faculty_id?: number;
   education_type_id?: number;
   education_form_id?: number;
   semester_id?: number;
+  order?: AttendanceOrder;
+  search?: string; // talaba F.I.O. / guruh (backend indeksi)
   page?: number;
   limit?: number;
+  cursor?: string;
 }): Promise<AttendanceStatResponse> {
   const resp = await http.get("/monitoring/attendance/stat/", { params });
   return resp.data as AttendanceStatResponse;
@@ -208,8 +333,171 @@ export async function getEmployeeList(params: {
   return resp.data as EmployeeListResponse;
 }
 
+export interface EmployeeFacet {
+  code: string;
+  name: string;
+  count: number;
+}
+
+// Server-side: to‘liq ro‘yxat backend keshida, bu yerga faqat sahifa + facet'lar keladi
+export interface EmployeeQueryResponse {
+  items: EmployeeItem[];
+  pagination: {
+    totalCount: number;
+    currentPage: number;
+    pageCount: number;
+    perPage: number;
+  };
+  total_loaded: number;
+  facets: {
+    employment_forms: EmployeeFacet[];
+    statuses: EmployeeFacet[];
+  };
+  meta?: CacheMeta;
+}
+
+export async function getEmployees(params: {
+  department?: number;
+  type?: "teacher" | "employee" | "all";
+  employment_form?: string;
+  status?: string;
+  search?: string;
+  page?: number;
+  limit?: number; // 0 = barcha mos yozuvlar (eksport)
+}): Promise<EmployeeQueryResponse> {
+  const resp = await http.get("/monitoring/employees/", { params });
+  return resp.data as EmployeeQueryResponse;
+}
+
 export async function getDepartmentList(params?: any): Promise<DepartmentListResponse> {
   const resp = await http.get("/monitoring/department-list/", { params });
   return resp.data as DepartmentListResponse;
 }
 
+// -----------------------
+// DEPARTMENT TREE
+// -----------------------
+
+export interface DepartmentTreeNode {
+  id: number;
+  name: string;
+  code?: string;
+  structure_type: { code: string; name?: string };
+  active: boolean;
+  parent_id: number | null;
+  faculty_id: number | null;
+  path: number[];
+  employees?: number;
+  employees_total?: number;
+  students_total?: number;
+  children?: DepartmentTreeNode[];
+  children_count?: number;
+}
+
+export interface DepartmentTreeResponse {
+  roots?: DepartmentTreeNode[];
+  root?: DepartmentTreeNode;
+  ancestors?: { id: number; name: string }[];
+  faculty_id?: number | null;
+  /** Xodim/talaba yig‘indilari hali keshda yo‘q - fonda quriladi, keyinroq qayta so‘rang */
+  counts_pending?: boolean;
+  meta?: CacheMeta;
+}
+
+export async function getDepartmentTree(params?: {
+  root?: number;
+  depth?: number;
+  counts?: 0 | 1;
+}): Promise<DepartmentTreeResponse> {
+  const resp = await http.get("/monitoring/department-tree/", { params });
+  return resp.data as DepartmentTreeResponse;
+}
+
+/** ---------------- CONTINGENT HISTORY (DB snapshots) ---------------- **/
+export interface ContingentTrendPoint {
+  date: string;
+  snapshot_id: number;
+  total: number;
+}
+
+export interface ContingentTrendSeries {
+  key: string;
+  name: string;
+  points: ContingentTrendPoint[];
+}
+
+export interface ContingentTrendResponse {
+  period: "day" | "week";
+  split: "faculty" | "form" | null;
+  series: ContingentTrendSeries[];
+}
+
+export async function getContingentTrend(params?: {
+  period?: "day" | "week";
+  days?: number;
+  faculty_id?: number;
+  form_id?: number | string;
+  split?: "faculty" | "form";
+}): Promise<ContingentTrendResponse> {
+  const resp = await http.get("/monitoring/contingent/trend/", { params });
+  return resp.data as ContingentTrendResponse;
+}
+
+export interface ContingentDiffItem {
+  id: string;
+  name: string;
+  current: number;
+  previous: number;
+  delta: number;
+}
+
+export interface ContingentDiffResponse {
+  diff: {
+    snapshot: { id: number; taken_at: string };
+    grand_total: { current: number; previous: number; delta: number };
+    faculties: ContingentDiffItem[];
+    forms: ContingentDiffItem[];
+  } | null;
+  meta?: CacheMeta;
+}
+
+export async function getContingentDiff(): Promise<ContingentDiffResponse> {
+  const resp = await http.get("/monitoring/contingent/diff/");
+  return resp.data as ContingentDiffResponse;
+}
+
+/** ---------------- CONTINGENT REPORT (local student scan, any dims) ---------------- **/
+export type ContingentDimension = "faculty" | "education_form" | "course" | "gender";
+
+export interface ContingentPercentiles {
+  p50: number;
+  p75: number;
+  p90: number;
+  p95: number;
+}
+
+// Har o'lcham uchun: `${dim}_id` (kalit) va `${dim}` (nom)
+export type ContingentReportRow = {
+  count: number;
+  percent: number;
+  rank: number;
+} & Record<string, string | number | null>;
+
+export interface ContingentReportResponse {
+  dims: ContingentDimension[];
+  total: number;
+  cells: number;
+  cell_percentiles: ContingentPercentiles;
+  rows: ContingentReportRow[];
+  marginals: Partial<Record<ContingentDimension, ContingentReportRow[]>>;
+  meta?: CacheMeta;
+}
+
+export async function getContingentReport(
+  dims: ContingentDimension[] = ["faculty", "education_form"]
+): Promise<ContingentReportResponse> {
+  const resp = await http.get("/monitoring/contingent/report/", {
+    params: { dims: dims.join(",") },
+  });
+  return resp.data as ContingentReportResponse;
+}
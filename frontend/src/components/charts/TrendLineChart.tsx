@@ -0,0 +1,74 @@
+import React, { useMemo } from "react";
+import {
+  LineChart,
+  Line,
+  XAxis,
+  YAxis,
+  CartesianGrid,
+  Tooltip,
+  Legend,
+  ResponsiveContainer,
+} from "recharts";
+import type { ContingentTrendSeries } from "../../api/monitoring";
+
+const COLORS = [
+  "#4361EE",
+  "#F72585",
+  "#3A0CA3",
+  "#4CC9F0",
+  "#06D6A0",
+  "#FFD166",
+  "#EF476F",
+  "#7209B7",
+  "#118AB2",
+  "#FF9F1C",
+];
+
+interface TrendLineChartProps {
+  series: ContingentTrendSeries[];
+  height?: number;
+}
+
+// Seriyalar (faculty/form/jami) -> recharts qatorlari: { date, [key]: total }
+const TrendLineChart: React.FC<TrendLineChartProps> = ({ series, height = 320 }) => {
+  const rows = useMemo(() => {
+    const byDate = new Map<string, Record<string, number | string>>();
+    series.forEach((s) => {
+      s.points.forEach((p) => {
+        const row = byDate.get(p.date) || { date: p.date };
+        row[s.key] = p.total;
+        byDate.set(p.date, row);
+      });
+    });
+    return Array.from(byDate.values()).sort((a, b) => String(a.date).localeCompare(String(b.date)));
+  }, [series]);
+
+  if (!rows.length) {
+    return <p style={{ color: "#6b7280" }}>Tarixiy ma'lumot hali yo‘q.</p>;
+  }
+
+  return (
+    <ResponsiveContainer width="100%" height={height}>
+      <LineChart data={rows} margin={{ top: 10, right: 30, left: 10, bottom: 10 }}>
+        <CartesianGrid strokeDasharray="3 3" vertical={false} stroke="#e5e7eb" />
+        <XAxis dataKey="date" tick={{ fontSize: 12, fill: "#6b7280" }} />
+        <YAxis tick={{ fontSize: 12, fill: "#6b7280" }} axisLine={false} tickLine={false} />
+        <Tooltip formatter={(value: any) => Number(value).toLocaleString("uz-UZ")} />
+        {series.length > 1 && <Legend />}
+        {series.map((s, i) => (
+          <Line
+            key={s.key}
+            type="monotone"
+            dataKey={s.key}
+            name={s.name}
+            stroke={COLORS[i % COLORS.length]}
+            strokeWidth={2}
+            dot={false}
+          />
+        ))}
+      </LineChart>
+    </ResponsiveContainer>
+  );
+};
+
+export default TrendLineChart;
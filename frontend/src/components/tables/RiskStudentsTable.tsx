@@ -0,0 +1,56 @@
+import React from "react";
+import type { AttendanceRiskRow } from "../../api/monitoring";
+
+interface RiskStudentsTableProps {
+  rows: AttendanceRiskRow[];
+  loading?: boolean;
+  // Butun universitet ro'yxatida fakultet ustuni ko'rsatiladi
+  showFaculty?: boolean;
+}
+
+const RiskStudentsTable: React.FC<RiskStudentsTableProps> = ({ rows, loading, showFaculty }) => {
+  if (loading) {
+    return <div className="att-muted">Yuklanmoqda...</div>;
+  }
+  if (!rows.length) {
+    return <div className="att-muted">Xavf guruhidagi talabalar topilmadi</div>;
+  }
+
+  return (
+    <div className="att-table-wrap">
+      <table className="att-table">
+        <thead>
+          <tr>
+            <th>#</th>
+            <th>Talaba</th>
+            {showFaculty && <th>Fakultet</th>}
+            <th>Guruh</th>
+            <th>Mutaxassislik</th>
+            <th>Sababli</th>
+            <th>Sababsiz</th>
+            <th>Jami</th>
+            <th>%</th>
+          </tr>
+        </thead>
+        <tbody>
+          {rows.map((r, i) => (
+            // F.I.O. takrorlanishi mumkin - kalit talaba id'si + guruh
+            <tr key={r.student_id ? `${r.student_id}-${r.group}` : `${r.group}-${r.entity}-${i}`}>
+              <td>{i + 1}</td>
+              <td>{r.entity}</td>
+              {showFaculty && <td>{r.faculty}</td>}
+              <td>{r.group}</td>
+              <td>{r.specialty || "-"}</td>
+              <td>{r.absent_on}</td>
+              <td>{r.absent_off}</td>
+              <td>{r.total_absent ?? r.absent_on + r.absent_off}</td>
+              <td>{r.total_percent.toFixed(1)}</td>
+            </tr>
+          ))}
+        </tbody>
+      </table>
+    </div>
+  );
+};
+
+export default RiskStudentsTable;
@@ -1,8 +1,9 @@
 import React, { useEffect, useState } from "react";
 import {
   getDepartmentList,
-  getEmployeeList,
+  getEmployees,
   type DepartmentItem,
+  type EmployeeFacet,
   type EmployeeItem,
 } from "../../api/monitoring";
 import "./attendance.css";
@@ -178,20 +179,24 @@ const AttendanceAnalyticsPage: React.FC = () => {
   const [formCode, setFormCode] = useState<string>("");
   const [statusCode, setStatusCode] = useState<string>("");
   const [search, setSearch] = useState<string>("");
+  const [debouncedSearch, setDebouncedSearch] = useState<string>("");
   const [isSubmitted, setIsSubmitted] = useState(false);
 
   // --------- OPTIONS STATE ---------
   const [depts, setDepts] = useState<DepartmentItem[]>([]);
-  const [forms, setForms] = useState<{ code: string; name: string }[]>([]);
-  const [statuses, setStatuses] = useState<{ code: string; name: string }[]>([]);
+  const [forms, setForms] = useState<EmployeeFacet[]>([]);
+  const [statuses, setStatuses] = useState<EmployeeFacet[]>([]);
 
   // --------- DATA STATE ---------
-  const [rawItems, setRawItems] = useState<EmployeeItem[]>([]); // NEW: Store unfiltered data
+  // Filtr, facet va sahifalash backend'da (to‘liq ro‘yxat serverda keshlanadi)
   const [rows, setRows] = useState<EmployeeItem[]>([]);
+  const [totalCount, setTotalCount] = useState(0);
+  const [totalLoaded, setTotalLoaded] = useState(0);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string>("");
+  const requestSeq = React.useRef(0);
 
-  // --------- PAGINATION (Client-side) ---------
+  // --------- PAGINATION (Server-side) ---------
   const [page, setPage] = useState(1);
   const limit = 50;
 
@@ -217,236 +222,87 @@ const AttendanceAnalyticsPage: React.FC = () => {
       .catch((err) => console.error("Failed to load departments", err));
   }, []);
 
-  // ========== CRITICAL: RESET DEPENDENT FILTERS ON KAFEDRA CHANGE ==========
+  // Search: har harfda emas, 300ms to‘xtalgandan keyin so‘rov
   useEffect(() => {
-    // When Kafedra changes:
-    // 1. Reset filters
-    setFormCode("");
-    setStatusCode("");
-    setSearch("");
-    // 2. Reset UI state
-    setIsSubmitted(false);
-    setPage(1);
-
-    // 3. IMMEDIATELY fetch options/data for the new department
-    // This ensures options are fresh even before "Ko'rsatish" is clicked
-    if (deptId) {
-      fetchAllPages();
-    } else {
-      // If "Barchasi" selected, also fetch immediately
-      fetchAllPages();
-    }
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [deptId]);
-
-  // 1. Normalize Helper
-  const normalize = (str: any) => {
-    return String(str || "")
-      .toLowerCase()
-      .trim()
-      .replace(/\s+/g, " ");
-  };
-
-  // 2. Filter Logic (Strict & Robust) - SINGLE SOURCE OF TRUTH
-  const applyFilters = (items: EmployeeItem[]) => {
-    let res = items;
-
-    // A) Department Filter (double-check, server should handle this)
-    if (deptId) {
-      res = res.filter((x) => String(x.department?.id) === String(deptId));
-    }
-
-    // B) Employment Form Filter (Mehnat shakli)
-    // ONLY check employmentForm.code
-    if (formCode) {
-      res = res.filter((x) => {
-        const fCode = x.employmentForm?.code;
-        return fCode && String(fCode) === String(formCode);
-      });
-    }
-
-    // C) Status Filter
-    // Checks "active" boolean if present, else employeeStatus.code
-    if (statusCode) {
-      res = res.filter((x: any) => {
-        // 1. If filtering for "true" (Ishlamoqda) or "false" (Bo'shagan)
-        if (statusCode === "true") return x.active === true;
-        if (statusCode === "false") return x.active === false;
-
-        // 2. Fallback to normal code match
-        const code = x.employeeStatus?.code;
-        return code && String(code) === String(statusCode);
-      });
-    }
-
-    // D) Search Filter (Normalized)
-    const q = normalize(search);
-    if (q) {
-      res = res.filter((x) => {
-        const fields = [
-          x.full_name,
-          x.short_name,
-          x.employee_id_number,
-        ];
-        return fields.some(f => normalize(f).includes(q));
-      });
-    }
-
-    return res;
+    const t = setTimeout(() => {
+      setDebouncedSearch(search);
+      setPage(1);
+    }, 300);
+    return () => clearTimeout(t);
+  }, [search]);
+
+  const buildParams = () => {
+    const params: Parameters<typeof getEmployees>[0] = { type: "teacher" };
+    if (deptId) params.department = deptId;
+    if (formCode) params.employment_form = formCode;
+    if (statusCode) params.status = statusCode;
+    if (debouncedSearch.trim()) params.search = debouncedSearch;
+    return params;
   };
 
-  // 3. Fetch ALL Pages for Complete Dataset
-  const fetchAllPages = async () => {
+  // 2. Fetch one page + facets (backend cache; HEMIS crawled once per kafedra)
+  const fetchPage = async (p: number) => {
+    const seq = ++requestSeq.current;
     setLoading(true);
-    // setOptionsLoading(true);
     setError("");
-    setRawItems([]);
-    setRows([]);
 
     try {
-      const baseParams: any = {
-        type: "teacher",
-        limit: 200, // Maximize per page
-        page: 1,
-      };
-
-      if (deptId) baseParams["_department"] = deptId;
-      // Note: We don't send search/form/status to API - we filter client-side
-      // This ensures we get complete dataset for building options
-
-      // Fetch first page
-      const res1 = await getEmployeeList(baseParams);
-      let allItems = res1.data?.items || [];
-      const totalCount = res1.data?.pagination?.totalCount || 0;
-      const totalPages = Math.ceil(totalCount / 200);
-
-      // Fetch remaining pages in parallel
-      if (totalPages > 1) {
-        const promises = [];
-        for (let p = 2; p <= totalPages; p++) {
-          promises.push(getEmployeeList({ ...baseParams, page: p }));
-        }
-        const results = await Promise.all(promises);
-        results.forEach(r => {
-          const pageItems = r.data?.items || [];
-          allItems = allItems.concat(pageItems);
-        });
-      }
-
-      // Store raw items
-      setRawItems(allItems);
-
-      // Build COMPLETE options from ALL items
-
-      // 1. MEHNAT SHAKLI: Use ONLY employmentForm (Asosiy, O'rindoshlik, etc.)
-      const formMap = new Map<string, { code: string; name: string }>();
-      allItems.forEach((item: any) => {
-        if (item.employmentForm?.code) {
-          formMap.set(item.employmentForm.code, {
-            code: item.employmentForm.code,
-            name: item.employmentForm.name,
-          });
-        }
-      });
-      setForms(Array.from(formMap.values()));
-
-
-
-      // 2. STATUS: Deduplicate by favoring employmentStatus, fallback to active
-      const statusMap = new Map<string, { code: string; name: string }>();
-      allItems.forEach((item: any) => {
-        // If real status object exists, use it (Granular: "Mehnat ta'tilida", "Ishlamoqda")
-        if (item.employeeStatus?.code) {
-          statusMap.set(item.employeeStatus.code, {
-            code: item.employeeStatus.code,
-            name: item.employeeStatus.name,
-          });
-        }
-        // Fallback: If no status object, but has 'active' boolean -> Map to "true"/"false"
-        else if (typeof item.active === 'boolean') {
-          const code = item.active ? "true" : "false";
-          const name = item.active ? "Ishlamoqda" : "Bo‘shagan";
-          statusMap.set(code, { code, name });
-        }
-      });
-      setStatuses(Array.from(statusMap.values()));
-
-      // Apply filters to get displayed rows
-      const filteredItems = applyFilters(allItems);
-      setRows(filteredItems);
-
+      const res = await getEmployees({ ...buildParams(), page: p, limit });
+      if (seq !== requestSeq.current) return; // eskirgan javob
+
+      setRows(res.items || []);
+      setTotalCount(res.pagination?.totalCount || 0);
+      setTotalLoaded(res.total_loaded || 0);
+      setForms(res.facets?.employment_forms || []);
+      setStatuses(res.facets?.statuses || []);
     } catch (e: any) {
+      if (seq !== requestSeq.current) return;
       console.error(e);
       setError("Ma'lumotlarni yuklashda xatolik yuz berdi.");
+      setRows([]);
+      setTotalCount(0);
     } finally {
-      setLoading(false);
-      // setOptionsLoading(false);
+      if (seq === requestSeq.current) setLoading(false);
     }
   };
 
-  // 4. Re-apply filters when filter values change or when submitted
+  // ========== CRITICAL: RESET DEPENDENT FILTERS ON KAFEDRA CHANGE ==========
   useEffect(() => {
-    // Only update rows if we have data
-    if (rawItems.length > 0) {
-      const filtered = applyFilters(rawItems);
-      setRows(filtered);
-      setPage(1);
-    }
-  }, [formCode, statusCode, search, isSubmitted]); // Add isSubmitted to ensure sync
+    // When Kafedra changes: reset filters and UI state
+    setFormCode("");
+    setStatusCode("");
+    setSearch("");
+    setDebouncedSearch("");
+    setIsSubmitted(false);
+    setPage(1);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [deptId]);
+
+  // 3. Refetch when filters / page change (options stay fresh even before "Ko'rsatish")
+  useEffect(() => {
+    fetchPage(page);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [deptId, formCode, statusCode, debouncedSearch, page]);
 
-  // 5. Submit Handler
+  // 4. Submit Handler
   const onSubmit = () => {
     setIsSubmitted(true);
-    // Data is likely already loaded by dept change, but ensure
-    if (rawItems.length === 0) {
-      fetchAllPages();
+    if (rows.length === 0 && !loading) {
+      fetchPage(page);
     }
   };
 
   const [exportLoading, setExportLoading] = useState(false);
 
-  // 5. Export Handler (ALL PAGES)
+  // 5. Export Handler (ALL filtered rows in one request, from backend cache)
   const handleExport = async () => {
     if (!isSubmitted || exportLoading) return;
 
     try {
       setExportLoading(true);
 
-      // 1. Prepare Params for iteration
-      const baseParams: any = {
-        type: "teacher",
-        limit: 200, // Maximize per page
-        page: 1,
-      };
-      if (deptId) baseParams["_department"] = deptId;
-      // Note: We don't send search to API to ensure we get broader set and filter locally strictly
-      // But if 'search' reduces result set significantly on server, it's good. 
-      // User policy: "UI must match HEMIS". We used strict client filter. 
-      // Safest: Fetch without search if we trust client filter 100%, OR fetch WITH search and filter again.
-      // Let's pass search if present to respect server filtering first.
-      if (search) baseParams["search"] = search;
-
-      // 2. Initial Fetch
-      const res1 = await getEmployeeList(baseParams);
-      let allItems = res1.data?.items || [];
-      const totalCount = res1.data?.pagination?.totalCount || 0;
-      const totalPages = Math.ceil(totalCount / 200);
-
-      // 3. Fetch Remaining Pages
-      if (totalPages > 1) {
-        const promises = [];
-        for (let p = 2; p <= totalPages; p++) {
-          promises.push(getEmployeeList({ ...baseParams, page: p }));
-        }
-        const results = await Promise.all(promises);
-        results.forEach(r => {
-          const pageItems = r.data?.items || [];
-          allItems = allItems.concat(pageItems);
-        });
-      }
-
-      // 4. Apply Strict Filters on ALL items
-      const finalRows = applyFilters(allItems);
+      const res = await getEmployees({ ...buildParams(), page: 1, limit: 0 });
+      const finalRows = res.items || [];
 
       if (finalRows.length === 0) {
         alert("Eksport qilish uchun ma'lumot topilmadi.");
@@ -535,9 +391,6 @@ const AttendanceAnalyticsPage: React.FC = () => {
     }
   };
 
-  // CLIENT-SIDE PAGINATION SLICE
-  const displayedRows = rows.slice((page - 1) * limit, page * limit);
-
   return (
     <div className="att-page">
       <div className="att-hero">
@@ -565,12 +418,15 @@ const AttendanceAnalyticsPage: React.FC = () => {
             <label>MEHNAT SHAKLI</label>
             <select
               value={formCode}
-              onChange={(e) => setFormCode(e.target.value)}
+              onChange={(e) => {
+                setFormCode(e.target.value);
+                setPage(1);
+              }}
             >
               <option value="">Barchasi</option>
               {forms.map((f) => (
                 <option key={f.code} value={f.code}>
-                  {f.name}
+                  {f.name} ({f.count})
                 </option>
               ))}
             </select>
@@ -580,12 +436,15 @@ const AttendanceAnalyticsPage: React.FC = () => {
             <label>STATUS</label>
             <select
               value={statusCode}
-              onChange={(e) => setStatusCode(e.target.value)}
+              onChange={(e) => {
+                setStatusCode(e.target.value);
+                setPage(1);
+              }}
             >
               <option value="">Barchasi</option>
               {statuses.map((s) => (
                 <option key={s.code} value={s.code}>
-                  {s.name}
+                  {s.name} ({s.count})
                 </option>
               ))}
             </select>
@@ -619,7 +478,7 @@ const AttendanceAnalyticsPage: React.FC = () => {
         <div className="att-result-head">
           <div style={{ display: "flex", alignItems: "center", gap: "15px" }}>
             <h2>Natija</h2>
-            {isSubmitted && rows.length > 0 && (
+            {isSubmitted && totalCount > 0 && (
               <button
                 className="att-btn"
                 onClick={handleExport}
@@ -638,7 +497,7 @@ const AttendanceAnalyticsPage: React.FC = () => {
           </div>
           {isSubmitted && (
             <div className="att-muted">
-              Jami yuklangan: {rawItems.length} ta | Ko‘rsatilmoqda: {rows.length} ta
+              Jami yuklangan: {totalLoaded} ta | Ko‘rsatilmoqda: {totalCount} ta
             </div>
           )}
         </div>
@@ -672,7 +531,7 @@ const AttendanceAnalyticsPage: React.FC = () => {
                   </td>
                 </tr>
               ) : (
-                displayedRows.map((r, idx) => (
+                rows.map((r, idx) => (
                   <tr key={r.id || idx}>
                     <td>{(page - 1) * limit + idx + 1}</td>
                     <td>{r.employeeStatus?.name || "-"}</td>
@@ -688,13 +547,13 @@ const AttendanceAnalyticsPage: React.FC = () => {
           </table>
         </div>
 
-        {isSubmitted && rows.length > 0 && (
+        {isSubmitted && totalCount > 0 && (
           <div
             className="att-pagination"
             style={{ marginTop: 20, display: "flex", gap: 10, alignItems: "center" }}
           >
             <button
-              disabled={page <= 1}
+              disabled={loading || page <= 1}
               onClick={() => setPage((p) => p - 1)}
               className="att-btn"
               style={{ padding: "5px 10px", fontSize: 14 }}
@@ -702,10 +561,10 @@ const AttendanceAnalyticsPage: React.FC = () => {
               Ortga
             </button>
             <span>
-              Sahifa {page} / {Math.ceil(rows.length / limit)}
+              Sahifa {page} / {Math.ceil(totalCount / limit)}
             </span>
             <button
-              disabled={page * limit >= rows.length}
+              disabled={loading || page * limit >= totalCount}
               onClick={() => setPage((p) => p + 1)}
               className="att-btn"
               style={{ padding: "5px 10px", fontSize: 14 }}
@@ -713,7 +572,7 @@ const AttendanceAnalyticsPage: React.FC = () => {
               Oldinga
             </button>
             <span style={{ marginLeft: "auto", fontWeight: "bold" }}>
-              Jami: {rawItems.length} | Filtr: {rows.length}
+              Jami: {totalLoaded} | Filtr: {totalCount}
             </span>
           </div>
         )}
@@ -12,9 +12,16 @@ import {
   Pie,
   Cell,
 } from "recharts";
-import { getStudentContingentSummary } from "../../api/monitoring";
+import { getAttendanceRisk, getContingentTrend, getStudentContingentSummary } from "../../api/monitoring";
+import type { AttendanceRiskProgress, AttendanceRiskRow, ContingentTrendResponse } from "../../api/monitoring";
+import TrendLineChart from "../../components/charts/TrendLineChart";
+import RiskStudentsTable from "../../components/tables/RiskStudentsTable";
 import FacultyEducationTable from "./FacultyEducationTable";
 import "./OverviewDashboard.css";
+import "./attendance.css";
+
+// Universitet xavf ro'yxati fonda quriladi - tayyor bo'lguncha shu oraliqda qayta so'raladi
+const RISK_POLL_MS = 3000;
 
 // --- Types ---
 type FacultyStat = { name: string; count: number };
@@ -76,6 +83,50 @@ const OverviewDashboard: React.FC = () => {
   const [data, setData] = useState<MonitoringData | null>(null);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
+  const [trend, setTrend] = useState<ContingentTrendResponse | null>(null);
+  const [trendPeriod, setTrendPeriod] = useState<"day" | "week">("day");
+  const [riskRows, setRiskRows] = useState<AttendanceRiskRow[] | null>(null);
+  const [riskProgress, setRiskProgress] = useState<AttendanceRiskProgress | null>(null);
+
+  // Kontingent tarixi (DB nusxalari) - asosiy ma'lumotdan mustaqil, xatosi sahifani to‘xtatmaydi
+  useEffect(() => {
+    getContingentTrend({ period: trendPeriod, days: trendPeriod === "day" ? 90 : 365, split: "form" })
+      .then(setTrend)
+      .catch((err) => console.error("Failed to load contingent trend:", err));
+  }, [trendPeriod]);
+
+  // Eng ko'p dars qoldirgan talabalar (butun universitet) - 202 bo'lsa progress ko'rsatilib qayta so'raladi
+  useEffect(() => {
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let cancelled = false;
+
+    const load = () => {
+      getAttendanceRisk({ k: 20 })
+        .then((res) => {
+          if (cancelled) return;
+          if (res.ready) {
+            setRiskRows(res.data.rows);
+            setRiskProgress(null);
+          } else if (res.progress?.status === "failed") {
+            setRiskRows([]);
+            setRiskProgress(res.progress);
+          } else {
+            setRiskProgress(res.progress);
+            timer = setTimeout(load, RISK_POLL_MS);
+          }
+        })
+        .catch((err) => {
+          console.error("Failed to load attendance risk:", err);
+          if (!cancelled) setRiskRows([]);
+        });
+    };
+
+    load();
+    return () => {
+      cancelled = true;
+      if (timer) clearTimeout(timer);
+    };
+  }, []);
 
   useEffect(() => {
     const fetchData = async () => {
@@ -242,6 +293,35 @@ const OverviewDashboard: React.FC = () => {
 
       </div>
 
+      {/* Contingent history */}
+      <div className="hm-chart-panel">
+        <div className="hm-panel-header">
+          <h3 className="hm-panel-title">KONTINGENT DINAMIKASI (TAʼLIM SHAKLI KESIMIDA)</h3>
+          <select
+            value={trendPeriod}
+            onChange={(e) => setTrendPeriod(e.target.value as "day" | "week")}
+          >
+            <option value="day">Kunlik</option>
+            <option value="week">Haftalik</option>
+          </select>
+        </div>
+        <TrendLineChart series={trend?.series || []} />
+      </div>
+
+      {/* Attendance risk (top-K) */}
+      <div className="hm-chart-panel">
+        <div className="hm-panel-header">
+          <h3 className="hm-panel-title">ENG KO‘P DARS QOLDIRGAN TALABALAR</h3>
+          {riskProgress?.groups_total ? (
+            <span className="att-muted">
+              Guruhlar: {riskProgress.groups ?? 0} / {riskProgress.groups_total}
+            </span>
+          ) : null}
+        </div>
+        {riskProgress?.status === "failed" && <div className="att-error">Xatolik: {riskProgress.error}</div>}
+        <RiskStudentsTable rows={riskRows || []} loading={riskRows === null} showFaculty />
+      </div>
+
       {/* Integration of the new Faculty Table Component */}
       <FacultyEducationTable />
     </div>